@@ -0,0 +1,81 @@
+"""
+augment_prompt 경로 비교: 기존 3단계(키워드 추출 -> 정의 검색 -> 번역) vs 1회 호출(combined + 로컬 언어 판별).
+질문별 end-to-end 지연과 LLM 토큰 사용량(core/accounting.py 집계)을 출력한다.
+
+실제 API:
+    python benchmarks/bench_augment_prompt.py --repeat 3
+로컬 fake 서버 (네트워크 없이):
+    python benchmarks/fake_openai_server.py --port 8090 &
+    UPSTAGE_BASE_URL=http://127.0.0.1:8090/v1 python benchmarks/bench_augment_prompt.py --fake-tavily-latency 0.4
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import requests
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT_DIR)
+
+QUESTIONS = [
+    "Downstream task에 대해 모델의 재사용성을 향상시킨 후속논문을 알려줘.",
+    "어텐션 메커니즘의 계산 효율을 개선한 논문을 알려줘.",
+    "Which follow-up papers improved the computational efficiency of attention?",
+    "Tell me about parameter-efficient fine-tuning methods built on this paper.",
+]
+
+def make_fake_tavily_search(latency: float):
+    """네트워크 없이 정의 검색 지연만 흉내 내는 source_api.tavily_search 대체 함수"""
+
+    def fake_tavily_search(api_key: str, query: str, max_results: int, timeout: float) -> list[dict]:
+        time.sleep(min(latency, timeout))
+        if latency > timeout:
+            raise requests.Timeout(f"fake Tavily timeout ({timeout}s)")
+        return [{"content": f"definition for {query[-30:]}"}][:max_results]
+
+    return fake_tavily_search
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--fake-tavily-latency", type=float, default=None,
+                        help="설정하면 Tavily 대신 지정한 지연(초)의 fake 검색을 사용")
+    args = parser.parse_args()
+
+    from services.rag_api.src.core import retriever, definition_cache, glossary
+    from services.rag_api.src.core.accounting import ledger, usage_scope
+
+    # 용어집 hit이 섞이면 두 경로의 LLM 호출 비용 비교가 흐려지므로 빈 용어집을 사용한다.
+    glossary._glossary = glossary.Glossary([], [])
+    if args.fake_tavily_latency is not None:
+        # _search_definition 이 모듈 전역 이름으로 찾으므로 retriever 모듈의 tavily_search 를 바꾼다.
+        retriever.tavily_search = make_fake_tavily_search(args.fake_tavily_latency)
+
+    flows = {
+        "three_step": retriever.augment_prompt_three_step,
+        "combined": retriever.augment_prompt_combined,
+    }
+    latencies = {name: [] for name in flows}
+    for i in range(args.repeat):
+        for question in QUESTIONS:
+            for name, flow in flows.items():
+                # 두 경로가 같은 조건(정의 캐시 miss)에서 비교되도록 매 호출 전에 빈 캐시로 바꾼다.
+                definition_cache._cache = definition_cache.DefinitionCache(":memory:")
+                with usage_scope(thread_id=f"bench-{name}", node="augment_prompt"):
+                    start = time.perf_counter()
+                    flow(question, retriever.UPSTAGE_API_KEY or "fake-key", retriever.TAVILY_SEARCH or "fake-key")
+                    latencies[name].append((time.perf_counter() - start) * 1000)
+
+    runs = args.repeat * len(QUESTIONS)
+    print(f"\n{'flow':<12}{'p50 ms':>10}{'p95 ms':>10}{'calls/q':>9}{'prompt tok/q':>14}{'compl tok/q':>13}")
+    for name in flows:
+        values = sorted(latencies[name])
+        p95 = values[int(0.95 * (len(values) - 1))]
+        total = ledger.thread_stats(f"bench-{name}")["total"]
+        print(f"{name:<12}{statistics.median(values):>10.1f}{p95:>10.1f}"
+              f"{total['calls'] / runs:>9.2f}{total['prompt_tokens'] / runs:>14.1f}{total['completion_tokens'] / runs:>13.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+LangGraph 체크포인터(services/rag_api/src/graph/checkpointer.py) 메모리/저장량 비교: MemorySaver vs SQLite(PrunedCheckpointSaver).
+Phase 1(중단) -> Phase 2 재개 -> 후속 질문 --turns 회로 이루어진 대화를 매 "시간" --threads-per-hour 개씩 흘려보내고,
+시간마다 프로세스 힙(tracemalloc)과 저장된 체크포인트/writes 행 수를 출력한다.
+시간 경과는 graph_threads.updated_at 을 한 시간씩 앞당겨 흉내 내고, 그때마다 CheckpointCompactor.run_once()를 실행한다.
+
+    python benchmarks/bench_checkpointer.py --hours 48 --threads-per-hour 50 --payload-kb 64
+"""
+import argparse
+import operator
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Annotated, TypedDict
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT_DIR)
+
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import StateGraph, END
+from langgraph.types import Command, interrupt
+
+from services.rag_api.src.graph.checkpointer import CheckpointCompactor, PrunedCheckpointSaver, _SqliteBackend
+
+class State(TypedDict):
+    question: str
+    context: list
+    messages: Annotated[list, operator.add]
+
+def build(checkpointer, payload_kb: int):
+    """select_paper(중단) -> generate_answer 를 흉내 내는 작은 그래프. context에 payload_kb 크기의 값을 싣는다."""
+    payload = [0.0] * (payload_kb * 1024 // 8)
+
+    def select_paper(state):
+        return {"context": payload, "messages": [state["question"]]}
+
+    def wait_user(state):
+        return {"messages": [interrupt("confirm paper")]}
+
+    def generate_answer(state):
+        return {"messages": ["answer " * 20]}
+
+    g = StateGraph(State)
+    g.add_node("select_paper", select_paper)
+    g.add_node("wait_user", wait_user)
+    g.add_node("generate_answer", generate_answer)
+    g.set_entry_point("select_paper")
+    g.add_edge("select_paper", "wait_user")
+    g.add_edge("wait_user", "generate_answer")
+    g.add_edge("generate_answer", END)
+    return g.compile(checkpointer=checkpointer)
+
+def run(name: str, checkpointer, args) -> None:
+    app = build(checkpointer, args.payload_kb)
+    compactor = CheckpointCompactor(checkpointer) if isinstance(checkpointer, PrunedCheckpointSaver) else None
+    tracemalloc.start()
+    print(f"\n[{name}]")
+    print(f"{'hour':>6}{'threads':>9}{'heap MB':>10}{'checkpoints':>13}{'writes':>9}{'sec':>7}")
+    n = 0
+    for hour in range(1, args.hours + 1):
+        start = time.perf_counter()
+        for _ in range(args.threads_per_hour):
+            cfg = {"configurable": {"thread_id": f"{name}-{n}"}}
+            n += 1
+            for turn in range(args.turns):
+                app.invoke({"question": f"q{turn}", "context": [], "messages": []}, cfg)
+                app.invoke(Command(resume="yes"), cfg)
+        if compactor is not None:
+            with checkpointer.backend.cursor() as cur:
+                cur.execute("UPDATE graph_threads SET updated_at = updated_at - 3600")
+            compactor.run_once()
+            rows = checkpointer.stats()
+        else:
+            rows = {"checkpoints": sum(len(v) for ns in checkpointer.storage.values() for v in ns.values()),
+                    "writes": sum(len(v) for v in checkpointer.writes.values())}
+        heap = tracemalloc.get_traced_memory()[0] / 2**20
+        if hour == 1 or hour % args.report_every == 0 or hour == args.hours:
+            print(f"{hour:>6}{n:>9}{heap:>10.1f}{rows['checkpoints']:>13}{rows['writes']:>9}{time.perf_counter() - start:>7.2f}")
+    tracemalloc.stop()
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--hours", type=int, default=48)
+    parser.add_argument("--threads-per-hour", type=int, default=50)
+    parser.add_argument("--turns", type=int, default=3, help="thread당 질문 수")
+    parser.add_argument("--payload-kb", type=int, default=64, help="체크포인트 state에 싣는 값의 크기")
+    parser.add_argument("--max-per-thread", type=int, default=20)
+    parser.add_argument("--ttl-hours", type=float, default=24)
+    parser.add_argument("--idle-hours", type=float, default=1)
+    parser.add_argument("--report-every", type=int, default=6)
+    parser.add_argument("--skip-memory", action="store_true", help="MemorySaver 비교 생략")
+    args = parser.parse_args()
+
+    if not args.skip_memory:
+        run("memory", MemorySaver(), args)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "checkpoints.sqlite")
+        saver = PrunedCheckpointSaver(_SqliteBackend(path), max_per_thread=args.max_per_thread,
+                                      ttl_s=args.ttl_hours * 3600, compact_idle_s=args.idle_hours * 3600 - 1)
+        run("sqlite", saver, args)
+        saver.backend.close()
+        print(f"sqlite 파일 크기: {os.path.getsize(path) / 2**20:.1f} MB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+중복 논문 탐지(db/dedup.py) 성능/정확도 측정.
+무작위 제목으로 OpenAlex/arXiv 레코드를 만들고 일부를 변형(대소문자, 구두점, 글자 뒤바뀜, 단어 삭제, 접미어)한 중복으로 넣은 뒤,
+찾은 중복 쌍의 recall/precision과 단계별 시간을 출력한다. --brute 를 주면 전체 쌍 비교(title_similarity)의 예상 시간도 계산한다.
+
+    python benchmarks/bench_dedup.py --records 1000000 --dup-rate 0.1
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT_DIR)
+
+from db.dedup import deduplicate, arxiv_doi
+from db.util import title_similarity
+
+COMMON = "towards understanding improving via with for from on of in and a the using beyond".split()
+
+def make_vocab(size: int, rng: random.Random) -> list[str]:
+    """실제 논문 제목처럼 어휘가 다양하도록 영어 글자 빈도로 만든 가짜 단어"""
+    letters = "eeeeeeeeeeeettttttttaaaaaaaooooooiiiiiiinnnnnnnsssssshhhhhhrrrrrrddddllllcccuuummwwffggyyppbbvk"
+    return list({"".join(rng.choice(letters) for _ in range(rng.randint(3, 11))) for _ in range(size)})
+
+def perturb(title: str, rng: random.Random) -> str:
+    """같은 논문의 다른 출처 표기를 흉내 낸다."""
+    kind = rng.randrange(5)
+    if kind == 0:
+        return title.upper()
+    if kind == 1:
+        return title.replace(" ", ": ", 1) + "."
+    words = title.split()
+    if kind == 2 and len(words) > 4:
+        i = rng.randrange(len(words))
+        return " ".join(words[:i] + words[i + 1:])
+    if kind == 3:
+        i = rng.randrange(len(title) - 1)
+        return title[:i] + title[i + 1] + title[i] + title[i + 2:]
+    return title + " (extended version)"
+
+def make_records(n: int, dup_rate: float, seed: int = 0):
+    rng = random.Random(seed)
+    vocab = make_vocab(50000, rng)
+    n_dups = int(n * dup_rate)
+    n_unique = n - n_dups
+    rows, truth = [], []
+    for i in range(n_unique):
+        title = " ".join(rng.choice(COMMON) if rng.random() < 0.25 else rng.choice(vocab) for _ in range(rng.randint(6, 14))).capitalize()
+        rows.append(("openalex", f"W{i}", title, f"10.1000/fake.{i}" if rng.random() < 0.5 else "", rng.randint(0, 1000)))
+    for k in range(n_dups):
+        src = rng.randrange(n_unique)
+        title = perturb(rows[src][2], rng)
+        if rng.random() < 0.7:
+            arxiv_id = f"{2300 + k % 100}.{k:05d}v1"
+            rows.append(("arxiv", arxiv_id, title, arxiv_doi(arxiv_id), 0))
+        else:
+            rows.append(("openalex", f"W{n_unique + k}", title, "", rng.randint(0, 1000)))
+        truth.append((src, n_unique + k))
+    records = pd.DataFrame(rows, columns=["source", "source_id", "title", "doi", "cited_by_count"])
+    return records, truth
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--records", type=int, default=200_000)
+    parser.add_argument("--dup-rate", type=float, default=0.1)
+    parser.add_argument("--brute", action="store_true", help="전체 쌍 비교 시간을 1000쌍 샘플로 추정")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    records, truth = make_records(args.records, args.dup_rate)
+    print(f"records: {len(records)} (true duplicates: {len(truth)}), generated in {time.perf_counter() - start:.1f}s")
+
+    id_map, stats = deduplicate(records)
+    print(f"stats: {stats}")
+
+    canonical = id_map["canonical_id"].to_numpy()
+    found = sum(canonical[a] == canonical[b] for a, b in truth)
+    # 정답 그룹과 다른 레코드가 같은 그룹으로 묶인 경우 (원본 기준)
+    true_group = np.arange(len(records))
+    for a, b in truth:
+        true_group[b] = a
+    df = pd.DataFrame({"canonical": canonical, "true": true_group})
+    wrong = int((df.groupby("canonical")["true"].nunique() - 1).sum())
+    print(f"recall: {found / max(len(truth), 1):.4f}, wrongly merged groups: {wrong}")
+
+    if args.brute:
+        titles = records["title"].tolist()
+        rng = random.Random(1)
+        sample = [(rng.randrange(len(titles)), rng.randrange(len(titles))) for _ in range(1000)]
+        t = time.perf_counter()
+        for i, j in sample:
+            title_similarity(titles[i], titles[j])
+        per_pair = (time.perf_counter() - t) / len(sample)
+        n = len(titles)
+        print(f"brute force estimate: {n * (n - 1) / 2:,.0f} pairs x {per_pair * 1e6:.1f}us = {n * (n - 1) / 2 * per_pair / 3600:,.1f} h")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+후속 논문 검색 비교: 벡터 검색(mock_db_follow_up_select) vs 하이브리드 검색(db_follow_up_hybrid_select, 벡터 + 전문 검색 RRF).
+Postgres(papers.search_tsv 포함, db/migrate_fulltext.py)와 임베딩 모델이 필요하다.
+
+인용 논문이 --min-citing 개 이상인 기준 논문 --bases 개를 뽑고, 기준 논문마다 인용 논문 하나를 정답으로 정해 그 제목에서 질문을 만든다.
+- terms: 제목에서 고른 정확한 단어(약어/숫자 포함 단어 우선, 예: "BERT", "GPT-3", "ImageNet")만으로 만든 질문
+- title: 제목 전체
+hit@k, MRR@k와 호출 지연(p50/p95, 커넥션 포함, 질문 임베딩 제외)을 출력한다.
+
+    python benchmarks/bench_hybrid_retrieval.py --bases 200 --k 5 --query-mode terms title
+"""
+import argparse
+import os
+import random
+import re
+import statistics
+import sys
+import time
+
+from psycopg2.extras import RealDictCursor
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT_DIR)
+
+from db.db_init import get_conn
+from services.rag_api.src.core.database import mock_db_follow_up_select, db_follow_up_hybrid_select
+from services.rag_api.src.core.get_emb import get_emb_model, get_emb
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "based", "by", "for", "from", "in", "into", "is", "of", "on", "or",
+    "the", "to", "towards", "using", "via", "with", "without", "its", "their", "new", "study", "approach",
+}
+
+def load_cases(conn, n_bases: int, min_citing: int, seed: int) -> list[dict]:
+    """기준 논문 n_bases 개와 각 기준 논문의 정답 인용 논문 하나"""
+    rng = random.Random(seed)
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
+        cur.execute("""
+            SELECT c.cited_openalex_id AS base_id, b.title AS base_title,
+                   array_agg(c.citing_openalex_id ORDER BY c.citing_openalex_id) AS citing
+            FROM citations c
+            JOIN papers p ON p.openalex_id = c.citing_openalex_id
+            JOIN papers b ON b.openalex_id = c.cited_openalex_id
+            WHERE p.embedding IS NOT NULL AND p.abstract IS NOT NULL
+            GROUP BY c.cited_openalex_id, b.title
+            HAVING COUNT(*) >= %s
+            ORDER BY md5(c.cited_openalex_id)
+            LIMIT %s
+        """, (min_citing, n_bases))
+        bases = cur.fetchall()
+        targets = [rng.choice(b["citing"]) for b in bases]
+        cur.execute("SELECT openalex_id, title FROM papers WHERE openalex_id = ANY(%s)", (targets,))
+        titles = {r["openalex_id"]: r["title"] for r in cur.fetchall()}
+    return [
+        {"paper_info": {"openalex_id": b["base_id"], "title": b["base_title"]}, "target": t, "target_title": titles[t],
+         "n_citing": len(b["citing"])}
+        for b, t in zip(bases, targets) if titles.get(t)
+    ]
+
+def exact_terms(title: str, n: int = 2) -> str:
+    """제목에서 정확히 일치해야 의미가 있는 단어를 고른다. 약어/숫자/대문자가 섞인 단어 -> 긴 단어 순"""
+    words = [w for w in re.findall(r"[A-Za-z][A-Za-z0-9\-]+", title) if w.lower() not in STOPWORDS]
+    def distinct(w: str) -> tuple:
+        return (any(c.isdigit() for c in w) or sum(c.isupper() for c in w) >= 2 or "-" in w, len(w))
+    return " ".join(sorted(words, key=distinct, reverse=True)[:n]) or title
+
+def rank_of(rows: list[dict], openalex_id: str) -> int | None:
+    for i, row in enumerate(rows, start=1):
+        if row["openalex_id"] == openalex_id:
+            return i
+    return None
+
+def summarize(ranks: list, latencies: list) -> str:
+    hit = sum(1 for r in ranks if r is not None) / len(ranks)
+    mrr = sum(1 / r for r in ranks if r is not None) / len(ranks)
+    p95 = statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else latencies[0]
+    return f"{hit:>8.3f}{mrr:>8.3f}{statistics.median(latencies):>9.1f}{p95:>9.1f}"
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bases", type=int, default=200)
+    parser.add_argument("--min-citing", type=int, default=20, help="후보가 충분한 기준 논문만 사용")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--pool", type=int, default=100, help="하이브리드 검색의 벡터/전문 검색 후보 수")
+    parser.add_argument("--query-mode", nargs="+", choices=["terms", "title"], default=["terms", "title"])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    conn = get_conn()
+    cases = load_cases(conn, args.bases, args.min_citing, args.seed)
+    conn.close()
+    print(f"bases={len(cases)} (citing papers median {statistics.median(c['n_citing'] for c in cases):.0f}) k={args.k}")
+
+    emb_model = get_emb_model()
+    print(f"{'query':>7}{'method':>8}{'hit@k':>8}{'MRR@k':>8}{'p50 ms':>9}{'p95 ms':>9}")
+    for mode in args.query_mode:
+        queries = [exact_terms(c["target_title"]) if mode == "terms" else c["target_title"] for c in cases]
+        query_vecs = get_emb(emb_model, queries)
+        results = {"vector": ([], []), "hybrid": ([], [])}
+        for case, query, vec in zip(cases, queries, query_vecs):
+            start = time.perf_counter()
+            rows = mock_db_follow_up_select(case["paper_info"], vec, args.k)
+            results["vector"][1].append((time.perf_counter() - start) * 1000)
+            results["vector"][0].append(rank_of(rows, case["target"]))
+
+            start = time.perf_counter()
+            rows = db_follow_up_hybrid_select(case["paper_info"], vec, query, args.k, pool=args.pool)
+            results["hybrid"][1].append((time.perf_counter() - start) * 1000)
+            results["hybrid"][0].append(rank_of(rows, case["target"]))
+        for method, (ranks, latencies) in results.items():
+            print(f"{mode:>7}{method:>8}{summarize(ranks, latencies)}")
+
+if __name__ == "__main__":
+    main()
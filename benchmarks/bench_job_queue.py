@@ -0,0 +1,105 @@
+"""
+임베딩 작업 큐(services/paper-ingestor/src/job_queue.py) 처리량 측정. Postgres가 필요하다. (PGHOST 등 env)
+가짜 논문 --jobs 개를 papers에 넣고 큐에 넣은 뒤, 워커 수를 바꿔 가며 모두 처리하는 데 걸린 시간을 잰다.
+임베딩은 배치 크기에 비례해 sleep하는 가짜 함수(--embed-ms 논문당 ms)로 대신한다. 끝나면 벤치마크 행은 지운다.
+
+    python benchmarks/bench_job_queue.py --jobs 5000 --workers 1 2 4 8 --embed-ms 5
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+
+import numpy as np
+from psycopg2.extras import execute_values
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT_DIR)
+sys.path.append(os.path.join(ROOT_DIR, "services", "paper-ingestor"))
+
+from db.db_init import EMBED_DIM
+from src.database import connect
+from src.job_queue import EmbeddingWorker, enqueue, queue_stats
+
+PREFIX = "WBENCH"
+
+def setup(conn, queue: str, n: int) -> list[str]:
+    ids = [f"{PREFIX}{uuid.uuid4().hex[:12]}" for _ in range(n)]
+    with conn.cursor() as cur:
+        execute_values(cur, "INSERT INTO papers (openalex_id, title, abstract) VALUES %s",
+                       [(i, f"bench paper {i}", f"benchmark abstract {i}") for i in ids], page_size=1000)
+    conn.commit()
+    enqueue(conn, ids, queue=queue)
+    return ids
+
+def cleanup(conn, queue: str) -> None:
+    with conn.cursor() as cur:
+        cur.execute("DELETE FROM ingest_jobs WHERE queue = %s", (queue,))
+        cur.execute("DELETE FROM papers WHERE openalex_id LIKE %s", (PREFIX + "%",))
+    conn.commit()
+
+def run_workers(queue: str, workers: int, batch_size: int, embed_ms: float) -> tuple[float, Counter]:
+    """workers 개의 워커(스레드, 각자 커넥션)로 큐가 빌 때까지 처리한다. sleep은 GIL을 놓으므로 프로세스 여러 개와 비슷하다."""
+    processed = Counter()
+    lock = threading.Lock()
+    zero = np.zeros(EMBED_DIM, dtype=np.float32)
+
+    def fake_embed(texts):
+        time.sleep(embed_ms / 1000 * len(texts))
+        return [zero] * len(texts)
+
+    def run(worker):
+        original = worker.process_batch
+
+        def counted(conn, ids):
+            original(conn, ids)
+            with lock:
+                processed.update(ids)
+        worker.process_batch = counted
+        worker.run(exit_when_empty=True)
+
+    pool = [
+        EmbeddingWorker(connect, fake_embed, queue=queue, batch_size=batch_size, worker_id=f"bench-{i}")
+        for i in range(workers)
+    ]
+    threads = [threading.Thread(target=run, args=(w,)) for w in pool]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - start, processed
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=5000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--embed-ms", type=float, default=5.0, help="논문 1개 임베딩에 걸리는 가짜 시간(ms)")
+    args = parser.parse_args()
+
+    conn = connect()
+    print(f"{'workers':>8}{'seconds':>10}{'jobs/s':>10}{'speedup':>10}{'dup claims':>12}")
+    base = None
+    try:
+        for workers in args.workers:
+            queue = f"bench-{uuid.uuid4().hex[:8]}"
+            try:
+                ids = setup(conn, queue, args.jobs)
+                elapsed, processed = run_workers(queue, workers, args.batch_size, args.embed_ms)
+                stats = queue_stats(conn, queue)
+                assert stats["done"] == len(ids) and set(processed) == set(ids), stats
+                dups = sum(c - 1 for c in processed.values())
+                rate = len(ids) / elapsed
+                base = base or rate
+                print(f"{workers:>8}{elapsed:>10.1f}{rate:>10.0f}{rate / base:>9.1f}x{dups:>12}")
+            finally:
+                cleanup(conn, queue)
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+OpenAlex 수집 속도 비교: 기존 순차 수집(meta_openalex, 페이지마다 RPS_SLEEP) vs 비동기 수집(openalex_async, 전역 토큰 버킷).
+
+    python benchmarks/fake_openalex_server.py --port 8091 --latency 0.15 --rps-limit 10 &
+    python benchmarks/bench_openalex_harvest.py --base-url http://127.0.0.1:8091 --keywords 4 --max-records 1000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import urllib.request
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT_DIR)
+
+KEYWORDS = ["transformer", "diffusion", "language", "tuning", "retrieval", "neural", "attention", "generative", "training", "instruct"]
+
+def server_stats(base_url: str) -> dict:
+    with urllib.request.urlopen(f"{base_url}/stats") as r:
+        return json.load(r)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://127.0.0.1:8091")
+    parser.add_argument("--keywords", type=int, default=4, help="사용할 키워드 수 (최대 10)")
+    parser.add_argument("--max-records", type=int, default=1000)
+    parser.add_argument("--skip-sync", action="store_true", help="순차 수집(느림)은 건너뛴다")
+    args = parser.parse_args()
+
+    # db.util 이 import 시점에 OPENALEX_BASE_URL 을 읽으므로 import 전에 설정한다.
+    os.environ["OPENALEX_BASE_URL"] = args.base_url
+    from db.meta_openalex import search_works_by_keywords
+    from db.openalex_async import harvest_works_async
+    from db.util import OPENALEX_RPS
+    import asyncio
+
+    keywords = KEYWORDS[:args.keywords]
+    rows = []
+
+    if not args.skip_sync:
+        before = server_stats(args.base_url)["status"]
+        start = time.perf_counter()
+        works = []
+        for keyword in keywords:
+            works.extend(search_works_by_keywords(keyword, max_records=args.max_records))
+        rows.append(("sequential", time.perf_counter() - start, len(works), before, server_stats(args.base_url)["status"]))
+
+    before = server_stats(args.base_url)["status"]
+    start = time.perf_counter()
+    works = asyncio.run(harvest_works_async(keywords, max_records=args.max_records))
+    rows.append((f"async@{OPENALEX_RPS:g}rps", time.perf_counter() - start, len(works), before, server_stats(args.base_url)["status"]))
+
+    print(f"\n{'harvester':<16}{'seconds':>10}{'works':>8}{'works/s':>10}{'200s':>7}{'429s':>7}")
+    for name, elapsed, n, before, after in rows:
+        delta = {k: after.get(k, 0) - before.get(k, 0) for k in ("200", "429")}
+        print(f"{name:<16}{elapsed:>10.1f}{n:>8}{n / elapsed:>10.1f}{delta['200']:>7}{delta['429']:>7}")
+    if len(rows) == 2:
+        print(f"\nspeedup: {rows[0][1] / rows[1][1]:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+OpenAlex 응답 파싱 속도 비교 (네트워크 없음): 저장해 둔 /works 페이지 corpus를 반복해서 파싱한다.
+
+- decode:   stdlib json.loads vs db.util.loads (orjson이 있으면 orjson)
+- abstract: 위치 -> 단어 dict + 정렬(이전 방식) vs 미리 할당한 위치 리스트 (db.util.reconstruct_abstract)
+- frames:   work마다 dict(parse_work) -> DataFrame(이전 방식) vs 페이지 단위 컬럼 변환 (parse_works_columnar)
+
+    # corpus가 없으면 fake 서버의 work 생성기로 만든 뒤 저장한다.
+    python benchmarks/bench_openalex_parse.py --corpus data/bench/openalex_pages --pages 50
+    # HTTP 응답 캐시(HTTP_CACHE_MODE=record 로 기록한 실제 응답)를 corpus로 사용
+    python benchmarks/bench_openalex_parse.py --corpus data/http_cache
+"""
+import argparse
+import glob
+import gzip
+import json
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+import pandas as pd
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT_DIR)
+
+from db.util import loads, orjson, reconstruct_abstract
+from db.meta_openalex import parse_work, parse_works_columnar
+
+def reconstruct_abstract_dict(abs_idx: dict | None) -> str:
+    """이전 구현: 위치 -> 단어 dict를 만들고 위치를 정렬한다."""
+    if not abs_idx: return ""
+    pos = {}
+    for w, idxs in abs_idx.items():
+        for i in idxs:
+            pos[i] = w
+    return " ".join(pos[i] for i in sorted(pos.keys()))
+
+def works_to_frames_rows(works: list[dict]):
+    """이전 구현: work마다 parse_work로 dict를 만든 뒤 DataFrame으로 변환한다."""
+    papers_rows, citation_rows, seen = [], [], set()
+    for w in works:
+        if w["id"] in seen:
+            continue
+        paper_row, refs = parse_work(w)
+        if paper_row is None:
+            continue
+        papers_rows.append(paper_row)
+        citation_rows.extend(refs)
+        seen.add(w["id"])
+    return pd.DataFrame(papers_rows), pd.DataFrame(citation_rows)
+
+def works_to_frames_columnar(works: list[dict]):
+    papers, citations = parse_works_columnar(works)
+    return pd.DataFrame(papers), pd.DataFrame(citations)
+
+def generate_corpus(corpus_dir: str, pages: int, per_page: int):
+    """fake OpenAlex 서버의 결정적 work 생성기로 /works 응답 페이지를 만들어 저장한다."""
+    from benchmarks import fake_openalex_server as fake
+    fake.ARGS = SimpleNamespace(abstract_words=180, id_space=500000, refs_per_work=30, works_per_day=100)
+    os.makedirs(corpus_dir, exist_ok=True)
+    for p in range(pages):
+        results = [fake.make_work(p * per_page + i + 1) for i in range(per_page)]
+        body = json.dumps({"meta": {"count": pages * per_page, "per_page": per_page}, "results": results})
+        with open(os.path.join(corpus_dir, f"page_{p:04d}.json"), "w", encoding="utf-8") as f:
+            f.write(body)
+    print(f"📝 corpus 생성: {corpus_dir} ({pages} pages x {per_page} works)")
+
+def load_corpus(corpus_dir: str) -> list[bytes]:
+    """*.json (응답 본문) 또는 HTTP 캐시의 *.json.gz (본문은 'body' 필드)를 읽어 응답 본문 bytes 리스트로 반환한다."""
+    bodies = []
+    for path in sorted(glob.glob(os.path.join(corpus_dir, "**", "*.json*"), recursive=True)):
+        if path.endswith(".json.gz"):
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                entry = json.load(f)
+            if "/works" not in entry.get("url", ""):
+                continue
+            bodies.append(entry["body"].encode("utf-8"))
+        elif path.endswith(".json"):
+            with open(path, "rb") as f:
+                bodies.append(f.read())
+    return bodies
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--corpus", default=os.path.join(ROOT_DIR, "data", "bench", "openalex_pages"))
+    parser.add_argument("--pages", type=int, default=50, help="corpus가 없을 때 생성할 페이지 수")
+    parser.add_argument("--per-page", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    bodies = load_corpus(args.corpus)
+    if not bodies:
+        generate_corpus(args.corpus, args.pages, args.per_page)
+        bodies = load_corpus(args.corpus)
+
+    pages = [json.loads(b) for b in bodies]
+    works = [w for page in pages for w in page.get("results", [])]
+    indexes = [w.get("abstract_inverted_index") for w in works]
+    print(f"corpus: {len(bodies)} pages, {len(works)} works, {sum(map(len, bodies)) / 1e6:.1f} MB (orjson: {'yes' if orjson else 'no'})")
+
+    # 두 구현의 결과가 같은지 먼저 확인한다.
+    assert all(reconstruct_abstract(i) == reconstruct_abstract_dict(i) for i in indexes)
+    old_papers, old_citations = works_to_frames_rows(works)
+    new_papers, new_citations = works_to_frames_columnar(works)
+    assert old_papers.equals(new_papers[old_papers.columns]) and old_citations.equals(new_citations)
+
+    rows = [
+        ("decode", best_of(lambda: [json.loads(b) for b in bodies], args.repeat), best_of(lambda: [loads(b) for b in bodies], args.repeat)),
+        ("abstract", best_of(lambda: [reconstruct_abstract_dict(i) for i in indexes], args.repeat), best_of(lambda: [reconstruct_abstract(i) for i in indexes], args.repeat)),
+        ("frames", best_of(lambda: works_to_frames_rows(works), args.repeat), best_of(lambda: works_to_frames_columnar(works), args.repeat)),
+    ]
+    # frames 단계가 abstract 복원을 포함하므로 합계는 decode + frames 로 계산한다.
+    rows.append(("decode+frames", rows[0][1] + rows[2][1], rows[0][2] + rows[2][2]))
+
+    print(f"\n{'stage':<16}{'before ms':>12}{'after ms':>12}{'works/s after':>16}{'speedup':>10}")
+    for name, before, after in rows:
+        print(f"{name:<16}{before * 1000:>12.1f}{after * 1000:>12.1f}{len(works) / after:>16,.0f}{before / after:>9.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+후속 논문 rerank(services/rag_api/src/core/reranker.py) 품질/지연 트레이드오프 측정. Postgres(papers.embedding)와
+임베딩 모델, cross-encoder 모델이 필요하다.
+
+평가 방법 (제목 -> 초록 검색): 초록이 있는 논문 --queries 개를 뽑아 제목을 질문으로 쓰고, 질문 임베딩과 코사인 거리가
+가까운 논문 --pool 개를 후보로 가져온다. 정답은 제목을 뽑은 논문 하나이며, 후보 텍스트에서는 제목을 지운다.
+1단계(코사인) 순서와 예산(--budgets ms)별 rerank 순서의 recall@k, MRR@k, rerank 지연(p50/p95)을 출력한다.
+
+    python benchmarks/bench_rerank.py --queries 200 --pool 25 50 100 --budgets 0 100 200 400 --k 5
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+from psycopg2.extras import RealDictCursor
+from pgvector.psycopg2 import register_vector
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT_DIR)
+
+from db.db_init import get_conn
+from services.rag_api.src.core.get_emb import get_emb_model, get_emb
+from services.rag_api.src.core.reranker import CrossEncoderReranker
+
+def load_queries(conn, n: int) -> list[dict]:
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
+        cur.execute("""
+            SELECT openalex_id, title FROM papers
+            WHERE embedding IS NOT NULL AND abstract IS NOT NULL AND length(abstract) > 200
+            ORDER BY md5(openalex_id) LIMIT %s
+        """, (n,))
+        return cur.fetchall()
+
+def load_candidates(conn, query_vec, pool: int) -> list[dict]:
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
+        cur.execute("""
+            SELECT openalex_id, abstract FROM papers
+            WHERE embedding IS NOT NULL
+            ORDER BY embedding <=> %s LIMIT %s
+        """, (query_vec, pool))
+        return [{"openalex_id": r["openalex_id"], "title": "", "abstract": r["abstract"]} for r in cur.fetchall()]
+
+def rank_of(docs: list[dict], openalex_id: str) -> int | None:
+    for i, d in enumerate(docs, start=1):
+        if d["openalex_id"] == openalex_id:
+            return i
+    return None
+
+def metrics(ranks: list[int | None], k: int) -> tuple[float, float]:
+    recall = sum(1 for r in ranks if r is not None and r <= k) / len(ranks)
+    mrr = sum(1 / r for r in ranks if r is not None and r <= k) / len(ranks)
+    return recall, mrr
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--pool", type=int, nargs="+", default=[25, 50, 100], help="후보 풀 크기")
+    parser.add_argument("--budgets", type=float, nargs="+", default=[0, 100, 200, 400], help="rerank 예산(ms), 0이면 전부 점수화")
+    parser.add_argument("--k", type=int, default=5)
+    args = parser.parse_args()
+
+    conn = get_conn()
+    register_vector(conn)
+    queries = load_queries(conn, args.queries)
+    emb_model = get_emb_model()
+    query_vecs = get_emb(emb_model, [q["title"] for q in queries])
+    max_pool = max(args.pool)
+    pools = [load_candidates(conn, vec, max_pool) for vec in query_vecs]
+    conn.close()
+
+    warm = CrossEncoderReranker()
+    warm.warm_up()
+    model = warm.get_model()
+    print(f"queries={len(queries)} k={args.k} model={CrossEncoderReranker().model_name}")
+    print(f"{'pool':>6}{'budget':>8}{'recall@k':>10}{'MRR@k':>8}{'p50 ms':>9}{'p95 ms':>9}{'scored':>8}")
+    for pool in args.pool:
+        first = [rank_of(p[:pool], q["openalex_id"]) for q, p in zip(queries, pools)]
+        recall, mrr = metrics(first, args.k)
+        print(f"{pool:>6}{'cosine':>8}{recall:>10.3f}{mrr:>8.3f}{'-':>9}{'-':>9}{'-':>8}")
+        for budget in args.budgets:
+            reranker = CrossEncoderReranker(budget_ms=budget, model=model) # 캐시를 비운 새 인스턴스
+            ranks, latencies, scored = [], [], []
+            for q, p in zip(queries, pools):
+                timings = {}
+                start = time.perf_counter()
+                top = reranker.rerank(q["title"], p[:pool], args.k, timings)
+                latencies.append((time.perf_counter() - start) * 1000)
+                scored.append(timings["rerank_scored"])
+                ranks.append(rank_of(top, q["openalex_id"]))
+            recall, mrr = metrics(ranks, args.k)
+            p95 = statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else latencies[0]
+            print(f"{pool:>6}{budget or 'none':>8}{recall:>10.3f}{mrr:>8.3f}{statistics.median(latencies):>9.0f}{p95:>9.0f}"
+                  f"{statistics.mean(scored):>8.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+그래프 state 크기 비교: 기존 state(SELECT * 행 + 임베딩, Document 리스트) vs slim state(paper_ref + openalex_id 리스트).
+체크포인터가 매 단계 하는 것과 같이 JsonPlusSerializer.dumps_typed 로 Phase 2 한 턴 뒤의 state를 직렬화해
+바이트 수와 직렬화/역직렬화 시간을 출력한다. DB/모델 없이 가짜 논문으로 실행한다.
+
+    python benchmarks/bench_state_size.py --docs 5 --turns 1 5 20
+"""
+import argparse
+import os
+import random
+import string
+import sys
+import time
+from datetime import datetime
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT_DIR)
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from db.db_init import EMBED_DIM
+from services.rag_api.src.util import convert_to_documents
+
+def fake_paper(rng: random.Random, with_embedding: bool) -> dict:
+    words = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9))) for _ in range(180)]
+    row = {
+        "openalex_id": f"W{rng.randint(10**8, 10**10)}",
+        "doi": f"https://doi.org/10.{rng.randint(1000, 9999)}/{rng.randint(10**5, 10**6)}",
+        "title": " ".join(words[:10]).title(),
+        "abstract": " ".join(words),
+        "authors": ", ".join(" ".join(words[i:i + 2]).title() for i in range(20, 36, 2)),
+        "pdf_url": "https://arxiv.org/pdf/1706.03762",
+        "published": datetime(2020, 1, 1),
+        "cited_by_count": rng.randint(0, 5000),
+    }
+    if with_embedding:
+        row["embedding"] = [rng.random() for _ in range(EMBED_DIM)]
+    return row
+
+def make_states(rng: random.Random, docs: int, turns: int) -> tuple[dict, dict]:
+    from services.rag_api.src.core.paper_cache import paper_ref
+
+    base = fake_paper(rng, with_embedding=True)
+    follow_ups = [fake_paper(rng, with_embedding=False) for _ in range(docs)]
+    messages = []
+    for t in range(turns):
+        messages += [HumanMessage(f"question {t} about follow-up work"), AIMessage("answer " * 150)]
+    common = {"initial_query": base["title"], "sbp_found": True, "sbp_title": base["title"], "is_chat_mode": True,
+              "rag_judgement": "RAG", "messages": messages, "thread_id": "bench", "question": "question",
+              "history": "", "node_timings": {"retrieve": 120.0}, "augmented_question": "augmented question"}
+    old = {**common, "paper_search_result": base,
+           "retrieved_docs": convert_to_documents(follow_ups), "augmented_docs": convert_to_documents(follow_ups)}
+    slim = {**common, "paper_search_result": paper_ref(base),
+            "retrieved_ids": [p["openalex_id"] for p in follow_ups], "augmented_ids": [p["openalex_id"] for p in follow_ups]}
+    return old, slim
+
+def measure(serde: JsonPlusSerializer, state: dict, repeat: int) -> tuple[int, float, float]:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        typed = serde.dumps_typed(state)
+    dumps_ms = (time.perf_counter() - start) / repeat * 1000
+    start = time.perf_counter()
+    for _ in range(repeat):
+        serde.loads_typed(typed)
+    loads_ms = (time.perf_counter() - start) / repeat * 1000
+    return len(typed[1]), dumps_ms, loads_ms
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=5, help="검색된 후속 논문 수")
+    parser.add_argument("--turns", type=int, nargs="+", default=[1, 5, 20], help="대화 턴 수 (messages 길이)")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    serde = JsonPlusSerializer()
+    rng = random.Random(0)
+    print(f"{'turns':>6}{'state':>7}{'bytes':>10}{'dumps ms':>10}{'loads ms':>10}")
+    for turns in args.turns:
+        old, slim = make_states(rng, args.docs, turns)
+        results = {name: measure(serde, state, args.repeat) for name, state in (("old", old), ("slim", slim))}
+        for name, (size, dumps_ms, loads_ms) in results.items():
+            print(f"{turns:>6}{name:>7}{size:>10}{dumps_ms:>10.3f}{loads_ms:>10.3f}")
+        print(f"{'':>6}{'ratio':>7}{results['old'][0] / results['slim'][0]:>9.1f}x"
+              f"{results['old'][1] / results['slim'][1]:>9.1f}x{results['old'][2] / results['slim'][2]:>9.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+arXiv API(/api/query, Atom 피드)를 흉내 내는 로컬 fake 서버.
+샤드 수집기(db/arxiv_sharded.py)의 동시성/재시도/중복 제거를 네트워크 없이 확인할 때 사용한다.
+
+    python benchmarks/fake_arxiv_server.py --port 8095 --latency 1.0 --empty-rate 0.1
+    ARXIV_API_URL=http://127.0.0.1:8095/api/query ARXIV_RPS=5 python db/arxiv_sharded.py --date-from 2024-01-01 --window-days 120
+
+- search_query마다 결정적(deterministic) 결과 수와 결과 id를 돌려준다. id 공간(--id-space)이 작을수록 쿼리 간 중복이 많다.
+- --empty-rate 비율로 totalResults는 그대로 두고 entry가 없는 페이지를 돌려준다. (arXiv API의 빈 페이지 현상)
+- GET /stats 로 요청 수, 빈 페이지 수, 관측된 최대 동시 요청 수를 확인할 수 있다.
+"""
+import argparse
+import hashlib
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from xml.sax.saxutils import escape
+import json
+
+ARGS = None
+
+VOCAB = (
+    "model training attention transformer diffusion language retrieval neural network generative instruction tuning "
+    "representation learning benchmark dataset task performance layer token embedding optimization gradient loss"
+).split()
+
+class _Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.empty_pages = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def enter(self):
+        with self.lock:
+            self.requests += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def leave(self, empty: bool):
+        with self.lock:
+            self.in_flight -= 1
+            self.empty_pages += int(empty)
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {"requests": self.requests, "empty_pages": self.empty_pages, "max_in_flight": self.max_in_flight}
+
+STATS = _Stats()
+
+def _seed(*parts) -> int:
+    return int(hashlib.sha1("|".join(map(str, parts)).encode()).hexdigest()[:12], 16)
+
+def results_for_query(query: str) -> list[int]:
+    """쿼리별 결과 번호 리스트 (submittedDate 오름차순이라고 가정)"""
+    rng = random.Random(_seed("query", query))
+    return [rng.randrange(1, ARGS.id_space) for _ in range(rng.randint(0, ARGS.max_results_per_query))]
+
+def make_entry(num: int) -> str:
+    rng = random.Random(num)
+    arxiv_id = f"{2300 + num % 200:04d}.{num:05d}v{rng.randint(1, 3)}"
+    title = " ".join(rng.choice(VOCAB) for _ in range(8)).capitalize()
+    summary = " ".join(rng.choice(VOCAB) for _ in range(ARGS.abstract_words))
+    authors = "".join(f"<author><name>Author {rng.randint(1, 9999)}</name></author>" for _ in range(rng.randint(1, 5)))
+    cat = rng.choice(["cs.CL", "cs.LG", "cs.CV", "cs.AI", "stat.ML"])
+    return (
+        "<entry>"
+        f"<id>http://arxiv.org/abs/{arxiv_id}</id>"
+        f"<published>20{23 + num % 3}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T00:00:00Z</published>"
+        f"<title>{escape(title)}</title><summary>{escape(summary)}</summary>{authors}"
+        f'<link title="pdf" href="http://arxiv.org/pdf/{arxiv_id}" rel="related" type="application/pdf"/>'
+        f'<arxiv:primary_category term="{cat}" scheme="http://arxiv.org/schemas/atom"/>'
+        f'<category term="{cat}" scheme="http://arxiv.org/schemas/atom"/>'
+        "</entry>"
+    )
+
+def make_feed(total: int, start: int, nums: list[int]) -> str:
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<feed xmlns="http://www.w3.org/2005/Atom" xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/" '
+        'xmlns:arxiv="http://arxiv.org/schemas/atom">'
+        f"<opensearch:totalResults>{total}</opensearch:totalResults>"
+        f"<opensearch:startIndex>{start}</opensearch:startIndex>"
+        f"<opensearch:itemsPerPage>{len(nums)}</opensearch:itemsPerPage>"
+        + "".join(make_entry(n) for n in nums)
+        + "</feed>"
+    )
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        if ARGS.verbose:
+            super().log_message(format, *args)
+
+    def _send(self, status: int, body: str, content_type: str):
+        data = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path.rstrip("/") == "/stats":
+            self._send(200, json.dumps(STATS.snapshot()), "application/json")
+            return
+        if url.path.rstrip("/") != "/api/query":
+            self._send(404, "not found", "text/plain")
+            return
+
+        qs = parse_qs(url.query)
+        STATS.enter()
+        empty = False
+        try:
+            time.sleep(ARGS.latency * random.uniform(0.8, 1.2))
+            nums = results_for_query(qs.get("search_query", [""])[0])
+            start = int(qs.get("start", ["0"])[0])
+            size = int(qs.get("max_results", ["10"])[0])
+            page = nums[start:start + size]
+            if page and random.random() < ARGS.empty_rate:
+                empty, page = True, []
+            self._send(200, make_feed(len(nums), start, page), "application/atom+xml")
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            STATS.leave(empty)
+
+def main():
+    global ARGS
+    parser = argparse.ArgumentParser(description="Fake arXiv API server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8095)
+    parser.add_argument("--latency", type=float, default=1.0, help="요청당 응답 지연(초)")
+    parser.add_argument("--empty-rate", type=float, default=0.0, help="entry 없이 돌려줄 페이지 비율")
+    parser.add_argument("--max-results-per-query", type=int, default=600)
+    parser.add_argument("--id-space", type=int, default=20000)
+    parser.add_argument("--abstract-words", type=int, default=150)
+    parser.add_argument("--verbose", action="store_true")
+    ARGS = parser.parse_args()
+
+    server = ThreadingHTTPServer((ARGS.host, ARGS.port), Handler)
+    print(f"fake arXiv server on http://{ARGS.host}:{ARGS.port}/api/query")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+OpenAI 호환 /v1/chat/completions 를 흉내 내는 로컬 fake 서버.
+LLM 호출 계층(services/rag_api/src/core/llm_client.py)의 타임아웃/재시도/hedging 동작을 네트워크 없이 확인할 때 사용한다.
+
+    python benchmarks/fake_openai_server.py --port 8090 --latency 0.3 --tail-rate 0.05 --tail-latency 3 --fail-rate 0.05
+    UPSTAGE_BASE_URL=http://127.0.0.1:8090/v1 python -m services.rag_api.src.core.llm_client
+"""
+import argparse
+import json
+import random
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ARGS = None
+
+def _approx_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+def _reply_text(messages: list[dict]) -> str:
+    last = messages[-1].get("content", "") if messages else ""
+    if isinstance(last, list):
+        last = " ".join(part.get("text", "") for part in last if isinstance(part, dict))
+    if "JSON" in last or "json" in last:
+        return json.dumps({"keywords": ["attention", "transformer"], "translation": "fake translation"})
+    if "RAG" in last:
+        return "RAG"
+    return f"fake answer to: {last[:80]}"
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        if ARGS.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status: int, payload: dict, headers: dict | None = None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        try:
+            self._handle_post()
+        except (BrokenPipeError, ConnectionResetError):
+            # 클라이언트가 요청을 취소한 경우 (hedged request의 패자 등)
+            pass
+
+    def _handle_post(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": "not found"}})
+            return
+        length = int(self.headers.get("Content-Length", 0))
+        req = json.loads(self.rfile.read(length) or b"{}")
+
+        roll = random.random()
+        if roll < ARGS.rate_limit_rate:
+            self._send_json(429, {"error": {"message": "rate limited"}}, {"Retry-After": "1"})
+            return
+        if roll < ARGS.rate_limit_rate + ARGS.fail_rate:
+            self._send_json(500, {"error": {"message": "upstream failure"}})
+            return
+
+        latency = ARGS.tail_latency if random.random() < ARGS.tail_rate else ARGS.latency
+        time.sleep(latency * random.uniform(0.8, 1.2))
+
+        text = _reply_text(req.get("messages", []))
+        prompt_tokens = sum(_approx_tokens(str(m.get("content", ""))) for m in req.get("messages", []))
+        completion_tokens = _approx_tokens(text)
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens, "total_tokens": prompt_tokens + completion_tokens}
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        model = req.get("model", "fake")
+
+        if req.get("stream"):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            words = text.split(" ")
+            for i, word in enumerate(words):
+                delta = {"content": word + (" " if i < len(words) - 1 else "")}
+                chunk = {"id": completion_id, "object": "chat.completion.chunk", "model": model,
+                         "choices": [{"index": 0, "delta": delta, "finish_reason": None}]}
+                self._write_chunk(f"data: {json.dumps(chunk)}\n\n")
+                time.sleep(ARGS.token_interval)
+            last = {"id": completion_id, "object": "chat.completion.chunk", "model": model,
+                    "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}], "usage": usage}
+            self._write_chunk(f"data: {json.dumps(last)}\n\n")
+            self._write_chunk("data: [DONE]\n\n")
+            self._write_chunk("")
+            return
+
+        self._send_json(200, {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+            "usage": usage,
+        })
+
+    def _write_chunk(self, data: str):
+        raw = data.encode()
+        self.wfile.write(f"{len(raw):x}\r\n".encode() + raw + b"\r\n")
+        self.wfile.flush()
+
+def main():
+    global ARGS
+    parser = argparse.ArgumentParser(description="Fake OpenAI-compatible chat completions server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency", type=float, default=0.3, help="기본 응답 지연(초)")
+    parser.add_argument("--tail-rate", type=float, default=0.0, help="느린 응답 비율")
+    parser.add_argument("--tail-latency", type=float, default=3.0, help="느린 응답 지연(초)")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="500 응답 비율")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="429 응답 비율")
+    parser.add_argument("--token-interval", type=float, default=0.01, help="스트리밍 토큰 간격(초)")
+    parser.add_argument("--verbose", action="store_true")
+    ARGS = parser.parse_args()
+
+    server = ThreadingHTTPServer((ARGS.host, ARGS.port), Handler)
+    print(f"fake OpenAI server on http://{ARGS.host}:{ARGS.port}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
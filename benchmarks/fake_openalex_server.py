@@ -0,0 +1,228 @@
+"""
+OpenAlex /works API(search + cursor 페이징)를 흉내 내는 로컬 fake 서버.
+수집기(db/meta_openalex.py, db/openalex_async.py)의 속도 제한/재시도/동시성을 네트워크 없이 비교할 때 사용한다.
+
+    python benchmarks/fake_openalex_server.py --port 8091 --latency 0.15 --rps-limit 10
+    OPENALEX_BASE_URL=http://127.0.0.1:8091 python db/openalex_async.py
+
+- 검색어마다 --records-per-query 개의 결정적(deterministic) work를 돌려준다. (검색어 간 id가 일부 겹친다)
+- filter=openalex_id:W1|W2|... 로 id 배치 조회를 할 수 있다. (--id-space 밖의 id는 없는 work로 취급)
+- filter=cites:W123 은 그 work를 인용한 work를 cursor 페이징으로 돌려준다.
+- filter=from_created_date:YYYY-MM-DD (또는 from_updated_date) 는 그 날짜 이후에 등록된 work를 돌려준다.
+  id가 클수록 최근 work이며 하루에 --works-per-day 개씩 등록된 것으로 본다. (paper-ingestor 증분 수집 테스트용)
+- --rps-limit 을 넘는 요청에는 429 + Retry-After 를 돌려준다.
+- GET /stats 로 상태 코드별 요청 수와 관측된 최대 동시 요청 수를 확인할 수 있다.
+"""
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+ARGS = None
+
+VOCAB = (
+    "model training attention transformer diffusion language retrieval neural network generative instruction tuning "
+    "representation learning benchmark dataset task performance layer token embedding optimization gradient loss "
+    "inference scaling pretraining fine-tuning evaluation robustness efficiency architecture encoder decoder"
+).split()
+
+class _Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.status = {}
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.started = time.time()
+        # 서버 측 속도 제한 (고정 1초 윈도우)
+        self.window_start = time.monotonic()
+        self.window_count = 0
+
+    def enter(self) -> bool:
+        """요청을 받아들일 수 있으면 True, 속도 제한에 걸리면 False"""
+        with self.lock:
+            now = time.monotonic()
+            if now - self.window_start >= 1.0:
+                self.window_start, self.window_count = now, 0
+            if ARGS.rps_limit and self.window_count >= ARGS.rps_limit:
+                return False
+            self.window_count += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            return True
+
+    def leave(self, status: int):
+        with self.lock:
+            self.in_flight -= 1
+            self.status[status] = self.status.get(status, 0) + 1
+
+    def count(self, status: int):
+        with self.lock:
+            self.status[status] = self.status.get(status, 0) + 1
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {
+                "status": {str(k): v for k, v in self.status.items()},
+                "max_in_flight": self.max_in_flight,
+                "uptime_s": round(time.time() - self.started, 1),
+            }
+
+STATS = _Stats()
+
+def _seed(*parts) -> int:
+    return int(hashlib.sha1("|".join(map(str, parts)).encode()).hexdigest()[:12], 16)
+
+def make_work(work_num: int, cites: int | None = None) -> dict:
+    """work 번호로부터 항상 같은 내용의 OpenAlex work를 만든다. cites가 있으면 referenced_works에 포함한다."""
+    rng = random.Random(work_num)
+    words = [rng.choice(VOCAB) for _ in range(ARGS.abstract_words)]
+    inverted = {}
+    for i, w in enumerate(words):
+        inverted.setdefault(w, []).append(i)
+    refs = {rng.randrange(1, ARGS.id_space) for _ in range(ARGS.refs_per_work)}
+    if cites is not None:
+        refs.add(cites)
+    refs = sorted(refs - {work_num})
+    year = rng.randint(2014, 2025)
+    return {
+        "id": f"https://openalex.org/W{work_num}",
+        "display_name": " ".join(rng.choice(VOCAB) for _ in range(6)).capitalize(),
+        "publication_date": f"{year}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+        "doi": f"https://doi.org/10.0000/fake.{work_num}",
+        "cited_by_count": rng.randint(0, 5000),
+        "abstract_inverted_index": inverted,
+        "primary_location": {"pdf_url": f"https://example.org/pdf/W{work_num}.pdf"},
+        "authorships": [{"author": {"display_name": f"Author {rng.randint(1, 9999)}"}} for _ in range(rng.randint(1, 6))],
+        "referenced_works": [f"https://openalex.org/W{r}" for r in refs],
+        "created_date": created_date(work_num).isoformat(),
+        "updated_date": created_date(work_num).isoformat(),
+    }
+
+def created_date(work_num: int) -> date:
+    """가장 큰 id가 오늘 등록된 work, 하루에 --works-per-day 개씩"""
+    return date.today() - timedelta(days=(ARGS.id_space - 1 - work_num) // ARGS.works_per_day)
+
+def created_since(since: str) -> list[int]:
+    """since(YYYY-MM-DD, 포함) 이후에 등록된 work 번호"""
+    days_back = (date.today() - date.fromisoformat(since)).days
+    return list(range(max(1, ARGS.id_space - (days_back + 1) * ARGS.works_per_day), ARGS.id_space))
+
+def citers_of(work_num: int) -> list[int]:
+    """work를 인용한 work 번호 (work마다 고정, 0 ~ --citers-per-work 개)"""
+    rng = random.Random(_seed("cites", work_num))
+    return [rng.randrange(1, ARGS.id_space) for _ in range(rng.randint(0, ARGS.citers_per_work))]
+
+def works_for_query(query: str) -> list[int]:
+    """검색어별 결과 work 번호 (검색어마다 고정, 전체 id 공간에서 뽑으므로 검색어 간 겹칠 수 있다)"""
+    rng = random.Random(_seed("query", query))
+    return [rng.randrange(1, ARGS.id_space) for _ in range(ARGS.records_per_query)]
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        if ARGS.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status: int, payload: dict, headers: dict | None = None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        try:
+            self._handle_get()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def _handle_get(self):
+        url = urlparse(self.path)
+        if url.path.rstrip("/") == "/stats":
+            self._send_json(200, STATS.snapshot())
+            return
+        if url.path.rstrip("/") != "/works":
+            self._send_json(404, {"error": "not found"})
+            return
+
+        if not STATS.enter():
+            STATS.count(429)
+            self._send_json(429, {"error": "rate limited"}, {"Retry-After": str(ARGS.retry_after)})
+            return
+        status = 200
+        try:
+            time.sleep(ARGS.latency * random.uniform(0.8, 1.2))
+            if random.random() < ARGS.fail_rate:
+                status = 503
+                self._send_json(503, {"error": "unavailable"})
+                return
+            self._send_json(200, self._works_page(parse_qs(url.query)))
+        finally:
+            STATS.leave(status)
+
+    def _works_page(self, qs: dict) -> dict:
+        per_page = min(int(qs.get("per-page", ["25"])[0]), 200)
+        filters = dict(f.split(":", 1) for f in qs.get("filter", [""])[0].split(",") if ":" in f)
+        if "openalex_id" in filters:
+            # id 배치 조회: id 공간 밖의 id는 OpenAlex에 없는 것처럼 결과에서 뺀다
+            ids = [int(i.rsplit("/", 1)[-1].lstrip("W")) for i in filters["openalex_id"].split("|")][:per_page]
+            results = [make_work(n) for n in ids if 0 < n < ARGS.id_space]
+            return {"meta": {"count": len(results), "per_page": per_page}, "results": results}
+        cites = None
+        if "cites" in filters:
+            cites = int(filters["cites"].rsplit("/", 1)[-1].lstrip("W"))
+            nums = citers_of(cites)
+        elif "from_created_date" in filters or "from_updated_date" in filters:
+            # 이 fake 서버에서는 등록 이후 바뀐 work가 없다. (updated_date == created_date)
+            nums = created_since(filters.get("from_created_date") or filters["from_updated_date"])
+        else:
+            nums = works_for_query(qs.get("search", [""])[0])
+
+        cursor = qs.get("cursor", [None])[0]
+        if cursor is not None:
+            offset = 0 if cursor == "*" else int(cursor.lstrip("o"))
+        else:
+            offset = (int(qs.get("page", ["1"])[0]) - 1) * per_page
+        page = nums[offset:offset + per_page]
+        next_offset = offset + len(page)
+        meta = {"count": len(nums), "per_page": per_page}
+        if cursor is not None:
+            meta["next_cursor"] = f"o{next_offset}" if page and next_offset < len(nums) else None
+        return {"meta": meta, "results": [make_work(n, cites) for n in page]}
+
+def main():
+    global ARGS
+    parser = argparse.ArgumentParser(description="Fake OpenAlex /works server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8091)
+    parser.add_argument("--latency", type=float, default=0.15, help="요청당 응답 지연(초)")
+    parser.add_argument("--rps-limit", type=float, default=10, help="초당 허용 요청 수 (0이면 무제한)")
+    parser.add_argument("--retry-after", type=int, default=1, help="429 응답의 Retry-After(초)")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="503 응답 비율")
+    parser.add_argument("--records-per-query", type=int, default=1000)
+    parser.add_argument("--id-space", type=int, default=50000, help="work id 범위 (작을수록 검색어 간 중복이 많다)")
+    parser.add_argument("--abstract-words", type=int, default=150)
+    parser.add_argument("--refs-per-work", type=int, default=20)
+    parser.add_argument("--citers-per-work", type=int, default=600, help="cites: 필터 결과의 최대 개수")
+    parser.add_argument("--works-per-day", type=int, default=100, help="from_created_date 필터에서 하루에 등록되는 work 수")
+    parser.add_argument("--verbose", action="store_true")
+    ARGS = parser.parse_args()
+
+    server = ThreadingHTTPServer((ARGS.host, ARGS.port), Handler)
+    print(f"fake OpenAlex server on http://{ARGS.host}:{ARGS.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+"""
+arXiv 메타데이터 샤드 병렬 수집기.
+meta_table_arxiv.fetch_arxiv_metadata 는 키워드별 쿼리를 순서대로 실행하고, 모든 결과를 메모리에 모은 뒤에야 중복을 제거한다.
+여기서는 수집 범위를 키워드 x 카테고리 x 기간(date window) 샤드로 나눈다.
+
+- 샤드는 정해진 크기의 worker pool(--workers)에서 동시에 실행되고, 모든 요청은 전역 토큰 버킷(ARXIV_RPS)을 통과한다.
+- 샤드 안에서는 submittedDate 오름차순으로 겹치지 않는 페이지를 가져온다.
+  실패했거나 결과가 모자란 페이지만 기록해 두었다가 그 페이지만 다시 요청한다. (겹치는 구간을 다시 받지 않음)
+- arxiv_id(버전 제외)는 8바이트 해시로 seen-set에 넣어 수집 중에 바로 중복을 거른다.
+- 페이지마다 CSV에 이어 쓰고(flush), 다시 실행하면 CSV에 이미 있는 id는 건너뛴다.
+
+    python db/arxiv_sharded.py --keywords transformer diffusion --categories cs.CL cs.LG --date-from 2023-01-01 --window-days 90
+    ARXIV_API_URL=http://127.0.0.1:8095/api/query python db/arxiv_sharded.py ...   # 로컬 fake 서버
+"""
+import argparse
+import csv
+import hashlib
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, fields as dataclass_fields
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+
+from requests.exceptions import ReadTimeout, ConnectionError, HTTPError
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.abspath(__file__), "..", ".."))
+sys.path.append(ROOT_DIR)
+
+from db.meta_table_arxiv import PaperMeta, build_query, fetch_feed, entry_to_record
+from db.rate_limit import TokenBucket
+from db.http_client import get_http_stats
+
+data_dir = os.path.join(ROOT_DIR, "data")
+
+# arXiv API 이용 규칙: 3초에 1번. 모든 샤드가 이 한도를 나눠 쓴다.
+ARXIV_RPS = float(os.getenv("ARXIV_RPS", str(1 / 3)))
+CSV_COLUMNS = [f.name for f in dataclass_fields(PaperMeta)]
+_VERSION_RE = re.compile(r"v\d+$")
+
+@dataclass(frozen=True)
+class Shard:
+    keyword: str
+    category: str
+    date_from: str  # YYYYMMDD
+    date_to: str    # YYYYMMDD
+
+    @property
+    def name(self) -> str:
+        return f"{self.keyword}|{self.category}|{self.date_from}-{self.date_to}"
+
+    def query(self, fields: str = "ti,abs") -> str:
+        core = build_query([self.keyword], fields=fields)[0]
+        return f"({core}) AND cat:{self.category} AND submittedDate:[{self.date_from}0000 TO {self.date_to}2359]"
+
+def _parse_date(value: str) -> date:
+    return datetime.strptime(value.replace("-", ""), "%Y%m%d").date()
+
+def make_shards(
+    keywords: List[str],
+    categories: List[str],
+    date_from: str,
+    date_to: Optional[str] = None,
+    window_days: int = 90,
+) -> List[Shard]:
+    """키워드 x 카테고리 x [date_from, date_to] 를 window_days 일 단위로 자른 샤드 리스트"""
+    start = _parse_date(date_from)
+    end = _parse_date(date_to) if date_to else datetime.utcnow().date()
+    windows = []
+    while start <= end:
+        stop = min(start + timedelta(days=window_days - 1), end)
+        windows.append((start.strftime("%Y%m%d"), stop.strftime("%Y%m%d")))
+        start = stop + timedelta(days=1)
+    return [Shard(k.strip(), c, fr, to) for k in keywords if k.strip() for c in categories for fr, to in windows]
+
+class SeenIds:
+    """
+    수집 중 중복 제거용 seen-set. arxiv_id 문자열 대신 버전을 뗀 id의 64비트 해시(int)를 저장한다.
+    (같은 논문의 다른 버전도 같은 id로 취급)
+    """
+
+    def __init__(self):
+        self._keys = set()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(arxiv_id: str) -> int:
+        digest = hashlib.blake2b(_VERSION_RE.sub("", arxiv_id).encode(), digest_size=8).digest()
+        return int.from_bytes(digest, "little")
+
+    def add(self, arxiv_id: str) -> bool:
+        """처음 보는 id면 추가하고 True"""
+        key = self._key(arxiv_id)
+        with self._lock:
+            if key in self._keys:
+                return False
+            self._keys.add(key)
+            return True
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+class CsvSink:
+    """PaperMeta 컬럼 순서로 CSV에 이어 쓴다. 쓸 때마다 flush 하므로 중간에 멈춰도 받은 결과는 남는다."""
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        is_new = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._lock = threading.Lock()
+        self._f = open(path, "a", newline="", encoding="utf-8")
+        self._writer = csv.DictWriter(self._f, fieldnames=CSV_COLUMNS)
+        if is_new:
+            self._writer.writeheader()
+            self._f.flush()
+
+    def write(self, records: List[dict]) -> None:
+        rows = []
+        for r in records:
+            row = {c: r.get(c) or "" for c in CSV_COLUMNS}
+            # 가끔 공백/개행 정리 (fetch_arxiv_metadata 와 같은 처리)
+            row["title"] = " ".join(row["title"].split())
+            row["abstract"] = " ".join(row["abstract"].split())
+            rows.append(row)
+        with self._lock:
+            self._writer.writerows(rows)
+            self._f.flush()
+
+    def close(self) -> None:
+        self._f.close()
+
+def existing_ids(path: str) -> List[str]:
+    """이전 실행에서 CSV에 쓴 arxiv_id (재실행 시 seen-set에 미리 넣는다)"""
+    if not os.path.exists(path):
+        return []
+    csv.field_size_limit(sys.maxsize)
+    with open(path, newline="", encoding="utf-8") as f:
+        return [row["arxiv_id"] for row in csv.DictReader(f) if row.get("arxiv_id")]
+
+def harvest_shard(
+    shard: Shard,
+    seen: SeenIds,
+    sink: CsvSink,
+    bucket: TokenBucket,
+    fields: str = "ti,abs",
+    max_per_shard: int = 2000,
+    batch: int = 200,
+    max_retries: int = 3,
+) -> dict:
+    """
+    샤드 1개를 페이지 단위로 수집한다.
+    1회차에 모든 페이지를 요청하고, 실패했거나 결과가 모자란 페이지(start)만 다음 회차에 다시 요청한다.
+    """
+    query = shard.query(fields)
+    stats = {"shard": shard.name, "total": None, "requests": 0, "records": 0, "duplicates": 0, "retried_pages": 0, "missing_pages": []}
+    total = None
+    pending = list(range(0, max_per_shard, batch))
+
+    for attempt in range(max_retries + 1):
+        if attempt > 0:
+            if not pending:
+                break
+            stats["retried_pages"] += len(pending)
+            time.sleep(min(2 ** attempt, 30))
+        missing = []
+        for start in pending:
+            if total is not None and start >= total:
+                continue
+            size = min(batch, max_per_shard - start)
+            stats["requests"] += 1
+            try:
+                feed = fetch_feed(query, start, size, "submittedDate", "ascending", bucket=bucket)
+            except (ReadTimeout, ConnectionError, HTTPError) as e:
+                print(f"[WARN] {shard.name} start={start}: {e}")
+                missing.append(start)
+                continue
+
+            page_total = int(getattr(feed.feed, "opensearch_totalresults", 0) or 0)
+            if page_total > 0:
+                total = page_total
+            elif start == 0 and not feed.entries:
+                # 첫 페이지가 결과 0건이면 빈 샤드
+                total = 0
+            expected = size if total is None else min(size, total - start)
+            # arXiv는 가끔 빈 페이지나 일부만 돌려준다. 받은 것은 쓰고 그 페이지는 다시 요청한다.
+            if len(feed.entries) < expected:
+                missing.append(start)
+
+            records = [entry_to_record(e) for e in feed.entries]
+            new = [r for r in records if seen.add(r["arxiv_id"])]
+            stats["duplicates"] += len(records) - len(new)
+            stats["records"] += len(new)
+            if new:
+                sink.write(new)
+        pending = missing
+
+    stats["total"] = total
+    stats["missing_pages"] = pending
+    if total is not None and total > max_per_shard:
+        print(f"⚠️ {shard.name}: 결과 {total}건 중 {max_per_shard}건만 수집 (--window-days 를 줄이세요)")
+    return stats
+
+def harvest_sharded(
+    shards: List[Shard],
+    out_path: str,
+    workers: int = 4,
+    rps: float = ARXIV_RPS,
+    fields: str = "ti,abs",
+    max_per_shard: int = 2000,
+    batch: int = 200,
+    max_retries: int = 3,
+) -> dict:
+    """샤드를 worker pool에서 동시에 수집해 out_path CSV에 이어 쓰고 요약 통계를 반환한다."""
+    start = time.perf_counter()
+    seen = SeenIds()
+    previous = existing_ids(out_path)
+    for aid in previous:
+        seen.add(aid)
+    if previous:
+        print(f"♻️ {out_path} 에 이미 있는 {len(previous)}개 id는 건너뜁니다.")
+
+    sink = CsvSink(out_path)
+    bucket = TokenBucket(rps, 1)
+    summary = {"shards": len(shards), "records": 0, "duplicates": 0, "requests": 0, "retried_pages": 0, "failed_shards": [], "missing_pages": {}}
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="arxiv_shard") as pool:
+            futures = {
+                pool.submit(harvest_shard, shard, seen, sink, bucket, fields, max_per_shard, batch, max_retries): shard
+                for shard in shards
+            }
+            for done, future in enumerate(as_completed(futures), 1):
+                shard = futures[future]
+                try:
+                    stats = future.result()
+                except Exception as e:
+                    print(f"⚠️ 샤드 실패 {shard.name}: {e}")
+                    summary["failed_shards"].append(shard.name)
+                    continue
+                for key in ("records", "duplicates", "requests", "retried_pages"):
+                    summary[key] += stats[key]
+                if stats["missing_pages"]:
+                    summary["missing_pages"][shard.name] = stats["missing_pages"]
+                print(f"[{done}/{len(shards)}] {shard.name}: total={stats['total']}, new={stats['records']}, dup={stats['duplicates']}")
+    finally:
+        sink.close()
+    summary["elapsed_s"] = round(time.perf_counter() - start, 1)
+    return summary
+
+def main():
+    parser = argparse.ArgumentParser(description="Sharded parallel arXiv metadata harvester")
+    parser.add_argument("--keywords", nargs="+", default=["transformer", "diffusion", "language", "tuning", "retrieval", "neural", "attention"])
+    parser.add_argument("--categories", nargs="+", default=["cs.CV", "cs.LG", "cs.AI", "stat.ML", "cs.CL", "cs.MA"])
+    parser.add_argument("--fields", default="ti,abs", help="all | title | abstract | ti,abs")
+    parser.add_argument("--date-from", default="2023-01-01")
+    parser.add_argument("--date-to", default=None)
+    parser.add_argument("--window-days", type=int, default=90)
+    parser.add_argument("--max-per-shard", type=int, default=2000)
+    parser.add_argument("--batch", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--out", default=os.path.join(data_dir, "arxiv_meta.csv"))
+    args = parser.parse_args()
+
+    shards = make_shards(args.keywords, args.categories, args.date_from, args.date_to, args.window_days)
+    print(f"🧩 샤드 {len(shards)}개 ({len(args.keywords)} keywords x {len(args.categories)} categories x windows)")
+    summary = harvest_sharded(
+        shards,
+        args.out,
+        workers=args.workers,
+        fields=args.fields,
+        max_per_shard=args.max_per_shard,
+        batch=args.batch,
+    )
+    print(f"✅ 수집 완료: {summary}")
+    print(f"HTTP stats: {get_http_stats()}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+citations 테이블에는 있지만 papers 테이블에는 없는 논문(참고 논문 등)을 OpenAlex에서 채워 넣는 backfill 작업.
+후속 논문 검색(mock_db_follow_up_select)은 papers와 join하므로, 빠진 논문은 검색 결과에서 조용히 사라진다.
+
+- 빠진 id를 openalex_id:W1|W2|... 필터로 50개씩 묶어 한 번에 조회하고, 여러 배치를 동시에 요청한다.
+  (id 수천 개 -> 요청 수십 번)
+- 가져온 논문은 초록 임베딩과 함께 papers에 upsert하고, 그 논문들의 참고 관계도 citations에 추가한다.
+- 찾을 수 없거나 초록이 없는 id는 로컬 상태 저장소(db/harvest_state.py)에 기록해 다음 실행에서 다시 조회하지 않는다.
+
+    python db/backfill_citations.py --limit 5000 --workers 4
+    python db/backfill_citations.py --no-embed --no-references
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.abspath(__file__), "..", ".."))
+sys.path.append(ROOT_DIR)
+
+from db.db_init import get_conn, init_db, upsert_paper_rows, insert_citation_rows
+from db.meta_openalex import fetch_works_by_ids, parse_work, MAX_IDS_PER_FILTER
+from db.rate_limit import TokenBucket
+from db.util import OPENALEX_RPS, OPENALEX_BURST
+from db.http_client import get_http_stats
+from db.harvest_state import HarvestState
+
+# 한 번에 조회 -> 임베딩 -> 쓰기 를 진행할 id 수 (메모리 상한)
+CHUNK_SIZE = 2000
+
+def find_missing_ids(conn, limit: int | None = None, exclude: set[str] | None = None) -> list[str]:
+    """citations에서 참조되지만 papers에 없는 openalex_id (많이 참조된 순)"""
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT c.cited_openalex_id
+            FROM citations c
+            LEFT JOIN papers p ON p.openalex_id = c.cited_openalex_id
+            WHERE p.openalex_id IS NULL
+            GROUP BY c.cited_openalex_id
+            ORDER BY COUNT(*) DESC
+        """)
+        ids = []
+        for (openalex_id,) in cur:
+            if exclude and openalex_id in exclude:
+                continue
+            ids.append(openalex_id)
+            if limit is not None and len(ids) >= limit:
+                break
+    return ids
+
+def fetch_by_ids(ids: list[str], max_workers: int = 4, bucket: TokenBucket | None = None):
+    """
+    id를 MAX_IDS_PER_FILTER개씩 나눠 동시에 조회한다. 배치가 끝나는 대로 (요청한 id 리스트, works)를 yield한다.
+    실패한 배치는 경고만 남기고 건너뛴다. (다음 실행에서 다시 시도된다)
+    """
+    bucket = bucket or TokenBucket(OPENALEX_RPS, OPENALEX_BURST)
+    batches = [ids[i:i + MAX_IDS_PER_FILTER] for i in range(0, len(ids), MAX_IDS_PER_FILTER)]
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="backfill") as pool:
+        futures = {pool.submit(fetch_works_by_ids, batch, bucket=bucket): batch for batch in batches}
+        for future in as_completed(futures):
+            batch = futures[future]
+            try:
+                yield batch, future.result()
+            except Exception as e:
+                print(f"⚠️ 배치 조회 실패 ({batch[0]} 외 {len(batch) - 1}개): {e}")
+
+def backfill(
+    conn,
+    limit: int | None = None,
+    max_workers: int = 4,
+    embed_fn=None,
+    with_references: bool = True,
+    state: HarvestState | None = None,
+) -> dict:
+    """
+    :param limit: 이번 실행에서 처리할 최대 id 수
+    :param embed_fn: 초록 리스트 -> 임베딩 리스트 (None이면 embedding NULL)
+    :param with_references: True면 가져온 논문의 referenced_works도 citations에 추가 (다음 backfill 대상이 늘어난다)
+    :param state: skipped id 기록용 상태 저장소
+    """
+    start = time.perf_counter()
+    skipped = state.skipped_ids("openalex_backfill") if state is not None else set()
+    missing = find_missing_ids(conn, limit, exclude=skipped)
+    stats = {"missing": len(missing), "requests": 0, "papers_written": 0, "citations_written": 0, "not_found": 0, "no_abstract": 0}
+    print(f"🔎 papers에 없는 인용 논문: {len(missing)}개 (이전에 건너뛴 id {len(skipped)}개 제외)")
+    bucket = TokenBucket(OPENALEX_RPS, OPENALEX_BURST)
+
+    for offset in range(0, len(missing), CHUNK_SIZE):
+        chunk = missing[offset:offset + CHUNK_SIZE]
+        papers, citations, not_found, no_abstract = [], [], [], []
+        for requested, works in fetch_by_ids(chunk, max_workers, bucket):
+            stats["requests"] += 1
+            returned = {w["id"].split("/")[-1] for w in works}
+            not_found.extend(i for i in requested if i not in returned)
+            for w in works:
+                paper_row, citation_rows = parse_work(w)
+                if paper_row is None:
+                    no_abstract.append(w["id"].split("/")[-1])
+                    continue
+                papers.append(paper_row)
+                if with_references:
+                    citations.extend((c["citing_paper_id"], c["cited_paper_id"]) for c in citation_rows)
+
+        embeddings = embed_fn([p["abstract"] for p in papers]) if (embed_fn and papers) else None
+        if papers:
+            upsert_paper_rows(conn, papers, embeddings, commit=False)
+        if citations:
+            insert_citation_rows(conn, citations, commit=False)
+        conn.commit()
+        if state is not None:
+            state.mark_skipped("openalex_backfill", not_found, "not_found")
+            state.mark_skipped("openalex_backfill", no_abstract, "no_abstract")
+
+        stats["papers_written"] += len(papers)
+        stats["citations_written"] += len(citations)
+        stats["not_found"] += len(not_found)
+        stats["no_abstract"] += len(no_abstract)
+        print(f"💾 {offset + len(chunk)}/{len(missing)} 처리: papers {stats['papers_written']}, 요청 {stats['requests']}회")
+
+    stats["elapsed_s"] = round(time.perf_counter() - start, 1)
+    return stats
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill papers referenced in citations but missing from papers")
+    parser.add_argument("--limit", type=int, default=None, help="처리할 최대 id 수")
+    parser.add_argument("--workers", type=int, default=4, help="동시에 보낼 배치 요청 수")
+    parser.add_argument("--no-embed", action="store_true", help="임베딩 없이 적재 (embedding NULL)")
+    parser.add_argument("--no-references", action="store_true", help="가져온 논문의 참고 관계는 저장하지 않음")
+    args = parser.parse_args()
+
+    embed_fn = None
+    if not args.no_embed:
+        from db.openalex_pipeline import make_embed_fn
+        embed_fn = make_embed_fn()
+
+    conn = get_conn()
+    init_db(conn, with_ivf_index=False)
+    stats = backfill(
+        conn,
+        limit=args.limit,
+        max_workers=args.workers,
+        embed_fn=embed_fn,
+        with_references=not args.no_references,
+        state=HarvestState(),
+    )
+    conn.close()
+    print(f"✅ backfill 완료: {stats}")
+    print(f"HTTP stats: {get_http_stats()}")
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 import os
+import sys
 import psycopg2
 from psycopg2.extensions import connection as PGConnection
 from pgvector.psycopg2 import register_vector
@@ -7,6 +8,7 @@ import numpy as np
 from psycopg2.extras import execute_values
 
 ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
 data_dir = os.path.join(ROOT_DIR, "data")
 
 
@@ -43,6 +45,40 @@ CREATE TABLE IF NOT EXISTS citations (
   cited_openalex_id   TEXT NOT NULL,
   PRIMARY KEY (citing_openalex_id, cited_openalex_id)
 );
+
+-- 후속 논문 웹 검색(Tavily) 결과: openalex_id 대신 "web:<url 해시>" id로 그래프 state에 남는 문서
+CREATE TABLE IF NOT EXISTS web_docs (
+  id              TEXT PRIMARY KEY,              -- 예: web:1a2b3c4d5e6f7a8b
+  url             TEXT NOT NULL,
+  title           TEXT,
+  content         TEXT,
+  doi             TEXT,
+  fetched_at      TIMESTAMP DEFAULT now()
+);
+
+-- ML 용어집 (db/glossary.py 배치 작업으로 생성): 질문 증강 시 웹 검색 대신 조회
+CREATE TABLE IF NOT EXISTS glossary (
+  term_key        TEXT PRIMARY KEY,              -- 정규화된 용어 (예: "fine tuning")
+  term            TEXT NOT NULL,                 -- 대표 표기 (예: "fine-tuning")
+  definition      TEXT NOT NULL,
+  doc_freq        INTEGER,                       -- 용어가 등장한 논문 수
+  embedding       VECTOR({EMBED_DIM}),
+  updated_at      TIMESTAMP DEFAULT now()
+);
+"""
+
+# 전문 검색(full-text) 설정. 검색 SQL(services/rag_api/src/core/database.py)도 같은 설정으로 질문을 tsquery로 바꾼다.
+FTS_CONFIG = os.getenv("PG_FTS_CONFIG", "english")
+
+# 제목(가중치 A) + 초록(B) tsvector. GENERATED 컬럼이라 어떤 수집 경로로 INSERT/UPDATE 해도 Postgres가 채운다.
+# STORED 생성 컬럼 추가는 papers 테이블 전체를 다시 쓰므로 init_db에서 실행하지 않는다. (add_fulltext_search 참고)
+DDL_FULLTEXT = f"""
+ALTER TABLE papers ADD COLUMN IF NOT EXISTS search_tsv tsvector
+  GENERATED ALWAYS AS (
+    setweight(to_tsvector('{FTS_CONFIG}'::regconfig, coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('{FTS_CONFIG}'::regconfig, coalesce(abstract, '')), 'B')
+  ) STORED;
+CREATE INDEX IF NOT EXISTS idx_papers_search_tsv ON papers USING GIN (search_tsv);
 """
 
 # DDL_UPDATED_AT_TRIGGER = """
@@ -67,20 +103,21 @@ CREATE TABLE IF NOT EXISTS citations (
 # -----------------------------
 # 커넥션 & 초기화 함수
 # -----------------------------
+def get_conn_params() -> dict:
+    """환경변수(PGHOST 등)로 만든 psycopg2.connect 인자. (커넥션 풀도 같은 인자로 연결한다)"""
+    return {
+        "host": os.getenv("PGHOST", "localhost"),
+        "port": int(os.getenv("PGPORT", "5432")),
+        "user": os.getenv("PGUSER", "postgres"),
+        "password": os.getenv("PGPASSWORD", "postgres"),
+        "dbname": os.getenv("PGDATABASE", "postgres"),
+    }
+
 def get_conn() -> PGConnection:
     """
     PostgreSQL 커넥션 생성 + pgvector 어댑터 등록.
     """
-
-    PGHOST = os.getenv("PGHOST", "localhost")
-    PGPORT = int(os.getenv("PGPORT", "5432"))
-    PGUSER = os.getenv("PGUSER", "postgres")
-    PGPASSWORD = os.getenv("PGPASSWORD", "postgres")
-    PGDATABASE = os.getenv("PGDATABASE", "postgres")
-
-    conn = psycopg2.connect(
-        host=PGHOST, port=PGPORT, user=PGUSER, password=PGPASSWORD, dbname=PGDATABASE
-    )
+    conn = psycopg2.connect(**get_conn_params())
     return conn
 
 
@@ -88,7 +125,7 @@ def init_db(conn: PGConnection, *, with_ivf_index: bool = True) -> None:
     """
     DB 스키마 생성/보정
     - vector 확장
-    - papers, citations 테이블
+    - papers, citations, web_docs, glossary 테이블
     - updated_at 트리거
     - 보조 인덱스
     - 벡터 IVFFlat 인덱스
@@ -159,12 +196,57 @@ def insert_citations(conn: PGConnection, citations_df: pd.DataFrame) -> None:
         """, rows, page_size=1000)
     conn.commit()
 
+def upsert_paper_rows(conn: PGConnection, rows: list[dict], embeddings: list | None = None, commit: bool = True) -> None:
+    """
+    수집 파이프라인(db/openalex_pipeline.py)용 papers upsert.
+    이미 있는 논문은 인용 수/PDF URL만 갱신하고, 새 임베딩이 없으면 기존 임베딩을 유지한다.
+
+    :param rows: meta_openalex.parse_work 가 만든 papers 행 dict 리스트
+    :param embeddings: rows와 같은 순서의 임베딩 리스트 (없으면 NULL)
+    :param commit: False면 호출부에서 citations와 함께 commit
+    """
+    values = [(
+        row["openalex_id"],
+        row["doi"],
+        row["title"],
+        row["abstract"],
+        row["authors"],
+        row["pdf_url"],
+        row["publication_date"] or None,
+        row["cited_by_count"] if row["cited_by_count"] != "" else None,
+        embeddings[i] if embeddings is not None else None,
+    ) for i, row in enumerate(rows)]
+    with conn.cursor() as cur:
+        execute_values(cur, """
+            INSERT INTO papers (
+                openalex_id, doi, title, abstract, authors, pdf_url, published, cited_by_count, embedding
+            ) VALUES %s
+            ON CONFLICT (openalex_id) DO UPDATE SET
+                cited_by_count = EXCLUDED.cited_by_count,
+                pdf_url = COALESCE(EXCLUDED.pdf_url, papers.pdf_url),
+                embedding = COALESCE(EXCLUDED.embedding, papers.embedding)
+        """, values, page_size=500)
+    if commit:
+        conn.commit()
+
+def insert_citation_rows(conn: PGConnection, rows: list[tuple], commit: bool = True) -> None:
+    """(citing_openalex_id, cited_openalex_id) 튜플 리스트 삽입 (중복 무시)"""
+    with conn.cursor() as cur:
+        execute_values(cur, """
+            INSERT INTO citations (citing_openalex_id, cited_openalex_id)
+            VALUES %s
+            ON CONFLICT DO NOTHING
+        """, rows, page_size=1000)
+    if commit:
+        conn.commit()
+
 # -----------------------------
 # (선택) 유지보수 유틸
 # -----------------------------
 def drop_all(conn: PGConnection) -> None:
     """테스트용: 테이블과 인덱스만 삭제 (vector 확장은 유지)"""
     with conn.cursor() as cur:
+        cur.execute("DROP TABLE IF EXISTS glossary CASCADE;")
         cur.execute("DROP TABLE IF EXISTS citations CASCADE;")
         cur.execute("DROP TABLE IF EXISTS papers CASCADE;")
     conn.commit()
@@ -182,6 +264,19 @@ def reindex_vector(conn: PGConnection, lists: int) -> None:
         """)
     conn.commit()
 
+def add_fulltext_search(conn: PGConnection) -> None:
+    """
+    papers.search_tsv 전문 검색 컬럼 + GIN 인덱스 추가 (하이브리드 검색 RETRIEVAL_HYBRID 에 필요).
+
+    STORED 생성 컬럼을 추가하면 Postgres가 papers 테이블 전체를 다시 쓰며(모든 행의 tsvector 계산),
+    끝날 때까지 ACCESS EXCLUSIVE 잠금으로 papers 읽기/쓰기가 모두 막힌다. 이어지는 GIN 인덱스 생성도 쓰기를 막는다.
+    데이터가 있는 DB에서는 서비스 점검 시간에 db/migrate_fulltext.py 로 한 번만 실행한다.
+    (새 DB라면 적재 전 빈 테이블에서 실행하면 다시 쓸 행이 없다. 이미 컬럼이 있으면 아무것도 하지 않는다.)
+    """
+    with conn.cursor() as cur:
+        cur.execute(DDL_FULLTEXT)
+    conn.commit()
+
 if __name__ == "__main__":
     conn = get_conn()
     init_db(conn = conn, with_ivf_index=True)
@@ -189,10 +284,19 @@ if __name__ == "__main__":
 
     meta_df = pd.read_csv(os.path.join(data_dir, "papers.csv"))
     emb_npy = np.load(os.path.join(data_dir, "papers_embeddings.npy"))
+    citations_df = pd.read_csv(os.path.join(data_dir, "citations.csv"))
+
+    # db/dedup.py 로 만든 canonical id 매핑이 있으면 중복 논문을 빼고 인용 관계를 대표 id로 바꾼다.
+    from db.dedup import load_id_map, apply_id_map
+    id_map = load_id_map()
+    if id_map:
+        before = len(meta_df)
+        meta_df, citations_df = apply_id_map(meta_df, citations_df, id_map)
+        print(f"중복 논문 {before - len(meta_df)}개 제외 (paper_id_map.csv)")
+
     insert_papers(conn, meta_df, emb_npy)
     print("논문 삽입 완료")
     
-    citations_df = pd.read_csv(os.path.join(data_dir, "citations.csv"))
     insert_citations(conn, citations_df)
     print("인용 관계 삽입 완료")
 
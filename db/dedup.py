@@ -0,0 +1,393 @@
+"""
+arXiv(meta_table_arxiv, arxiv_sharded)와 OpenAlex(meta_openalex) 레코드에서 같은 논문을 찾아 canonical id 매핑을 만든다.
+util.title_similarity 를 모든 쌍에 적용하면 O(n²)이므로, 비교할 후보 쌍을 먼저 줄인다.
+
+1. 정확 일치: 정규화한 제목의 해시, 정규화한 DOI (arXiv 레코드는 10.48550/arxiv.<id> DOI를 사용)
+   같은 제목이 MAX_BUCKET 개보다 많은 흔한 제목("Introduction")은 묶지 않고, 출판 DOI가 서로 다른 쌍도 잇지 않는다.
+2. 후보 쌍: 제목 4-gram(바이트) 집합의 MinHash 서명을 LSH 밴드로 나눠 같은 버킷에 들어간 쌍만
+3. 확인: 서명으로 추정한 Jaccard 유사도가 MIN_JACCARD 이상인 후보 쌍에만 util.title_similarity 를 적용
+4. 정확 일치 + 확인된 쌍을 연결 요소로 묶는다. 세 번째 레코드를 거쳐 서로 다른 출판 DOI가 한 그룹이 되면
+   그 그룹만 DOI가 충돌하지 않게 다시 나눈다. (split_conflicting_groups)
+5. 그룹마다 대표 id를 정한다. (OpenAlex id 우선, 인용 수 많은 순)
+
+서명 계산, 버킷 분할, 연결 요소 계산은 모두 numpy 배열 연산이라 수백만 건도 한 머신에서 처리할 수 있다.
+결과는 data/paper_id_map.csv (source, source_id, canonical_source, canonical_id, group_size) 로 저장하고,
+db_init 적재 시 apply_id_map 으로 중복 논문을 빼고 인용 관계를 canonical id로 바꾼다.
+
+    python db/dedup.py --openalex data/papers.csv --arxiv data/arxiv_meta.csv
+"""
+import argparse
+import hashlib
+import os
+import re
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.abspath(__file__), "..", ".."))
+sys.path.append(ROOT_DIR)
+
+from db.util import norm, title_similarity
+
+data_dir = os.path.join(ROOT_DIR, "data")
+ID_MAP_PATH = os.path.join(data_dir, "paper_id_map.csv")
+
+# MinHash 서명 길이 = BANDS * ROWS. 유사도 s인 쌍이 후보가 될 확률은 1 - (1 - s^ROWS)^BANDS (임계 ≈ (1/BANDS)^(1/ROWS) ≈ 0.5)
+BANDS = 16
+ROWS = 4
+# 서명으로 추정한 Jaccard 유사도가 이 값 미만인 후보 쌍은 title_similarity 로 확인하지 않는다.
+MIN_JACCARD = 0.5
+# title_similarity 가 이 값 이상이면 같은 논문. (완전히 같은 제목이 0.85이고, 단어 하나가 빠지면 0.75~0.8 정도)
+SIM_THRESHOLD = 0.70
+# 한 LSH 버킷(또는 정규화 제목이 같은 그룹)에 이보다 많은 레코드가 있으면 ("Introduction" 같은 흔한 제목) 묶지 않는다.
+MAX_BUCKET = 200
+# 서명을 계산할 때 한 번에 처리할 레코드 수 (메모리 상한)
+CHUNK_SIZE = 200_000
+
+_ARXIV_VERSION_RE = re.compile(r"v\d+$")
+_DOI_PREFIX_RE = re.compile(r"^(https?://(dx\.)?doi\.org/|doi:)", re.IGNORECASE)
+
+def normalize_doi(doi) -> str:
+    if not isinstance(doi, str) or not doi.strip():
+        return ""
+    return _DOI_PREFIX_RE.sub("", doi.strip()).lower()
+
+def arxiv_doi(arxiv_id: str) -> str:
+    """arXiv가 모든 논문에 부여하는 DOI (OpenAlex의 arXiv 레코드 DOI와 같다)"""
+    return f"10.48550/arxiv.{_ARXIV_VERSION_RE.sub('', arxiv_id).lower()}"
+
+def load_records(openalex_csv: str | None = None, arxiv_csv: str | None = None) -> pd.DataFrame:
+    """수집 결과 CSV를 (source, source_id, title, doi, cited_by_count) 레코드로 합친다."""
+    frames = []
+    if openalex_csv and os.path.exists(openalex_csv):
+        df = pd.read_csv(openalex_csv, usecols=lambda c: c in ("openalex_id", "title", "doi", "cited_by_count"))
+        frames.append(pd.DataFrame({
+            "source": "openalex",
+            "source_id": df["openalex_id"].astype(str),
+            "title": df["title"].fillna("").astype(str),
+            "doi": df["doi"].map(normalize_doi) if "doi" in df else "",
+            "cited_by_count": pd.to_numeric(df.get("cited_by_count", 0), errors="coerce").fillna(0).astype(np.int64),
+        }))
+    if arxiv_csv and os.path.exists(arxiv_csv):
+        df = pd.read_csv(arxiv_csv, usecols=lambda c: c in ("arxiv_id", "title"), dtype=str)
+        frames.append(pd.DataFrame({
+            "source": "arxiv",
+            "source_id": df["arxiv_id"],
+            "title": df["title"].fillna(""),
+            "doi": df["arxiv_id"].map(arxiv_doi),
+            "cited_by_count": np.int64(0),
+        }))
+    if not frames:
+        return pd.DataFrame(columns=["source", "source_id", "title", "doi", "cited_by_count"])
+    return pd.concat(frames, ignore_index=True)
+
+def _hash64(values) -> np.ndarray:
+    """문자열마다 64비트 해시. 빈 문자열은 0 (키 없음)"""
+    out = np.zeros(len(values), dtype=np.uint64)
+    for i, v in enumerate(values):
+        if v:
+            out[i] = int.from_bytes(hashlib.blake2b(v.encode("utf-8"), digest_size=8).digest(), "little") or 1
+    return out
+
+def _exact_edges(keys: np.ndarray, max_group: int | None = None) -> tuple[np.ndarray, np.ndarray, int]:
+    """
+    같은 키(0 제외)를 가진 레코드를 그룹의 첫 레코드와 잇는 간선
+
+    :param int max_group: 같은 키를 가진 레코드가 이보다 많으면 그 키는 간선을 만들지 않는다. (None이면 제한 없음)
+    :return: (u, v, 건너뛴 키 수)
+    """
+    idx = np.flatnonzero(keys)
+    if idx.size == 0:
+        return np.empty(0, np.int64), np.empty(0, np.int64), 0
+    _, inv = np.unique(keys[idx], return_inverse=True)
+    skipped = 0
+    if max_group is not None:
+        sizes = np.bincount(inv)
+        skipped = int((sizes > max_group).sum())
+        small = sizes[inv] <= max_group
+        idx, inv = idx[small], inv[small]
+        if idx.size == 0:
+            return np.empty(0, np.int64), np.empty(0, np.int64), skipped
+    first = np.full(inv.max() + 1, np.iinfo(np.int64).max, dtype=np.int64)
+    np.minimum.at(first, inv, idx)
+    u, v = idx, first[inv]
+    keep = u != v
+    return u[keep], v[keep], skipped
+
+def minhash_signatures(norm_titles: list[str], num_perm: int = BANDS * ROWS, seed: int = 42) -> tuple[np.ndarray, np.ndarray]:
+    """
+    정규화한 제목의 바이트 4-gram 집합에 대한 MinHash 서명 (num_perm 개의 multiply-shift 해시 최솟값).
+
+    :return: (서명 uint32 [n, num_perm], 4-gram이 하나라도 있는지 bool [n])
+    """
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, 2**63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+    b = rng.integers(0, 2**63, size=num_perm, dtype=np.uint64)
+    n = len(norm_titles)
+    sig = np.full((n, num_perm), np.iinfo(np.uint32).max, dtype=np.uint32)
+    valid = np.zeros(n, dtype=bool)
+
+    for lo in range(0, n, CHUNK_SIZE):
+        enc = [t.encode("utf-8") for t in norm_titles[lo:lo + CHUNK_SIZE]]
+        lengths = np.fromiter(map(len, enc), dtype=np.int64, count=len(enc))
+        n_sh = np.maximum(lengths - 3, 0)
+        has = n_sh > 0
+        valid[lo:lo + len(enc)] = has
+        if not has.any():
+            continue
+        buf = np.frombuffer(b"".join(enc), dtype=np.uint8).astype(np.uint64)
+        starts = np.cumsum(lengths) - lengths
+        sh_offsets = np.cumsum(n_sh) - n_sh
+        # 각 4-gram의 시작 위치 (레코드 경계를 넘는 창은 만들지 않는다)
+        pos = np.arange(n_sh.sum()) - np.repeat(sh_offsets, n_sh) + np.repeat(starts, n_sh)
+        x = buf[pos] | (buf[pos + 1] << np.uint64(8)) | (buf[pos + 2] << np.uint64(16)) | (buf[pos + 3] << np.uint64(24))
+        rows = np.flatnonzero(has) + lo
+        for p in range(num_perm):
+            h = ((a[p] * x + b[p]) >> np.uint64(32)).astype(np.uint32)
+            sig[rows, p] = np.minimum.reduceat(h, sh_offsets[has])
+    return sig, valid
+
+def lsh_candidate_pairs(sig: np.ndarray, valid: np.ndarray, bands: int = BANDS, rows: int = ROWS, max_bucket: int = MAX_BUCKET) -> tuple[np.ndarray, int]:
+    """
+    서명을 bands 개의 밴드로 나눠, 한 밴드라도 값이 모두 같은 레코드 쌍을 후보로 반환한다.
+
+    :return: (후보 쌍 int64 [m, 2] (i < j), 너무 커서 건너뛴 버킷 수)
+    """
+    ids = np.flatnonzero(valid)
+    codes, skipped = [], 0
+    n = np.int64(sig.shape[0])
+    for band in range(bands):
+        cols = sig[ids, band * rows:(band + 1) * rows].astype(np.uint64)
+        key = cols[:, 0]
+        for c in range(1, rows):
+            key = (key * np.uint64(0x100000001B3)) ^ cols[:, c]
+        order = np.argsort(key, kind="stable")
+        sorted_key = key[order]
+        bounds = np.flatnonzero(np.diff(sorted_key)) + 1
+        group_starts = np.concatenate(([0], bounds))
+        group_sizes = np.diff(np.concatenate((group_starts, [len(sorted_key)])))
+        for start, size in zip(group_starts[group_sizes > 1], group_sizes[group_sizes > 1]):
+            if size > max_bucket:
+                skipped += 1
+                continue
+            members = np.sort(ids[order[start:start + size]])
+            i, j = np.triu_indices(size, k=1)
+            codes.append(members[i] * n + members[j])
+    if not codes:
+        return np.empty((0, 2), dtype=np.int64), skipped
+    codes = np.unique(np.concatenate(codes))
+    return np.stack([codes // n, codes % n], axis=1), skipped
+
+def estimated_jaccard(sig: np.ndarray, pairs: np.ndarray, chunk: int = 1_000_000) -> np.ndarray:
+    """후보 쌍마다 MinHash 서명 값이 같은 비율 (= 4-gram 집합 Jaccard 유사도 추정치)"""
+    out = np.empty(len(pairs), dtype=np.float32)
+    for lo in range(0, len(pairs), chunk):
+        p = pairs[lo:lo + chunk]
+        out[lo:lo + chunk] = (sig[p[:, 0]] == sig[p[:, 1]]).mean(axis=1)
+    return out
+
+def connected_components(n: int, u: np.ndarray, v: np.ndarray) -> np.ndarray:
+    """간선 (u, v) 로 연결된 레코드에 같은 라벨(그룹에서 가장 작은 index)을 붙인다. (hooking + pointer jumping)"""
+    labels = np.arange(n, dtype=np.int64)
+    if u.size == 0:
+        return labels
+    while True:
+        lu, lv = labels[u], labels[v]
+        if np.array_equal(lu, lv):
+            return labels
+        m = np.minimum(lu, lv)
+        np.minimum.at(labels, lu, m)
+        np.minimum.at(labels, lv, m)
+        while True:
+            nxt = labels[labels]
+            if np.array_equal(nxt, labels):
+                break
+            labels = nxt
+
+def _publisher_doi(doi: str) -> str:
+    """출판 DOI만 남긴다. (arXiv DOI는 출판본 DOI와 달라도 같은 논문일 수 있으므로 충돌 판단에 쓰지 않는다)"""
+    return "" if not doi or doi.startswith("10.48550/") else doi
+
+def _doi_conflict(doi_a: str, doi_b: str) -> bool:
+    """둘 다 출판 DOI가 있는데 서로 다르면 다른 논문"""
+    a, b = _publisher_doi(doi_a), _publisher_doi(doi_b)
+    return bool(a and b and a != b)
+
+def _drop_doi_conflicts(u: np.ndarray, v: np.ndarray, dois: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    keep = np.array([not _doi_conflict(dois[i], dois[j]) for i, j in zip(u, v)], dtype=bool)
+    return (u[keep], v[keep]) if keep.size else (u, v)
+
+def split_conflicting_groups(labels: np.ndarray, u: np.ndarray, v: np.ndarray, dois: list[str]) -> tuple[np.ndarray, int]:
+    """
+    서로 다른 출판 DOI를 가진 레코드가 (DOI 없는 레코드를 거쳐) 같은 그룹이 된 경우, 그 그룹만 다시 묶는다.
+    간선을 주어진 순서(우선순위)대로 보며, 합쳤을 때 출판 DOI가 두 개가 되는 간선은 건너뛴다. (union-find)
+    충돌 그룹은 드물어서 해당 그룹의 간선만 파이썬으로 처리한다.
+
+    :param labels: connected_components 결과
+    :param u, v: 그룹을 만든 간선 (앞쪽일수록 먼저 합친다)
+    :param dois: 레코드별 정규화된 DOI
+    :return: (새 라벨 (그룹에서 가장 작은 index), 나눈 그룹 수)
+    """
+    pdoi = pd.Series([_publisher_doi(d) for d in dois])
+    has_doi = pdoi != ""
+    per_group = pd.DataFrame({"label": labels[has_doi.to_numpy()], "doi": pdoi[has_doi].to_numpy()})
+    n_dois = per_group.groupby("label")["doi"].nunique()
+    conflicting = n_dois.index[n_dois > 1].to_numpy()
+    if conflicting.size == 0:
+        return labels, 0
+
+    in_conflict = np.isin(labels, conflicting)
+    members = np.flatnonzero(in_conflict)
+    parent = {int(i): int(i) for i in members}
+    group_doi = {int(i): pdoi[i] for i in members}
+
+    def find(x: int) -> int:
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for i, j in zip(u[in_conflict[u]], v[in_conflict[u]]):
+        ri, rj = find(int(i)), find(int(j))
+        if ri == rj:
+            continue
+        di, dj = group_doi[ri], group_doi[rj]
+        if di and dj and di != dj:
+            continue
+        root, child = (ri, rj) if ri < rj else (rj, ri)
+        parent[child] = root
+        group_doi[root] = di or dj
+
+    labels = labels.copy()
+    for i in members:
+        labels[i] = find(int(i))
+    return labels, int(conflicting.size)
+
+def deduplicate(records: pd.DataFrame, sim_threshold: float = SIM_THRESHOLD, bands: int = BANDS, rows: int = ROWS) -> tuple[pd.DataFrame, dict]:
+    """
+    :param records: load_records 결과 (source, source_id, title, doi, cited_by_count)
+    :return: (id 매핑 DataFrame, 단계별 통계)
+    """
+    timings = {}
+    t0 = time.perf_counter()
+    n = len(records)
+    titles = records["title"].tolist()
+    dois = records["doi"].fillna("").tolist()
+    norm_titles = [norm(t) for t in titles]
+
+    # 1. 정규화 제목 / DOI 정확 일치 (흔한 제목 그룹과 출판 DOI가 다른 제목 일치 쌍은 제외)
+    tu, tv, skipped_titles = _exact_edges(_hash64(norm_titles), MAX_BUCKET)
+    tu, tv = _drop_doi_conflicts(tu, tv, dois)
+    du, dv, _ = _exact_edges(_hash64(dois))
+    labels = connected_components(n, np.concatenate([tu, du]), np.concatenate([tv, dv]))
+    timings["exact_s"] = time.perf_counter() - t0
+
+    # 2. MinHash/LSH 후보 쌍 (이미 같은 그룹인 쌍은 제외)
+    t1 = time.perf_counter()
+    sig, valid = minhash_signatures(norm_titles, bands * rows)
+    timings["minhash_s"] = time.perf_counter() - t1
+    t1 = time.perf_counter()
+    pairs, skipped_buckets = lsh_candidate_pairs(sig, valid, bands, rows)
+    pairs = pairs[labels[pairs[:, 0]] != labels[pairs[:, 1]]]
+    candidate_pairs = len(pairs)
+    # 밴드 하나만 우연히 겹친 쌍은 서명 전체로 추정한 Jaccard 유사도로 먼저 거른다.
+    pairs = pairs[estimated_jaccard(sig, pairs) >= MIN_JACCARD]
+    del sig
+    timings["lsh_s"] = time.perf_counter() - t1
+
+    # 3. 후보 쌍에만 title_similarity 확인
+    t1 = time.perf_counter()
+    confirmed = np.array([
+        title_similarity(titles[i], titles[j]) >= sim_threshold and not _doi_conflict(dois[i], dois[j])
+        for i, j in pairs
+    ], dtype=bool)
+    timings["confirm_s"] = time.perf_counter() - t1
+
+    # 4. 그룹 (DOI 일치 -> 제목 일치 -> 유사 제목 순으로 합치며, 출판 DOI가 충돌하는 그룹은 다시 나눈다)
+    good = pairs[confirmed] if pairs.size else pairs
+    u = np.concatenate([du, tu, good[:, 0]])
+    v = np.concatenate([dv, tv, good[:, 1]])
+    labels = connected_components(n, u, v)
+    labels, split_groups = split_conflicting_groups(labels, u, v, dois)
+
+    # 5. 대표 id (OpenAlex 우선, 인용 수 많은 순, 먼저 나온 순)
+    is_openalex = (records["source"].to_numpy() == "openalex")
+    cited = records["cited_by_count"].to_numpy(dtype=np.int64)
+    order = np.lexsort((np.arange(n), -cited, ~is_openalex, labels))
+    first_of_group = np.ones(n, dtype=bool)
+    first_of_group[1:] = labels[order][1:] != labels[order][:-1]
+    canonical_of_label = np.empty(n, dtype=np.int64)
+    canonical_of_label[labels[order][first_of_group]] = order[first_of_group]
+    canonical = canonical_of_label[labels]
+    group_size = np.bincount(labels, minlength=n)[labels]
+
+    source = records["source"].to_numpy()
+    source_id = records["source_id"].to_numpy()
+    id_map = pd.DataFrame({
+        "source": source,
+        "source_id": source_id,
+        "canonical_source": source[canonical],
+        "canonical_id": source_id[canonical],
+        "group_size": group_size,
+    })
+    timings["total_s"] = time.perf_counter() - t0
+    stats = {
+        "records": n,
+        "exact_edges": int(tu.size + du.size),
+        "candidate_pairs": int(candidate_pairs),
+        "checked_pairs": int(len(pairs)),
+        "confirmed_pairs": int(confirmed.sum()),
+        "skipped_buckets": skipped_buckets,
+        "skipped_title_groups": skipped_titles,
+        "split_groups": split_groups,
+        "groups": int(len(np.unique(labels))),
+        "duplicates": int(n - len(np.unique(labels))),
+        **{k: round(v, 2) for k, v in timings.items()},
+    }
+    return id_map, stats
+
+def load_id_map(path: str = ID_MAP_PATH, source: str = "openalex") -> dict[str, str]:
+    """source 레코드의 source_id -> canonical_id (대표가 같은 source인 경우만). 매핑 파일이 없으면 빈 dict."""
+    if not os.path.exists(path):
+        return {}
+    df = pd.read_csv(path, dtype=str)
+    df = df[(df["source"] == source) & (df["canonical_source"] == source)]
+    return dict(zip(df["source_id"], df["canonical_id"]))
+
+def apply_id_map(papers_df: pd.DataFrame, citations_df: pd.DataFrame, id_map: dict[str, str], id_col: str = "openalex_id"):
+    """
+    적재 전에 canonical id 매핑을 적용한다.
+    - papers: 대표가 아닌 중복 논문 행을 뺀다. (index는 유지 -> 임베딩 배열 정렬 유지)
+    - citations: 양쪽 id를 canonical id로 바꾸고 자기 인용/중복 행을 뺀다.
+    """
+    if not id_map:
+        return papers_df, citations_df
+    ids = papers_df[id_col]
+    papers_df = papers_df[ids.map(id_map).fillna(ids) == ids]
+    if citations_df is not None and not citations_df.empty:
+        citations_df = citations_df.copy()
+        for col in ("citing_paper_id", "cited_paper_id"):
+            citations_df[col] = citations_df[col].map(id_map).fillna(citations_df[col])
+        citations_df = citations_df[citations_df["citing_paper_id"] != citations_df["cited_paper_id"]].drop_duplicates()
+    return papers_df, citations_df
+
+def main():
+    parser = argparse.ArgumentParser(description="Cross-source paper dedup (title hash / DOI + MinHash LSH)")
+    parser.add_argument("--openalex", default=os.path.join(data_dir, "papers.csv"))
+    parser.add_argument("--arxiv", default=os.path.join(data_dir, "arxiv_meta.csv"))
+    parser.add_argument("--out", default=ID_MAP_PATH)
+    parser.add_argument("--threshold", type=float, default=SIM_THRESHOLD, help="title_similarity 임계값 (최대 0.85)")
+    args = parser.parse_args()
+
+    records = load_records(args.openalex, args.arxiv)
+    print(f"📚 레코드 {len(records)}개 (openalex {int((records['source'] == 'openalex').sum())}, arxiv {int((records['source'] == 'arxiv').sum())})")
+    id_map, stats = deduplicate(records, args.threshold)
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    id_map.to_csv(args.out, index=False)
+    print(f"✅ 중복 제거 완료: {stats}")
+    print(f"💾 id 매핑 저장: {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+papers 테이블의 제목/초록에서 ML 용어 후보를 추출하고, LLM으로 한 줄 정의를 한 번만 생성해 glossary 테이블에 저장하는 배치 작업.
+질문 증강(services/rag_api/src/core/retriever.py)은 이 용어집을 먼저 조회하고, 없는 키워드만 웹(Tavily)에서 검색한다.
+
+    python db/glossary.py --top-k 2000 --min-df 5
+    python db/glossary.py --dry-run          # 후보 용어만 출력
+"""
+import argparse
+import os
+import re
+import sys
+from collections import Counter
+
+from psycopg2.extras import execute_values
+from pgvector.psycopg2 import register_vector
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from db.db_init import get_conn, init_db
+from services.rag_api.src.core.definition_cache import normalize_keyword
+
+# 한 번의 LLM 호출로 정의를 생성할 용어 수
+DEFINE_BATCH_SIZE = 25
+
+_TOKEN_RE = re.compile(r"[A-Za-z][A-Za-z0-9]*(?:-[A-Za-z0-9]+)*")
+
+# 용어에 포함될 수 없는 단어 (n-gram 후보 필터)
+STOPWORDS = set("""
+a an the and or but nor of in on at to for from by with without within into onto over under via per as is are was were be been
+being this that these those it its we our us they their them he she his her you your i can could may might must shall should will
+would do does did done has have had having not no than then there here which who whom whose what when where why how also such
+both each either neither all any some many much more most other another same different new novel first second third one two three
+based using use used uses show shows shown propose proposed proposes present presents presented paper papers work works study
+studies approach approaches method methods result results experiment experiments experimental large small high low well further
+however moreover therefore thus while although between among across through during after before about against up down out
+significantly significant state art existing recent recently various several specific extensive demonstrate demonstrates achieve
+achieves achieved outperform outperforms improve improves improved improvement effective efficient simple strong able
+""".split())
+
+def mine_terms(texts, max_ngram: int = 3, min_df: int = 5, top_k: int = 2000) -> list[tuple[str, str, int]]:
+    """
+    제목/초록에서 용어 후보(1~max_ngram 단어)를 문서 빈도 기준으로 뽑는다.
+    불용어가 포함된 n-gram은 제외한다. (일반 명사 등 잡음의 최종 선별은 정의 생성 LLM이 한다)
+    같은 정규화 키를 갖는 표기(예: Fine-tuning / fine tuning)는 가장 많이 쓰인 표기를 대표로 사용한다.
+
+    :param texts: 문서(제목 + 초록) 문자열 iterable
+    :param int max_ngram: 최대 n-gram 길이
+    :param int min_df: 최소 문서 빈도
+    :param int top_k: 반환할 최대 용어 수
+    :return list[tuple[str, str, int]]: (term_key, term, doc_freq) 리스트, 문서 빈도 내림차순
+    """
+    doc_freq = Counter()
+    surface_forms: dict[str, Counter] = {}
+    for text in texts:
+        tokens = _TOKEN_RE.findall(text or "")
+        seen = set()
+        for n in range(1, max_ngram + 1):
+            for i in range(len(tokens) - n + 1):
+                gram = tokens[i:i + n]
+                if any(token.lower() in STOPWORDS for token in gram):
+                    continue
+                # 한 글자/두 글자 소문자 단어는 대부분 잡음 (약어는 대문자라 유지)
+                if n == 1 and len(gram[0]) < 3 and not gram[0].isupper():
+                    continue
+                surface = " ".join(gram)
+                key = normalize_keyword(surface)
+                if key not in seen:
+                    seen.add(key)
+                    doc_freq[key] += 1
+                surface_forms.setdefault(key, Counter())[surface if surface.isupper() else surface.lower()] += 1
+
+    terms = []
+    for key, df in doc_freq.most_common():
+        if df < min_df:
+            break
+        terms.append((key, surface_forms[key].most_common(1)[0][0], df))
+        if len(terms) >= top_k:
+            break
+    return terms
+
+def load_corpus(conn) -> list[str]:
+    with conn.cursor() as cur:
+        cur.execute("SELECT title, abstract FROM papers")
+        return [f"{title or ''}. {abstract or ''}" for title, abstract in cur.fetchall()]
+
+def existing_term_keys(conn) -> set[str]:
+    with conn.cursor() as cur:
+        cur.execute("SELECT term_key FROM glossary")
+        return {row[0] for row in cur.fetchall()}
+
+def define_terms(terms: list[str], api_key: str) -> dict[str, str]:
+    """
+    용어 리스트의 한 줄 정의를 LLM으로 생성한다.
+    DEFINE_BATCH_SIZE개씩 묶어 한 번에 요청하고, 배치들은 llm_client의 동시성 제한 안에서 병렬로 실행된다.
+    일반적인 ML 용어가 아니라고 판단된 용어는 빈 문자열로 돌려받아 저장하지 않는다.
+
+    :param list[str] terms: 용어 리스트
+    :param str api_key: Upstage API Key
+    :return dict[str, str]: {term: definition}
+    """
+    from langchain_core.prompts import ChatPromptTemplate
+    from langchain_core.output_parsers import JsonOutputParser
+    from services.rag_api.src.core.llm_client import make_chat_model, submit_chain
+
+    prompt = ChatPromptTemplate.from_template(
+        """You are writing a glossary of Machine Learning, Deep Learning and AI terms.
+For each term below, write a one-sentence definition in English as it is used in ML research.
+If a term is not a meaningful ML/AI concept (e.g. a generic phrase or a fragment), map it to an empty string.
+Your output must be a JSON object mapping each term exactly as given to its definition.
+
+Terms:
+{terms}"""
+    )
+    chain = prompt | make_chat_model("solar-pro2", api_key) | JsonOutputParser()
+
+    batches = [terms[i:i + DEFINE_BATCH_SIZE] for i in range(0, len(terms), DEFINE_BATCH_SIZE)]
+    futures = [
+        submit_chain(chain, {"terms": "\n".join(f"- {t}" for t in batch)}, model="solar-pro2", label="glossary_define")
+        for batch in batches
+    ]
+    definitions = {}
+    for batch, future in zip(batches, futures):
+        try:
+            response = future.result()
+        except Exception as e:
+            print(f"⚠️ 정의 생성 실패 ({batch[0]} 외 {len(batch) - 1}개): {e}")
+            continue
+        for term in batch:
+            definition = response.get(term) if isinstance(response, dict) else None
+            if isinstance(definition, str) and definition.strip():
+                definitions[term] = definition.strip()
+    return definitions
+
+def upsert_glossary(conn, rows: list[tuple]) -> None:
+    """rows: (term_key, term, definition, doc_freq, embedding) 리스트"""
+    with conn.cursor() as cur:
+        execute_values(cur, """
+            INSERT INTO glossary (term_key, term, definition, doc_freq, embedding)
+            VALUES %s
+            ON CONFLICT (term_key) DO UPDATE SET
+                term = EXCLUDED.term,
+                definition = EXCLUDED.definition,
+                doc_freq = EXCLUDED.doc_freq,
+                embedding = EXCLUDED.embedding,
+                updated_at = now()
+        """, rows, page_size=500)
+    conn.commit()
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the ML glossary from the papers table")
+    parser.add_argument("--top-k", type=int, default=2000, help="정의를 생성할 최대 후보 용어 수")
+    parser.add_argument("--min-df", type=int, default=5, help="후보 용어의 최소 문서 빈도")
+    parser.add_argument("--max-ngram", type=int, default=3)
+    parser.add_argument("--refresh", action="store_true", help="이미 용어집에 있는 용어도 정의를 다시 생성")
+    parser.add_argument("--dry-run", action="store_true", help="후보 용어만 출력하고 종료")
+    args = parser.parse_args()
+
+    conn = get_conn()
+    init_db(conn, with_ivf_index=False)
+
+    corpus = load_corpus(conn)
+    terms = mine_terms(corpus, max_ngram=args.max_ngram, min_df=args.min_df, top_k=args.top_k)
+    print(f"📚 논문 {len(corpus)}편에서 후보 용어 {len(terms)}개 추출")
+    if args.dry_run:
+        for key, term, df in terms:
+            print(f"{df:>6}  {term}")
+        return
+
+    if not args.refresh:
+        known = existing_term_keys(conn)
+        terms = [t for t in terms if t[0] not in known]
+        print(f"🆕 새로 정의할 용어: {len(terms)}개 (기존 {len(known)}개 유지)")
+    if not terms:
+        return
+
+    definitions = define_terms([term for _, term, _ in terms], os.getenv("UPSTAGE_API_KEY"))
+    defined = [(key, term, df) for key, term, df in terms if term in definitions]
+    print(f"✅ 정의 생성: {len(defined)}개 (제외: {len(terms) - len(defined)}개)")
+    if not defined:
+        return
+
+    # 용어 임베딩: 키워드 표기가 달라도(예: "self attention" vs "self-attention mechanism") 유사도로 찾기 위함
+    from services.rag_api.src.core.get_emb import get_emb_model, get_emb
+    embeddings = get_emb(get_emb_model(), [term for _, term, _ in defined])
+
+    register_vector(conn)
+    rows = [
+        (key, term, definitions[term], df, embeddings[i])
+        for i, (key, term, df) in enumerate(defined)
+    ]
+    upsert_glossary(conn, rows)
+    print(f"💾 glossary 테이블에 {len(rows)}개 저장 완료")
+    conn.close()
+
+if __name__ == "__main__":
+    main()
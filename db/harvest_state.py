@@ -0,0 +1,101 @@
+"""
+수집 진행 상태(query, filters, next_cursor, 받은 work 수, 완료 여부)를 로컬 SQLite에 저장한다.
+수집이 중간에 실패하거나 프로세스가 죽어도 --resume 으로 저장된 cursor부터 이어서 수집하고, 완료된 query는 건너뛴다.
+backfill에서 적재할 수 없었던 id(skipped_ids)도 기록해 같은 id를 반복 조회하지 않게 한다.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HARVEST_STATE_PATH = os.getenv("HARVEST_STATE_PATH", os.path.join(ROOT_DIR, "data", "harvest_state.sqlite"))
+
+def filters_key(filters: dict | None) -> str:
+    """같은 필터를 항상 같은 문자열로 (키 순서 무관)"""
+    return json.dumps({k: v for k, v in (filters or {}).items() if v}, sort_keys=True, ensure_ascii=False)
+
+class HarvestState:
+    """(source, query, filters) 별 cursor 체크포인트 저장소"""
+
+    def __init__(self, path: str = HARVEST_STATE_PATH):
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS harvest_state (
+                    source       TEXT NOT NULL,
+                    query        TEXT NOT NULL,
+                    filters      TEXT NOT NULL,
+                    next_cursor  TEXT,
+                    fetched      INTEGER NOT NULL DEFAULT 0,
+                    done         INTEGER NOT NULL DEFAULT 0,
+                    updated_at   REAL NOT NULL,
+                    PRIMARY KEY (source, query, filters)
+                )
+            """)
+            # OpenAlex에서 찾을 수 없거나 초록이 없어 적재하지 않은 id (backfill에서 다시 조회하지 않음)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS skipped_ids (
+                    source      TEXT NOT NULL,
+                    id          TEXT NOT NULL,
+                    reason      TEXT,
+                    updated_at  REAL NOT NULL,
+                    PRIMARY KEY (source, id)
+                )
+            """)
+            self._conn.commit()
+
+    def load(self, source: str, query: str, filters: dict | None) -> dict | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT next_cursor, fetched, done, updated_at FROM harvest_state WHERE source = ? AND query = ? AND filters = ?",
+                (source, query, filters_key(filters)),
+            ).fetchone()
+        if row is None:
+            return None
+        return {"next_cursor": row[0], "fetched": row[1], "done": bool(row[2]), "updated_at": row[3]}
+
+    def save(self, source: str, query: str, filters: dict | None, next_cursor: str | None, fetched: int, done: bool) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO harvest_state (source, query, filters, next_cursor, fetched, done, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (source, query, filters_key(filters), next_cursor, fetched, int(done), time.time()),
+            )
+            self._conn.commit()
+
+    def reset(self, source: str, queries: list[str] | None = None, filters: dict | None = None) -> None:
+        """queries가 없으면 source의 모든 상태를 지운다."""
+        with self._lock:
+            if queries is None:
+                self._conn.execute("DELETE FROM harvest_state WHERE source = ?", (source,))
+            else:
+                self._conn.executemany(
+                    "DELETE FROM harvest_state WHERE source = ? AND query = ? AND filters = ?",
+                    [(source, q, filters_key(filters)) for q in queries],
+                )
+            self._conn.commit()
+
+    def summary(self, source: str) -> list[dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT query, filters, fetched, done, updated_at FROM harvest_state WHERE source = ? ORDER BY query", (source,)
+            ).fetchall()
+        return [{"query": r[0], "filters": r[1], "fetched": r[2], "done": bool(r[3]), "updated_at": r[4]} for r in rows]
+
+    def mark_skipped(self, source: str, ids: list[str], reason: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO skipped_ids (source, id, reason, updated_at) VALUES (?, ?, ?, ?)",
+                [(source, i, reason, now) for i in ids],
+            )
+            self._conn.commit()
+
+    def skipped_ids(self, source: str) -> set[str]:
+        with self._lock:
+            rows = self._conn.execute("SELECT id FROM skipped_ids WHERE source = ?", (source,)).fetchall()
+        return {r[0] for r in rows}
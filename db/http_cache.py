@@ -0,0 +1,128 @@
+"""
+수집기 HTTP 응답을 로컬 디스크에 저장하는 content-addressed 캐시.
+키는 URL(쿼리 제외) + 정렬된 파라미터의 sha256이고, 응답은 gzip 압축 JSON 파일로 저장한다.
+
+    HTTP_CACHE_MODE=off     캐시 사용 안 함 (기본값)
+    HTTP_CACHE_MODE=record  유효 기간(HTTP_CACHE_TTL_S) 안의 캐시가 있으면 사용하고, 없으면 요청 후 저장
+    HTTP_CACHE_MODE=replay  캐시만 사용 (네트워크 요청 없음). 캐시에 없으면 CacheMissError, 유효 기간은 무시
+
+개발 중 같은 수집을 반복하거나 벤치마크를 네트워크 없이 재현할 때:
+    HTTP_CACHE_MODE=record python db/meta_openalex.py    # 한 번 기록
+    HTTP_CACHE_MODE=replay python db/meta_openalex.py    # 이후에는 디스크에서만 재생
+"""
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from urllib.parse import urlsplit, urlunsplit, parse_qsl
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HTTP_CACHE_MODE = os.getenv("HTTP_CACHE_MODE", "off").strip().lower()
+HTTP_CACHE_DIR = os.getenv("HTTP_CACHE_DIR", os.path.join(ROOT_DIR, "data", "http_cache"))
+HTTP_CACHE_TTL_S = int(os.getenv("HTTP_CACHE_TTL_S", str(7 * 24 * 3600)))
+# 응답 내용에 영향을 주지 않는 파라미터 (키 계산에서 제외)
+IGNORED_PARAMS = {"mailto", "api_key"}
+
+class CacheMissError(LookupError):
+    """replay 모드에서 캐시에 없는 요청을 보내려고 할 때 발생한다."""
+
+def cache_key(url: str, params: dict | None = None) -> str:
+    """URL의 쿼리 문자열과 params를 합쳐 정렬한 뒤 sha256으로 키를 만든다. (파라미터 순서 무관)"""
+    parts = urlsplit(url)
+    items = parse_qsl(parts.query, keep_blank_values=True)
+    for k, v in (params or {}).items():
+        values = v if isinstance(v, (list, tuple)) else [v]
+        items.extend((k, str(x)) for x in values)
+    items = sorted((k, v) for k, v in items if k not in IGNORED_PARAMS)
+    base = urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip("/") or "/", "", ""))
+    raw = json.dumps([base, items], ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+class HTTPCache:
+    """<cache_dir>/<key[:2]>/<key>.json.gz 에 {url, params, status, headers, body, stored_at} 를 저장한다."""
+
+    def __init__(self, mode: str = HTTP_CACHE_MODE, cache_dir: str = HTTP_CACHE_DIR, ttl_s: int = HTTP_CACHE_TTL_S):
+        if mode not in ("off", "record", "replay"):
+            raise ValueError(f"HTTP_CACHE_MODE must be off|record|replay, got {mode!r}")
+        self.mode = mode
+        self.cache_dir = cache_dir
+        self.ttl_s = ttl_s
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "expired": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json.gz")
+
+    def _count(self, name: str):
+        with self._lock:
+            self.stats[name] += 1
+
+    def get(self, url: str, params: dict | None = None) -> dict | None:
+        """
+        캐시된 응답 dict를 반환한다. 없거나(record 모드에서) 유효 기간이 지났으면 None.
+        replay 모드에서 없으면 CacheMissError.
+        """
+        key = cache_key(url, params)
+        try:
+            with gzip.open(self._path(key), "rt", encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            entry = None
+        except (OSError, ValueError):
+            # 쓰다가 중단된 파일 등은 없는 것으로 취급
+            entry = None
+
+        if entry is not None and self.mode == "record" and time.time() - entry["stored_at"] > self.ttl_s:
+            self._count("expired")
+            entry = None
+        if entry is None:
+            self._count("misses")
+            if self.mode == "replay":
+                raise CacheMissError(f"not in HTTP cache (replay mode): {url} {params}")
+            return None
+        self._count("hits")
+        return entry
+
+    def put(self, url: str, params: dict | None, status: int, headers: dict, body: str) -> None:
+        """성공 응답(2xx)만 저장한다. 임시 파일에 쓴 뒤 rename해 반쯤 쓴 파일이 읽히지 않게 한다."""
+        if self.mode != "record" or not 200 <= status < 300:
+            return
+        key = cache_key(url, params)
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        entry = {
+            "url": url,
+            "params": {k: v for k, v in (params or {}).items() if k not in IGNORED_PARAMS},
+            "status": status,
+            "headers": {k: v for k, v in headers.items() if k.lower() in ("content-type", "retry-after")},
+            "body": body,
+            "stored_at": time.time(),
+        }
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=6) as f:
+                f.write(json.dumps(entry, ensure_ascii=False).encode("utf-8"))
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        self._count("stores")
+
+_cache: HTTPCache | None = None
+_cache_lock = threading.Lock()
+
+def get_http_cache() -> HTTPCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = HTTPCache()
+    return _cache
@@ -0,0 +1,236 @@
+"""
+arXiv / OpenAlex 수집기가 공유하는 HTTP 클라이언트 계층.
+- 호스트별로 하나의 requests.Session을 재사용한다. (keep-alive, 매 요청마다 TCP/TLS handshake를 하지 않음)
+- HTTPAdapter 커넥션 풀을 쓰고, 재시도/백오프 정책은 http_get 안에서 한 곳에서 관리한다. (429/503의 Retry-After 준수)
+  재시도를 urllib3에 맡기지 않으므로 재시도마다 속도 제한(bucket)을 다시 통과하고, Retry-After는 버킷 전체를 멈춘다.
+  마감 시간이 있는 요청(RAG 검색 경로)은 retries=False로 한 번만 요청한다.
+- gzip 응답을 요청하고, 호스트별 요청 수 / 초당 요청 수 / 커넥션 재사용률을 집계한다.
+- HTTP_CACHE_MODE가 record/replay면 디스크 응답 캐시(db/http_cache.py)를 먼저 확인한다.
+"""
+import os
+import random
+import threading
+import time
+from collections import defaultdict, deque
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3.util.retry import Retry
+
+from db.http_cache import get_http_cache
+
+# 호스트별 커넥션 풀 크기 (동시에 요청하는 스레드 수 이상으로)
+HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "16"))
+# 재시도 정책: 연결 실패/타임아웃/429/5xx에 대해 지수 백오프(+지터)로 재시도 (Retry-After가 있으면 그 시간만큼)
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "5"))
+HTTP_BACKOFF_FACTOR = float(os.getenv("HTTP_BACKOFF_FACTOR", "1.0"))
+HTTP_BACKOFF_MAX_S = float(os.getenv("HTTP_BACKOFF_MAX_S", "30"))
+RETRY_STATUS = (429, 500, 502, 503, 504)
+# 초당 요청 수 계산 구간(초)
+_RPS_WINDOW_S = 10.0
+
+DEFAULT_HEADERS = {
+    "User-Agent": "paper-harvester/0.1",
+    "Accept-Encoding": "gzip, deflate",
+}
+
+_sessions: dict[str, requests.Session] = {} # host -> Session
+_sessions_lock = threading.Lock()
+
+_stats_lock = threading.Lock()
+_stats: dict[str, dict] = defaultdict(lambda: {"requests": 0, "errors": 0, "latency_ms": 0.0})
+_recent: dict[str, deque] = defaultdict(lambda: deque(maxlen=10000))
+
+def retry_after_seconds(value: str | None) -> float | None:
+    """Retry-After 헤더(초 또는 HTTP-date)를 초 단위로 변환한다."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def _backoff_s(attempt: int) -> float:
+    """attempt번째 재시도 전 대기 시간 (지수 백오프, 상한 HTTP_BACKOFF_MAX_S, + 지터)"""
+    return min(HTTP_BACKOFF_MAX_S, HTTP_BACKOFF_FACTOR * 2 ** attempt) + random.uniform(0, HTTP_BACKOFF_FACTOR)
+
+def get_session(host: str) -> requests.Session:
+    """
+    호스트별 공유 Session. 처음 호출할 때 커넥션 풀을 붙여 만든다.
+    urllib3 수준의 재시도는 끈다. (재시도는 http_get이 속도 제한을 다시 통과하며 직접 한다)
+    """
+    with _sessions_lock:
+        session = _sessions.get(host)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_POOL_MAXSIZE,
+                                  max_retries=Retry(total=0, raise_on_status=False), pool_block=True)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update(DEFAULT_HEADERS)
+            _sessions[host] = session
+    return session
+
+def _cached_response(url: str, entry: dict) -> requests.Response:
+    response = requests.Response()
+    response.status_code = entry["status"]
+    response._content = entry["body"].encode("utf-8")
+    response.headers = CaseInsensitiveDict(entry["headers"])
+    response.encoding = "utf-8"
+    response.url = entry.get("url", url)
+    response.from_cache = True
+    return response
+
+def _record(host: str, start: float, error: bool) -> None:
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    with _stats_lock:
+        stats = _stats[host]
+        stats["requests"] += 1
+        stats["errors"] += int(error)
+        stats["latency_ms"] += elapsed_ms
+        _recent[host].append(time.monotonic())
+
+def http_get(
+    url: str,
+    params: dict | None = None,
+    timeout=30,
+    headers: dict | None = None,
+    before_request=None,
+    retries: bool = True,
+    bucket=None,
+) -> requests.Response:
+    """
+    공유 Session으로 GET 요청을 보낸다.
+    연결 실패/타임아웃/RETRY_STATUS 응답은 최대 HTTP_MAX_RETRIES번 재시도하며, 시도마다 bucket과 before_request를 다시 거친다.
+    Retry-After가 있으면 bucket.pause()로 같은 버킷을 쓰는 모든 스레드를 그 시간만큼 멈춘다. (bucket이 없으면 이 스레드만 기다림)
+    응답 캐시가 켜져 있으면 캐시를 먼저 확인하고 (replay 모드에서 없으면 CacheMissError), 성공 응답을 저장한다.
+
+    :param str url: 요청 URL
+    :param dict params: query string
+    :param timeout: 초 또는 (connect, read)
+    :param dict headers: 기본 헤더에 덧붙일 헤더
+    :param before_request: 실제 네트워크 요청 직전에 호출할 함수 (예의상 지연 등). 캐시 hit에는 호출하지 않는다.
+    :param bool retries: False면 재시도 없이 한 번만 요청한다.
+    :param bucket: db.rate_limit.TokenBucket. 실제 네트워크 요청(재시도 포함)마다 토큰 1개를 사용한다.
+    :return requests.Response: 마지막 응답 (상태 코드 확인은 호출부에서)
+    """
+    host = urlparse(url).netloc
+    cache = get_http_cache()
+    if cache.enabled:
+        entry = cache.get(url, params)
+        if entry is not None:
+            return _cached_response(url, entry)
+
+    session = get_session(host)
+    attempts = HTTP_MAX_RETRIES + 1 if retries else 1
+    for attempt in range(attempts):
+        if bucket is not None:
+            bucket.acquire()
+        if before_request is not None:
+            before_request()
+        start = time.perf_counter()
+        error = False
+        try:
+            response = session.get(url, params=params, timeout=timeout, headers=headers)
+        except (requests.ConnectionError, requests.Timeout):
+            error = True
+            if attempt == attempts - 1:
+                raise
+            time.sleep(_backoff_s(attempt))
+            continue
+        except requests.RequestException:
+            error = True
+            raise
+        finally:
+            _record(host, start, error)
+
+        if response.status_code not in RETRY_STATUS or attempt == attempts - 1:
+            # 재시도를 다 쓰면 예외 대신 마지막 응답을 돌려준다. (호출부에서 raise_for_status)
+            if cache.enabled:
+                cache.put(url, params, response.status_code, response.headers, response.text)
+            return response
+        retry_after = retry_after_seconds(response.headers.get("Retry-After"))
+        if retry_after is None:
+            time.sleep(_backoff_s(attempt))
+        elif bucket is not None:
+            bucket.pause(retry_after) # 다음 acquire()가 재개 시각까지 기다린다.
+        else:
+            time.sleep(retry_after)
+
+def http_post_json(url: str, payload: dict, timeout=30, headers: dict | None = None) -> requests.Response:
+    """
+    공유 Session으로 JSON POST 요청을 재시도 없이 한 번 보낸다. (POST는 멱등이 아니므로 재시도/응답 캐시를 쓰지 않음)
+
+    :param str url: 요청 URL
+    :param dict payload: JSON 본문
+    :param timeout: 초 또는 (connect, read)
+    :param dict headers: 기본 헤더에 덧붙일 헤더
+    :return requests.Response: 응답 (상태 코드 확인은 호출부에서)
+    """
+    host = urlparse(url).netloc
+    session = get_session(host)
+    start = time.perf_counter()
+    error = False
+    try:
+        return session.post(url, json=payload, timeout=timeout, headers=headers)
+    except requests.RequestException:
+        error = True
+        raise
+    finally:
+        _record(host, start, error)
+
+def _pool_counters(session: requests.Session) -> tuple[int, int]:
+    """urllib3 커넥션 풀이 실제로 보낸 요청 수(재시도 포함)와 새로 연 커넥션 수"""
+    num_requests = num_connections = 0
+    for adapter in {id(a): a for a in session.adapters.values()}.values():
+        pools = adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools[key]
+            num_requests += pool.num_requests
+            num_connections += pool.num_connections
+    return num_requests, num_connections
+
+def get_http_stats() -> dict:
+    """
+    호스트별 요청 지표 스냅샷.
+    - requests: 재시도를 포함해 보낸 요청 수 / upstream_requests: 커넥션 풀이 실제로 보낸 요청 수
+    - new_connections: 새로 연 TCP 커넥션 수 / connection_reuse: 기존 커넥션으로 보낸 요청 비율
+    - rps: 최근 _RPS_WINDOW_S 초 동안의 초당 요청 수
+    - http_cache: 디스크 응답 캐시 hit/miss/store 수 (캐시를 거친 요청은 호스트 지표에 포함되지 않음)
+    """
+    now = time.monotonic()
+    snapshot = {}
+    with _sessions_lock:
+        sessions = dict(_sessions)
+    with _stats_lock:
+        for host, stats in _stats.items():
+            recent = _recent[host]
+            while recent and now - recent[0] > _RPS_WINDOW_S:
+                recent.popleft()
+            upstream, new_connections = _pool_counters(sessions[host]) if host in sessions else (0, 0)
+            snapshot[host] = {
+                **stats,
+                "latency_ms": round(stats["latency_ms"], 1),
+                "avg_latency_ms": round(stats["latency_ms"] / max(stats["requests"], 1), 1),
+                "upstream_requests": upstream,
+                "new_connections": new_connections,
+                "connection_reuse": round(1 - new_connections / upstream, 3) if upstream else 0.0,
+                "rps": round(len(recent) / max(min(_RPS_WINDOW_S, now - recent[0]), 1.0), 2) if recent else 0.0,
+            }
+    cache = get_http_cache()
+    if cache.enabled:
+        snapshot["http_cache"] = {"mode": cache.mode, **cache.stats}
+    return snapshot
+
+def close_sessions() -> None:
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
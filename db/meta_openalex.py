@@ -7,15 +7,86 @@ ROOT_DIR = os.path.abspath(os.path.join(os.path.abspath(__file__), "..", ".."))
 sys.path.append(ROOT_DIR)
 
 from db.util import get_json, OPENALEX, PER_PAGE, RPS_SLEEP, reconstruct_abstract
+from db.http_client import get_http_stats
+from db.rate_limit import TokenBucket
 
 data_dir = os.path.join(ROOT_DIR, "data")
 
+DEFAULT_SELECT = "id,display_name,publication_date,doi,cited_by_count,abstract_inverted_index,authorships,primary_location,referenced_works"
+
+def _works_params(query: str, filters: dict | None, select_fields: str, per_page: int) -> dict:
+    params = {"per-page": per_page, "select": select_fields}
+    if query:
+        # 빈 검색어면 필터만으로 조회한다. (e.g. cites:W123)
+        params["search"] = query
+    if filters:
+        # ex) "publication_year:2020|2021,type:journal-article"
+        filt = ",".join(f"{k}:{v}" for k, v in filters.items() if v)
+        if filt:
+            params["filter"] = filt
+    return params
+
+def iter_work_pages(
+    query: str,
+    filters: dict | None = None,
+    select_fields: str = DEFAULT_SELECT,
+    per_page: int = PER_PAGE,
+    cursor: str = "*",
+    rps_sleep: float = RPS_SLEEP,
+    bucket=None,
+    sort: str | None = None,
+    timeout: float = 30,
+    retries: bool = True,
+):
+    """
+    cursor 페이징으로 OpenAlex works를 한 페이지씩 가져오는 generator.
+    (works, next_cursor)를 yield하고, next_cursor가 None이면 마지막 페이지다.
+
+    cursor: 시작 cursor ("*"면 처음부터, 저장해 둔 next_cursor를 주면 그 다음 페이지부터)
+    bucket: db.rate_limit.TokenBucket. 없으면 rps_sleep 초에 한 번씩 요청하는 버킷을 만든다.
+        토큰은 실제 네트워크 요청에만 사용되므로 응답 캐시 hit은 기다리지 않는다.
+    sort: OpenAlex sort 파라미터 (e.g. "cited_by_count:desc")
+    timeout, retries: 요청마다의 HTTP 타임아웃(초)과 재시도 여부 (db/util.get_json)
+    """
+    if bucket is None and rps_sleep > 0:
+        bucket = TokenBucket(1 / rps_sleep, 1)
+    params = _works_params(query, filters, select_fields, per_page)
+    params["cursor"] = cursor
+    if sort:
+        params["sort"] = sort
+    while True:
+        j = get_json(f"{OPENALEX}/works", params, timeout=timeout, retries=retries, bucket=bucket)
+        results = j.get("results", [])
+        nxt = j.get("meta", {}).get("next_cursor") if results else None
+        yield results, nxt
+        if not nxt:
+            return
+        params["cursor"] = nxt
+
+# openalex_id 필터 한 번에 넣을 수 있는 최대 id 수 (OpenAlex OR 필터 상한)
+MAX_IDS_PER_FILTER = 50
+
+def fetch_works_by_ids(ids: list[str], select_fields: str = DEFAULT_SELECT, bucket=None) -> list[dict]:
+    """
+    openalex_id:W1|W2|... 필터로 최대 MAX_IDS_PER_FILTER개의 work를 한 번의 요청으로 가져온다.
+    OpenAlex에 없는 id는 결과에서 빠진다.
+    bucket: db.rate_limit.TokenBucket (재시도를 포함한 요청마다 토큰 사용)
+    """
+    if len(ids) > MAX_IDS_PER_FILTER:
+        raise ValueError(f"at most {MAX_IDS_PER_FILTER} ids per request, got {len(ids)}")
+    params = {
+        "filter": "openalex_id:" + "|".join(ids),
+        "per-page": MAX_IDS_PER_FILTER,
+        "select": select_fields,
+    }
+    return get_json(f"{OPENALEX}/works", params, bucket=bucket).get("results", [])
+
 def search_works_by_keywords(
     query: str,
     filters: dict | None = None,
     max_records: int = 5000,
     use_cursor: bool = True,
-    select_fields: str = "id,display_name,publication_date,doi,cited_by_count,abstract_inverted_index,authorships,primary_location,referenced_works",
+    select_fields: str = DEFAULT_SELECT,
     per_page: int = PER_PAGE,
     rps_sleep: float = RPS_SLEEP,
 ):
@@ -25,30 +96,17 @@ def search_works_by_keywords(
     max_records: 최대 수집 개수
     use_cursor: True면 cursor 페이징, False면 page 기반
     """
-    params = {"search": query, "per-page": per_page, "select": select_fields}
-    if filters:
-        # ex) "publication_year:2020|2021,type:journal-article"
-        filt = ",".join(f"{k}:{v}" for k, v in filters.items() if v)
-        if filt:
-            params["filter"] = filt
-
     items, got = [], 0
     if use_cursor:
-        params["cursor"] = "*"
-        while True:
-            j = get_json(f"{OPENALEX}/works", params)
-            results = j.get("results", [])
+        for results, nxt in iter_work_pages(query, filters, select_fields, per_page, rps_sleep=rps_sleep):
             for w in results:
                 items.append(w)
                 got += 1
                 if got >= max_records:
                     return items
-            nxt = j.get("meta", {}).get("next_cursor")
             print(f"query: {query}, items: {len(items)}")
-            if not nxt: break
-            params["cursor"] = nxt
-            time.sleep(rps_sleep)
     else:
+        params = _works_params(query, filters, select_fields, per_page)
         page = 1
         while got < max_records:
             params["page"] = page
@@ -77,51 +135,104 @@ def harvest_openalex_by_keywords(
             select_fields="id,display_name,publication_date,doi,cited_by_count,abstract_inverted_index,primary_location,authorships,referenced_works"
         )
         works.extend(work)
-    # papers 테이블
-    papers_rows = []
-    # 참고 논문 테이블
+    print(f"HTTP stats: {get_http_stats()}")
+    return works_to_frames(works)
+
+def parse_work(w: dict) -> tuple[dict | None, list[dict]]:
+    """
+    OpenAlex work 1건을 papers 행과 citations 행 리스트로 변환한다.
+    초록 또는 저자가 없는 work는 (None, []) 를 반환한다.
+    """
+    abs_txt = reconstruct_abstract(w.get("abstract_inverted_index"))
+    if not abs_txt.strip():
+        return None, []
+
+    if not w.get("authorships"):
+        return None, []
+
+    authors = ", ".join([a['author']['display_name'] for a in w.get("authorships", [])])
+    openalex_id = w["id"].split("/")[-1]
+
+    paper_row = {
+        "openalex_id": openalex_id,
+        "title": w.get("display_name"),
+        "publication_date": w.get("publication_date"),
+        "doi": w.get("doi"),
+        "cited_by_count": w.get("cited_by_count", ""),
+        "abstract": abs_txt,
+        "pdf_url": (w.get("primary_location") or {}).get("pdf_url"),
+        "authors": authors,
+    }
+
     citation_rows = []
-    
-    seen_papers = set()
+    for ref in w.get("referenced_works", []):
+        if w["id"] == ref:
+          continue
+        citation_rows.append({
+            "citing_paper_id": openalex_id,
+            "cited_paper_id": ref.split("/")[-1],
+        })
+    return paper_row, citation_rows
+
+PAPER_COLUMNS = ("openalex_id", "title", "publication_date", "doi", "cited_by_count", "abstract", "pdf_url", "authors")
+
+def parse_works_columnar(works: list[dict], seen: set | None = None) -> tuple[dict[str, list], dict[str, list]]:
+    """
+    works 페이지 전체를 한 번에 컬럼 단위 리스트(papers, citations)로 변환한다.
+    parse_work와 같은 규칙(초록 또는 저자가 없는 work 제외)에 더해 seen에 있는 work는 건너뛰고,
+    work마다 dict를 만들지 않아 DataFrame 변환까지 빠르다.
+
+    :param seen: 이미 변환한 work id(URL) 집합. 페이지를 나눠 호출할 때 같은 집합을 넘기면 중복이 제거된다.
+    :return: ({컬럼명: 값 리스트}, {"citing_paper_id": [...], "cited_paper_id": [...]})
+    """
+    seen = set() if seen is None else seen
+    papers = {c: [] for c in PAPER_COLUMNS}
+    ids, titles, dates, dois = papers["openalex_id"], papers["title"], papers["publication_date"], papers["doi"]
+    counts, abstracts, pdf_urls, authors = papers["cited_by_count"], papers["abstract"], papers["pdf_url"], papers["authors"]
+    citing, cited = [], []
+
     for w in works:
-        if w["id"] in seen_papers:
+        wid = w["id"]
+        if wid in seen:
+            continue
+        authorships = w.get("authorships")
+        if not authorships:
             continue
-
         abs_txt = reconstruct_abstract(w.get("abstract_inverted_index"))
         if not abs_txt.strip():
             continue
+        seen.add(wid)
+
+        openalex_id = wid.rsplit("/", 1)[-1]
+        ids.append(openalex_id)
+        titles.append(w.get("display_name"))
+        dates.append(w.get("publication_date"))
+        dois.append(w.get("doi"))
+        counts.append(w.get("cited_by_count", ""))
+        abstracts.append(abs_txt)
+        pdf_urls.append((w.get("primary_location") or {}).get("pdf_url"))
+        authors.append(", ".join([a["author"]["display_name"] for a in authorships]))
+
+        for ref in w.get("referenced_works") or ():
+            if ref == wid:
+                continue
+            citing.append(openalex_id)
+            cited.append(ref.rsplit("/", 1)[-1])
+
+    return papers, {"citing_paper_id": citing, "cited_paper_id": cited}
+
+def works_to_frames(works: list[dict]):
+    """
+    OpenAlex works 응답 리스트를 papers / citations DataFrame으로 변환한다.
+    중복 work, 초록 또는 저자가 없는 work는 제외한다.
+    """
+    papers, citations = parse_works_columnar(works)
 
-        if not w.get("authorships"):
-            continue
-
-        authors = ", ".join([a['author']['display_name'] for a in w.get("authorships", [])])
-
-        papers_rows.append({
-            "openalex_id": w["id"].split("/")[-1],
-            "title": w.get("display_name"),
-            "publication_date": w.get("publication_date"),
-            "doi": w.get("doi"),
-            "cited_by_count": w.get("cited_by_count", ""),
-            "abstract": abs_txt,
-            "pdf_url": (w.get("primary_location") or {}).get("pdf_url"),
-            "authors": authors,
-        })
-
-        for ref in w.get("referenced_works", []):
-            if w["id"] == ref:
-              continue
-            citation_rows.append({
-                "citing_paper_id": w["id"].split("/")[-1],
-                "cited_paper_id": ref.split("/")[-1],
-            })
-
-        seen_papers.add(w["id"])
+    print(f"papers_rows: {len(papers['openalex_id'])}")
+    print(f"citation_rows: {len(citations['citing_paper_id'])}")
 
-    print(f"papers_rows: {len(papers_rows)}")
-    print(f"citation_rows: {len(citation_rows)}")
-    
-    papers_df = pd.DataFrame(papers_rows)
-    citations_df = pd.DataFrame(citation_rows)
+    papers_df = pd.DataFrame(papers)
+    citations_df = pd.DataFrame(citations)
 
     return papers_df, citations_df
     
@@ -3,11 +3,28 @@ from typing import Optional, List, Dict
 import pandas as pd
 import time
 from datetime import datetime
-import requests
+import os
+import sys
 import feedparser
 from requests.exceptions import ReadTimeout, ConnectionError, HTTPError
 import random
 
+ROOT_DIR = os.path.abspath(os.path.join(os.path.abspath(__file__), "..", ".."))
+sys.path.append(ROOT_DIR)
+
+from db.http_client import http_get, get_http_stats
+from db.rate_limit import TokenBucket
+
+# 로컬 fake 서버(benchmarks/fake_arxiv_server.py)로 바꿔 테스트할 수 있도록 env로 덮어쓸 수 있다.
+ARXIV_API_URL = os.getenv("ARXIV_API_URL", "https://export.arxiv.org/api/query")
+ARXIV_HEADERS = {
+    "User-Agent": "arxiv-harvester/0.1 (wjdqlsrla0309@naver.com)",
+    "From": "wjdqlsrla0309@naver.com",
+}
+# arXiv 권장 대기 (요청 간 3초 이상). 프로세스 전체가 하나의 버킷을 공유하므로 쿼리가 바뀌어도 간격이 유지된다.
+ARXIV_MIN_INTERVAL_S = float(os.getenv("ARXIV_MIN_INTERVAL_S", "4"))
+arxiv_bucket = TokenBucket(1 / ARXIV_MIN_INTERVAL_S, 1)
+
 @dataclass
 class PaperMeta:
     arxiv_id: str
@@ -65,11 +82,47 @@ def build_query(
         cores = [f"{core} AND {extra}" for core in cores]
     return cores
 
+def fetch_feed(search_query: str, start: int, batch: int,
+               sortBy: str = "relevance", sortOrder: str = "descending",
+               timeout=(5, 60),
+               before_request=None,
+               bucket=None):
+    '''
+    arXiv API 한 페이지를 요청해 feedparser 결과를 반환한다. 네트워크/HTTP 오류는 그대로 전파한다.
+    feed.feed.opensearch_totalresults 로 전체 결과 수를 알 수 있다.
+    bucket: db.rate_limit.TokenBucket. 재시도를 포함한 요청마다 토큰을 쓰고, Retry-After를 받으면 버킷 전체를 멈춘다.
+    '''
+    params = {
+        "search_query": search_query,
+        "start": start,
+        "max_results": batch,  # arXiv는 보통 300이 상한, 100~200 권장
+        "sortBy": sortBy,
+        "sortOrder": sortOrder,
+    }
+    r = http_get(ARXIV_API_URL, params=params, timeout=timeout, headers=ARXIV_HEADERS, before_request=before_request, bucket=bucket)
+    r.raise_for_status()
+    return feedparser.parse(r.text)
+
+def entry_to_record(e) -> dict:
+    """feedparser entry 1건을 paged_arxiv가 yield하는 dict로 변환한다."""
+    return {
+        "arxiv_id": e.id.split("/")[-1],
+        "title": e.title,
+        "abstract": getattr(e, "summary", ""),
+        "published": getattr(e, "published", ""),
+        "authors": "; ".join(a["name"] for a in e.authors),
+        "primary_category": getattr(e, "arxiv_primary_category", {}).get("term", ""),
+        "categories": "; ".join(t["term"] for t in e.tags),
+        "pdf_url": next((l["href"] for l in e.links if l.get("type") == "application/pdf"), None),
+        "journal_ref": getattr(e, "arxiv_journal_ref", ""),
+    }
+
 def fetch_page(search_query: str, start: int, batch: int,
                sortBy: str = "relevance", sortOrder: str = "descending",
                timeout=(5, 60),  # (connect, read)
                sleep_jitter: tuple = (0.4, 1.0),
-               ignore_timeout: bool = True):
+               ignore_timeout: bool = True,
+               bucket=None):
     '''
     search_query: arxiv 검색 시 사용하는 쿼리 (ex: ti:attention OR abs:attention AND (cat:cs.CV OR cat:cs.LG OR cat:cs.AI OR cat:stat.ML OR cat:cs.CL OR cat:cs.MA) )
     start: 페이지 시작 인덱스
@@ -79,30 +132,17 @@ def fetch_page(search_query: str, start: int, batch: int,
     timeout: 타임아웃 시간 (connect, read)
     sleep_jitter: 조용히 스킬링 완화를 위한 지연 시간 (0.4, 1.0)
     ignore_timeout: 타임아웃 시 조용히 스킬링 완화를 위한 플래그
+    bucket: 요청 간격 제한 (db.rate_limit.TokenBucket). 응답 캐시 hit이면 토큰을 쓰지 않는다.
     '''
 
-    params = {
-        "search_query": search_query,
-        "start": start,
-        "max_results": batch,  # arXiv는 보통 300이 상한, 100~200 권장
-        "sortBy": sortBy,
-        "sortOrder": sortOrder,
-    }
-
-    SESSION = requests.Session()
-    URL = "https://export.arxiv.org/api/query"
-    HEADERS = {
-        "User-Agent": "arxiv-harvester/0.1 (wjdqlsrla0309@naver.com)",
-        "From": "wjdqlsrla0309@naver.com",
-        "Accept-Encoding": "gzip, deflate",
-}
-
-    # 예의상 약간의 지연(스로틀링 완화)
-    time.sleep(random.uniform(*sleep_jitter))
+    def pace():
+        # 예의상 약간의 지연(스로틀링 완화)
+        time.sleep(random.uniform(*sleep_jitter))
 
+    # 공유 Session(keep-alive, gzip)으로 요청. 5xx/429 재시도와 백오프는 http_client의 공통 정책이 처리한다. (재시도도 bucket을 거침)
+    # 지연은 실제 네트워크 요청에만 적용된다. (응답 캐시 hit은 바로 반환)
     try:
-        r = SESSION.get(URL, params=params, timeout=timeout, headers=HEADERS)
-        r.raise_for_status()
+        feed = fetch_feed(search_query, start, batch, sortBy, sortOrder, timeout=timeout, before_request=pace, bucket=bucket)
     except (ReadTimeout, ConnectionError) as e:
         # 타임아웃/네트워크 실패는 조용히 스킵 (로그만)
         if ignore_timeout:
@@ -111,20 +151,14 @@ def fetch_page(search_query: str, start: int, batch: int,
         else:
             raise
     except HTTPError as e:
-        # 5xx는 한 번 정도 느슨하게 재시도해도 좋음 (선택)
+        # 재시도 후에도 5xx면 이 페이지는 건너뜀
         if 500 <= getattr(e.response, "status_code", 0) < 600 and ignore_timeout:
-            try:
-                time.sleep(1.2)
-                r = SESSION.get(URL, params=params, timeout=(5, 90), headers=HEADERS)
-                r.raise_for_status()
-            except Exception as e2:
-                print(f"[WARN] fetch_page HTTP {getattr(e.response, 'status_code', '5xx')} again failed: {e2}. Skipping.")
-                return []
+            print(f"[WARN] fetch_page HTTP {getattr(e.response, 'status_code', '5xx')} after retries at start={start}. Skipping.")
+            return []
         else:
             # 4xx는 보통 쿼리 문제 -> 바로 전파
             raise
 
-    feed = feedparser.parse(r.text)
     total = int(getattr(feed.feed, "opensearch_totalresults", 0))
     per = int(getattr(feed.feed, "opensearch_itemsperpage", 0))
     start_idx = int(getattr(feed.feed, "opensearch_startindex", 0))
@@ -133,7 +167,7 @@ def fetch_page(search_query: str, start: int, batch: int,
     return feed.entries  # list[entry]
 
 def paged_arxiv(search_query: str, total: int = 1000, batch: int = 20,
-                sortBy: str = "relevance", sortOrder: str = "descending", sleep_time: int = 4):
+                sortBy: str = "relevance", sortOrder: str = "descending", bucket: TokenBucket | None = None):
 
     '''
     search_query: arxiv 검색 시 사용하는 쿼리 (ex: ti:attention OR abs:attention AND (cat:cs.CV OR cat:cs.LG OR cat:cs.AI OR cat:stat.ML OR cat:cs.CL OR cat:cs.MA) )
@@ -141,39 +175,29 @@ def paged_arxiv(search_query: str, total: int = 1000, batch: int = 20,
     batch: 페이지 당 결과 개수
     sortBy: 정렬 기준 (relevance, lastUpdatedDate, submittedDate)
     sortOrder: 정렬 순서 (ascending, descending)
-    sleep_time: 페이지 간 대기 시간
+    bucket: 네트워크 요청 사이 최소 간격을 지키는 버킷. 없으면 프로세스 전역 arxiv_bucket (ARXIV_MIN_INTERVAL_S 초에 한 번)
     '''
+    # 캐시 hit은 토큰을 쓰지 않으므로 기다리지 않는다.
+    bucket = bucket or arxiv_bucket
     seen = set()
     for start in range(0, total, batch):
         
         for i in range(5):
             
-            entries = fetch_page(search_query, max(0, start-i), batch+i, sortBy, sortOrder)
+            entries = fetch_page(search_query, max(0, start-i), batch+i, sortBy, sortOrder, bucket=bucket)
             print(f"len entries: {len(entries)}")
             if len(entries) >= batch:
                 break
-            time.sleep(sleep_time)
         
         if not entries:
             continue
         
         for e in entries:
-            aid = e.id.split("/")[-1]
-            if aid in seen: 
+            record = entry_to_record(e)
+            if record["arxiv_id"] in seen: 
                 continue
-            seen.add(aid)
-            yield {
-                "arxiv_id": aid,
-                "title": e.title,
-                "abstract": getattr(e, "summary", ""),
-                "published": getattr(e, "published", ""),
-                "authors": "; ".join(a["name"] for a in e.authors),
-                "primary_category": getattr(e, "arxiv_primary_category", {}).get("term", ""),
-                "categories": "; ".join(t["term"] for t in e.tags),
-                "pdf_url": next((l["href"] for l in e.links if l.get("type") == "application/pdf"), None),
-                "journal_ref": getattr(e, "arxiv_journal_ref", ""),
-            }
-        time.sleep(sleep_time)  # arXiv 권장 대기 (페이지 간 3초). :contentReference[oaicite:1]{index=1}
+            seen.add(record["arxiv_id"])
+            yield record
 
 def fetch_arxiv_metadata(
     keywords: List[str],
@@ -234,6 +258,7 @@ def fetch_arxiv_metadata(
         count += 1
 
     print(f"{count} rows")
+    print(f"HTTP stats: {get_http_stats()}")
     df = pd.DataFrame(rows)
     if not df.empty:
         # 정렬 통일(최신 업데이트 우선)
@@ -0,0 +1,51 @@
+"""
+papers.search_tsv 전문 검색 컬럼 + GIN 인덱스를 추가하는 1회성 마이그레이션 (하이브리드 검색 RETRIEVAL_HYBRID 에 필요).
+
+STORED 생성 컬럼 추가는 papers 테이블 전체를 다시 쓰고, 끝날 때까지 papers 읽기/쓰기를 모두 막는다.
+(db/db_init.py add_fulltext_search 참고) 데이터가 있는 DB에서는 서비스 점검 시간에 실행한다.
+
+    python db/migrate_fulltext.py --dry-run
+    python db/migrate_fulltext.py
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.abspath(__file__), "..", ".."))
+sys.path.append(ROOT_DIR)
+
+from db.db_init import get_conn, add_fulltext_search
+
+def has_fulltext_column(conn) -> bool:
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT 1 FROM information_schema.columns
+            WHERE table_name = 'papers' AND column_name = 'search_tsv'
+        """)
+        return cur.fetchone() is not None
+
+def main():
+    parser = argparse.ArgumentParser(description="Add papers.search_tsv (full-text search) column and GIN index")
+    parser.add_argument("--dry-run", action="store_true", help="다시 쓸 행 수만 출력하고 종료")
+    args = parser.parse_args()
+
+    conn = get_conn()
+    try:
+        if has_fulltext_column(conn):
+            print("✅ papers.search_tsv 가 이미 있습니다.")
+            return
+        with conn.cursor() as cur:
+            cur.execute("SELECT count(*) FROM papers")
+            n_rows = cur.fetchone()[0]
+        print(f"📦 papers {n_rows}행을 다시 씁니다. 끝날 때까지 papers 읽기/쓰기가 막힙니다.")
+        if args.dry_run:
+            return
+        start = time.perf_counter()
+        add_fulltext_search(conn)
+        print(f"✅ search_tsv 컬럼 + GIN 인덱스 추가 완료 ({time.perf_counter() - start:.1f}s)")
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    main()
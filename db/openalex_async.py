@@ -0,0 +1,154 @@
+"""
+OpenAlex 비동기 수집기.
+meta_openalex.harvest_openalex_by_keywords 와 같은 결과(papers / citations DataFrame)를 만들지만,
+- 키워드별 cursor 페이징을 동시에 진행하고 (키워드 내부의 cursor는 순서대로),
+- 하나의 httpx.AsyncClient 커넥션 풀을 공유하며,
+- 고정 sleep 대신 전역 토큰 버킷(OPENALEX_RPS)으로 속도를 맞추고 429/503의 Retry-After를 지킨다.
+
+    python db/openalex_async.py
+    OPENALEX_BASE_URL=http://127.0.0.1:8091 python db/openalex_async.py   # 로컬 fake 서버
+"""
+import asyncio
+import os
+import random
+import sys
+import time
+
+import httpx
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.abspath(__file__), "..", ".."))
+sys.path.append(ROOT_DIR)
+
+from db.util import OPENALEX, MAILTO, PER_PAGE, OPENALEX_RPS, OPENALEX_BURST, loads
+from db.meta_openalex import works_to_frames
+from db.rate_limit import TokenBucket
+from db.http_cache import get_http_cache
+from db.http_client import retry_after_seconds
+
+data_dir = os.path.join(ROOT_DIR, "data")
+
+SELECT_FIELDS = "id,display_name,publication_date,doi,cited_by_count,abstract_inverted_index,primary_location,authorships,referenced_works"
+# 동시에 진행할 키워드(cursor 체인) 수. 실제 요청 속도는 토큰 버킷이 제한한다.
+MAX_CONCURRENT_QUERIES = int(os.getenv("OPENALEX_MAX_CONCURRENT_QUERIES", "8"))
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+def make_async_client(max_connections: int = MAX_CONCURRENT_QUERIES) -> httpx.AsyncClient:
+    """keep-alive 커넥션 풀을 공유하는 OpenAlex용 AsyncClient (gzip 응답은 httpx가 자동으로 해제)"""
+    return httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        timeout=httpx.Timeout(30.0, connect=10.0),
+        headers={"Accept-Encoding": "gzip", "User-Agent": f"paper-harvester (mailto:{MAILTO})"},
+    )
+
+async def get_json_async(client: httpx.AsyncClient, bucket: TokenBucket, url: str, params: dict | None = None, max_retries: int = 5) -> dict:
+    """
+    db.util.get_json 의 비동기 버전.
+    요청마다 토큰 버킷을 통과하고, Retry-After가 있으면 버킷 전체를 그 시간만큼 멈춘 뒤 재시도한다.
+    응답 캐시(HTTP_CACHE_MODE)가 켜져 있으면 캐시 hit은 토큰 없이 바로 반환한다.
+    """
+    params = dict(params or {})
+    params["mailto"] = MAILTO
+    cache = get_http_cache()
+    if cache.enabled:
+        entry = cache.get(url, params)
+        if entry is not None:
+            return loads(entry["body"])
+    for attempt in range(max_retries):
+        await bucket.acquire_async()
+        try:
+            r = await client.get(url, params=params)
+        except httpx.TransportError as e:
+            print(f"⚠️ OpenAlex 연결 오류 ({type(e).__name__}), 재시도 {attempt + 1}/{max_retries}")
+            await asyncio.sleep((2 ** attempt) + random.random())
+            continue
+        if r.status_code == 200:
+            if cache.enabled:
+                cache.put(url, params, r.status_code, r.headers, r.text)
+            return loads(r.content)
+        if r.status_code in RETRY_STATUS:
+            retry_after = retry_after_seconds(r.headers.get("Retry-After"))
+            if retry_after is not None:
+                bucket.pause(retry_after)
+                await asyncio.sleep(retry_after)
+            else:
+                await asyncio.sleep((2 ** attempt) + random.random())
+            continue
+        r.raise_for_status()
+    raise RuntimeError(f"Failed after {max_retries} tries: {url} {params}")
+
+async def search_works_by_keywords_async(
+    client: httpx.AsyncClient,
+    bucket: TokenBucket,
+    query: str,
+    filters: dict | None = None,
+    max_records: int = 5000,
+    select_fields: str = SELECT_FIELDS,
+    per_page: int = PER_PAGE,
+) -> list[dict]:
+    """meta_openalex.search_works_by_keywords 의 cursor 페이징 비동기 버전 (페이지 간 고정 sleep 없음)"""
+    params = {"search": query, "per-page": per_page, "select": select_fields, "cursor": "*"}
+    if filters:
+        filt = ",".join(f"{k}:{v}" for k, v in filters.items() if v)
+        if filt:
+            params["filter"] = filt
+
+    items = []
+    while True:
+        j = await get_json_async(client, bucket, f"{OPENALEX}/works", params)
+        for w in j.get("results", []):
+            items.append(w)
+            if len(items) >= max_records:
+                return items
+        nxt = j.get("meta", {}).get("next_cursor")
+        print(f"query: {query}, items: {len(items)}")
+        if not nxt or not j.get("results"):
+            break
+        params["cursor"] = nxt
+    return items
+
+async def harvest_works_async(
+    keywords: list[str],
+    filters: dict | None = None,
+    max_records: int = 2000,
+    max_concurrent_queries: int = MAX_CONCURRENT_QUERIES,
+    rps: float = OPENALEX_RPS,
+    bucket: TokenBucket | None = None,
+) -> list[dict]:
+    """키워드별 수집을 동시에 실행하고 키워드 순서대로 works를 이어 붙여 반환한다."""
+    bucket = bucket or TokenBucket(rps, OPENALEX_BURST)
+    semaphore = asyncio.Semaphore(max_concurrent_queries)
+
+    async with make_async_client(max_concurrent_queries) as client:
+        async def one(keyword: str) -> list[dict]:
+            async with semaphore:
+                return await search_works_by_keywords_async(client, bucket, keyword, filters, max_records)
+
+        results = await asyncio.gather(*(one(k) for k in keywords))
+    return [w for works in results for w in works]
+
+def harvest_openalex_by_keywords_async(
+    keywords: list[str],
+    filters: dict | None = None,
+    max_records: int = 2000,
+    **kwargs,
+):
+    """harvest_openalex_by_keywords 와 같은 (papers_df, citations_df)를 반환하는 동기 진입점"""
+    works = asyncio.run(harvest_works_async(keywords, filters, max_records, **kwargs))
+    return works_to_frames(works)
+
+if __name__ == "__main__":
+    keywords = ["transformer", "diffusion", "language", "tuning", "retrieval", "neural", "attention", "generative", "training", "instruct"]
+
+    start = time.perf_counter()
+    papers_df, citations_df = harvest_openalex_by_keywords_async(
+        keywords=keywords,
+        filters={"from_publication_date": "2014-01-01", "topics.subfield.id": "1702"},
+        max_records=1000
+    )
+    print(f"⏱️ 수집 시간: {time.perf_counter() - start:.1f}s")
+
+    if not os.path.exists(data_dir):
+        os.makedirs(data_dir)
+
+    papers_df.to_csv(os.path.join(data_dir, "papers.csv"), index=False)
+    citations_df.to_csv(os.path.join(data_dir, "citations.csv"), index=False)
@@ -0,0 +1,336 @@
+"""
+OpenAlex -> Postgres 스트리밍 수집 파이프라인.
+harvest_openalex_by_keywords(전체 works를 리스트/DataFrame/CSV로 모은 뒤 db_init.py로 적재)를 대체한다.
+
+    fetch (키워드별 cursor 페이징, 스레드 N개) -> [bounded queue]
+      -> parse + dedupe (parse_work, 최근 id LRU) -> [bounded queue]
+      -> write (BATCH_SIZE 단위 papers/citations upsert, 배치마다 commit)
+
+단계 사이 큐의 크기가 정해져 있어 뒤 단계가 느리면 앞 단계가 기다린다. (메모리 사용량이 수집 규모와 무관)
+배치마다 commit하므로 중간에 중단되어도 이미 쓴 논문은 DB에 남는다.
+commit된 페이지마다 query별 next_cursor를 db/harvest_state.py에 저장하므로, --resume 으로 이어서 수집할 수 있다.
+
+    python db/openalex_pipeline.py --max-records 1000 --workers 4
+    python db/openalex_pipeline.py --max-records 1000 --resume   # 완료된 키워드는 건너뛰고 저장된 cursor부터
+    python db/openalex_pipeline.py --embed        # 쓰기 전에 초록 임베딩까지 계산
+"""
+import argparse
+import os
+import queue
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.abspath(__file__), "..", ".."))
+sys.path.append(ROOT_DIR)
+
+from db.db_init import get_conn, init_db, upsert_paper_rows, insert_citation_rows
+from db.meta_openalex import iter_work_pages, parse_work
+from db.rate_limit import TokenBucket
+from db.util import OPENALEX_RPS, OPENALEX_BURST
+from db.http_client import get_http_stats
+from db.harvest_state import HarvestState
+
+# fetch -> parse 사이에 쌓아 둘 수 있는 페이지 수
+PAGE_QUEUE_SIZE = 8
+# 한 번에 upsert/commit할 논문 수
+BATCH_SIZE = 500
+# 중복 제거용으로 기억할 최근 openalex_id 수 (그보다 오래된 중복은 DB의 ON CONFLICT가 처리)
+SEEN_CAPACITY = 200_000
+
+_DONE = object()
+
+@dataclass
+class PageMarker:
+    """한 페이지의 행이 모두 writer로 넘어갔음을 알리는 표시. writer가 해당 행을 commit한 뒤 on_commit으로 전달한다."""
+    query: str
+    next_cursor: str | None
+    fetched: int      # 이 query에서 지금까지 받은 work 수
+    done: bool        # 이 query의 수집이 끝났는지 (마지막 페이지 또는 max_records 도달)
+
+class RecentIds:
+    """최근 본 id를 최대 capacity개까지 기억하는 LRU 집합"""
+
+    def __init__(self, capacity: int = SEEN_CAPACITY):
+        self.capacity = capacity
+        self._ids: OrderedDict[str, None] = OrderedDict()
+
+    def add(self, key: str) -> bool:
+        """새 id면 True, 최근에 본 id면 False"""
+        if key in self._ids:
+            self._ids.move_to_end(key)
+            return False
+        self._ids[key] = None
+        if len(self._ids) > self.capacity:
+            self._ids.popitem(last=False)
+        return True
+
+def _put(q: queue.Queue, item, stop: threading.Event) -> bool:
+    """큐가 가득 차면 기다리되, 다른 단계가 실패해 stop이 설정되면 포기한다."""
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.5)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+def _get(q: queue.Queue, stop: threading.Event):
+    while not stop.is_set():
+        try:
+            return q.get(timeout=0.5)
+        except queue.Empty:
+            continue
+    return _DONE
+
+class HarvestPipeline:
+    """
+    키워드 리스트를 OpenAlex에서 수집해 papers/citations 테이블에 스트리밍으로 적재한다.
+
+    :param conn: Postgres 커넥션 (writer 단계 전용)
+    :param int batch_size: upsert/commit 단위 논문 수
+    :param int fetch_workers: 동시에 cursor를 진행할 키워드 수
+    :param embed_fn: 초록 리스트 -> 임베딩 리스트. 주어지면 쓰기 전에 임베딩을 계산한다.
+    :param on_commit: 배치 commit 직후, 그 배치에 행이 모두 포함된 페이지마다 호출된다. (PageMarker)
+    :param state: 주어지면 commit된 페이지마다 query별 cursor를 저장한다. (run(resume=True)로 이어서 수집)
+    """
+
+    def __init__(
+        self,
+        conn,
+        batch_size: int = BATCH_SIZE,
+        fetch_workers: int = 4,
+        rps: float = OPENALEX_RPS,
+        embed_fn: Callable[[list[str]], list] | None = None,
+        on_commit: Callable[[PageMarker], None] | None = None,
+        state: HarvestState | None = None,
+    ):
+        self.conn = conn
+        self.batch_size = batch_size
+        self.fetch_workers = fetch_workers
+        self.bucket = TokenBucket(rps, OPENALEX_BURST)
+        self.embed_fn = embed_fn
+        self.on_commit = on_commit
+        self.state = state
+        self._filters = None
+        self.failed_queries: list[str] = []
+        self.stats = {
+            "pages": 0, "works": 0, "duplicates": 0, "skipped": 0,
+            "papers_written": 0, "citations_written": 0, "commits": 0,
+        }
+        self._stats_lock = threading.Lock()
+        self._errors: list[BaseException] = []
+
+    def _count(self, key: str, n: int = 1):
+        with self._stats_lock:
+            self.stats[key] += n
+
+    # --- stage 1: fetch ---
+    def _fetch_worker(self, jobs: queue.Queue, pages: queue.Queue, stop: threading.Event, filters, max_records):
+        try:
+            while not stop.is_set():
+                try:
+                    query, cursor, fetched = jobs.get_nowait()
+                except queue.Empty:
+                    return
+                try:
+                    for works, next_cursor in iter_work_pages(query, filters, cursor=cursor, bucket=self.bucket):
+                        works = works[:max(0, max_records - fetched)]
+                        fetched += len(works)
+                        done = next_cursor is None or fetched >= max_records
+                        self._count("pages")
+                        self._count("works", len(works))
+                        print(f"query: {query}, items: {fetched}")
+                        if not _put(pages, (PageMarker(query, next_cursor, fetched, done), works), stop):
+                            return
+                        if done:
+                            break
+                except Exception as e:
+                    # 재시도를 모두 써도 실패한 query는 건너뛰고 다른 query를 계속 수집한다. (--resume 시 저장된 cursor부터 재시도)
+                    print(f"⚠️ query 수집 실패 ({query}, items: {fetched}): {e}")
+                    self.failed_queries.append(query)
+        except BaseException as e:
+            self._errors.append(e)
+            stop.set()
+
+    # --- stage 2: parse + dedupe ---
+    def _parse_worker(self, pages: queue.Queue, rows: queue.Queue, stop: threading.Event, fetchers: list[threading.Thread]):
+        seen = RecentIds()
+        try:
+            while True:
+                try:
+                    item = pages.get(timeout=0.5)
+                except queue.Empty:
+                    if stop.is_set() or not any(t.is_alive() for t in fetchers):
+                        if pages.empty():
+                            break
+                    continue
+                marker, works = item
+                for w in works:
+                    if not seen.add(w["id"]):
+                        self._count("duplicates")
+                        continue
+                    paper_row, citation_rows = parse_work(w)
+                    if paper_row is None:
+                        self._count("skipped")
+                        continue
+                    if not _put(rows, (paper_row, citation_rows), stop):
+                        return
+                if not _put(rows, marker, stop):
+                    return
+        except BaseException as e:
+            self._errors.append(e)
+            stop.set()
+        finally:
+            _put(rows, _DONE, stop)
+
+    # --- stage 3: write ---
+    def _flush(self, papers: list[dict], citations: list[tuple], markers: list[PageMarker]):
+        if papers:
+            embeddings = self.embed_fn([p["abstract"] for p in papers]) if self.embed_fn else None
+            upsert_paper_rows(self.conn, papers, embeddings, commit=False)
+        if citations:
+            insert_citation_rows(self.conn, citations, commit=False)
+        self.conn.commit()
+        self._count("commits")
+        self._count("papers_written", len(papers))
+        self._count("citations_written", len(citations))
+        for marker in markers:
+            if self.state is not None:
+                self.state.save("openalex", marker.query, self._filters, marker.next_cursor, marker.fetched, marker.done)
+            if self.on_commit:
+                self.on_commit(marker)
+        print(f"💾 commit #{self.stats['commits']}: papers {self.stats['papers_written']}, citations {self.stats['citations_written']}")
+
+    def _write(self, rows: queue.Queue, stop: threading.Event):
+        papers, citations, markers = [], [], []
+        while True:
+            item = _get(rows, stop)
+            if item is _DONE:
+                break
+            if isinstance(item, PageMarker):
+                markers.append(item)
+                continue
+            paper_row, citation_rows = item
+            papers.append(paper_row)
+            citations.extend((c["citing_paper_id"], c["cited_paper_id"]) for c in citation_rows)
+            if len(papers) >= self.batch_size:
+                self._flush(papers, citations, markers)
+                papers, citations, markers = [], [], []
+        if not stop.is_set() and (papers or citations or markers):
+            self._flush(papers, citations, markers)
+
+    def _start_positions(self, keywords: list[str], filters: dict | None, max_records: int, resume: bool) -> list[tuple]:
+        """query별 (query, 시작 cursor, 이미 받은 work 수). resume이면 완료된 query는 제외한다."""
+        if self.state is None:
+            return [(k, "*", 0) for k in keywords]
+        if not resume:
+            self.state.reset("openalex", keywords, filters)
+            return [(k, "*", 0) for k in keywords]
+
+        positions = []
+        for keyword in keywords:
+            saved = self.state.load("openalex", keyword, filters)
+            if saved is None:
+                positions.append((keyword, "*", 0))
+            elif saved["done"] or not saved["next_cursor"] or saved["fetched"] >= max_records:
+                print(f"⏭️ 이미 완료된 query: {keyword} (items: {saved['fetched']})")
+            else:
+                print(f"↩️ 이어서 수집: {keyword} (items: {saved['fetched']})")
+                positions.append((keyword, saved["next_cursor"], saved["fetched"]))
+        return positions
+
+    def _final_stats(self, start: float) -> dict:
+        """실행 종료 시점의 stats (수집할 query가 없어 바로 끝난 경우에도 같은 키를 가진다)"""
+        self.stats["elapsed_s"] = round(time.perf_counter() - start, 1)
+        self.stats["failed_queries"] = list(self.failed_queries)
+        return self.stats
+
+    def run(self, keywords: list[str], filters: dict | None = None, max_records: int = 2000, resume: bool = False) -> dict:
+        """
+        :param bool resume: True면 state에 저장된 cursor부터 이어서 수집하고 완료된 query는 건너뛴다.
+            False면 해당 query들의 저장된 상태를 지우고 처음부터 수집한다.
+        :return dict: 단계별 처리 건수와 소요 시간
+        """
+        start = time.perf_counter()
+        stop = threading.Event()
+        self._filters = filters
+        positions = self._start_positions(keywords, filters, max_records, resume)
+        if not positions:
+            return self._final_stats(start)
+        jobs: queue.Queue = queue.Queue()
+        for position in positions:
+            jobs.put(position)
+        pages: queue.Queue = queue.Queue(maxsize=PAGE_QUEUE_SIZE)
+        rows: queue.Queue = queue.Queue(maxsize=self.batch_size * 2)
+
+        fetchers = [
+            threading.Thread(target=self._fetch_worker, args=(jobs, pages, stop, filters, max_records), name=f"fetch-{i}", daemon=True)
+            for i in range(max(1, min(self.fetch_workers, len(positions))))
+        ]
+        parser = threading.Thread(target=self._parse_worker, args=(pages, rows, stop, fetchers), name="parse", daemon=True)
+        for t in fetchers:
+            t.start()
+        parser.start()
+        try:
+            self._write(rows, stop)
+        except BaseException as e:
+            self._errors.append(e)
+            stop.set()
+        finally:
+            stop.set()
+            for t in fetchers:
+                t.join()
+            parser.join()
+
+        stats = self._final_stats(start)
+        if self._errors:
+            self.conn.rollback()
+            raise self._errors[0]
+        return stats
+
+def make_embed_fn():
+    """abs_emb.py 와 같은 모델/설정으로 초록 임베딩을 계산하는 함수"""
+    from sentence_transformers import SentenceTransformer
+    from db.abs_emb import MODEL_NAME, MAX_SEQ_LEN, encode_texts
+
+    model = SentenceTransformer(MODEL_NAME)
+    model.max_seq_length = MAX_SEQ_LEN
+    return lambda texts: list(encode_texts(model, texts))
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream OpenAlex works into Postgres")
+    parser.add_argument("--keywords", nargs="+", default=["transformer", "diffusion", "language", "tuning", "retrieval", "neural", "attention", "generative", "training", "instruct"])
+    parser.add_argument("--max-records", type=int, default=1000)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--workers", type=int, default=4, help="동시에 수집할 키워드 수")
+    parser.add_argument("--embed", action="store_true", help="쓰기 전에 초록 임베딩 계산 (없으면 NULL)")
+    parser.add_argument("--resume", action="store_true", help="저장된 cursor부터 이어서 수집 (완료된 키워드는 건너뜀)")
+    args = parser.parse_args()
+
+    conn = get_conn()
+    init_db(conn, with_ivf_index=False)
+    pipeline = HarvestPipeline(
+        conn,
+        batch_size=args.batch_size,
+        fetch_workers=args.workers,
+        embed_fn=make_embed_fn() if args.embed else None,
+        state=HarvestState(),
+    )
+    stats = pipeline.run(
+        args.keywords,
+        filters={"from_publication_date": "2014-01-01", "topics.subfield.id": "1702"},
+        max_records=args.max_records,
+        resume=args.resume,
+    )
+    conn.close()
+    print(f"✅ 수집 완료: {stats}")
+    if stats["failed_queries"]:
+        print(f"⚠️ 실패한 키워드 {stats['failed_queries']} 는 --resume 으로 이어서 수집할 수 있습니다.")
+    print(f"HTTP stats: {get_http_stats()}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import asyncio
+import threading
+import time
+
+class RateLimitTimeout(TimeoutError):
+    """max_wait 안에 토큰을 얻을 수 없을 때 발생한다. (토큰은 예약하지 않는다)"""
+
+class TokenBucket:
+    """
+    프로세스 전역 요청 속도 제한기 (token bucket).
+    rate개/초로 토큰이 채워지고 최대 capacity개까지 쌓인다. 요청 1회에 토큰 1개를 사용한다.
+
+    토큰을 미리 예약(음수 허용)하는 방식이라 스레드(acquire)와 asyncio 태스크(acquire_async)가
+    같은 버킷을 공유해도 전체 속도가 rate를 넘지 않는다.
+    서버가 Retry-After를 보내면 pause()로 버킷 전체를 해당 시간 동안 멈춘다.
+    """
+
+    def __init__(self, rate: float, capacity: int | None = None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1, int(rate)))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+        self.waited_s = 0.0  # 누적 대기 시간 (지표용)
+
+    def _reserve(self, tokens: float = 1.0, max_wait: float | None = None) -> float:
+        """
+        토큰을 예약하고, 예약한 토큰을 사용할 수 있을 때까지 기다려야 하는 시간(초)을 반환한다.
+        max_wait보다 오래 기다려야 하면 예약하지 않고 RateLimitTimeout을 발생시킨다.
+        """
+        with self._lock:
+            now = time.monotonic()
+            # 멈춘 동안에는 토큰이 채워지지 않는다. (pause()가 _updated를 재개 시각으로 옮긴다)
+            if now > self._updated:
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+            # 재개 시각 이후에도 예약 순서대로 1/rate 간격으로 나간다.
+            delay = max(0.0, self._blocked_until - now) + max(0.0, -(self._tokens - tokens) / self.rate)
+            if max_wait is not None and delay > max_wait:
+                raise RateLimitTimeout(f"rate limit wait {delay:.2f}s exceeds {max_wait:.2f}s")
+            self._tokens -= tokens
+            self.waited_s += delay
+            return delay
+
+    def acquire(self, tokens: float = 1.0, max_wait: float | None = None) -> float:
+        delay = self._reserve(tokens, max_wait)
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    async def acquire_async(self, tokens: float = 1.0) -> float:
+        delay = self._reserve(tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
+
+    def pause(self, seconds: float) -> None:
+        """Retry-After 등으로 지정된 시간 동안 모든 요청을 멈춘다. (이미 더 길게 멈춰 있으면 유지)"""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+            # 재개 직후 몰아서 보내지 않도록 쌓인 토큰을 비우고, 재개 시각부터 다시 채운다.
+            self._tokens = min(self._tokens, 0.0)
+            self._updated = max(self._updated, self._blocked_until)
@@ -1,23 +1,49 @@
-import time, random, requests, re
+import os, sys, re, json
 from difflib import SequenceMatcher
 
-OPENALEX = "https://api.openalex.org"
+try:
+    import orjson  # 설치되어 있으면 JSON 디코딩에 사용 (stdlib json보다 수 배 빠름)
+except ImportError:
+    orjson = None
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.abspath(__file__), "..", ".."))
+sys.path.append(ROOT_DIR)
+
+from db.http_client import http_get
+
+# 로컬 fake 서버(benchmarks/fake_openalex_server.py)로 바꿔 테스트할 수 있도록 env로 덮어쓸 수 있다.
+OPENALEX = os.getenv("OPENALEX_BASE_URL", "https://api.openalex.org").rstrip("/")
 MAILTO   = "wjdqlsrla0309@naver.com"        # 반드시 채우기(폴라이트 풀)
 RPS_SLEEP = 2                    # ~8~9 rps
+# OpenAlex 공개 한도: 초당 10 요청, 하루 100,000 요청. 여유를 두고 전역 토큰 버킷(db/rate_limit.py)에 사용한다.
+# burst가 크면 1초 구간에 rate + burst 개까지 몰릴 수 있으므로 기본값은 1이다.
+OPENALEX_RPS = float(os.getenv("OPENALEX_RPS", "9"))
+OPENALEX_BURST = int(os.getenv("OPENALEX_BURST", "1"))
 PER_PAGE  = 200                     # works per page (max 200)
+# OpenAlex Premium API key (from_updated_date 필터 등). 응답 캐시 키에는 포함되지 않는다.
+OPENALEX_API_KEY = os.getenv("OPENALEX_API_KEY") or None
 
-def get_json(url, params=None, max_retries=5):
+def get_json(url, params=None, before_request=None, timeout=30, retries=True, bucket=None):
+    """
+    공유 HTTP 클라이언트(db/http_client.py)로 GET 요청 후 JSON을 반환한다.
+    재시도/백오프(429, 5xx, Retry-After)는 클라이언트의 공통 정책을 따른다.
+    before_request: 네트워크 요청 직전에 호출. 응답 캐시 hit에는 호출되지 않는다.
+    bucket: db.rate_limit.TokenBucket. 재시도를 포함한 요청마다 토큰을 쓰고, Retry-After를 받으면 버킷 전체를 멈춘다.
+    timeout, retries: 마감 시간이 있는 호출부는 남은 시간과 retries=False로 한 번만 요청한다.
+    """
     params = dict(params or {})
     params["mailto"] = MAILTO
-    for attempt in range(max_retries):
-        r = requests.get(url, params=params, timeout=30)
-        if r.status_code == 200:
-            return r.json()
-        if r.status_code in (429, 500, 502, 503, 504):
-            time.sleep((2**attempt) + random.random())
-            continue
-        r.raise_for_status()
-    raise RuntimeError(f"Failed after {max_retries} tries: {url} {params}")
+    if OPENALEX_API_KEY:
+        params["api_key"] = OPENALEX_API_KEY
+    r = http_get(url, params=params, timeout=timeout, before_request=before_request, retries=retries, bucket=bucket)
+    r.raise_for_status()
+    return loads(r.content)
+
+def loads(body: bytes | str):
+    """orjson이 있으면 orjson으로, 없으면 stdlib json으로 디코딩한다."""
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
 
 def norm(s: str) -> str:
     s = (s or "").lower()
@@ -34,12 +60,24 @@ def title_similarity(a: str, b: str) -> float:
     return 0.85*sm - 0.15*la
 
 def reconstruct_abstract(abs_idx: dict | None) -> str:
+    """
+    OpenAlex abstract_inverted_index({단어: [위치, ...]})를 원문으로 복원한다.
+    위치 -> 단어 dict를 만들어 정렬하는 대신, 최대 위치 크기의 리스트를 미리 만들어 채운다.
+    """
     if not abs_idx: return ""
-    pos = {}
+    size = 0
+    for idxs in abs_idx.values():
+        if idxs:
+            size = max(size, max(idxs))
+    words = [None] * (size + 1)
     for w, idxs in abs_idx.items():
         for i in idxs:
-            pos[i] = w
-    return " ".join(pos[i] for i in sorted(pos.keys()))
+            words[i] = w
+    try:
+        return " ".join(words)
+    except TypeError:
+        # 비어 있는 위치(원본 인덱스의 구멍)는 건너뛴다.
+        return " ".join([w for w in words if w is not None])
 
 if __name__ == "__main__":
     params = {
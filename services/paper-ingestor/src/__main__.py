@@ -0,0 +1,81 @@
+"""
+paper-ingestor: OpenAlex -> Postgres 증분 수집 서비스.
+
+    cd services/paper-ingestor
+    python -m src                      # INGEST_INTERVAL_S 마다 실행 (SIGTERM/Ctrl+C로 종료)
+    python -m src --once               # 한 번만 실행 (cron 등 외부 스케줄러용)
+    python -m src --once --since 2025-01-01 --stream created   # 저장된 watermark 대신 특정 날짜부터
+    python -m src --status             # 스트림별 watermark와 마지막 실행 통계
+    python -m src --once --pipeline --embed-mode inline   # 단계별 파이프라인 (임베딩은 PIPELINE_EMBED_PROCS 개 프로세스)
+
+임베딩 큐 (INGEST_EMBED_MODE=queue, 기본값)
+    python -m src --embed-worker       # 임베딩 워커. 여러 프로세스/머신에서 동시에 실행할 수 있다.
+    python -m src --queue-status       # 상태별 작업 수
+    python -m src --enqueue-missing    # embedding이 NULL인 기존 논문을 큐에 넣기
+    python -m src --requeue-dead       # dead-letter 작업을 다시 pending으로
+"""
+import argparse
+import json
+import signal
+from datetime import date
+
+from .config import INGEST_EMBED_MODE
+from .database import connect, list_watermarks
+from .embedding import embed_abstracts
+from .job_queue import EmbeddingWorker, queue_stats, enqueue_missing_embeddings, requeue_dead
+from .scheduler import IngestScheduler, run_once
+
+def _on_stop(stop):
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: stop())
+
+def main():
+    parser = argparse.ArgumentParser(description="Incremental OpenAlex ingest service")
+    parser.add_argument("--once", action="store_true", help="한 번만 실행하고 종료")
+    parser.add_argument("--stream", nargs="+", choices=["created", "updated"], default=None, help="기본값: INGEST_STREAMS")
+    parser.add_argument("--since", type=date.fromisoformat, default=None, help="YYYY-MM-DD. 저장된 watermark 대신 이 날짜부터 (--once 와 함께)")
+    parser.add_argument("--embed-mode", choices=["queue", "inline", "off"], default=INGEST_EMBED_MODE, help="기본값: INGEST_EMBED_MODE")
+    parser.add_argument("--pipeline", action="store_true", help="단계별 파이프라인 런타임으로 실행 (pipeline.py)")
+    parser.add_argument("--status", action="store_true", help="watermark 상태만 출력")
+    parser.add_argument("--embed-worker", action="store_true", help="임베딩 큐 워커로 실행")
+    parser.add_argument("--queue-status", action="store_true", help="임베딩 큐 상태만 출력")
+    parser.add_argument("--enqueue-missing", action="store_true", help="embedding이 NULL인 논문을 임베딩 큐에 넣기")
+    parser.add_argument("--requeue-dead", action="store_true", help="dead-letter 작업을 다시 pending으로")
+    args = parser.parse_args()
+
+    if args.status or args.queue_status or args.enqueue_missing or args.requeue_dead:
+        conn = connect()
+        if args.enqueue_missing:
+            print(f"📥 임베딩 큐에 {enqueue_missing_embeddings(conn)}개 추가")
+        if args.requeue_dead:
+            print(f"♻️ dead-letter {requeue_dead(conn)}개를 pending으로")
+        if args.status:
+            print(json.dumps(list_watermarks(conn), ensure_ascii=False, indent=2))
+        print(f"📊 임베딩 큐: {queue_stats(conn)}")
+        conn.close()
+        return
+
+    if args.embed_worker:
+        worker = EmbeddingWorker(connect, embed_abstracts)
+        _on_stop(worker.stop)
+        print(f"🚀 임베딩 워커 시작: {worker.worker_id}")
+        stats = worker.run()
+        print(f"👋 임베딩 워커 종료: {stats}")
+        return
+
+    embed_fn = embed_abstracts if args.embed_mode == "inline" else None
+    enqueue_embeddings = args.embed_mode == "queue"
+    if args.once:
+        run_once(args.stream, since=args.since, embed_fn=embed_fn, enqueue_embeddings=enqueue_embeddings, pipeline=args.pipeline)
+        return
+    if args.since is not None:
+        parser.error("--since 는 --once 와 함께 사용하세요.")
+
+    scheduler = IngestScheduler(args.stream, embed_fn=embed_fn, enqueue_embeddings=enqueue_embeddings, pipeline=args.pipeline)
+    _on_stop(scheduler.stop)
+    print("🚀 paper-ingestor 시작")
+    scheduler.run_forever()
+    print("👋 paper-ingestor 종료")
+
+if __name__ == "__main__":
+    main()
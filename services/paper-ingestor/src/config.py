@@ -0,0 +1,90 @@
+import os
+from dotenv import load_dotenv
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+load_dotenv(os.path.join(ROOT_DIR, ".env"))
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+def _env_choice(name: str, default: str, choices: tuple[str, ...]) -> str:
+    """허용된 값 중 하나인 환경변수. 오타가 조용히 다른 동작이 되지 않도록 import 시점에 실패한다."""
+    value = os.getenv(name, default).strip().lower()
+    if value not in choices:
+        raise ValueError(f"{name}={value!r} is not one of {', '.join(choices)}")
+    return value
+
+def _env_list(name: str, default: str) -> list[str]:
+    return [v.strip() for v in os.getenv(name, default).split(",") if v.strip()]
+
+# -----------------------------
+# 증분 수집 범위 (source_api.py)
+# -----------------------------
+# 수집할 OpenAlex 필터 (db/openalex_pipeline.py 와 같은 기본값: 2014년 이후, Artificial Intelligence 분야)
+INGEST_FILTERS = {
+    "from_publication_date": os.getenv("INGEST_FROM_PUBLICATION_DATE", "2014-01-01"),
+    "topics.subfield.id": os.getenv("INGEST_SUBFIELD_ID", "1702"),
+}
+# 수집할 watermark 스트림
+# - created: from_created_date (새로 등록된 work)
+# - updated: from_updated_date (내용이 바뀐 work, OpenAlex Premium API key 필요)
+INGEST_STREAMS = _env_list("INGEST_STREAMS", "created,updated")
+# watermark가 없을 때(첫 실행) 며칠 전부터 수집할지
+INGEST_INITIAL_LOOKBACK_DAYS = int(os.getenv("INGEST_INITIAL_LOOKBACK_DAYS", "7"))
+# watermark보다 며칠 앞에서부터 다시 조회할지. OpenAlex 날짜 필터는 일 단위이고 색인이 늦게 반영될 수 있다.
+# 겹치는 구간의 work는 DB와 비교해 바뀐 것이 없으면 쓰지 않는다.
+INGEST_OVERLAP_DAYS = int(os.getenv("INGEST_OVERLAP_DAYS", "1"))
+# 한 번의 실행에서 스트림마다 받을 최대 work 수 (안전장치). 넘으면 watermark를 옮기지 않고 다음 실행에서 이어서 받는다.
+INGEST_MAX_RECORDS = int(os.getenv("INGEST_MAX_RECORDS", "50000"))
+# OpenAlex Premium API key. 없으면 updated 스트림은 건너뛴다.
+OPENALEX_API_KEY = os.getenv("OPENALEX_API_KEY") or None
+
+# -----------------------------
+# 쓰기 / 임베딩 (database.py, embedding.py)
+# -----------------------------
+# DB 비교 + upsert + commit 단위 work 수
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "200"))
+# 새 논문/초록이 바뀐 논문의 임베딩 방식
+# - queue:  papers 쓰기와 같은 트랜잭션에서 임베딩 큐(job_queue.py)에 넣고, 임베딩 워커(--embed-worker)가 처리
+# - inline: 수집 프로세스에서 바로 임베딩한 뒤 쓴다
+# - off:    임베딩 없이 메타데이터만 쓴다 (나중에 --enqueue-missing 으로 큐에 넣을 수 있다)
+INGEST_EMBED_MODE = _env_choice("INGEST_EMBED_MODE", "queue", ("queue", "inline", "off"))
+
+# -----------------------------
+# 작업 큐 (job_queue.py)
+# -----------------------------
+# 임베딩 작업 큐 이름 (ingest_jobs.queue)
+EMBED_QUEUE = os.getenv("EMBED_QUEUE", "embed")
+# 임베딩 워커가 한 번에 claim하는 작업 수
+QUEUE_BATCH_SIZE = int(os.getenv("QUEUE_BATCH_SIZE", "64"))
+# claim한 작업을 다른 워커가 다시 가져갈 수 있게 되기까지의 시간(초). 배치 1개 임베딩 시간보다 넉넉하게.
+QUEUE_VISIBILITY_S = float(os.getenv("QUEUE_VISIBILITY_S", "600"))
+# 이 횟수만큼 claim해도 끝나지 않은 작업은 dead-letter 상태로 옮긴다.
+QUEUE_MAX_ATTEMPTS = int(os.getenv("QUEUE_MAX_ATTEMPTS", "5"))
+# 실패한 작업의 재시도 대기(초). 시도마다 2배.
+QUEUE_RETRY_BACKOFF_S = float(os.getenv("QUEUE_RETRY_BACKOFF_S", "30"))
+# 큐가 비었을 때 다시 claim하기까지 기다리는 시간(초)
+QUEUE_POLL_S = float(os.getenv("QUEUE_POLL_S", "5"))
+
+# -----------------------------
+# 단계별 파이프라인 (pipeline.py, --pipeline)
+# -----------------------------
+# 단계 사이 큐의 최대 크기 (항목 = 페이지 또는 배치)
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "4"))
+# 단계별 병렬도: 파싱(스레드), 임베딩(프로세스, 프로세스마다 모델 1개), 쓰기(스레드, 스레드마다 커넥션 1개)
+PIPELINE_PARSE_WORKERS = int(os.getenv("PIPELINE_PARSE_WORKERS", "2"))
+PIPELINE_EMBED_PROCS = int(os.getenv("PIPELINE_EMBED_PROCS", "1"))
+PIPELINE_WRITE_WORKERS = int(os.getenv("PIPELINE_WRITE_WORKERS", "1"))
+# 단계별 지표 출력 간격(초). 0이면 끝날 때만 출력
+PIPELINE_REPORT_S = float(os.getenv("PIPELINE_REPORT_S", "10"))
+
+# -----------------------------
+# 스케줄 (scheduler.py)
+# -----------------------------
+# 실행 간격(초). 기본 하루 4번.
+INGEST_INTERVAL_S = float(os.getenv("INGEST_INTERVAL_S", str(6 * 3600)))
+# 실패한 실행을 다시 시도하기까지 기다리는 시간(초)
+INGEST_RETRY_S = float(os.getenv("INGEST_RETRY_S", "600"))
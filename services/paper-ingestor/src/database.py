@@ -0,0 +1,163 @@
+"""
+paper-ingestor 의 Postgres 접근.
+- papers/citations 스키마는 db/db_init.py 를 그대로 사용한다.
+- 스트림별 watermark(마지막으로 끝까지 수집한 날짜)는 같은 DB의 ingest_watermarks 테이블에 저장한다.
+- 바뀐 work만 쓰기 위해 DB에 있는 논문의 제목/초록 해시, 인용 수, PDF URL, 임베딩 유무를 배치로 조회한다.
+"""
+import hashlib
+import json
+import os
+import sys
+from datetime import date
+
+from psycopg2.extras import execute_values
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.abspath(__file__), "..", "..", "..", ".."))
+sys.path.append(ROOT_DIR)
+
+from db.db_init import get_conn, init_db, insert_citation_rows
+
+from .job_queue import init_queue, enqueue
+
+DDL_WATERMARKS = """
+CREATE TABLE IF NOT EXISTS ingest_watermarks (
+  source        TEXT NOT NULL,                  -- 예: openalex
+  stream        TEXT NOT NULL,                  -- created | updated
+  watermark     DATE NOT NULL,                  -- 이 날짜 이전에 등록/변경된 work는 모두 수집됨
+  last_run_at   TIMESTAMPTZ NOT NULL DEFAULT now(),
+  last_stats    JSONB,
+  PRIMARY KEY (source, stream)
+);
+"""
+
+def connect():
+    """Postgres 커넥션을 열고 papers/citations, watermark, 작업 큐 테이블이 없으면 만든다."""
+    conn = get_conn()
+    init_db(conn, with_ivf_index=False)
+    with conn.cursor() as cur:
+        cur.execute(DDL_WATERMARKS)
+    conn.commit()
+    init_queue(conn)
+    return conn
+
+def load_watermark(conn, source: str, stream: str) -> date | None:
+    with conn.cursor() as cur:
+        cur.execute("SELECT watermark FROM ingest_watermarks WHERE source = %s AND stream = %s", (source, stream))
+        row = cur.fetchone()
+    conn.commit()
+    return row[0] if row else None
+
+def save_watermark(conn, source: str, stream: str, watermark: date, stats: dict) -> None:
+    with conn.cursor() as cur:
+        cur.execute("""
+            INSERT INTO ingest_watermarks (source, stream, watermark, last_run_at, last_stats)
+            VALUES (%s, %s, %s, now(), %s)
+            ON CONFLICT (source, stream) DO UPDATE SET
+                watermark = EXCLUDED.watermark,
+                last_run_at = EXCLUDED.last_run_at,
+                last_stats = EXCLUDED.last_stats
+        """, (source, stream, watermark, json.dumps(stats)))
+    conn.commit()
+
+def list_watermarks(conn) -> list[dict]:
+    with conn.cursor() as cur:
+        cur.execute("SELECT source, stream, watermark, last_run_at, last_stats FROM ingest_watermarks ORDER BY source, stream")
+        rows = cur.fetchall()
+    conn.commit()
+    return [
+        {"source": r[0], "stream": r[1], "watermark": r[2].isoformat(), "last_run_at": r[3].isoformat(), "last_stats": r[4]}
+        for r in rows
+    ]
+
+def content_hash(title: str | None, abstract: str | None) -> str:
+    """임베딩 입력이 바뀌었는지 비교하기 위한 제목/초록 해시 (Postgres md5와 같은 값)"""
+    return hashlib.md5(f"{title or ''}\x1f{abstract or ''}".encode("utf-8")).hexdigest()
+
+def existing_papers(conn, openalex_ids: list[str]) -> dict[str, dict]:
+    """
+    DB에 이미 있는 논문의 비교용 정보.
+
+    :return: {openalex_id: {"content_hash", "cited_by_count", "pdf_url", "has_embedding"}}
+    """
+    if not openalex_ids:
+        return {}
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT openalex_id,
+                   md5(COALESCE(title, '') || chr(31) || COALESCE(abstract, '')),
+                   cited_by_count,
+                   pdf_url,
+                   embedding IS NOT NULL
+            FROM papers
+            WHERE openalex_id = ANY(%s)
+        """, (openalex_ids,))
+        rows = cur.fetchall()
+    return {
+        r[0]: {"content_hash": r[1], "cited_by_count": r[2], "pdf_url": r[3], "has_embedding": r[4]}
+        for r in rows
+    }
+
+_UPSERT_CHANGED_SQL = """
+    INSERT INTO papers (
+        openalex_id, doi, title, abstract, authors, pdf_url, published, cited_by_count, embedding
+    ) VALUES %s
+    ON CONFLICT (openalex_id) DO UPDATE SET
+        doi = EXCLUDED.doi,
+        title = EXCLUDED.title,
+        abstract = EXCLUDED.abstract,
+        authors = EXCLUDED.authors,
+        pdf_url = COALESCE(EXCLUDED.pdf_url, papers.pdf_url),
+        published = EXCLUDED.published,
+        cited_by_count = EXCLUDED.cited_by_count,
+        embedding = {embedding}
+"""
+
+def upsert_changed_papers(conn, rows: list[dict], embeddings: list | None = None, meta_only_ids: set[str] | None = None) -> None:
+    """
+    새 논문은 넣고, 이미 있는 논문은 메타데이터(제목/초록 포함)를 갱신한다.
+    db_init.upsert_paper_rows 와 달리 제목/초록이 바뀐 경우도 반영한다.
+    - 메타데이터만 바뀐 논문(meta_only_ids)은 새 임베딩이 없으면 기존 임베딩을 유지한다.
+    - 그 밖의 논문은 새 임베딩으로 바꾸고, 새 임베딩이 없으면 NULL로 비운다.
+      (바뀌기 전 초록의 임베딩이 남지 않도록. 임베딩 큐/enqueue_missing_embeddings 가 다시 채운다)
+    commit은 호출부에서 citations와 함께 한다.
+
+    :param rows: meta_openalex.parse_work 가 만든 papers 행 dict 리스트
+    :param embeddings: rows와 같은 순서의 임베딩 리스트. 임베딩을 다시 계산하지 않은 행은 None.
+    :param meta_only_ids: 제목/초록이 그대로인(classify의 meta) 논문의 openalex_id
+    """
+    meta_only_ids = meta_only_ids or set()
+    values = [(
+        row["openalex_id"],
+        row["doi"],
+        row["title"],
+        row["abstract"],
+        row["authors"],
+        row["pdf_url"],
+        row["publication_date"] or None,
+        row["cited_by_count"] if row["cited_by_count"] != "" else None,
+        embeddings[i] if embeddings is not None else None,
+    ) for i, row in enumerate(rows)]
+    content = [v for v in values if v[0] not in meta_only_ids]
+    meta = [v for v in values if v[0] in meta_only_ids]
+    with conn.cursor() as cur:
+        if content:
+            execute_values(cur, _UPSERT_CHANGED_SQL.format(embedding="EXCLUDED.embedding"), content, page_size=500)
+        if meta:
+            execute_values(cur, _UPSERT_CHANGED_SQL.format(embedding="COALESCE(EXCLUDED.embedding, papers.embedding)"), meta, page_size=500)
+
+def write_batch(conn, rows: list[dict], embeddings: list | None, citations: list[tuple], embed_ids: list[str] | None = None,
+                meta_only_ids: set[str] | None = None) -> None:
+    """
+    papers upsert + citations insert (+ 임베딩 큐 enqueue) 를 한 트랜잭션으로 commit한다.
+    큐에 넣는 것과 논문 쓰기가 같이 commit되므로, 쓰였는데 임베딩 작업이 없는 논문이 생기지 않는다.
+
+    :param embed_ids: 임베딩 큐에 넣을 openalex_id
+    :param meta_only_ids: 메타데이터만 바뀌어 기존 임베딩을 유지할 openalex_id (upsert_changed_papers)
+    """
+    if rows:
+        upsert_changed_papers(conn, rows, embeddings, meta_only_ids)
+    if citations:
+        insert_citation_rows(conn, citations, commit=False)
+    if embed_ids:
+        enqueue(conn, embed_ids, commit=False)
+    conn.commit()
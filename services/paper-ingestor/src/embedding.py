@@ -0,0 +1,42 @@
+"""
+초록 임베딩. db/abs_emb.py 와 같은 모델/설정(Qwen3-Embedding-0.6B, 슬라이딩 윈도우 평균)을 사용한다.
+모델은 처음 임베딩이 필요할 때 한 번만 로드한다. (바뀐 work가 없는 실행에서는 로드하지 않음)
+"""
+import os
+import sys
+import threading
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.abspath(__file__), "..", "..", "..", ".."))
+sys.path.append(ROOT_DIR)
+
+_model = None
+_model_lock = threading.Lock()
+
+def get_emb_model():
+    global _model
+    with _model_lock:
+        if _model is None:
+            from sentence_transformers import SentenceTransformer
+            from db.abs_emb import MODEL_NAME, MAX_SEQ_LEN
+
+            print(f"🧠 임베딩 모델 로드: {MODEL_NAME}")
+            _model = SentenceTransformer(MODEL_NAME)
+            _model.max_seq_length = MAX_SEQ_LEN
+    return _model
+
+def embed_abstracts(texts: list[str]) -> list:
+    """초록 리스트 -> 임베딩 리스트 (입력 순서 유지)"""
+    if not texts:
+        return []
+    from db.abs_emb import encode_texts
+
+    return list(encode_texts(get_emb_model(), texts))
+
+def embed_batch(batch: dict) -> list[dict]:
+    """
+    파이프라인(pipeline.py) embed 단계 함수. 프로세스 풀에서 실행되며 프로세스마다 모델을 한 번 로드한다.
+    batch["texts"] 를 임베딩해 batch["embeddings"] 에 넣는다. (texts 뒤의 행은 None -> 기존 임베딩 유지)
+    """
+    vectors = embed_abstracts(batch["texts"]) if batch["texts"] else []
+    batch["embeddings"] = list(vectors) + [None] * (len(batch["rows"]) - len(vectors))
+    return [batch]
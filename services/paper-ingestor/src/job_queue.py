@@ -0,0 +1,307 @@
+"""
+Postgres 테이블 기반 작업 큐 (외부 브로커 없음).
+
+수집 워커는 논문 id를 큐에 넣고(enqueue, papers 쓰기와 같은 트랜잭션), 임베딩 워커는 몇 개가 떠 있든
+SELECT ... FOR UPDATE SKIP LOCKED 로 서로 겹치지 않는 배치를 가져간다(claim).
+
+상태 전이
+    pending --claim--> running --complete--> done
+                         |--fail--> pending (attempts < max_attempts, 지수 백오프 후 다시 claim 가능)
+                         |--fail--> dead    (attempts >= max_attempts, dead-letter)
+                         |--visibility timeout 경과--> 다른 워커가 다시 claim (워커가 죽은 경우)
+    done / dead --enqueue--> pending (논문 내용이 바뀌어 다시 임베딩해야 할 때)
+
+complete/fail은 locked_by(claim한 워커)가 같은 작업만 바꾸므로, visibility timeout이 지나
+다른 워커가 가져간 작업을 늦게 끝난 워커가 덮어쓰지 않는다.
+
+    python -m src --embed-worker            # 임베딩 워커 (프로세스 수만큼 처리량이 늘어난다)
+    python -m src --queue-status
+"""
+import os
+import socket
+import threading
+import time
+import uuid
+from typing import Callable
+
+from psycopg2.extras import execute_values
+
+from .config import (
+    EMBED_QUEUE, QUEUE_BATCH_SIZE, QUEUE_VISIBILITY_S, QUEUE_MAX_ATTEMPTS, QUEUE_RETRY_BACKOFF_S, QUEUE_POLL_S,
+)
+
+DDL_JOBS = """
+CREATE TABLE IF NOT EXISTS ingest_jobs (
+  queue         TEXT NOT NULL,                  -- 예: embed
+  item_id       TEXT NOT NULL,                  -- 예: papers.openalex_id
+  status        TEXT NOT NULL DEFAULT 'pending',  -- pending | running | done | dead
+  attempts      INTEGER NOT NULL DEFAULT 0,     -- claim된 횟수
+  available_at  TIMESTAMPTZ NOT NULL DEFAULT now(),  -- 이 시각 이후에 claim 가능 (재시도 백오프)
+  locked_by     TEXT,                           -- claim한 워커 id
+  locked_until  TIMESTAMPTZ,                    -- visibility timeout. 지나면 다른 워커가 다시 claim
+  last_error    TEXT,
+  enqueued_at   TIMESTAMPTZ NOT NULL DEFAULT now(),
+  updated_at    TIMESTAMPTZ NOT NULL DEFAULT now(),
+  PRIMARY KEY (queue, item_id)
+);
+-- claim 대상(pending/running)만 담는 부분 인덱스. done/dead가 쌓여도 claim 비용이 늘지 않는다.
+CREATE INDEX IF NOT EXISTS idx_ingest_jobs_claim
+  ON ingest_jobs (queue, available_at) WHERE status IN ('pending', 'running');
+"""
+
+def init_queue(conn) -> None:
+    with conn.cursor() as cur:
+        cur.execute(DDL_JOBS)
+    conn.commit()
+
+def enqueue(conn, item_ids: list[str], queue: str = EMBED_QUEUE, commit: bool = True) -> None:
+    """
+    작업을 넣는다. 이미 있는 작업은 done/dead/running이면 pending으로 되돌리고(시도 횟수 초기화), pending이면 그대로 둔다.
+    running 작업을 되돌리면 claim한 워커의 complete는 무시되고 새 내용으로 다시 처리된다.
+
+    :param commit: False면 호출부 트랜잭션(papers 쓰기)과 함께 commit
+    """
+    if not item_ids:
+        return
+    with conn.cursor() as cur:
+        execute_values(cur, """
+            INSERT INTO ingest_jobs (queue, item_id) VALUES %s
+            ON CONFLICT (queue, item_id) DO UPDATE SET
+                status = 'pending',
+                attempts = 0,
+                available_at = now(),
+                locked_by = NULL,
+                locked_until = NULL,
+                last_error = NULL,
+                enqueued_at = now(),
+                updated_at = now()
+            WHERE ingest_jobs.status <> 'pending'
+        """, [(queue, i) for i in dict.fromkeys(item_ids)], page_size=1000)
+    if commit:
+        conn.commit()
+
+def enqueue_missing_embeddings(conn, queue: str = EMBED_QUEUE) -> int:
+    """embedding이 NULL인 논문 중 큐에 없거나 dead인 것을 넣는다. (이전 수집분 backfill)"""
+    with conn.cursor() as cur:
+        cur.execute("""
+            INSERT INTO ingest_jobs (queue, item_id)
+            SELECT %s, p.openalex_id FROM papers p
+            WHERE p.embedding IS NULL
+            ON CONFLICT (queue, item_id) DO UPDATE SET
+                status = 'pending', attempts = 0, available_at = now(), last_error = NULL, updated_at = now()
+            WHERE ingest_jobs.status IN ('done', 'dead')
+        """, (queue,))
+        count = cur.rowcount
+    conn.commit()
+    return count
+
+def claim(
+    conn,
+    worker_id: str,
+    queue: str = EMBED_QUEUE,
+    batch_size: int = QUEUE_BATCH_SIZE,
+    visibility_s: float = QUEUE_VISIBILITY_S,
+    max_attempts: int = QUEUE_MAX_ATTEMPTS,
+) -> list[str]:
+    """
+    claim 가능한 작업을 최대 batch_size개 가져와 running으로 바꾸고 commit한다.
+    다른 워커가 잠근 행은 SKIP LOCKED 로 건너뛰므로 워커끼리 기다리지 않는다.
+    visibility timeout이 지난 running 작업도 다시 가져오며, 이미 max_attempts번 가져간 작업은 dead로 옮긴다.
+    """
+    with conn.cursor() as cur:
+        # 워커가 처리 중에 죽어 timeout이 지났는데 시도 횟수를 다 쓴 작업 -> dead-letter
+        cur.execute("""
+            UPDATE ingest_jobs
+            SET status = 'dead', locked_by = NULL, locked_until = NULL,
+                last_error = COALESCE(last_error, 'visibility timeout'), updated_at = now()
+            WHERE queue = %s AND status = 'running' AND locked_until < now() AND attempts >= %s
+        """, (queue, max_attempts))
+        cur.execute("""
+            WITH picked AS (
+                SELECT queue, item_id FROM ingest_jobs
+                WHERE queue = %s
+                  AND ((status = 'pending' AND available_at <= now())
+                       OR (status = 'running' AND locked_until < now()))
+                ORDER BY available_at
+                LIMIT %s
+                FOR UPDATE SKIP LOCKED
+            )
+            UPDATE ingest_jobs j
+            SET status = 'running',
+                attempts = j.attempts + 1,
+                locked_by = %s,
+                locked_until = now() + make_interval(secs => %s),
+                updated_at = now()
+            FROM picked
+            WHERE j.queue = picked.queue AND j.item_id = picked.item_id
+            RETURNING j.item_id
+        """, (queue, batch_size, worker_id, visibility_s))
+        ids = [r[0] for r in cur.fetchall()]
+    conn.commit()
+    return ids
+
+def complete(conn, worker_id: str, item_ids: list[str], queue: str = EMBED_QUEUE, commit: bool = True) -> int:
+    """
+    처리한 작업을 done으로 바꾼다. 이 워커가 아직 잡고 있는 작업만 바뀐다.
+
+    :param commit: False면 호출부 트랜잭션(embedding 쓰기)과 함께 commit
+    :return int: done으로 바뀐 작업 수
+    """
+    with conn.cursor() as cur:
+        cur.execute("""
+            UPDATE ingest_jobs
+            SET status = 'done', locked_by = NULL, locked_until = NULL, last_error = NULL, updated_at = now()
+            WHERE queue = %s AND item_id = ANY(%s) AND status = 'running' AND locked_by = %s
+        """, (queue, item_ids, worker_id))
+        count = cur.rowcount
+    if commit:
+        conn.commit()
+    return count
+
+def fail(
+    conn,
+    worker_id: str,
+    item_ids: list[str],
+    error: str,
+    queue: str = EMBED_QUEUE,
+    max_attempts: int = QUEUE_MAX_ATTEMPTS,
+    backoff_s: float = QUEUE_RETRY_BACKOFF_S,
+    dead: bool = False,
+) -> None:
+    """
+    실패한 작업을 다시 pending으로(backoff_s * 2^(attempts-1) 뒤에 claim 가능) 돌리거나,
+    시도 횟수를 다 썼으면(또는 dead=True면) dead로 옮긴다.
+    """
+    with conn.cursor() as cur:
+        cur.execute("""
+            UPDATE ingest_jobs
+            SET status = CASE WHEN %s OR attempts >= %s THEN 'dead' ELSE 'pending' END,
+                available_at = now() + make_interval(secs => %s * power(2, GREATEST(attempts - 1, 0))),
+                locked_by = NULL,
+                locked_until = NULL,
+                last_error = %s,
+                updated_at = now()
+            WHERE queue = %s AND item_id = ANY(%s) AND status = 'running' AND locked_by = %s
+        """, (dead, max_attempts, backoff_s, error[:2000], queue, item_ids, worker_id))
+    conn.commit()
+
+def requeue_dead(conn, queue: str = EMBED_QUEUE) -> int:
+    """dead-letter 작업을 다시 pending으로 (원인을 고친 뒤)"""
+    with conn.cursor() as cur:
+        cur.execute("""
+            UPDATE ingest_jobs SET status = 'pending', attempts = 0, available_at = now(), updated_at = now()
+            WHERE queue = %s AND status = 'dead'
+        """, (queue,))
+        count = cur.rowcount
+    conn.commit()
+    return count
+
+def queue_stats(conn, queue: str = EMBED_QUEUE) -> dict:
+    """상태별 작업 수와 가장 오래 기다린 pending 작업의 대기 시간(초)"""
+    with conn.cursor() as cur:
+        cur.execute("SELECT status, count(*) FROM ingest_jobs WHERE queue = %s GROUP BY status", (queue,))
+        stats = {"pending": 0, "running": 0, "done": 0, "dead": 0, **dict(cur.fetchall())}
+        cur.execute("""
+            SELECT EXTRACT(EPOCH FROM now() - min(enqueued_at)) FROM ingest_jobs
+            WHERE queue = %s AND status = 'pending'
+        """, (queue,))
+        oldest = cur.fetchone()[0]
+    conn.commit()
+    stats["oldest_pending_s"] = round(float(oldest), 1) if oldest is not None else None
+    return stats
+
+def make_worker_id(prefix: str = "embed") -> str:
+    return f"{prefix}-{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+class EmbeddingWorker:
+    """
+    임베딩 큐 소비자. claim -> papers에서 초록 조회 -> 임베딩 -> papers.embedding 일괄 UPDATE + complete (한 트랜잭션).
+    큐가 비어 있으면 poll_s 초 기다렸다가 다시 claim한다.
+
+    :param connect: 워커 전용 Postgres 커넥션을 만드는 함수 (pgvector 어댑터 등록 포함)
+    :param embed_fn: 초록 리스트 -> 임베딩 리스트
+    """
+
+    def __init__(
+        self,
+        connect: Callable,
+        embed_fn: Callable[[list[str]], list],
+        queue: str = EMBED_QUEUE,
+        batch_size: int = QUEUE_BATCH_SIZE,
+        visibility_s: float = QUEUE_VISIBILITY_S,
+        max_attempts: int = QUEUE_MAX_ATTEMPTS,
+        poll_s: float = QUEUE_POLL_S,
+        worker_id: str | None = None,
+    ):
+        self.connect = connect
+        self.embed_fn = embed_fn
+        self.queue = queue
+        self.batch_size = batch_size
+        self.visibility_s = visibility_s
+        self.max_attempts = max_attempts
+        self.poll_s = poll_s
+        self.worker_id = worker_id or make_worker_id()
+        self._stop = threading.Event()
+        self.stats = {"batches": 0, "embedded": 0, "failed_batches": 0, "missing": 0, "embed_s": 0.0}
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _load_abstracts(self, conn, ids: list[str]) -> dict[str, str]:
+        with conn.cursor() as cur:
+            cur.execute("SELECT openalex_id, abstract FROM papers WHERE openalex_id = ANY(%s)", (ids,))
+            return dict(cur.fetchall())
+
+    def process_batch(self, conn, ids: list[str]) -> None:
+        abstracts = self._load_abstracts(conn, ids)
+        found = [i for i in ids if (abstracts.get(i) or "").strip()]
+        if len(found) < len(ids):
+            # papers에 없거나 초록이 없는 작업은 재시도해도 소용이 없다.
+            missing = [i for i in ids if i not in set(found)]
+            conn.rollback()
+            fail(conn, self.worker_id, missing, "paper or abstract not found", self.queue, dead=True)
+            self.stats["missing"] += len(missing)
+        if not found:
+            return
+
+        start = time.perf_counter()
+        vectors = self.embed_fn([abstracts[i] for i in found])
+        self.stats["embed_s"] += time.perf_counter() - start
+        with conn.cursor() as cur:
+            execute_values(cur, """
+                UPDATE papers p SET embedding = v.embedding
+                FROM (VALUES %s) AS v(openalex_id, embedding)
+                WHERE p.openalex_id = v.openalex_id
+            """, list(zip(found, vectors)), template="(%s, %s::vector)", page_size=500)
+        done = complete(conn, self.worker_id, found, self.queue, commit=False)
+        conn.commit()
+        self.stats["batches"] += 1
+        self.stats["embedded"] += done
+
+    def run(self, max_batches: int | None = None, exit_when_empty: bool = False) -> dict:
+        """
+        :param int max_batches: 처리할 최대 배치 수 (테스트/벤치마크용)
+        :param bool exit_when_empty: True면 큐가 비었을 때 기다리지 않고 종료
+        """
+        conn = self.connect()
+        try:
+            while not self._stop.is_set():
+                if max_batches is not None and self.stats["batches"] >= max_batches:
+                    break
+                ids = claim(conn, self.worker_id, self.queue, self.batch_size, self.visibility_s, self.max_attempts)
+                if not ids:
+                    if exit_when_empty:
+                        break
+                    self._stop.wait(self.poll_s)
+                    continue
+                try:
+                    self.process_batch(conn, ids)
+                except Exception as e:
+                    conn.rollback()
+                    self.stats["failed_batches"] += 1
+                    print(f"⚠️ [{self.worker_id}] 배치 실패 ({len(ids)}개): {e}")
+                    fail(conn, self.worker_id, ids, f"{type(e).__name__}: {e}", self.queue, self.max_attempts)
+        finally:
+            conn.close()
+        self.stats["embed_s"] = round(self.stats["embed_s"], 1)
+        return self.stats
@@ -0,0 +1,421 @@
+"""
+단계별 파이프라인 런타임 (수집 -> 파싱 -> 중복 제거/DB 비교 -> 임베딩 -> 쓰기).
+
+    source(fetch) -> [bounded queue] -> stage 1 -> [bounded queue] -> stage 2 -> ... -> 마지막 stage
+
+- 단계 사이 큐의 크기가 정해져 있어 뒤 단계가 느리면 앞 단계가 put에서 기다린다. (가장 느린 단계가 전체 속도를 정하고, 버퍼가 무한히 쌓이지 않음)
+- 단계마다 병렬도를 따로 정한다. I/O 단계는 스레드, 임베딩처럼 CPU/GPU를 쓰는 단계는 프로세스 풀(kind="process")로 실행한다.
+  프로세스 단계는 동시에 처리 중인 항목도 workers * 2 개로 제한한다.
+- 단계별 지표: 처리 건수, 초당 처리량, 처리 시간(busy), 입력을 기다린 시간(starved), 다음 큐가 가득 차 기다린 시간(blocked),
+  현재/최대 입력 큐 깊이. 가장 blocked가 큰 단계의 다음 단계가 병목이다.
+"""
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Callable, Iterable
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.abspath(__file__), "..", "..", "..", ".."))
+sys.path.append(ROOT_DIR)
+
+from db.meta_openalex import parse_work
+
+from .config import (
+    PIPELINE_QUEUE_SIZE, PIPELINE_REPORT_S, PIPELINE_PARSE_WORKERS, PIPELINE_EMBED_PROCS, PIPELINE_WRITE_WORKERS,
+    INGEST_BATCH_SIZE, INGEST_MAX_RECORDS, INGEST_INITIAL_LOOKBACK_DAYS,
+)
+from .database import connect, load_watermark, save_watermark, existing_papers, write_batch
+from .embedding import embed_batch
+from .scheduler import SOURCE, classify, limit_page, watermark_target, _today
+from .source_api import iter_changed_works
+
+_DONE = object()
+
+@dataclass
+class Stage:
+    """
+    :param str name: 지표에 표시할 이름
+    :param fn: 입력 항목 1개 -> 출력 항목 iterable (0개 이상). 마지막 단계의 출력은 버린다.
+        kind="process"면 프로세스로 보내야 하므로 모듈 최상위 함수여야 한다. (pickle 가능)
+    :param int workers: 스레드 수 (kind="thread") 또는 프로세스 수 (kind="process")
+    :param str kind: "thread" | "process"
+    :param int queue_size: 이 단계 입력 큐의 최대 크기
+    :param flush: 입력이 끝났을 때 호출해 남은 출력을 내보낸다. (배치를 모으는 단계용, kind="thread", workers=1 에서만)
+    """
+    name: str
+    fn: Callable
+    workers: int = 1
+    kind: str = "thread"
+    queue_size: int = PIPELINE_QUEUE_SIZE
+    flush: Callable[[], Iterable] | None = None
+
+@dataclass
+class StageMetrics:
+    name: str
+    workers: int
+    items_in: int = 0
+    items_out: int = 0
+    busy_s: float = 0.0
+    starved_s: float = 0.0
+    blocked_s: float = 0.0
+    max_depth: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def add(self, **values) -> None:
+        with self._lock:
+            for key, value in values.items():
+                setattr(self, key, getattr(self, key) + value)
+
+    def observe_depth(self, depth: int) -> None:
+        with self._lock:
+            self.max_depth = max(self.max_depth, depth)
+
+    def snapshot(self, depth: int, elapsed: float) -> dict:
+        with self._lock:
+            self.max_depth = max(self.max_depth, depth)
+            return {
+                "stage": self.name,
+                "workers": self.workers,
+                "in": self.items_in,
+                "out": self.items_out,
+                "per_s": round(self.items_in / elapsed, 1) if elapsed > 0 else 0.0,
+                "busy_s": round(self.busy_s, 1),
+                "starved_s": round(self.starved_s, 1),
+                "blocked_s": round(self.blocked_s, 1),
+                "depth": depth,
+                "max_depth": self.max_depth,
+            }
+
+class Pipeline:
+    """
+    :param sources: 첫 단계에 넣을 항목을 만드는 iterable 리스트. 각각 전용 스레드(fetch)에서 소비된다.
+    :param stages: 순서대로 실행할 단계
+    :param float report_s: 이 간격(초)마다 단계별 지표를 출력한다. 0이면 출력하지 않는다.
+    """
+
+    def __init__(self, sources: list[Iterable], stages: list[Stage], report_s: float = PIPELINE_REPORT_S):
+        self.sources = sources
+        self.stages = stages
+        self.report_s = report_s
+        self.metrics = [StageMetrics("fetch", len(sources))] + [StageMetrics(s.name, s.workers) for s in stages]
+        self.queues = [queue.Queue(maxsize=s.queue_size) for s in stages]
+        self._stop = threading.Event()
+        self._errors: list[BaseException] = []
+        self._started = 0.0
+
+    # --- 큐 입출력 (stop 이 설정되면 포기) ---
+    def _put(self, q: queue.Queue, item, metrics: StageMetrics) -> bool:
+        start = time.perf_counter()
+        try:
+            while not self._stop.is_set():
+                try:
+                    q.put(item, timeout=0.2)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        finally:
+            metrics.add(blocked_s=time.perf_counter() - start)
+
+    def _get(self, q: queue.Queue, metrics: StageMetrics):
+        start = time.perf_counter()
+        try:
+            while not self._stop.is_set():
+                try:
+                    item = q.get(timeout=0.2)
+                except queue.Empty:
+                    continue
+                metrics.observe_depth(q.qsize() + 1)
+                return item
+            return _DONE
+        finally:
+            metrics.add(starved_s=time.perf_counter() - start)
+
+    def _emit(self, index: int, outputs, metrics: StageMetrics) -> bool:
+        """index 단계의 출력을 다음 단계 큐로. 마지막 단계면 버린다."""
+        for out in outputs or ():
+            metrics.add(items_out=1)
+            if index + 1 < len(self.stages) and not self._put(self.queues[index + 1], out, metrics):
+                return False
+        return True
+
+    def _fail(self, e: BaseException) -> None:
+        self._errors.append(e)
+        self._stop.set()
+
+    # --- 워커 ---
+    def _source_worker(self, source: Iterable) -> None:
+        metrics = self.metrics[0]
+        try:
+            it = iter(source)
+            while not self._stop.is_set():
+                start = time.perf_counter()
+                try:
+                    item = next(it)
+                except StopIteration:
+                    return
+                finally:
+                    metrics.add(busy_s=time.perf_counter() - start)
+                metrics.add(items_in=1, items_out=1)
+                if not self._put(self.queues[0], item, metrics):
+                    return
+        except BaseException as e:
+            self._fail(e)
+
+    def _thread_worker(self, index: int) -> None:
+        stage, metrics, inbox = self.stages[index], self.metrics[index + 1], self.queues[index]
+        try:
+            while True:
+                item = self._get(inbox, metrics)
+                if item is _DONE:
+                    break
+                metrics.add(items_in=1)
+                start = time.perf_counter()
+                outputs = list(stage.fn(item) or ())
+                metrics.add(busy_s=time.perf_counter() - start)
+                if not self._emit(index, outputs, metrics):
+                    return
+            if stage.flush is not None and not self._stop.is_set():
+                self._emit(index, list(stage.flush() or ()), metrics)
+        except BaseException as e:
+            self._fail(e)
+
+    def _process_dispatcher(self, index: int) -> None:
+        """입력 큐에서 꺼내 프로세스 풀로 보내고, 끝난 결과를 다음 큐로 넘긴다. 처리 중인 항목은 workers * 2 개까지."""
+        stage, metrics, inbox = self.stages[index], self.metrics[index + 1], self.queues[index]
+        max_in_flight = stage.workers * 2
+        in_flight: dict = {}
+        finished = False
+        try:
+            with ProcessPoolExecutor(max_workers=stage.workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+                while (not finished or in_flight) and not self._stop.is_set():
+                    if not finished and len(in_flight) < max_in_flight:
+                        start = time.perf_counter()
+                        try:
+                            # 처리 중인 항목이 있으면 결과를 넘기러 금방 돌아온다.
+                            item = inbox.get(timeout=0.05 if in_flight else 0.2)
+                        except queue.Empty:
+                            item = None
+                        else:
+                            metrics.observe_depth(inbox.qsize() + 1)
+                        metrics.add(starved_s=time.perf_counter() - start)
+                        if item is _DONE:
+                            finished = True
+                        elif item is not None:
+                            metrics.add(items_in=1)
+                            in_flight[pool.submit(stage.fn, item)] = time.perf_counter()
+                    if not in_flight:
+                        continue
+                    full = finished or len(in_flight) >= max_in_flight
+                    done, _ = wait(list(in_flight), timeout=0.2 if full else 0, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        metrics.add(busy_s=time.perf_counter() - in_flight.pop(future))
+                        if not self._emit(index, list(future.result() or ()), metrics):
+                            return
+        except BaseException as e:
+            self._fail(e)
+
+    # --- 실행 ---
+    def snapshot(self) -> list[dict]:
+        elapsed = time.perf_counter() - self._started
+        depths = [0] + [q.qsize() for q in self.queues]
+        return [m.snapshot(d, elapsed) for m, d in zip(self.metrics, depths)]
+
+    def _reporter(self) -> None:
+        while not self._stop.wait(self.report_s):
+            print("📈 " + " | ".join(
+                f"{s['stage']}: {s['per_s']}/s depth {s['depth']} blocked {s['blocked_s']}s" for s in self.snapshot()
+            ))
+
+    def run(self) -> list[dict]:
+        """모든 source가 끝나고 모든 단계가 남은 항목을 처리하면 단계별 지표를 반환한다. 한 단계라도 실패하면 첫 예외를 다시 던진다."""
+        self._started = time.perf_counter()
+        groups = []
+        fetchers = [threading.Thread(target=self._source_worker, args=(s,), name=f"fetch-{i}", daemon=True) for i, s in enumerate(self.sources)]
+        groups.append(fetchers)
+        for index, stage in enumerate(self.stages):
+            if stage.kind == "process":
+                groups.append([threading.Thread(target=self._process_dispatcher, args=(index,), name=f"{stage.name}-dispatch", daemon=True)])
+            else:
+                groups.append([
+                    threading.Thread(target=self._thread_worker, args=(index,), name=f"{stage.name}-{i}", daemon=True)
+                    for i in range(stage.workers)
+                ])
+        reporter = threading.Thread(target=self._reporter, name="pipeline-report", daemon=True) if self.report_s > 0 else None
+        for group in groups:
+            for t in group:
+                t.start()
+        if reporter:
+            reporter.start()
+
+        # 앞 단계의 스레드가 모두 끝나면 다음 단계 워커 수만큼 종료 표시를 넣는다.
+        for index, group in enumerate(groups):
+            for t in group:
+                t.join()
+            if index < len(self.stages):
+                for _ in range(len(groups[index + 1])):
+                    self._put(self.queues[index], _DONE, self.metrics[index])
+        self._stop.set()
+        if reporter:
+            reporter.join()
+
+        stats = self.snapshot()
+        if self._errors:
+            raise self._errors[0]
+        return stats
+
+# -----------------------------
+# 증분 수집 파이프라인 (python -m src --once --pipeline)
+# -----------------------------
+def _pages(stream: str, since, max_records: int, state: dict):
+    """fetch 단계 source: (stream, works) 페이지. 잘린 페이지 없이 끝까지 받았는지는 state["complete"] 에 남긴다."""
+    fetched = 0
+    for works, next_cursor in iter_changed_works(stream, since):
+        works, truncated = limit_page(works, fetched, max_records)
+        fetched += len(works)
+        state["works"] = fetched
+        yield works
+        if next_cursor is None:
+            state["complete"] = not truncated
+            return
+        if fetched >= max_records:
+            return
+
+def run_pipeline_stream(
+    stream: str,
+    since=None,
+    embed_mode: str = "queue",
+    embed_fn: Callable[[dict], list[dict]] = embed_batch,
+    batch_size: int = INGEST_BATCH_SIZE,
+    max_records: int = INGEST_MAX_RECORDS,
+    parse_workers: int = PIPELINE_PARSE_WORKERS,
+    embed_procs: int = PIPELINE_EMBED_PROCS,
+    write_workers: int = PIPELINE_WRITE_WORKERS,
+) -> dict:
+    """
+    scheduler.StreamIngestor.run 과 같은 증분 수집을 단계별 파이프라인으로 실행한다.
+
+        fetch (스트림 cursor) -> parse (스레드 parse_workers) -> dedupe + DB 비교 (스레드 1, batch_size 단위)
+          -> embed (프로세스 embed_procs, embed_mode="inline" 일 때만) -> write (스레드 write_workers, 배치마다 commit)
+
+    :param str embed_mode: "inline" 이면 embed 단계에서 임베딩, "queue" 면 임베딩 큐에 넣고, "off" 면 메타데이터만 쓴다.
+    :param embed_fn: embed 단계 함수 (프로세스에서 실행되므로 모듈 최상위 함수)
+    :return dict: 분류별 건수와 단계별 지표
+    """
+    run_date = _today()
+    main_conn = connect()
+    conns = [main_conn]
+    conns_lock = threading.Lock()
+    local = threading.local()
+
+    def thread_conn():
+        """write 단계 스레드 전용 커넥션"""
+        if getattr(local, "conn", None) is None:
+            local.conn = connect()
+            with conns_lock:
+                conns.append(local.conn)
+        return local.conn
+
+    try:
+        stored = load_watermark(main_conn, SOURCE, stream)
+        if since is None:
+            since = stored or run_date - timedelta(days=INGEST_INITIAL_LOOKBACK_DAYS)
+        print(f"🔎 [{stream}] {since.isoformat()} 이후 등록/변경된 work 수집 (pipeline)")
+        source_state = {"works": 0, "complete": False}
+        counts = Counter(dict.fromkeys(
+            ("skipped", "duplicates", "new", "content_changed", "meta_changed", "unchanged", "embedded", "enqueued", "citations", "commits"), 0
+        ))
+        counts_lock = threading.Lock()
+
+        def count(**values):
+            with counts_lock:
+                counts.update(values)
+        seen: set[str] = set()
+        pending: list[tuple[dict, list[tuple]]] = []
+
+        def parse(works: list[dict]):
+            parsed = []
+            for w in works:
+                paper_row, citation_rows = parse_work(w)
+                if paper_row is None:
+                    continue
+                parsed.append((paper_row, [(c["citing_paper_id"], c["cited_paper_id"]) for c in citation_rows]))
+            count(skipped=len(works) - len(parsed))
+            return [parsed]
+
+        def make_batch(items: list[tuple[dict, list[tuple]]]) -> list[dict]:
+            rows = [row for row, _ in items]
+            new, content, meta, same = classify(rows, existing_papers(main_conn, [r["openalex_id"] for r in rows]),
+                                                require_embedding=embed_mode == "inline")
+            main_conn.commit()
+            count(new=len(new), content_changed=len(content), meta_changed=len(meta), unchanged=len(same))
+            to_embed = new + content
+            if not to_embed and not meta:
+                return []
+            order = to_embed + meta
+            return [{
+                "rows": [rows[i] for i in order],
+                "texts": [rows[i]["abstract"] for i in to_embed] if embed_mode == "inline" else [],
+                "embed_ids": [rows[i]["openalex_id"] for i in to_embed] if embed_mode == "queue" else [],
+                "citations": [c for i in order for c in items[i][1]],
+                "meta_only_ids": {rows[i]["openalex_id"] for i in meta},
+            }]
+
+        def dedupe(parsed: list[tuple[dict, list[tuple]]]):
+            out = []
+            for item in parsed:
+                key = item[0]["openalex_id"]
+                if key in seen:
+                    count(duplicates=1)
+                    continue
+                seen.add(key)
+                pending.append(item)
+                if len(pending) >= batch_size:
+                    out.extend(make_batch(pending[:]))
+                    pending.clear()
+            return out
+
+        def flush_dedupe():
+            out = make_batch(pending[:]) if pending else []
+            pending.clear()
+            return out
+
+        def write(batch: dict):
+            write_batch(thread_conn(), batch["rows"], batch.get("embeddings"), batch["citations"], batch["embed_ids"] or None,
+                        batch["meta_only_ids"])
+            count(embedded=len(batch["texts"]), enqueued=len(batch["embed_ids"]), citations=len(batch["citations"]), commits=1)
+            return ()
+
+        stages = [
+            Stage("parse", parse, workers=parse_workers),
+            Stage("dedupe", dedupe, flush=flush_dedupe),
+        ]
+        if embed_mode == "inline":
+            stages.append(Stage("embed", embed_fn, workers=embed_procs, kind="process", queue_size=max(2, embed_procs)))
+        stages.append(Stage("write", write, workers=write_workers))
+
+        stage_stats = Pipeline([_pages(stream, since, max_records, source_state)], stages).run()
+
+        stats = {"pages": stage_stats[0]["in"], "works": source_state["works"], **dict(counts)}
+        stats.update(since=since.isoformat(), complete=source_state["complete"], stages=stage_stats)
+        target = watermark_target(since, stored, run_date)
+        if not source_state["complete"]:
+            print(f"⚠️ [{stream}] INGEST_MAX_RECORDS({max_records})에 도달해 watermark를 옮기지 않습니다.")
+        elif target is None:
+            print(f"⚠️ [{stream}] since({since})가 저장된 watermark({stored})보다 뒤라 watermark를 옮기지 않습니다.")
+        else:
+            save_watermark(main_conn, SOURCE, stream, target, {k: v for k, v in stats.items() if k != "stages"})
+        for s in stage_stats:
+            print(f"  {s['stage']:<8} in {s['in']:>6} out {s['out']:>6} {s['per_s']:>8}/s  busy {s['busy_s']:>6}s  "
+                  f"starved {s['starved_s']:>6}s  blocked {s['blocked_s']:>6}s  max depth {s['max_depth']}")
+        print(f"✅ [{stream}] {({k: v for k, v in stats.items() if k != 'stages'})}")
+        return stats
+    finally:
+        for conn in conns:
+            conn.close()
@@ -0,0 +1,272 @@
+"""
+증분 수집 실행과 주기 스케줄.
+
+한 번의 실행(StreamIngestor.run):
+    watermark 조회 -> watermark 이후 등록/변경된 work 페이지 조회 (source_api)
+      -> 배치마다 DB와 비교해 새 논문 / 제목·초록이 바뀐 논문 / 메타데이터만 바뀐 논문 / 그대로인 논문으로 분류
+      -> 새 논문과 제목·초록이 바뀐 논문만 임베딩(또는 임베딩 큐에 추가)하고, 그대로인 논문은 쓰지 않는다
+      -> 배치마다 commit, 스트림을 (잘린 페이지 없이) 끝까지 받으면 watermark를 실행 시작 날짜로 옮긴다.
+중간에 실패하면 watermark가 그대로이므로 다음 실행에서 같은 구간을 다시 받는다. (이미 쓴 논문은 그대로로 분류되어 비용이 거의 없음)
+"""
+import os
+import sys
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Callable
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.abspath(__file__), "..", "..", "..", ".."))
+sys.path.append(ROOT_DIR)
+
+from db.meta_openalex import parse_work
+
+from .config import (
+    INGEST_STREAMS, INGEST_INITIAL_LOOKBACK_DAYS, INGEST_MAX_RECORDS, INGEST_BATCH_SIZE,
+    INGEST_INTERVAL_S, INGEST_RETRY_S, OPENALEX_API_KEY,
+)
+from .database import connect, load_watermark, save_watermark, existing_papers, content_hash, write_batch
+from .source_api import iter_changed_works
+
+SOURCE = "openalex"
+
+def _today() -> date:
+    return datetime.now(timezone.utc).date()
+
+def limit_page(works: list[dict], fetched: int, max_records: int) -> tuple[list[dict], bool]:
+    """
+    페이지를 max_records 안으로 자른다.
+
+    :param int fetched: 이 페이지 전까지 받은 work 수
+    :return: (남길 work, 잘렸는지 여부). 잘린 페이지가 있으면 스트림을 끝까지 받은 것이 아니다.
+    """
+    keep = max(0, max_records - fetched)
+    return works[:keep], len(works) > keep
+
+def watermark_target(since: date, stored: date | None, run_date: date) -> date | None:
+    """
+    수집을 끝낸 뒤 옮길 watermark. since가 저장된 watermark보다 뒤면 그 사이 구간을 받지 않았으므로 옮기지 않는다(None).
+    """
+    if stored is not None and since > stored:
+        return None
+    return run_date
+
+def classify(rows: list[dict], existing: dict[str, dict], require_embedding: bool = True) -> tuple[list[int], list[int], list[int], list[int]]:
+    """
+    배치의 행을 DB 상태와 비교해 분류한다.
+
+    :param bool require_embedding: True면 임베딩이 없는 논문도 다시 임베딩할 대상으로 본다.
+        (큐 모드에서는 임베딩 워커가 아직 처리하지 않은 논문이므로 False)
+    :return: (새 논문, 제목/초록이 바뀌었거나 임베딩이 없는 논문, 메타데이터만 바뀐 논문, 그대로인 논문) 의 행 인덱스
+    """
+    new, content, meta, same = [], [], [], []
+    for i, row in enumerate(rows):
+        old = existing.get(row["openalex_id"])
+        if old is None:
+            new.append(i)
+        elif old["content_hash"] != content_hash(row["title"], row["abstract"]) or (
+            require_embedding and not old["has_embedding"]
+        ):
+            content.append(i)
+        elif (row["cited_by_count"] if row["cited_by_count"] != "" else None) != old["cited_by_count"] or (
+            row["pdf_url"] and row["pdf_url"] != old["pdf_url"]
+        ):
+            meta.append(i)
+        else:
+            same.append(i)
+    return new, content, meta, same
+
+class StreamIngestor:
+    """
+    스트림 1개("created" | "updated")의 증분 수집.
+
+    :param conn: Postgres 커넥션
+    :param embed_fn: 초록 리스트 -> 임베딩 리스트. 주어지면 쓰기 전에 바로 임베딩한다. (inline 모드)
+    :param bool enqueue_embeddings: True면 임베딩할 논문을 papers 쓰기와 같은 트랜잭션에서 임베딩 큐에 넣는다. (queue 모드)
+    :param int batch_size: DB 비교 + 임베딩 + commit 단위 work 수
+    :param int max_records: 한 번의 실행에서 받을 최대 work 수. 넘으면 watermark를 옮기지 않는다.
+    """
+
+    def __init__(
+        self,
+        conn,
+        stream: str,
+        embed_fn: Callable[[list[str]], list] | None = None,
+        enqueue_embeddings: bool = False,
+        batch_size: int = INGEST_BATCH_SIZE,
+        max_records: int = INGEST_MAX_RECORDS,
+    ):
+        self.conn = conn
+        self.stream = stream
+        self.embed_fn = embed_fn
+        self.enqueue_embeddings = enqueue_embeddings
+        self.batch_size = batch_size
+        self.max_records = max_records
+        self.stats = {
+            "pages": 0, "works": 0, "skipped": 0, "duplicates": 0,
+            "new": 0, "content_changed": 0, "meta_changed": 0, "unchanged": 0,
+            "embedded": 0, "enqueued": 0, "citations": 0, "commits": 0,
+        }
+
+    def _flush(self, rows: list[dict], refs: dict[str, list[tuple]]) -> None:
+        existing = existing_papers(self.conn, [r["openalex_id"] for r in rows])
+        new, content, meta, same = classify(rows, existing, require_embedding=self.embed_fn is not None)
+        self.stats["new"] += len(new)
+        self.stats["content_changed"] += len(content)
+        self.stats["meta_changed"] += len(meta)
+        self.stats["unchanged"] += len(same)
+
+        to_embed = new + content
+        changed = to_embed + meta
+        if not changed:
+            # 조회 트랜잭션만 닫는다.
+            self.conn.commit()
+            return
+
+        write_rows = [rows[i] for i in changed]
+        embeddings = None
+        if self.embed_fn is not None and to_embed:
+            vectors = self.embed_fn([rows[i]["abstract"] for i in to_embed])
+            # 메타데이터만 바뀐 논문은 None -> 기존 임베딩 유지 (제목/초록이 바뀐 논문은 임베딩이 없으면 NULL로 비운다)
+            embeddings = list(vectors) + [None] * len(meta)
+            self.stats["embedded"] += len(to_embed)
+        embed_ids = [rows[i]["openalex_id"] for i in to_embed] if self.enqueue_embeddings else None
+        citations = [c for r in write_rows for c in refs.get(r["openalex_id"], ())]
+        write_batch(self.conn, write_rows, embeddings, citations, embed_ids, {rows[i]["openalex_id"] for i in meta})
+        self.stats["enqueued"] += len(embed_ids or ())
+        self.stats["citations"] += len(citations)
+        self.stats["commits"] += 1
+
+    def run(self, since: date | None = None) -> dict:
+        """
+        watermark(또는 since) 이후의 work를 수집한다.
+        스트림을 끝까지 받았으면 watermark를 실행 시작 날짜로 옮긴다.
+
+        :param date since: 주어지면 저장된 watermark 대신 이 날짜부터 수집한다. (수동 backfill)
+            저장된 watermark보다 뒤의 날짜면 watermark는 옮기지 않는다.
+        """
+        start = time.perf_counter()
+        run_date = _today()
+        stored = load_watermark(self.conn, SOURCE, self.stream)
+        if since is None:
+            since = stored or run_date - timedelta(days=INGEST_INITIAL_LOOKBACK_DAYS)
+        print(f"🔎 [{self.stream}] {since.isoformat()} 이후 등록/변경된 work 수집")
+
+        rows: list[dict] = []
+        refs: dict[str, list[tuple]] = {}
+        seen: set[str] = set()
+        complete = False
+        for works, next_cursor in iter_changed_works(self.stream, since):
+            self.stats["pages"] += 1
+            works, truncated = limit_page(works, self.stats["works"], self.max_records)
+            self.stats["works"] += len(works)
+            for w in works:
+                if w["id"] in seen:
+                    self.stats["duplicates"] += 1
+                    continue
+                seen.add(w["id"])
+                paper_row, citation_rows = parse_work(w)
+                if paper_row is None:
+                    self.stats["skipped"] += 1
+                    continue
+                rows.append(paper_row)
+                refs[paper_row["openalex_id"]] = [(c["citing_paper_id"], c["cited_paper_id"]) for c in citation_rows]
+                if len(rows) >= self.batch_size:
+                    self._flush(rows, refs)
+                    rows, refs = [], {}
+            if next_cursor is None:
+                complete = not truncated
+                break
+            if self.stats["works"] >= self.max_records:
+                break
+        if rows:
+            self._flush(rows, refs)
+
+        self.stats["since"] = since.isoformat()
+        self.stats["complete"] = complete
+        self.stats["elapsed_s"] = round(time.perf_counter() - start, 1)
+        target = watermark_target(since, stored, run_date)
+        if not complete:
+            print(f"⚠️ [{self.stream}] INGEST_MAX_RECORDS({self.max_records})에 도달해 watermark를 옮기지 않습니다. 다음 실행에서 이어서 받습니다.")
+        elif target is None:
+            print(f"⚠️ [{self.stream}] since({since})가 저장된 watermark({stored})보다 뒤라 watermark를 옮기지 않습니다.")
+        else:
+            save_watermark(self.conn, SOURCE, self.stream, target, self.stats)
+        print(f"✅ [{self.stream}] {self.stats}")
+        return self.stats
+
+def enabled_streams(streams: list[str] | None = None) -> list[str]:
+    """updated 스트림(from_updated_date)은 OpenAlex Premium API key가 있을 때만 사용한다."""
+    streams = list(streams or INGEST_STREAMS)
+    if "updated" in streams and not OPENALEX_API_KEY:
+        print("ℹ️ OPENALEX_API_KEY가 없어 updated 스트림(from_updated_date)은 건너뜁니다.")
+        streams.remove("updated")
+    return streams
+
+def run_once(
+    streams: list[str] | None = None,
+    since: date | None = None,
+    embed_fn: Callable[[list[str]], list] | None = None,
+    enqueue_embeddings: bool = False,
+    pipeline: bool = False,
+) -> dict:
+    """
+    모든 스트림을 한 번씩 수집한다. 커넥션은 실행마다 새로 연다.
+
+    :param bool pipeline: True면 단계별 파이프라인(pipeline.py)으로 실행한다. 임베딩은 embed_fn 대신 프로세스 풀에서 한다.
+    """
+    if pipeline:
+        from .pipeline import run_pipeline_stream
+
+        embed_mode = "inline" if embed_fn is not None else "queue" if enqueue_embeddings else "off"
+        return {stream: run_pipeline_stream(stream, since, embed_mode) for stream in enabled_streams(streams)}
+    conn = connect()
+    try:
+        return {
+            stream: StreamIngestor(conn, stream, embed_fn, enqueue_embeddings).run(since)
+            for stream in enabled_streams(streams)
+        }
+    finally:
+        conn.close()
+
+class IngestScheduler:
+    """
+    INGEST_INTERVAL_S 마다 run_once를 실행한다. 실패하면 INGEST_RETRY_S 뒤에 다시 시도한다.
+    stop()을 호출하면 진행 중인 실행이 끝난 뒤(또는 대기 중이면 바로) 멈춘다.
+    """
+
+    def __init__(
+        self,
+        streams: list[str] | None = None,
+        embed_fn: Callable[[list[str]], list] | None = None,
+        enqueue_embeddings: bool = False,
+        pipeline: bool = False,
+        interval_s: float = INGEST_INTERVAL_S,
+        retry_s: float = INGEST_RETRY_S,
+    ):
+        self.streams = streams
+        self.embed_fn = embed_fn
+        self.enqueue_embeddings = enqueue_embeddings
+        self.pipeline = pipeline
+        self.interval_s = interval_s
+        self.retry_s = retry_s
+        self._stop = threading.Event()
+        self.runs = 0
+        self.failures = 0
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def run_forever(self) -> None:
+        while not self._stop.is_set():
+            started = time.monotonic()
+            try:
+                run_once(self.streams, embed_fn=self.embed_fn, enqueue_embeddings=self.enqueue_embeddings, pipeline=self.pipeline)
+                self.runs += 1
+                delay = max(0.0, self.interval_s - (time.monotonic() - started))
+            except Exception as e:
+                self.failures += 1
+                print(f"⚠️ 증분 수집 실패 ({self.failures}회): {e}")
+                delay = self.retry_s
+            if not self._stop.is_set():
+                print(f"⏰ 다음 실행까지 {delay:.0f}초")
+            self._stop.wait(delay)
@@ -0,0 +1,54 @@
+"""
+OpenAlex 증분 조회.
+watermark(마지막으로 수집을 끝낸 날짜) 이후에 등록(from_created_date)되었거나 바뀐(from_updated_date) work만 cursor 페이징으로 가져온다.
+"""
+import os
+import sys
+from datetime import date, timedelta
+from typing import Iterator
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.abspath(__file__), "..", "..", "..", ".."))
+sys.path.append(ROOT_DIR)
+
+from db.meta_openalex import iter_work_pages
+from db.rate_limit import TokenBucket
+from db.util import OPENALEX_RPS, OPENALEX_BURST
+
+from .config import INGEST_FILTERS, INGEST_OVERLAP_DAYS
+
+# 스트림 이름 -> OpenAlex 날짜 필터
+STREAM_FILTERS = {
+    "created": "from_created_date",
+    "updated": "from_updated_date",
+}
+
+# 증분 수집에 필요한 필드만 요청한다. (db/meta_openalex.DEFAULT_SELECT 와 같음)
+INGEST_SELECT = "id,display_name,publication_date,doi,cited_by_count,abstract_inverted_index,authorships,primary_location,referenced_works"
+
+_bucket = TokenBucket(OPENALEX_RPS, OPENALEX_BURST)
+
+def stream_filters(stream: str, since: date, filters: dict | None = None) -> dict:
+    """
+    watermark 이후 구간의 OpenAlex 필터.
+    OpenAlex 날짜 필터는 일 단위이므로 INGEST_OVERLAP_DAYS 만큼 앞에서부터 다시 조회한다.
+
+    :param str stream: "created" | "updated"
+    :param date since: 저장된 watermark
+    """
+    if stream not in STREAM_FILTERS:
+        raise ValueError(f"unknown stream: {stream}")
+    start = since - timedelta(days=INGEST_OVERLAP_DAYS)
+    return {**(INGEST_FILTERS if filters is None else filters), STREAM_FILTERS[stream]: start.isoformat()}
+
+def iter_changed_works(stream: str, since: date, filters: dict | None = None, cursor: str = "*") -> Iterator[tuple[list[dict], str | None]]:
+    """
+    since 이후에 등록되었거나 바뀐 work를 페이지 단위로 yield한다. (works, next_cursor)
+    모든 요청은 프로세스 전역 토큰 버킷(OPENALEX_RPS)을 통과한다.
+    """
+    yield from iter_work_pages(
+        "",
+        stream_filters(stream, since, filters),
+        select_fields=INGEST_SELECT,
+        cursor=cursor,
+        bucket=_bucket,
+    )
@@ -2,18 +2,28 @@ from concurrent.futures import thread
 import uuid
 import os
 import sys
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
 from langgraph.types import Command
 from langchain_core.runnables import RunnableConfig
 import json
+import logging
 
 ROOT_DIR = os.path.abspath(os.path.join(os.path.abspath(__file__), "..", "..", "..", ".."))
 sys.path.append(ROOT_DIR)
 
 from services.rag_api.src.graph.builder import build_graph
+from services.rag_api.src.core.accounting import ledger
+from services.rag_api.src.core.llm_client import get_llm_counters
+from services.rag_api.src.core.citing_harvest import get_citing_harvest
+
+# LLM 호출별 사용량 기록(rag_api.llm_usage)을 JSON 한 줄씩 남긴다.
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+)
 # LangGraph app 빌드
 app_builder = build_graph()
 # FastAPI app 생성
@@ -147,6 +157,9 @@ async def start_phase2(request: Phase2Request):
           "messages":[("user", request.question)],
           "sbp_found": True,
           "thread_id": request.thread_id,
+          "node_timings": None, # 이번 턴의 노드별 실행 시간 초기화
+          "augmented_question": "", # 이전 턴의 증강 결과 초기화
+          "augmented_ids": [],
         }
         for event in app_builder.stream(
             inputs, config, stream_mode="updates"
@@ -157,8 +170,32 @@ async def start_phase2(request: Phase2Request):
                 # JSON 스트림 형식으로 데이터를 전송
                 yield f"data: {json.dumps({'answer_chunk': answer_chunk})}\n\n"
 
+        node_timings = app_builder.get_state(config).values.get("node_timings", {})
+        print(f"⏱️ node_timings(ms): {node_timings}")
+
     return StreamingResponse(stream_generator(), media_type="text/event-stream")
 
+@app.get("/stats/usage")
+async def usage_stats():
+    """노드별/모델별 LLM 토큰 사용량과 지연(TTFT, 전체) 누적 통계, 모델별 호출 카운터를 반환합니다."""
+    return {**ledger.summary(), "llm_counters": get_llm_counters()}
+
+@app.get("/stats/usage/{thread_id}")
+async def thread_usage_stats(thread_id: str):
+    """특정 대화(thread_id)의 LLM 토큰 사용량과 지연 통계를 노드별/모델별로 반환합니다."""
+    stats = ledger.thread_stats(thread_id)
+    if stats is None:
+        raise HTTPException(status_code=404, detail=f"no usage recorded for thread {thread_id}")
+    return stats
+
+@app.get("/harvest/citing/{openalex_id}")
+async def citing_harvest_progress(openalex_id: str):
+    """기준 논문(openalex_id)을 인용한 논문의 백그라운드 수집 진행 상황(받은 수, 저장된 수, 상태)을 반환합니다."""
+    job = get_citing_harvest(openalex_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"no citing harvest for {openalex_id}")
+    return job.snapshot()
+
 if __name__ == "__main__":
     import uvicorn
     # uvicorn rag-api.src:app --host 0.0.0.0 --port 8000 --reload
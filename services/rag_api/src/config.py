@@ -0,0 +1,168 @@
+import os
+from dotenv import load_dotenv
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+load_dotenv(os.path.join(ROOT_DIR, ".env"))
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+def _env_choice(name: str, default: str, choices: tuple[str, ...]) -> str:
+    """허용된 값 중 하나인 환경변수. 오타가 조용히 다른 동작이 되지 않도록 import 시점에 실패한다."""
+    value = os.getenv(name, default).strip().lower()
+    if value not in choices:
+        raise ValueError(f"{name}={value!r} is not one of {', '.join(choices)}")
+    return value
+
+# -----------------------------
+# 그래프 실행 모드
+# -----------------------------
+# True면 rag_judge와 (질문 임베딩 + 후속 논문 검색)을 동시에 시작하고,
+# judge 결과가 NO_RAG이면 검색 결과를 버린다.
+GRAPH_SPECULATIVE = _env_bool("GRAPH_SPECULATIVE", False)
+
+# -----------------------------
+# LLM 호출 정책 (core/llm_client.py)
+# -----------------------------
+# 모델별 동시 호출 상한 (프로세스 전역 세마포어)
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+# 한 번의 시도(attempt)에 허용하는 최대 시간(초)
+LLM_ATTEMPT_TIMEOUT_S = float(os.getenv("LLM_ATTEMPT_TIMEOUT_S", "30"))
+# 재시도까지 포함한 호출 전체의 마감 시간(초)
+LLM_DEADLINE_S = float(os.getenv("LLM_DEADLINE_S", "60"))
+# 재시도 횟수와 지수 백오프(지터 포함) 파라미터
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_BACKOFF_BASE_S = float(os.getenv("LLM_BACKOFF_BASE_S", "0.5"))
+LLM_BACKOFF_MAX_S = float(os.getenv("LLM_BACKOFF_MAX_S", "8"))
+# True면 p95 지연 이후에도 응답이 없을 때 백업 요청(hedge)을 보낸다.
+LLM_HEDGE = _env_bool("LLM_HEDGE", False)
+# p95 추정에 필요한 샘플이 부족할 때 사용하는 hedge 지연(초)
+LLM_HEDGE_DEFAULT_DELAY_S = float(os.getenv("LLM_HEDGE_DEFAULT_DELAY_S", "5"))
+# True면 응답을 스트리밍으로 받아 TTFT와 토큰 사용량을 집계한다. (core/accounting.py)
+LLM_STREAMING = _env_bool("LLM_STREAMING", True)
+# OpenAI 호환 엔드포인트 (로컬 fake 서버 테스트용). 비어 있으면 Upstage 기본값 사용.
+UPSTAGE_BASE_URL = os.getenv("UPSTAGE_BASE_URL") or None
+
+# -----------------------------
+# 키워드 정의 검색 (Tavily) 및 캐시 (core/definition_cache.py)
+# -----------------------------
+# 키워드별 Tavily 검색을 동시에 수행할 최대 스레드 수
+TAVILY_MAX_WORKERS = int(os.getenv("TAVILY_MAX_WORKERS", "5"))
+# Tavily 검색 1회에 허용하는 최대 시간(초). 초과하면 정의 없이 진행한다.
+TAVILY_TIMEOUT_S = float(os.getenv("TAVILY_TIMEOUT_S", "5"))
+# 정규화된 키워드 -> 정의 캐시 (SQLite 파일)와 유효 기간
+DEFINITION_CACHE_PATH = os.getenv("DEFINITION_CACHE_PATH", os.path.join(ROOT_DIR, "data", "definition_cache.sqlite"))
+DEFINITION_CACHE_TTL_S = int(os.getenv("DEFINITION_CACHE_TTL_S", str(30 * 24 * 3600)))
+# 질문 증강(augment_question 노드)의 출력을 어디에 사용할지: off | retrieval | generation
+# - retrieval: 증강된 질문 임베딩으로 후속 논문 검색 / generation: 답변 생성 프롬프트에만 추가
+# 증강은 LLM/Tavily 호출을 더하고, 순차 모드에서는 merge_context가 최대 AUGMENT_TIMEOUT_S 기다리므로 기본값은 off.
+AUGMENT_TARGET = _env_choice("AUGMENT_TARGET", "off", ("off", "retrieval", "generation"))
+# AUGMENT_TARGET=retrieval일 때 증강된 질문으로 다시 조회할 소스 (쉼표 구분, RETRIEVAL_SOURCES 중).
+# 기본값은 로컬 DB만: 외부 API(OpenAlex, Tavily) 호출과 외부 결과 저장을 질문마다 두 번 하지 않는다.
+AUGMENT_RETRIEVAL_SOURCES = [s.strip().lower() for s in os.getenv("AUGMENT_RETRIEVAL_SOURCES", "db").split(",") if s.strip()]
+# 질문 증강 브랜치의 최대 대기 시간(초). 초과하면 raw query 검색 결과를 사용한다.
+AUGMENT_TIMEOUT_S = float(os.getenv("AUGMENT_TIMEOUT_S", "6"))
+# True면 키워드 추출과 번역을 한 번의 LLM 호출로 처리하고, 영어 질문은 번역을 생략한다.
+AUGMENT_COMBINED = _env_bool("AUGMENT_COMBINED", True)
+
+# -----------------------------
+# 오프라인 ML 용어집 (db/glossary.py 로 생성, core/glossary.py 에서 조회)
+# -----------------------------
+# True면 키워드 정의를 용어집에서 먼저 찾고, 없는 키워드만 정의 캐시/Tavily로 찾는다.
+GLOSSARY_ENABLED = _env_bool("GLOSSARY_ENABLED", True)
+# True면 정확히 일치하는 용어가 없을 때 키워드 임베딩의 코사인 유사도로 용어를 찾는다.
+# 처음 보는 키워드마다 임베딩 모델을 호출하므로(수십~수백 ms) 기본값은 끈다.
+GLOSSARY_SIMILARITY = _env_bool("GLOSSARY_SIMILARITY", False)
+# 유사도 조회에서 같은 용어로 인정할 최소 코사인 유사도
+GLOSSARY_SIM_THRESHOLD = float(os.getenv("GLOSSARY_SIM_THRESHOLD", "0.85"))
+# 유사도 조회용 키워드 임베딩 LRU 캐시 크기 (정규화된 키워드 단위)
+GLOSSARY_EMB_CACHE_SIZE = int(os.getenv("GLOSSARY_EMB_CACHE_SIZE", "4096"))
+# 용어집 로드(DB)가 실패한 뒤 다시 시도하기까지 기다릴 시간(초). 그 사이에는 빈 용어집으로 웹 검색만 사용한다.
+GLOSSARY_RETRY_S = float(os.getenv("GLOSSARY_RETRY_S", "60"))
+
+# -----------------------------
+# 기준 논문 인용 논문(citing works) 백그라운드 수집 (core/citing_harvest.py)
+# -----------------------------
+# True면 insert_paper 이후 기준 논문을 인용한 논문(cites:W...)을 백그라운드에서 수집해 DB에 저장한다.
+CITING_HARVEST_ENABLED = _env_bool("CITING_HARVEST_ENABLED", True)
+# 기준 논문 1개당 수집할 최대 인용 논문 수 (인용 수 많은 순)
+CITING_HARVEST_MAX_RECORDS = int(os.getenv("CITING_HARVEST_MAX_RECORDS", "1000"))
+# 임베딩 + DB 쓰기를 한 번에 처리할 논문 수 (배치마다 commit 되어 Phase 2에서 바로 검색된다)
+CITING_HARVEST_BATCH_SIZE = int(os.getenv("CITING_HARVEST_BATCH_SIZE", "100"))
+# 동시에 수집할 기준 논문 수
+CITING_HARVEST_WORKERS = int(os.getenv("CITING_HARVEST_WORKERS", "2"))
+# Phase 2 검색 전에 진행 중인 수집을 기다리는 최대 시간(초). 초과하면 그때까지 저장된 결과로 검색한다.
+# 실제 대기는 호출자의 남은 검색 예산(DB 소스 마감, 증강 브랜치는 AUGMENT_TIMEOUT_S의 남은 시간) 안으로 줄어든다.
+CITING_HARVEST_WAIT_S = float(os.getenv("CITING_HARVEST_WAIT_S", "10"))
+
+# -----------------------------
+# LangGraph 체크포인터 (graph/checkpointer.py)
+# -----------------------------
+# memory | sqlite | postgres. sqlite는 단일 노드, postgres는 여러 워커/노드가 thread를 공유할 때 사용한다.
+# (memory는 이력을 무기한 메모리에 보관하므로 로컬 디버깅용)
+CHECKPOINT_BACKEND = _env_choice("CHECKPOINT_BACKEND", "sqlite", ("memory", "sqlite", "postgres"))
+# sqlite 백엔드 파일 경로
+CHECKPOINT_SQLITE_PATH = os.getenv("CHECKPOINT_SQLITE_PATH", os.path.join(ROOT_DIR, "data", "checkpoints.sqlite"))
+# postgres 백엔드의 커넥션 풀 크기. 동시에 체크포인트를 읽고 쓰는 graph 실행 수만큼 커넥션을 나눠 쓴다.
+CHECKPOINT_PG_POOL_SIZE = int(os.getenv("CHECKPOINT_PG_POOL_SIZE", "8"))
+# (thread, namespace)별로 남길 최근 체크포인트 수. 0이면 제한하지 않는다.
+CHECKPOINT_MAX_PER_THREAD = int(os.getenv("CHECKPOINT_MAX_PER_THREAD", "20"))
+# 이 시간(초) 동안 새 체크포인트가 없는 thread는 삭제한다. 0이면 삭제하지 않는다.
+CHECKPOINT_TTL_S = float(os.getenv("CHECKPOINT_TTL_S", str(7 * 24 * 3600)))
+# 이 시간(초) 동안 새 체크포인트가 없는 thread는 최신 체크포인트 하나만 남긴다.
+CHECKPOINT_COMPACT_IDLE_S = float(os.getenv("CHECKPOINT_COMPACT_IDLE_S", "1800"))
+# 백그라운드 정리(TTL 삭제 + idle 압축) 주기(초). 0이면 백그라운드 스레드를 띄우지 않는다.
+CHECKPOINT_COMPACT_INTERVAL_S = float(os.getenv("CHECKPOINT_COMPACT_INTERVAL_S", "300"))
+
+# -----------------------------
+# 논문 캐시 (core/paper_cache.py)
+# -----------------------------
+# state에는 논문 id와 작은 메타데이터만 저장하고, 초록 등은 이 LRU 캐시(없으면 DB)에서 가져온다. 보관할 최대 논문 수
+PAPER_CACHE_SIZE = int(os.getenv("PAPER_CACHE_SIZE", "4096"))
+
+# -----------------------------
+# 후속 논문 다중 소스 검색 (core/multi_source.py)
+# -----------------------------
+# 동시에 조회할 소스 (쉼표 구분): db | openalex | tavily. tavily는 TAVILY_SEARCH 키가 있을 때만 사용한다.
+RETRIEVAL_SOURCES = [s.strip().lower() for s in os.getenv("RETRIEVAL_SOURCES", "db,openalex,tavily").split(",") if s.strip()]
+# 검색 전체의 마감 시간(초). 어떤 소스도 이 시간을 넘겨 기다리지 않는다.
+RETRIEVAL_BUDGET_S = float(os.getenv("RETRIEVAL_BUDGET_S", "8"))
+# 소스별 마감 시간(초). 끝나지 않은 소스는 결과 없이 진행한다. (db는 인용 논문 수집 대기 포함)
+RETRIEVAL_DB_TIMEOUT_S = float(os.getenv("RETRIEVAL_DB_TIMEOUT_S", "8"))
+RETRIEVAL_OPENALEX_TIMEOUT_S = float(os.getenv("RETRIEVAL_OPENALEX_TIMEOUT_S", "3"))
+RETRIEVAL_TAVILY_TIMEOUT_S = float(os.getenv("RETRIEVAL_TAVILY_TIMEOUT_S", "3"))
+# True면 DB 소스가 벡터 검색과 전문 검색(papers.search_tsv)을 DB 안에서 RRF로 합친다. (core/database.py db_follow_up_hybrid_select)
+# papers.search_tsv 컬럼이 필요하다 (db/migrate_fulltext.py). benchmarks/bench_hybrid_retrieval.py 로 벡터 검색 대비
+# hit@k/지연을 측정하기 전까지는 기본값을 끈다.
+RETRIEVAL_HYBRID = _env_bool("RETRIEVAL_HYBRID", False)
+# 하이브리드 검색에서 벡터/전문 검색 각각 순위를 매길 최대 후보 수
+RETRIEVAL_HYBRID_POOL = int(os.getenv("RETRIEVAL_HYBRID_POOL", "100"))
+# 소스마다 가져올 후보 수
+RETRIEVAL_PER_SOURCE_K = int(os.getenv("RETRIEVAL_PER_SOURCE_K", "5"))
+# reciprocal rank fusion 상수: score = sum(1 / (RETRIEVAL_RRF_K + rank))
+RETRIEVAL_RRF_K = int(os.getenv("RETRIEVAL_RRF_K", "60"))
+# 소스별 조회 스레드 풀 크기 (요청 간 공유). 느린 외부 소스가 다른 소스의 워커를 차지하지 않도록 소스마다 따로 둔다.
+RETRIEVAL_WORKERS_PER_SOURCE = int(os.getenv("RETRIEVAL_WORKERS_PER_SOURCE", "4"))
+
+# -----------------------------
+# 후속 논문 재순위 (core/reranker.py)
+# -----------------------------
+# True면 DB에서 RERANK_CANDIDATES 개의 후보를 가져와 cross-encoder로 다시 정렬한 뒤 상위 k개를 사용한다.
+# benchmarks/bench_rerank.py 로 recall/지연을 측정하기 전까지는 기본값을 끈다.
+RERANK_ENABLED = _env_bool("RERANK_ENABLED", False)
+RERANK_MODEL = os.getenv("RERANK_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+RERANK_CANDIDATES = int(os.getenv("RERANK_CANDIDATES", "100"))
+# cross-encoder 입력 최대 토큰 수와 배치 크기
+RERANK_MAX_LENGTH = int(os.getenv("RERANK_MAX_LENGTH", "256"))
+RERANK_BATCH_SIZE = int(os.getenv("RERANK_BATCH_SIZE", "32"))
+# rerank 1회의 CPU 예측 시간 예산(ms). 넘을 것 같으면 1단계 순위가 낮은 후보는 점수화하지 않는다. 0이면 예산 없음.
+RERANK_BUDGET_MS = float(os.getenv("RERANK_BUDGET_MS", "400"))
+# 예산과 관계없이 점수화할 최소 후보 수
+RERANK_MIN_SCORED = int(os.getenv("RERANK_MIN_SCORED", "20"))
+# 첫 호출 전 쌍 1개당 예측 시간 추정치(ms). 이후에는 측정값으로 갱신한다.
+RERANK_INITIAL_PAIR_MS = float(os.getenv("RERANK_INITIAL_PAIR_MS", "4"))
+# (질문, 논문) 점수 캐시 크기
+RERANK_CACHE_SIZE = int(os.getenv("RERANK_CACHE_SIZE", "50000"))
@@ -0,0 +1,180 @@
+import contextvars
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from contextlib import contextmanager
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+logger = logging.getLogger("rag_api.llm_usage")
+
+# 메모리 상한: 최근 대화(thread) N개의 집계만 유지한다.
+MAX_TRACKED_THREADS = 1000
+
+_thread_id_var: contextvars.ContextVar[str] = contextvars.ContextVar("usage_thread_id", default="-")
+_node_var: contextvars.ContextVar[str] = contextvars.ContextVar("usage_node", default="-")
+
+def _empty_totals() -> dict:
+    return {
+        "calls": 0,
+        "errors": 0,
+        "prompt_tokens": 0,
+        "completion_tokens": 0,
+        "latency_ms": 0.0,
+        "ttft_ms": 0.0,
+    }
+
+class UsageLedger:
+    """LLM 호출별 토큰/지연 기록을 thread_id, node, model 단위로 집계한다."""
+
+    def __init__(self, max_threads: int = MAX_TRACKED_THREADS):
+        self._lock = threading.Lock()
+        self._max_threads = max_threads
+        # thread_id -> (node, model) -> totals
+        self._threads: OrderedDict[str, dict] = OrderedDict()
+        self._by_node: dict[str, dict] = defaultdict(_empty_totals)
+        self._by_model: dict[str, dict] = defaultdict(_empty_totals)
+
+    @staticmethod
+    def _add(totals: dict, record: dict):
+        totals["calls"] += 1
+        totals["errors"] += int(record["error"])
+        totals["prompt_tokens"] += record["prompt_tokens"]
+        totals["completion_tokens"] += record["completion_tokens"]
+        totals["latency_ms"] += record["latency_ms"]
+        totals["ttft_ms"] += record["ttft_ms"]
+
+    def record(self, record: dict):
+        with self._lock:
+            thread = self._threads.pop(record["thread_id"], None) or defaultdict(_empty_totals)
+            self._threads[record["thread_id"]] = thread
+            while len(self._threads) > self._max_threads:
+                self._threads.popitem(last=False)
+            self._add(thread[(record["node"], record["model"])], record)
+            self._add(self._by_node[record["node"]], record)
+            self._add(self._by_model[record["model"]], record)
+
+    @staticmethod
+    def _with_averages(totals: dict) -> dict:
+        calls = max(totals["calls"], 1)
+        return {
+            **totals,
+            "latency_ms": round(totals["latency_ms"], 1),
+            "ttft_ms": round(totals["ttft_ms"], 1),
+            "avg_latency_ms": round(totals["latency_ms"] / calls, 1),
+            "avg_ttft_ms": round(totals["ttft_ms"] / calls, 1),
+        }
+
+    def thread_stats(self, thread_id: str) -> dict | None:
+        with self._lock:
+            thread = self._threads.get(thread_id)
+            if thread is None:
+                return None
+            by_node, by_model, total = defaultdict(_empty_totals), defaultdict(_empty_totals), _empty_totals()
+            for (node, model), totals in thread.items():
+                for target in (by_node[node], by_model[model], total):
+                    for key, value in totals.items():
+                        target[key] += value
+        return {
+            "thread_id": thread_id,
+            "total": self._with_averages(total),
+            "by_node": {k: self._with_averages(v) for k, v in by_node.items()},
+            "by_model": {k: self._with_averages(v) for k, v in by_model.items()},
+        }
+
+    def summary(self) -> dict:
+        with self._lock:
+            return {
+                "tracked_threads": len(self._threads),
+                "by_node": {k: self._with_averages(v) for k, v in self._by_node.items()},
+                "by_model": {k: self._with_averages(v) for k, v in self._by_model.items()},
+            }
+
+ledger = UsageLedger()
+
+@contextmanager
+def usage_scope(thread_id: str | None = None, node: str | None = None):
+    """
+    with 블록 안에서 발생한 LLM 호출을 thread_id / node 로 귀속시킨다.
+    인자로 주지 않은 값은 바깥 scope의 값을 그대로 사용한다.
+    """
+    tokens = []
+    if thread_id is not None:
+        tokens.append((_thread_id_var, _thread_id_var.set(thread_id)))
+    if node is not None:
+        tokens.append((_node_var, _node_var.set(node)))
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
+
+class UsageCallbackHandler(BaseCallbackHandler):
+    """
+    LLM 호출 1회(upstream 요청 1회)마다 prompt/completion 토큰, TTFT, 전체 지연을 기록하는 콜백.
+    생성 시점의 usage_scope(thread_id, node)를 캡처하므로 다른 스레드/이벤트 루프에서 실행되어도 귀속이 유지된다.
+    """
+
+    def __init__(self, model: str, label: str | None = None):
+        self.model = model
+        self.thread_id = _thread_id_var.get()
+        node = _node_var.get()
+        self.node = f"{node}.{label}" if label and label != node else node
+        self._runs: dict = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self._runs[run_id] = {"start": time.perf_counter(), "first_token": None}
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        self._runs[run_id] = {"start": time.perf_counter(), "first_token": None}
+
+    def on_llm_new_token(self, token, *, run_id, **kwargs):
+        run = self._runs.get(run_id)
+        if run is not None and run["first_token"] is None:
+            run["first_token"] = time.perf_counter()
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        prompt_tokens, completion_tokens = self._token_usage(response)
+        self._finish(run_id, prompt_tokens, completion_tokens, error=False)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._finish(run_id, 0, 0, error=True)
+
+    @staticmethod
+    def _token_usage(response) -> tuple[int, int]:
+        # 1) 메시지의 usage_metadata (스트리밍 포함)  2) llm_output["token_usage"] (OpenAI 호환 응답)
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if usage:
+                    return usage.get("input_tokens", 0), usage.get("output_tokens", 0)
+        token_usage = (response.llm_output or {}).get("token_usage") or {}
+        return token_usage.get("prompt_tokens", 0), token_usage.get("completion_tokens", 0)
+
+    def _finish(self, run_id, prompt_tokens: int, completion_tokens: int, error: bool):
+        run = self._runs.pop(run_id, None)
+        if run is None:
+            return
+        end = time.perf_counter()
+        latency_ms = (end - run["start"]) * 1000
+        # 스트리밍이 아니면 첫 토큰은 전체 응답과 함께 도착한다.
+        ttft_ms = ((run["first_token"] or end) - run["start"]) * 1000
+        record = {
+            "event": "llm_call",
+            "thread_id": self.thread_id,
+            "node": self.node,
+            "model": self.model,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "ttft_ms": round(ttft_ms, 1),
+            "latency_ms": round(latency_ms, 1),
+            "error": error,
+        }
+        ledger.record(record)
+        logger.info(json.dumps(record, ensure_ascii=False))
+
+def usage_callbacks(model: str, label: str | None = None) -> list:
+    """현재 usage_scope에 귀속되는 콜백 리스트를 만든다. (RunnableConfig['callbacks']에 전달)"""
+    return [UsageCallbackHandler(model, label)]
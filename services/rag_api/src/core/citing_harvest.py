@@ -0,0 +1,184 @@
+"""
+기준 논문을 인용한 논문(citing works)을 백그라운드에서 수집해 DB에 저장한다.
+
+insert_paper 노드는 기준 논문과 그 참고 문헌(referenced_works)만 저장하므로, Phase 2에서 찾는 후속 논문(인용 논문)은
+DB에 없을 수 있다. insert 직후 start_citing_harvest()로 OpenAlex cites:W... 필터를 cursor 페이징하며
+배치마다 초록 임베딩 -> upsert -> commit 하고, 진행 상황은 get_citing_harvest()/GET /harvest/citing/{openalex_id} 로 확인한다.
+Phase 2 검색은 wait_for_citing_harvest()로 최대 CITING_HARVEST_WAIT_S 초 기다린 뒤, 끝나지 않았으면 그때까지 저장된 결과로 검색한다.
+"""
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from pgvector.psycopg2 import register_vector
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.abspath(__file__), "..", "..", "..", "..", ".."))
+sys.path.append(ROOT_DIR)
+
+from db.db_init import get_conn, upsert_paper_rows, insert_citation_rows
+from db.meta_openalex import iter_work_pages, parse_work
+from db.util import PER_PAGE
+from .get_emb import get_emb_model, get_emb
+from .source_api import openalex_bucket
+from ..config import CITING_HARVEST_MAX_RECORDS, CITING_HARVEST_BATCH_SIZE, CITING_HARVEST_WORKERS
+
+# 최근 작업만 보관 (진행 상황 조회용)
+MAX_TRACKED_JOBS = 256
+
+class CitingHarvestJob:
+    """기준 논문 1개에 대한 인용 논문 수집 작업과 진행 상황"""
+
+    def __init__(self, openalex_id: str, max_records: int):
+        self.openalex_id = openalex_id
+        self.max_records = max_records
+        self.status = "pending"  # pending | running | done | failed
+        self.fetched = 0  # OpenAlex에서 받은 work 수
+        self.written = 0  # papers에 저장한 논문 수 (commit 완료)
+        self.skipped = 0  # 초록/저자가 없어 저장하지 않은 work 수
+        self.batches = 0
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._done = threading.Event()
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def wait(self, timeout: float | None = None, cancel_event: threading.Event | None = None) -> bool:
+        """작업이 끝날 때까지 최대 timeout초 기다린다. 끝났으면 True. cancel_event가 set 되면 바로 반환한다."""
+        if cancel_event is None:
+            return self._done.wait(timeout)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self._done.is_set() and not cancel_event.is_set():
+            remaining = 0.1 if deadline is None else min(0.1, deadline - time.monotonic())
+            if remaining <= 0:
+                break
+            self._done.wait(remaining)
+        return self._done.is_set()
+
+    def snapshot(self) -> dict:
+        end = self.finished_at or time.time()
+        return {
+            "openalex_id": self.openalex_id,
+            "status": self.status,
+            "fetched": self.fetched,
+            "written": self.written,
+            "skipped": self.skipped,
+            "batches": self.batches,
+            "max_records": self.max_records,
+            "elapsed_s": round(end - self.started_at, 1) if self.started_at else 0.0,
+            "error": self.error,
+        }
+
+_jobs: "OrderedDict[str, CitingHarvestJob]" = OrderedDict()
+_jobs_lock = threading.Lock()
+_pool = ThreadPoolExecutor(max_workers=CITING_HARVEST_WORKERS, thread_name_prefix="citing_harvest")
+
+def _write_batch(conn, model, job: CitingHarvestJob, works: list[dict]) -> None:
+    """works를 papers/citations 행으로 변환하고 초록 임베딩과 함께 저장한 뒤 commit 한다."""
+    papers, citations = [], []
+    for w in works:
+        paper_row, citation_rows = parse_work(w)
+        if paper_row is None:
+            job.skipped += 1
+            continue
+        papers.append(paper_row)
+        # cites: 필터 결과이므로 (인용 논문 -> 기준 논문) 관계는 항상 저장한다.
+        citations.append((paper_row["openalex_id"], job.openalex_id))
+        citations.extend((c["citing_paper_id"], c["cited_paper_id"]) for c in citation_rows)
+
+    if papers:
+        embeddings = get_emb(model, [p["abstract"] for p in papers])
+        upsert_paper_rows(conn, papers, embeddings, commit=False)
+        insert_citation_rows(conn, list(dict.fromkeys(citations)), commit=False)
+    conn.commit()
+    job.written += len(papers)
+    job.batches += 1
+
+def _run(job: CitingHarvestJob, batch_size: int) -> None:
+    job.status = "running"
+    job.started_at = time.time()
+    conn = None
+    try:
+        conn = get_conn()
+        register_vector(conn)
+        model = get_emb_model()
+        batch = []
+        pages = iter_work_pages(
+            "",
+            filters={"cites": job.openalex_id},
+            per_page=min(PER_PAGE, job.max_records),
+            bucket=openalex_bucket, # 후속 논문 검색(core/multi_source.py)과 같은 버킷
+            sort="cited_by_count:desc",
+        )
+        for works, _ in pages:
+            for w in works[:job.max_records - job.fetched]:
+                batch.append(w)
+                job.fetched += 1
+                if len(batch) >= batch_size:
+                    _write_batch(conn, model, job, batch)
+                    batch = []
+            if job.fetched >= job.max_records:
+                break
+        if batch:
+            _write_batch(conn, model, job, batch)
+        job.status = "done"
+        print(f"✅ 인용 논문 수집 완료: {job.snapshot()}")
+    except Exception as e:
+        job.status = "failed"
+        job.error = f"{type(e).__name__}: {e}"
+        print(f"⚠️ 인용 논문 수집 실패 ({job.openalex_id}): {job.error}")
+        if conn is not None:
+            conn.rollback()
+    finally:
+        if conn is not None:
+            conn.close()
+        job.finished_at = time.time()
+        job._done.set()
+
+def start_citing_harvest(
+    openalex_id: str,
+    max_records: int = CITING_HARVEST_MAX_RECORDS,
+    batch_size: int = CITING_HARVEST_BATCH_SIZE,
+) -> CitingHarvestJob:
+    """
+    기준 논문의 인용 논문 수집을 백그라운드로 시작한다.
+    같은 논문에 대해 진행 중이거나 끝난 작업이 있으면 그 작업을 반환한다. (실패한 작업은 다시 시작)
+    """
+    with _jobs_lock:
+        job = _jobs.get(openalex_id)
+        if job is not None and job.status != "failed":
+            return job
+        job = CitingHarvestJob(openalex_id, max_records)
+        _jobs[openalex_id] = job
+        _jobs.move_to_end(openalex_id)
+        while len(_jobs) > MAX_TRACKED_JOBS:
+            _jobs.popitem(last=False)
+    print(f"📥 인용 논문 백그라운드 수집 시작: {openalex_id} (최대 {max_records}개)")
+    _pool.submit(_run, job, batch_size)
+    return job
+
+def get_citing_harvest(openalex_id: str) -> CitingHarvestJob | None:
+    with _jobs_lock:
+        return _jobs.get(openalex_id)
+
+def wait_for_citing_harvest(
+    openalex_id: str,
+    timeout: float,
+    cancel_event: threading.Event | None = None,
+) -> dict | None:
+    """
+    진행 중인 수집 작업을 최대 timeout초 기다린 뒤 진행 상황을 반환한다. 작업이 없으면 None.
+    시간 안에 끝나지 않아도 예외 없이 반환하며, 그때까지 commit 된 논문은 바로 검색할 수 있다.
+    """
+    job = get_citing_harvest(openalex_id)
+    if job is None:
+        return None
+    if not job.wait(timeout, cancel_event):
+        print(f"⏳ 인용 논문 수집 진행 중 ({job.written}개 저장됨): 부분 결과로 검색합니다.")
+    return job.snapshot()
@@ -11,7 +11,11 @@ sys.path.append(ROOT_DIR)
 
 from services.rag_api.src.core.source_api import openalex_search
 from services.rag_api.src.core.get_emb import get_emb_model, get_emb
-from db.db_init import get_conn
+from services.rag_api.src.core.paper_cache import WEB_ID_PREFIX
+from db.db_init import get_conn, FTS_CONFIG
+
+# 논문 조회 시 가져오는 컬럼. embedding(1024 float)은 검색 SQL 안에서만 사용하고 Python으로 가져오지 않는다.
+PAPER_COLUMNS = "openalex_id, doi, title, abstract, authors, pdf_url, published, cited_by_count"
 
 def mock_db_select(paper_title: str) -> dict | None:
     """
@@ -36,8 +40,8 @@ def mock_db_select(paper_title: str) -> dict | None:
         # RealDictCursor를 사용하여 결과를 딕셔너리 형태로 받음
         with conn.cursor(cursor_factory=RealDictCursor) as cur:
             # papers 테이블에서 제목이 일치하는 논문을 1개 검색
-            cur.execute("""
-                SELECT *
+            cur.execute(f"""
+                SELECT {PAPER_COLUMNS}
                 FROM papers
                 WHERE title ilike %s
                 LIMIT 1
@@ -53,6 +57,83 @@ def mock_db_select(paper_title: str) -> dict | None:
     finally:
         conn.close() # DB 연결 종료
 
+def db_select_papers(ids: list[str]) -> list[dict]:
+    """
+    openalex_id 리스트로 논문 정보를 조회합니다. (core/paper_cache.py 에서 캐시에 없는 논문을 읽을 때 사용)
+    "web:" id는 web_docs 테이블에서 읽어 papers 행과 같은 키로 맞춥니다.
+
+    :param ids: 조회할 openalex_id 리스트
+    :return: 논문 정보 딕셔너리 리스트 (embedding 제외, 순서는 보장하지 않음)
+    """
+    if not ids:
+        return []
+    paper_ids = [i for i in ids if not i.startswith(WEB_ID_PREFIX)]
+    web_ids = [i for i in ids if i.startswith(WEB_ID_PREFIX)]
+    conn = get_conn()
+    try:
+        rows = []
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            if paper_ids:
+                cur.execute(f"SELECT {PAPER_COLUMNS} FROM papers WHERE openalex_id = ANY(%s)", (paper_ids,))
+                rows += [dict(row) for row in cur.fetchall()]
+            if web_ids:
+                cur.execute("SELECT id, url, title, content, doi FROM web_docs WHERE id = ANY(%s)", (web_ids,))
+                rows += [{
+                    "openalex_id": row["id"], "doi": row["doi"], "title": row["title"], "abstract": row["content"],
+                    "authors": None, "pdf_url": row["url"] if row["url"].lower().endswith(".pdf") else None,
+                    "published": None, "cited_by_count": None, "url": row["url"],
+                } for row in cur.fetchall()]
+        return rows
+    finally:
+        conn.close()
+
+def db_save_external_papers(base_id: str, docs: list[dict]) -> int:
+    """
+    다중 소스 검색(core/multi_source.py)에서 DB 밖에서 찾은 논문을 저장합니다.
+    paper_cache는 프로세스 로컬 LRU라서, 저장하지 않으면 캐시에서 빠지거나 다른 워커에서 thread를 이어갈 때 id를 다시 읽을 수 없습니다.
+    - OpenAlex 논문: papers에 upsert (임베딩 없이) + 기준 논문을 인용하는 citations 행
+    - Tavily 문서("web:" id): web_docs에 upsert
+
+    :param base_id: 기준 논문 openalex_id
+    :param docs: multi_source_retrieve 결과 (sources에 "db"가 있는 논문은 이미 DB에 있으므로 건너뜁니다)
+    :return: 저장한 문서 수
+    """
+    external = [d for d in docs if "db" not in (d.get("sources") or [d.get("source")])]
+    papers = [d for d in external if not d["openalex_id"].startswith(WEB_ID_PREFIX)]
+    web = [d for d in external if d["openalex_id"].startswith(WEB_ID_PREFIX)]
+    if not papers and not web:
+        return 0
+    conn = get_conn()
+    try:
+        with conn.cursor() as cur:
+            if papers:
+                execute_values(cur, """
+                    INSERT INTO papers (openalex_id, doi, title, abstract, authors, pdf_url, published, cited_by_count)
+                    VALUES %s
+                    ON CONFLICT (openalex_id) DO UPDATE SET
+                        cited_by_count = EXCLUDED.cited_by_count,
+                        pdf_url = COALESCE(EXCLUDED.pdf_url, papers.pdf_url)
+                """, [(
+                    d["openalex_id"], d.get("doi"), d["title"], d.get("abstract"), d.get("authors"),
+                    d.get("pdf_url"), d.get("published") or None, d.get("cited_by_count"),
+                ) for d in papers])
+                execute_values(cur, """
+                    INSERT INTO citations (citing_openalex_id, cited_openalex_id)
+                    VALUES %s
+                    ON CONFLICT DO NOTHING
+                """, [(d["openalex_id"], base_id) for d in papers])
+            if web:
+                execute_values(cur, """
+                    INSERT INTO web_docs (id, url, title, content, doi)
+                    VALUES %s
+                    ON CONFLICT (id) DO UPDATE SET
+                        title = EXCLUDED.title, content = EXCLUDED.content, doi = EXCLUDED.doi, fetched_at = now()
+                """, [(d["openalex_id"], d["url"], d["title"], d.get("abstract"), d.get("doi")) for d in web])
+        conn.commit()
+    finally:
+        conn.close()
+    return len(papers) + len(web)
+
 def mock_db_insert(paper_info: dict):
     """
     OpenAlex에서 검색한 논문 정보(메타데이터, 인용 관계)를 데이터베이스에 삽입합니다.
@@ -147,8 +228,7 @@ def mock_db_follow_up_select(paper_info: dict, query_vec: list[float], k: int) -
                                 p.embedding <=> %s AS dist,
                                 ROW_NUMBER() OVER(PARTITION BY p.title ORDER BY LENGTH(p.abstract) DESC) AS rn
                             FROM papers p
-                            JOIN citations c ON c.citing_openalex_id = p.openalex_id
-                            WHERE c.cited_openalex_id = ANY(%s)
+                            WHERE p.openalex_id = ANY(%s)
                         )
                         SELECT
                             openalex_id,
@@ -171,6 +251,84 @@ def mock_db_follow_up_select(paper_info: dict, query_vec: list[float], k: int) -
     finally:
         conn.close()
 
+# 기준 논문을 인용한 논문 안에서 벡터 검색과 전문 검색을 각각 pool개까지 순위를 매기고 RRF로 합친다.
+# 질문은 plainto_tsquery의 AND(&)를 OR(|)로 바꾼 tsquery로 검색한다. (모든 단어가 있어야 하면 긴 질문은 거의 매칭되지 않음)
+HYBRID_FOLLOW_UP_SQL = """
+WITH citing AS (
+    SELECT citing_openalex_id AS openalex_id FROM citations WHERE cited_openalex_id = %(base_id)s
+),
+q AS (
+    SELECT replace(plainto_tsquery(%(fts_config)s::regconfig, %(query_text)s)::text, ' & ', ' | ')::tsquery AS query
+),
+vec AS (
+    SELECT p.openalex_id, ROW_NUMBER() OVER (ORDER BY p.embedding <=> %(query_vec)s) AS rnk
+    FROM papers p JOIN citing USING (openalex_id)
+    WHERE p.embedding IS NOT NULL
+    ORDER BY p.embedding <=> %(query_vec)s
+    LIMIT %(pool)s
+),
+lex AS (
+    SELECT p.openalex_id, ROW_NUMBER() OVER (ORDER BY ts_rank_cd(p.search_tsv, q.query) DESC) AS rnk
+    FROM papers p JOIN citing USING (openalex_id) CROSS JOIN q
+    WHERE p.search_tsv @@ q.query
+    ORDER BY ts_rank_cd(p.search_tsv, q.query) DESC
+    LIMIT %(pool)s
+),
+fused AS (
+    SELECT openalex_id,
+           COALESCE(1.0 / (%(rrf_k)s + vec.rnk), 0) + COALESCE(1.0 / (%(rrf_k)s + lex.rnk), 0) AS rrf_score,
+           vec.rnk AS vec_rank,
+           lex.rnk AS lex_rank
+    FROM vec FULL OUTER JOIN lex USING (openalex_id)
+),
+ranked AS (
+    SELECT p.openalex_id, p.doi, p.title, p.published, p.abstract, p.pdf_url, p.authors, p.cited_by_count,
+           f.rrf_score, f.vec_rank, f.lex_rank,
+           ROW_NUMBER() OVER (PARTITION BY p.title ORDER BY f.rrf_score DESC, LENGTH(p.abstract) DESC) AS rn
+    FROM fused f JOIN papers p USING (openalex_id)
+)
+SELECT openalex_id, doi, title, published, abstract, pdf_url, authors, cited_by_count, rrf_score, vec_rank, lex_rank
+FROM ranked
+WHERE rn = 1
+ORDER BY rrf_score DESC
+LIMIT %(k)s
+"""
+
+def db_follow_up_hybrid_select(paper_info: dict, query_vec: list[float], query_text: str, k: int,
+                               pool: int = 100, rrf_k: int = 60) -> list[dict]:
+    """
+    기준 논문(paper_info)을 인용한 후속 연구를 벡터 검색(질문 임베딩)과 전문 검색(papers.search_tsv)으로 함께 찾고,
+    두 순위를 reciprocal rank fusion으로 합쳐 상위 k개를 반환합니다. 한 번의 쿼리로 DB에서 모두 처리합니다.
+    방법 이름, 데이터셋 이름처럼 정확한 단어가 중요한 질문에서 벡터 검색만으로는 놓치는 논문을 찾습니다.
+
+    :param paper_info: 기준이 되는 논문의 정보 딕셔너리 (openalex_id 포함)
+    :param query_vec: 사용자의 질문을 임베딩한 벡터
+    :param query_text: 전문 검색에 사용할 질문 원문
+    :param k: 가져올 후속 논문의 최대 개수
+    :param pool: 벡터/전문 검색 각각에서 순위를 매길 최대 후보 수
+    :param rrf_k: RRF 상수, score = 1/(rrf_k + 벡터 순위) + 1/(rrf_k + 전문 검색 순위)
+    :return: 후속 논문 정보 딕셔너리의 리스트 (rrf_score, vec_rank, lex_rank 포함, RRF 순)
+    """
+    print(f"🔍 DB 인용관계 하이브리드 검색 (Select): '{paper_info['title']}' 인용 논문")
+
+    conn = get_conn()
+    register_vector(conn)
+
+    try:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(HYBRID_FOLLOW_UP_SQL, {
+                "base_id": paper_info["openalex_id"],
+                "fts_config": FTS_CONFIG,
+                "query_text": query_text or "",
+                "query_vec": query_vec,
+                "pool": max(pool, k),
+                "rrf_k": rrf_k,
+                "k": k,
+            })
+            return cur.fetchall()
+    finally:
+        conn.close()
+
 if __name__ == "__main__":
     paper_info = openalex_search("attention is all you need")
     print(paper_info)
@@ -0,0 +1,88 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+
+from ..config import DEFINITION_CACHE_PATH, DEFINITION_CACHE_TTL_S
+
+def normalize_keyword(keyword: str) -> str:
+    """
+    캐시 키로 사용할 키워드 정규화.
+    e.g. " Fine-Tuning " -> "fine tuning"
+    """
+    s = unicodedata.normalize("NFKC", keyword or "").casefold()
+    s = re.sub(r"[\"'`“”]", "", s)
+    s = re.sub(r"[-_/]+", " ", s)
+    return re.sub(r"\s+", " ", s).strip()
+
+class DefinitionCache:
+    """
+    키워드 정의를 SQLite 파일에 보관하는 영속 캐시.
+    빈 정의나 검색 실패 결과는 저장하지 않는다.
+    """
+
+    def __init__(self, path: str = DEFINITION_CACHE_PATH, ttl_s: int = DEFINITION_CACHE_TTL_S):
+        self.ttl_s = ttl_s
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS keyword_definitions (
+                    key         TEXT PRIMARY KEY,
+                    keyword     TEXT NOT NULL,
+                    definition  TEXT NOT NULL,
+                    created_at  REAL NOT NULL
+                )
+            """)
+            self._conn.commit()
+
+    def get(self, keyword: str) -> str | None:
+        key = normalize_keyword(keyword)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT definition, created_at FROM keyword_definitions WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or time.time() - row[1] > self.ttl_s:
+            return None
+        return row[0]
+
+    def get_many(self, keywords: list[str]) -> dict[str, str]:
+        """캐시에 유효한 정의가 있는 키워드만 {keyword: definition} 으로 반환한다."""
+        found = {}
+        for keyword in keywords:
+            definition = self.get(keyword)
+            if definition is not None:
+                found[keyword] = definition
+        return found
+
+    def put(self, keyword: str, definition: str | None):
+        if not definition or not definition.strip():
+            return
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO keyword_definitions (key, keyword, definition, created_at) VALUES (?, ?, ?, ?)",
+                (normalize_keyword(keyword), keyword, definition.strip(), time.time()),
+            )
+            self._conn.commit()
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            cur = self._conn.execute(
+                "DELETE FROM keyword_definitions WHERE created_at < ?", (time.time() - self.ttl_s,)
+            )
+            self._conn.commit()
+            return cur.rowcount
+
+_cache: DefinitionCache | None = None
+_cache_lock = threading.Lock()
+
+def get_definition_cache() -> DefinitionCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = DefinitionCache()
+    return _cache
@@ -0,0 +1,148 @@
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.abspath(__file__), "..", "..", "..", "..", ".."))
+sys.path.append(ROOT_DIR)
+
+from db.db_init import get_conn
+from .definition_cache import normalize_keyword
+from ..config import GLOSSARY_ENABLED, GLOSSARY_SIMILARITY, GLOSSARY_SIM_THRESHOLD, GLOSSARY_EMB_CACHE_SIZE, GLOSSARY_RETRY_S
+
+class Glossary:
+    """
+    db/glossary.py 가 만든 ML 용어집의 메모리 인덱스.
+    - exact: 정규화된 용어 -> 정의 (dict 조회)
+    - similarity: 정규화된 용어 임베딩 행렬과 키워드 임베딩의 내적(코사인 유사도)
+      키워드 임베딩은 정규화된 키워드 단위 LRU에 보관해 같은 키워드는 다시 임베딩하지 않는다.
+    """
+
+    def __init__(self, terms: list[str], definitions: list[str], embeddings: np.ndarray | None = None):
+        self._exact = {normalize_keyword(t): d for t, d in zip(terms, definitions)}
+        self._terms = list(terms)
+        self._definitions = list(definitions)
+        self._matrix = None
+        if embeddings is not None and len(embeddings):
+            matrix = np.asarray(embeddings, dtype="float32")
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            self._matrix = matrix / np.maximum(norms, 1e-12)
+        self._emb_cache: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._emb_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._exact)
+
+    @classmethod
+    def from_db(cls, with_embeddings: bool = True) -> "Glossary":
+        conn = get_conn()
+        try:
+            with conn.cursor() as cur:
+                if with_embeddings:
+                    # pgvector 어댑터 없이 텍스트('[0.1,0.2,...]')로 받아 한 번에 파싱한다.
+                    cur.execute("SELECT term, definition, embedding::text FROM glossary WHERE embedding IS NOT NULL")
+                else:
+                    cur.execute("SELECT term, definition, NULL FROM glossary")
+                rows = cur.fetchall()
+        finally:
+            conn.close()
+        terms = [row[0] for row in rows]
+        definitions = [row[1] for row in rows]
+        embeddings = None
+        if with_embeddings and rows:
+            embeddings = np.array([np.fromstring(row[2].strip("[]"), sep=",", dtype="float32") for row in rows])
+        return cls(terms, definitions, embeddings)
+
+    def lookup_exact(self, keywords: list[str]) -> dict[str, str]:
+        found = {}
+        for keyword in keywords:
+            definition = self._exact.get(normalize_keyword(keyword))
+            if definition:
+                found[keyword] = definition
+        return found
+
+    def lookup_similar(self, keywords: list[str], keyword_embeddings: np.ndarray, threshold: float = GLOSSARY_SIM_THRESHOLD) -> dict[str, str]:
+        """키워드 임베딩과 가장 가까운 용어의 유사도가 threshold 이상이면 그 용어의 정의를 사용한다."""
+        if self._matrix is None or not keywords:
+            return {}
+        queries = np.asarray(keyword_embeddings, dtype="float32")
+        queries = queries / np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+        scores = queries @ self._matrix.T
+        best = scores.argmax(axis=1)
+        found = {}
+        for i, keyword in enumerate(keywords):
+            if scores[i, best[i]] >= threshold:
+                found[keyword] = self._definitions[best[i]]
+        return found
+
+    def keyword_embeddings(self, keywords: list[str]) -> np.ndarray:
+        """키워드 임베딩 (캐시에 없는 키워드만 한 번에 임베딩한다)"""
+        keys = [normalize_keyword(k) for k in keywords]
+        with self._emb_lock:
+            cached = {key: self._emb_cache[key] for key in keys if key in self._emb_cache}
+            for key in cached:
+                self._emb_cache.move_to_end(key)
+        missing = list(dict.fromkeys(key for key in keys if key not in cached))
+        if missing:
+            from .get_emb import get_emb_model, get_emb
+            vectors = np.asarray(get_emb(get_emb_model(), missing), dtype="float32")
+            with self._emb_lock:
+                for key, vec in zip(missing, vectors):
+                    self._emb_cache[key] = cached[key] = vec
+                while len(self._emb_cache) > GLOSSARY_EMB_CACHE_SIZE:
+                    self._emb_cache.popitem(last=False)
+        return np.stack([cached[key] for key in keys])
+
+    def lookup(self, keywords: list[str], similarity: bool = GLOSSARY_SIMILARITY) -> dict[str, str]:
+        """
+        키워드 정의를 용어집에서 찾는다. 정확히 일치하는 용어를 먼저 찾고,
+        similarity=True면 나머지 키워드의 임베딩(캐시)으로 유사도 조회를 한다.
+
+        :param list[str] keywords: 키워드 리스트
+        :return dict[str, str]: 용어집에서 찾은 {keyword: definition}
+        """
+        found = self.lookup_exact(keywords)
+        misses = [k for k in keywords if k not in found]
+        if similarity and misses and self._matrix is not None:
+            found.update(self.lookup_similar(misses, self.keyword_embeddings(misses)))
+        return found
+
+_glossary: Glossary | None = None
+_glossary_lock = threading.Lock()
+# 로드에 실패했을 때 쓰는 빈 용어집과 다음 로드 시도 시각(time.monotonic). 실패 결과는 _glossary에 남기지 않는다.
+_empty_glossary = Glossary([], [])
+_retry_at = 0.0
+
+def get_glossary() -> Glossary:
+    """
+    프로세스 전역 용어집. 처음 호출될 때 DB에서 한 번 읽는다.
+    비활성화되었으면 빈 용어집을 사용한다. (모든 키워드가 웹 검색으로 넘어간다)
+    DB/테이블을 사용할 수 없으면 빈 용어집을 반환하고, GLOSSARY_RETRY_S 뒤의 호출에서 다시 읽는다.
+    """
+    global _glossary, _retry_at
+    with _glossary_lock:
+        if _glossary is None:
+            if not GLOSSARY_ENABLED:
+                _glossary = _empty_glossary
+            elif time.monotonic() < _retry_at:
+                return _empty_glossary
+            else:
+                try:
+                    _glossary = Glossary.from_db(with_embeddings=GLOSSARY_SIMILARITY)
+                    print(f"📚 용어집 로드: {len(_glossary)}개")
+                except Exception as e:
+                    _retry_at = time.monotonic() + GLOSSARY_RETRY_S
+                    print(f"⚠️ 용어집 로드 실패, {GLOSSARY_RETRY_S:.0f}s 동안 웹 검색만 사용: {e}")
+                    return _empty_glossary
+    return _glossary
+
+def reload_glossary() -> Glossary:
+    """db/glossary.py 실행 후 서버 재시작 없이 용어집을 다시 읽는다."""
+    global _glossary, _retry_at
+    with _glossary_lock:
+        _glossary = None
+        _retry_at = 0.0
+    return get_glossary()
@@ -5,9 +5,8 @@ from collections import defaultdict
 from langchain_core.documents import Document
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
-from langchain_openai import ChatOpenAI
-from langchain_upstage import ChatUpstage
 from langchain_core.prompts import MessagesPlaceholder
+from .llm_client import make_chat_model, invoke_chain
 
 def format_context(context: List[Document]) -> str:
     """
@@ -25,7 +24,7 @@ def format_context(context: List[Document]) -> str:
     
     return "\n\n".join(context_parts)
 
-def mock_llm_generate(messages, context: List[Document], llm_api_key: str) -> str:
+def mock_llm_generate(messages, context: List[Document], llm_api_key: str, augmented_question: str | None = None) -> str:
     """
     검색된 문서를 바탕으로 최종 답변을 생성하는 LLM 함수.
     논문들을 분석하여 구조화된 답변을 생성합니다.
@@ -37,6 +36,7 @@ def mock_llm_generate(messages, context: List[Document], llm_api_key: str) -> st
     :param str question: 사용자가 입력한 프롬프트
     :param List[Document] context: 검색된 후속 연구 논문들의 리스트
     :param llm_api_key: OpenAI API 키
+    :param str augmented_question: (선택) 키워드 정의로 증강된 영어 질문. 주어지면 프롬프트에 함께 제공한다.
     :return str: 구조화된 답변 문자열
     """
     print("🤖 LLM 답변 생성 중...")
@@ -67,7 +67,7 @@ Your response must be well-organized, using Markdown for headings and lists.
 <question>
 {question}
 </question>
-
+{augmented_block}
 **Provided Context (Follow-up Papers):**
 <context>
 {context_str}
@@ -84,16 +84,21 @@ Directly answer the user's question. Synthesize the key findings from all papers
 
     # LLM 모델을 초기화합니다. (GPT-3.5 Turbo 사용)
     # llm = ChatOpenAI(model_name="gpt-3.5-turbo", api_key=llm_api_key, temperature=0.2)
-    llm = ChatUpstage(model="solar-pro2", api_key=llm_api_key)
+    llm = make_chat_model("solar-pro2", llm_api_key)
     # LangChain Expression Language (LCEL)을 사용하여 체인을 구성합니다.
     # 1. 프롬프트 포맷팅 -> 2. LLM 호출 -> 3. 출력 파싱(문자열로)
     chain = prompt_template | llm | StrOutputParser()
     
     # 체인을 실행하여 답변을 생성합니다.
-    answer = chain.invoke({
+    augmented_block = ""
+    if augmented_question:
+        augmented_block = f"\n**Clarified Question (English, with keyword definitions):**\n<clarified_question>\n{augmented_question}\n</clarified_question>\n"
+
+    answer = invoke_chain(chain, {
         "question": messages,
-        "context_str": context_str
-    })
+        "context_str": context_str,
+        "augmented_block": augmented_block,
+    }, model="solar-pro2", label="generate")
     print(f"\n\nanswer: {answer}\n\n")
     
     return answer
@@ -138,15 +143,15 @@ Directly answer the user's question.
 
     # LLM 모델을 초기화합니다. (GPT-3.5 Turbo 사용)
     # llm = ChatOpenAI(model_name="gpt-3.5-turbo", api_key=llm_api_key, temperature=0.2)
-    llm = ChatUpstage(model="solar-pro2", api_key=llm_api_key)
+    llm = make_chat_model("solar-pro2", llm_api_key)
     # LangChain Expression Language (LCEL)을 사용하여 체인을 구성합니다.
     # 1. 프롬프트 포맷팅 -> 2. LLM 호출 -> 3. 출력 파싱(문자열로)
     chain = prompt_template | llm | StrOutputParser()
     
     # 체인을 실행하여 답변을 생성합니다.
-    answer = chain.invoke({
+    answer = invoke_chain(chain, {
         "question": messages
-    })
+    }, model="solar-pro2", label="generate_no_rag")
     print(f"\n\nanswer: {answer}\n\n")
     
     return answer
@@ -178,12 +183,12 @@ Your response must be exclusively 'RAG' or 'NO_RAG'. Do not include any addition
             )
     ])
 
-    llm = ChatUpstage(model="solar-pro2", api_key=llm_api_key)
+    llm = make_chat_model("solar-pro2", llm_api_key)
     chain = prompt_template | llm | StrOutputParser()
 
-    judgement = chain.invoke({
+    judgement = invoke_chain(chain, {
         "question": question
-    })
+    }, model="solar-pro2", label="rag_judge")
 
     return judgement
 
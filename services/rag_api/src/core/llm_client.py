@@ -0,0 +1,262 @@
+import asyncio
+import concurrent.futures
+import random
+import threading
+import time
+from collections import defaultdict, deque
+
+from langchain_upstage import ChatUpstage
+
+from .accounting import usage_callbacks
+from ..config import (
+    LLM_MAX_CONCURRENCY,
+    LLM_ATTEMPT_TIMEOUT_S,
+    LLM_DEADLINE_S,
+    LLM_MAX_RETRIES,
+    LLM_BACKOFF_BASE_S,
+    LLM_BACKOFF_MAX_S,
+    LLM_HEDGE,
+    LLM_HEDGE_DEFAULT_DELAY_S,
+    UPSTAGE_BASE_URL,
+    LLM_STREAMING,
+)
+
+# p95 추정에 사용할 최근 지연 샘플 수와 최소 샘플 수
+_LATENCY_WINDOW = 200
+_MIN_P95_SAMPLES = 20
+
+# 모든 LLM 호출은 하나의 백그라운드 이벤트 루프에서 실행된다.
+# -> 모델별 세마포어가 워커 스레드 수와 관계없이 프로세스 전역으로 동작한다.
+_loop: asyncio.AbstractEventLoop | None = None
+_loop_lock = threading.Lock()
+
+_semaphores: dict[str, asyncio.Semaphore] = {}
+_latencies: dict[str, deque] = defaultdict(lambda: deque(maxlen=_LATENCY_WINDOW))
+_counters: dict[str, dict] = defaultdict(lambda: {
+    "calls": 0,       # ainvoke_chain 호출 수
+    "attempts": 0,    # 실제 upstream 요청 수 (재시도, hedge 포함)
+    "in_flight": 0,   # 현재 진행 중인 upstream 요청 수
+    "retries": 0,
+    "timeouts": 0,
+    "hedged": 0,      # 백업 요청을 보낸 횟수
+    "hedge_wins": 0,  # 백업 요청이 먼저 끝난 횟수
+    "errors": 0,      # 최종 실패한 호출 수
+})
+
+class LLMTimeoutError(TimeoutError):
+    """재시도를 포함한 LLM 호출이 마감 시간 내에 끝나지 않았을 때 발생한다."""
+
+def make_chat_model(model: str, api_key: str, **kwargs) -> ChatUpstage:
+    """
+    호출 정책(타임아웃/재시도)을 이 모듈이 담당하도록 클라이언트 자체 재시도를 끈 ChatUpstage를 생성한다.
+    UPSTAGE_BASE_URL이 설정되어 있으면 해당 OpenAI 호환 엔드포인트(예: 로컬 fake 서버)를 사용한다.
+
+    :param str model: 모델 이름 (예: solar-pro2)
+    :param str api_key: Upstage API Key
+    :return ChatUpstage: LLM 객체
+    """
+    params = {"model": model, "api_key": api_key, "max_retries": 0, "timeout": LLM_ATTEMPT_TIMEOUT_S}
+    if LLM_STREAMING:
+        # 스트리밍으로 받아야 첫 토큰 도착 시각(TTFT)을 측정할 수 있다.
+        params.update(streaming=True, stream_usage=True)
+    if UPSTAGE_BASE_URL:
+        params["base_url"] = UPSTAGE_BASE_URL
+    params.update(kwargs)
+    return ChatUpstage(**params)
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=_loop.run_forever, name="llm-client-loop", daemon=True)
+            thread.start()
+    return _loop
+
+def _semaphore(model: str) -> asyncio.Semaphore:
+    if model not in _semaphores:
+        _semaphores[model] = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+    return _semaphores[model]
+
+def _hedge_delay(model: str) -> float:
+    """최근 지연 샘플의 p95. 샘플이 부족하면 기본값을 사용한다."""
+    samples = _latencies[model]
+    if len(samples) < _MIN_P95_SAMPLES:
+        return LLM_HEDGE_DEFAULT_DELAY_S
+    ordered = sorted(samples)
+    return ordered[int(0.95 * (len(ordered) - 1))]
+
+def _is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, (asyncio.TimeoutError, ConnectionError)):
+        return True
+    status = getattr(exc, "status_code", None)
+    if status is not None:
+        return status == 429 or status >= 500
+    return type(exc).__name__ in ("APIConnectionError", "APITimeoutError")
+
+def _backoff(attempt: int) -> float:
+    # full jitter: [0, min(cap, base * 2^attempt)]
+    return random.uniform(0, min(LLM_BACKOFF_MAX_S, LLM_BACKOFF_BASE_S * (2 ** attempt)))
+
+async def _attempt(runnable, inputs, model: str, timeout: float, config: dict | None, started: asyncio.Event | None = None):
+    """세마포어 대기 시간까지 포함해 timeout 안에 한 번의 upstream 요청을 수행한다."""
+    counters = _counters[model]
+
+    async def guarded():
+        async with _semaphore(model):
+            if started is not None:
+                started.set()
+            counters["attempts"] += 1
+            counters["in_flight"] += 1
+            start = time.monotonic()
+            try:
+                return await runnable.ainvoke(inputs, config=config)
+            finally:
+                # 타임아웃/hedge로 취소된 요청도 그때까지 걸린 시간을 기록한다. (빠진 느린 샘플만큼 p95가 낮게 추정된다)
+                counters["in_flight"] -= 1
+                _latencies[model].append(time.monotonic() - start)
+
+    return await asyncio.wait_for(guarded(), timeout)
+
+async def _hedged_attempt(runnable, inputs, model: str, timeout: float, config: dict | None):
+    """
+    primary 요청이 p95 지연 안에 끝나지 않으면 backup 요청을 보내고, 먼저 성공한 응답을 사용한다.
+    나머지 요청은 취소한다.
+    """
+    counters = _counters[model]
+    start = time.monotonic()
+    started = asyncio.Event()
+    primary = asyncio.create_task(_attempt(runnable, inputs, model, timeout, config, started))
+
+    # 세마포어 대기 시간은 hedge 지연에 포함하지 않는다. (대기열에서 백업 요청을 보내봐야 같이 기다릴 뿐이다)
+    waiter = asyncio.create_task(started.wait())
+    await asyncio.wait({primary, waiter}, return_when=asyncio.FIRST_COMPLETED)
+    waiter.cancel()
+    if not primary.done():
+        await asyncio.wait({primary}, timeout=_hedge_delay(model))
+    if primary.done():
+        return primary.result()
+
+    remaining = timeout - (time.monotonic() - start)
+    if remaining <= 0:
+        return await primary
+
+    counters["hedged"] += 1
+    backup = asyncio.create_task(_attempt(runnable, inputs, model, remaining, config))
+    pending = {primary, backup}
+    last_exc = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is backup:
+                        counters["hedge_wins"] += 1
+                    return task.result()
+                last_exc = task.exception()
+        raise last_exc
+    finally:
+        for task in pending:
+            task.cancel()
+
+async def ainvoke_chain(
+    runnable,
+    inputs: dict,
+    model: str,
+    *,
+    deadline: float | None = None,
+    max_retries: int | None = None,
+    hedge: bool | None = None,
+    config: dict | None = None,
+):
+    """
+    LCEL 체인(runnable)을 모델별 동시성 제한, 마감 시간, 지터 재시도, (선택) hedging 정책으로 비동기 실행한다.
+    세마포어가 백그라운드 루프에 묶여 있으므로 외부에서는 submit_chain / invoke_chain 을 통해 호출한다.
+
+    :param runnable: ainvoke를 지원하는 LangChain Runnable
+    :param dict inputs: 체인 입력
+    :param str model: 세마포어/카운터를 구분할 모델 이름
+    :param float deadline: time.monotonic() 기준 절대 마감 시각. None이면 지금부터 LLM_DEADLINE_S.
+    :param int max_retries: 재시도 횟수. None이면 LLM_MAX_RETRIES.
+    :param bool hedge: hedged request 사용 여부. None이면 LLM_HEDGE.
+    :param dict config: runnable에 전달할 RunnableConfig (callbacks 등)
+    :return: 체인 출력
+    """
+    counters = _counters[model]
+    counters["calls"] += 1
+    deadline = deadline if deadline is not None else time.monotonic() + LLM_DEADLINE_S
+    max_retries = LLM_MAX_RETRIES if max_retries is None else max_retries
+    hedge = LLM_HEDGE if hedge is None else hedge
+    call = _hedged_attempt if hedge else _attempt
+
+    last_exc = None
+    for attempt in range(max_retries + 1):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            return await call(runnable, inputs, model, min(remaining, LLM_ATTEMPT_TIMEOUT_S), config)
+        except asyncio.TimeoutError as e:
+            counters["timeouts"] += 1
+            last_exc = e
+        except Exception as e:
+            if not _is_retryable(e):
+                counters["errors"] += 1
+                raise
+            last_exc = e
+
+        if attempt == max_retries:
+            break
+        delay = _backoff(attempt)
+        if time.monotonic() + delay >= deadline:
+            break
+        counters["retries"] += 1
+        print(f"🔁 LLM 재시도 ({model}, attempt={attempt + 1}): {type(last_exc).__name__}")
+        await asyncio.sleep(delay)
+
+    counters["errors"] += 1
+    if last_exc is None or isinstance(last_exc, asyncio.TimeoutError):
+        raise LLMTimeoutError(f"LLM call to {model} exceeded its deadline")
+    raise last_exc
+
+def submit_chain(runnable, inputs: dict, model: str, *, label: str | None = None, **kwargs) -> concurrent.futures.Future:
+    """
+    ainvoke_chain을 백그라운드 이벤트 루프에 제출한다.
+    호출 스레드의 usage_scope(thread_id, node)에 귀속되는 토큰/지연 집계 콜백을 함께 붙인다.
+    다른 이벤트 루프(예: FastAPI)에서는 `await asyncio.wrap_future(submit_chain(...))` 로 기다린다.
+
+    :param str label: 집계용 호출 이름 (예: extract_keywords, translate, rag_judge)
+    """
+    config = dict(kwargs.pop("config", None) or {})
+    config["callbacks"] = [*(config.get("callbacks") or []), *usage_callbacks(model, label)]
+    return asyncio.run_coroutine_threadsafe(ainvoke_chain(runnable, inputs, model, config=config, **kwargs), _get_loop())
+
+def invoke_chain(runnable, inputs: dict, model: str, **kwargs):
+    """동기 코드(그래프 노드)에서 사용하는 ainvoke_chain 래퍼. 결과가 나올 때까지 기다린다."""
+    return submit_chain(runnable, inputs, model, **kwargs).result()
+
+def get_llm_counters() -> dict:
+    """모델별 호출 카운터와 현재 hedge 지연(p95) 스냅샷을 반환한다."""
+    snapshot = {}
+    for model, counters in list(_counters.items()):
+        snapshot[model] = {**counters, "hedge_delay_s": round(_hedge_delay(model), 3)}
+    return snapshot
+
+if __name__ == "__main__":
+    # 로컬 fake OpenAI 호환 서버로 동작 확인:
+    #   python benchmarks/fake_openai_server.py --port 8090 --fail-rate 0.1
+    #   UPSTAGE_BASE_URL=http://127.0.0.1:8090/v1 python -m services.rag_api.src.core.llm_client
+    from langchain_core.prompts import ChatPromptTemplate
+    from langchain_core.output_parsers import StrOutputParser
+
+    prompt = ChatPromptTemplate.from_messages([("human", "{question}")])
+    chain = prompt | make_chat_model("solar-pro2", "fake-key") | StrOutputParser()
+
+    async def main():
+        futures = [asyncio.wrap_future(submit_chain(chain, {"question": f"q{i}"}, "solar-pro2", hedge=True)) for i in range(50)]
+        results = await asyncio.gather(*futures, return_exceptions=True)
+        failed = sum(isinstance(r, BaseException) for r in results)
+        print(f"done: {len(results) - failed} ok, {failed} failed")
+        print(get_llm_counters())
+
+    asyncio.run(main())
@@ -0,0 +1,280 @@
+"""
+후속 논문 다중 소스 검색 (graph/nodes.py 의 _retrieve_follow_up_ids 에서 사용).
+
+로컬 DB(기준 논문을 인용한 논문 중 벡터 검색, RETRIEVAL_HYBRID면 + 전문 검색, RERANK_ENABLED면 cross-encoder로 재순위), OpenAlex(cites:기준 논문 + search=질문),
+Tavily(웹 검색)를 동시에 조회하고, 결과를 하나의 논문 dict 형식(normalize_*)으로 맞춘 뒤
+DOI 또는 정규화한 제목이 같은 논문을 합치고 reciprocal rank fusion(RRF)으로 순위를 매긴다.
+
+소스마다 전용 스레드 풀과 마감 시간(RETRIEVAL_*_TIMEOUT_S, 작업이 실행되기 시작한 시점부터)이 있고,
+전체 검색은 RETRIEVAL_BUDGET_S 안에 끝난다. 마감까지 끝나지 않은 소스는 결과 없이 진행한다.
+외부 소스(OpenAlex, Tavily)는 남은 시간을 HTTP 타임아웃으로 넘기고 재시도하지 않으므로, 시간 초과된 작업도 곧 워커를 돌려준다.
+"""
+import hashlib
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.abspath(__file__), "..", "..", "..", "..", ".."))
+sys.path.append(ROOT_DIR)
+
+from db.dedup import normalize_doi
+from db.meta_openalex import iter_work_pages, parse_work
+from db.util import norm
+
+from services.rag_api.src.config import (
+    RETRIEVAL_SOURCES,
+    RETRIEVAL_BUDGET_S,
+    RETRIEVAL_DB_TIMEOUT_S,
+    RETRIEVAL_OPENALEX_TIMEOUT_S,
+    RETRIEVAL_TAVILY_TIMEOUT_S,
+    RETRIEVAL_PER_SOURCE_K,
+    RETRIEVAL_RRF_K,
+    RETRIEVAL_WORKERS_PER_SOURCE,
+    CITING_HARVEST_ENABLED,
+    CITING_HARVEST_WAIT_S,
+    RERANK_ENABLED,
+    RERANK_CANDIDATES,
+    RETRIEVAL_HYBRID,
+    RETRIEVAL_HYBRID_POOL,
+)
+from services.rag_api.src.core.paper_cache import WEB_ID_PREFIX
+from services.rag_api.src.core.reranker import get_reranker
+from services.rag_api.src.core.source_api import tavily_search, openalex_bucket
+from services.rag_api.src.util import timed
+
+# DB 소스에서 인용 논문 수집을 기다린 뒤 검색 SQL에 남겨 둘 시간(초)
+_DB_SELECT_RESERVE_S = 1.0
+OPENALEX_SELECT = "id,display_name,publication_date,doi,cited_by_count,abstract_inverted_index,authorships,primary_location"
+_DOI_IN_URL_RE = re.compile(r"(10\.\d{4,9}/[^\s?#&]+)")
+
+# -----------------------------
+# 결과 정규화: 모든 소스를 papers 행과 같은 키의 dict로 맞춘다. (+ source, url)
+# -----------------------------
+def normalize_db_row(row: dict) -> dict:
+    return {
+        "openalex_id": row["openalex_id"],
+        "title": row.get("title"),
+        "abstract": row.get("abstract") or "",
+        "doi": row.get("doi"),
+        "published": row.get("published"),
+        "authors": row.get("authors"),
+        "cited_by_count": row.get("cited_by_count"),
+        "pdf_url": row.get("pdf_url"),
+        "url": None,
+        "source": "db",
+    }
+
+def normalize_openalex_work(work: dict) -> dict | None:
+    row, _ = parse_work(work)
+    if row is None:
+        return None
+    return {
+        **{k: row[k] for k in ("openalex_id", "title", "abstract", "doi", "authors", "cited_by_count", "pdf_url")},
+        "published": row.get("publication_date"),
+        "url": f"https://openalex.org/{row['openalex_id']}",
+        "source": "openalex",
+    }
+
+def normalize_tavily_result(result: dict) -> dict | None:
+    """Tavily 결과는 openalex_id가 없으므로 URL 해시로 "web:" id를 만든다. (paper_cache 키)"""
+    url = result.get("url") or ""
+    if not url or not result.get("content"):
+        return None
+    doi = _DOI_IN_URL_RE.search(url)
+    return {
+        "openalex_id": WEB_ID_PREFIX + hashlib.md5(url.encode("utf-8")).hexdigest()[:16],
+        "title": result.get("title") or url,
+        "abstract": result.get("content"),
+        "doi": doi.group(1) if doi else None,
+        "published": None,
+        "authors": None,
+        "cited_by_count": None,
+        "pdf_url": url if url.lower().endswith(".pdf") else None,
+        "url": url,
+        "source": "tavily",
+    }
+
+# -----------------------------
+# 소스별 검색 함수: (paper_info, query, k, deadline, cancel_event, timings) -> 정규화된 논문 리스트 (관련도 순)
+# -----------------------------
+def search_db(paper_info: dict, query: str, k: int, deadline: float, cancel_event: threading.Event | None, timings: dict) -> list[dict]:
+    from services.rag_api.src.core.database import mock_db_follow_up_select, db_follow_up_hybrid_select
+    from services.rag_api.src.core.get_emb import get_emb_model, get_emb
+    from services.rag_api.src.core.citing_harvest import wait_for_citing_harvest
+
+    with timed(timings, "embed_query"):
+        query_vec = get_emb(get_emb_model(), [query])[0]
+    if CITING_HARVEST_ENABLED:
+        # 수집이 진행 중이면 기다리되, 마감 전에 검색할 시간은 남긴다.
+        wait_s = min(CITING_HARVEST_WAIT_S, max(0.0, deadline - time.monotonic() - _DB_SELECT_RESERVE_S))
+        with timed(timings, "wait_citing_harvest"):
+            wait_for_citing_harvest(paper_info["openalex_id"], wait_s, cancel_event)
+    if cancel_event is not None and cancel_event.is_set():
+        print("🛑 후속 논문 검색 취소 (임베딩 이후)")
+        return []
+    # rerank를 켜면 더 큰 후보 풀을 가져와 cross-encoder로 다시 정렬한다. (core/reranker.py)
+    n = RERANK_CANDIDATES if RERANK_ENABLED else k
+    with timed(timings, "follow_up_select"):
+        if RETRIEVAL_HYBRID:
+            rows = db_follow_up_hybrid_select(paper_info, query_vec, query, n, pool=RETRIEVAL_HYBRID_POOL, rrf_k=RETRIEVAL_RRF_K)
+        else:
+            rows = mock_db_follow_up_select(paper_info, query_vec, n)
+    docs = [normalize_db_row(r) for r in rows]
+    if RERANK_ENABLED and len(docs) > k:
+        docs = get_reranker().rerank(query, docs, k, timings)
+    return docs[:k]
+
+def _remaining(deadline: float) -> float:
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise TimeoutError("source deadline exceeded")
+    return remaining
+
+def search_openalex(paper_info: dict, query: str, k: int, deadline: float, cancel_event: threading.Event | None, timings: dict) -> list[dict]:
+    filters = {"cites": paper_info["openalex_id"], "has_abstract": "true", "is_paratext": "false"}
+    # 속도 제한 대기와 HTTP 요청 모두 마감 안에서만 한다. (재시도/Retry-After 대기 없음)
+    openalex_bucket.acquire(max_wait=_remaining(deadline))
+    pages = iter_work_pages(query, filters, OPENALEX_SELECT, per_page=k, rps_sleep=0, timeout=_remaining(deadline), retries=False)
+    works, _ = next(pages)
+    return [doc for doc in map(normalize_openalex_work, works[:k]) if doc is not None]
+
+def search_tavily(paper_info: dict, query: str, k: int, deadline: float, cancel_event: threading.Event | None, timings: dict) -> list[dict]:
+    key = os.getenv("TAVILY_SEARCH")
+    search_query = f'{query} (follow-up research of the paper "{paper_info["title"]}")'
+    results = tavily_search(key, search_query, max_results=k, timeout=_remaining(deadline))
+    return [doc for doc in map(normalize_tavily_result, results[:k]) if doc is not None]
+
+SOURCES = {
+    "db": (search_db, RETRIEVAL_DB_TIMEOUT_S),
+    "openalex": (search_openalex, RETRIEVAL_OPENALEX_TIMEOUT_S),
+    "tavily": (search_tavily, RETRIEVAL_TAVILY_TIMEOUT_S),
+}
+# 소스별 조회 스레드 풀 (요청 간 공유). 느린 소스의 작업이 다른 소스의 작업을 대기열에 세우지 않는다.
+_source_pools = {
+    name: ThreadPoolExecutor(max_workers=RETRIEVAL_WORKERS_PER_SOURCE, thread_name_prefix=f"source_{name}") for name in SOURCES
+}
+
+def enabled_sources(sources: list[str] | None = None) -> list[str]:
+    """설정된 소스 중 사용할 수 있는 소스만 남긴다. (Tavily는 TAVILY_SEARCH 키가 있을 때만)"""
+    names = [s for s in (sources or RETRIEVAL_SOURCES) if s in SOURCES]
+    if "tavily" in names and not os.getenv("TAVILY_SEARCH"):
+        names.remove("tavily")
+    return names
+
+# -----------------------------
+# 병합 + 순위
+# -----------------------------
+def dedup_keys(doc: dict) -> list[str]:
+    """같은 논문 판단에 사용하는 키: 정규화한 DOI와 정규화한 제목 (둘 중 하나라도 같으면 같은 논문)"""
+    keys = []
+    if doi := normalize_doi(doc.get("doi")):
+        keys.append(f"doi:{doi}")
+    if title := norm(doc.get("title") or ""):
+        keys.append(f"title:{title}")
+    return keys
+
+def merge_and_rank(results: dict[str, list[dict]], top_k: int, rrf_k: int = RETRIEVAL_RRF_K) -> list[dict]:
+    """
+    소스별 결과(관련도 순)를 DOI/정규화 제목으로 합치고 RRF 점수 순으로 top_k개를 반환한다.
+    score = sum(1 / (rrf_k + rank)), rank는 소스 안에서의 순위(1부터). 합쳐진 논문은 SOURCES 순서상 앞선 소스(db)의
+    레코드를 기준으로 빈 필드만 다른 소스 값으로 채우고, sources에 모든 소스를 기록한다.
+
+    :param dict results: {source: [정규화된 논문, ...]}
+    :param int top_k: 반환할 논문 수
+    :param int rrf_k: RRF 상수 (클수록 하위 순위의 영향이 커진다)
+    """
+    merged: list[dict] = []
+    scores: list[float] = []
+    index: dict[str, int] = {} # dedup key -> merged 위치
+    for source in sorted(results, key=lambda s: list(SOURCES).index(s) if s in SOURCES else len(SOURCES)):
+        seen = set()
+        for rank, doc in enumerate(results[source], start=1):
+            keys = dedup_keys(doc)
+            if not keys:
+                continue
+            pos = next((index[k] for k in keys if k in index), None)
+            if pos is None:
+                pos = len(merged)
+                merged.append({**doc, "sources": [source]})
+                scores.append(0.0)
+            elif pos in seen:
+                continue # 같은 소스 안의 중복은 높은 순위만 센다.
+            else:
+                base = merged[pos]
+                for field, value in doc.items():
+                    if base.get(field) in (None, "") and value not in (None, ""):
+                        base[field] = value
+                base["sources"].append(source)
+            seen.add(pos)
+            scores[pos] += 1.0 / (rrf_k + rank)
+            for k in dedup_keys(merged[pos]) + keys:
+                index.setdefault(k, pos)
+    ranked = sorted(range(len(merged)), key=lambda pos: scores[pos], reverse=True)[:top_k]
+    return [{**merged[pos], "rrf_score": round(scores[pos], 5)} for pos in ranked]
+
+def multi_source_retrieve(
+    paper_info: dict,
+    query: str,
+    top_k: int,
+    cancel_event: threading.Event | None = None,
+    timings: dict | None = None,
+    sources: list[str] | None = None,
+    budget_s: float = RETRIEVAL_BUDGET_S,
+) -> list[dict]:
+    """
+    소스들을 동시에 조회해 합친 후속 논문 리스트(RRF 순)를 반환한다.
+    각 소스는 실행을 시작한 시점부터 소스 마감 시간 안에, 그리고 전체 budget_s 안에 끝나야 결과에 포함된다.
+    풀 대기열에서 기다린 시간은 소스 마감 시간에 포함하지 않는다. 실패/시간 초과 소스는 건너뛴다.
+
+    :param dict paper_info: 기준 논문 paper_ref (openalex_id, title 포함)
+    :param str query: 검색 질문
+    :param int top_k: 반환할 논문 수
+    :param threading.Event cancel_event: set 되면 결과를 버리고 빈 리스트를 반환한다. (speculative 모드)
+    :param dict timings: 소스별 실행 시간(ms)을 기록할 딕셔너리 (완료된 소스만, 시간 초과 소스는 *_timeout)
+    :param list sources: 조회할 소스 (기본값: config.RETRIEVAL_SOURCES)
+    :param float budget_s: 전체 검색 마감 시간(초)
+    :return list: 정규화된 논문 dict 리스트 (sources, rrf_score 포함)
+    """
+    timings = timings if timings is not None else {}
+    start = time.monotonic()
+    budget_deadline = start + budget_s
+    jobs = {}
+    for name in enabled_sources(sources):
+        fn, timeout_s = SOURCES[name]
+        job = {"started": threading.Event(), "deadline": budget_deadline, "timings": {}}
+
+        def run(fn=fn, timeout_s=timeout_s, job=job):
+            job["deadline"] = min(time.monotonic() + timeout_s, budget_deadline)
+            job["started"].set()
+            with timed(job["timings"], "total"):
+                return fn(paper_info, query, RETRIEVAL_PER_SOURCE_K, job["deadline"], cancel_event, job["timings"])
+        job["future"] = _source_pools[name].submit(run)
+        jobs[name] = job
+
+    results = {}
+    for name, job in jobs.items():
+        future = job["future"]
+        try:
+            if not job["started"].wait(max(0.0, budget_deadline - time.monotonic())):
+                raise FutureTimeoutError
+            results[name] = future.result(timeout=max(0.0, job["deadline"] - time.monotonic()))
+        except FutureTimeoutError:
+            queued = not job["started"].is_set()
+            future.cancel()
+            print(f"⚠️ {name} 검색 시간 초과({'대기열' if queued else '실행'}): 결과 없이 진행합니다.")
+            timings[f"{name}_timeout"] = round((time.monotonic() - start) * 1000, 1)
+            continue
+        except Exception as e:
+            print(f"⚠️ {name} 검색 실패: {e}")
+            continue
+        # 완료된 소스의 단계별 시간만 복사한다. (시간 초과된 작업은 나중에도 job["timings"]를 바꿀 수 있음)
+        timings.update({(f"{name}_total" if k == "total" else k): v for k, v in job["timings"].items()})
+    if cancel_event is not None and cancel_event.is_set():
+        return []
+    docs = merge_and_rank(results, top_k)
+    print(f"🔎 다중 소스 검색: { {name: len(docs_) for name, docs_ in results.items()} } -> {len(docs)}개 "
+          f"({(time.monotonic() - start) * 1000:.0f}ms)")
+    return docs
@@ -0,0 +1,109 @@
+"""
+그래프 state에는 논문을 id와 작은 메타데이터(paper_ref)로만 저장하고, 초록 등 무거운 필드는 이 캐시에서 필요할 때 가져온다.
+체크포인터는 매 단계 state 전체를 직렬화하므로, 임베딩(1024 float)이나 Document 리스트를 state에 두지 않는다.
+
+- 노드가 DB/OpenAlex에서 논문을 읽으면 put()으로 캐시에 넣고 state에는 id만 남긴다.
+- get_papers()는 캐시에 없는 id(다른 워커에서 시작된 thread, 재시작, LRU 제거)를 DB에서 다시 읽는다. (embedding 컬럼 제외)
+  그래서 외부 소스(OpenAlex, Tavily)에서 찾은 논문도 id를 반환하기 전에 DB에 저장한다. (database.db_save_external_papers)
+"""
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.abspath(__file__), "..", "..", "..", "..", ".."))
+sys.path.append(ROOT_DIR)
+
+from langchain_core.documents import Document
+
+from services.rag_api.src.config import PAPER_CACHE_SIZE
+from services.rag_api.src.util import convert_to_documents
+
+# 웹 검색(Tavily) 결과 id 접두사. 이 id의 문서는 papers 대신 web_docs 테이블에 저장한다.
+WEB_ID_PREFIX = "web:"
+
+# state에 저장하는 논문 메타데이터 필드 (paper_ref)
+PAPER_REF_FIELDS = ("openalex_id", "title", "doi", "published", "cited_by_count")
+
+def paper_ref(row: dict | None) -> dict | None:
+    """
+    DB 행 또는 openalex_search 결과를 state에 저장할 작은 메타데이터로 줄인다.
+    발행일은 DB(published, datetime)와 OpenAlex(publication_date, str) 모두 "YYYY-MM-DD" 문자열로 맞춘다.
+    """
+    if not row:
+        return None
+    ref = {field: row.get(field) for field in PAPER_REF_FIELDS}
+    published = row.get("published") or row.get("publication_date")
+    ref["published"] = str(published)[:10] if published else None
+    return ref
+
+class PaperCache:
+    """
+    openalex_id -> 논문 정보(embedding 제외) LRU 캐시. 여러 스레드(노드, 증강 브랜치)에서 함께 사용한다.
+
+    :param int max_items: 보관할 최대 논문 수
+    """
+
+    def __init__(self, max_items: int = PAPER_CACHE_SIZE):
+        self.max_items = max_items
+        self._items: OrderedDict[str, dict] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def put(self, rows: list[dict]) -> list[str]:
+        """논문들을 캐시에 넣고 openalex_id 리스트를 (입력 순서대로) 반환한다."""
+        ids = []
+        with self._lock:
+            for row in rows:
+                openalex_id = row.get("openalex_id")
+                if not openalex_id:
+                    continue
+                self._items[openalex_id] = {k: v for k, v in row.items() if k != "embedding"}
+                self._items.move_to_end(openalex_id)
+                ids.append(openalex_id)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+        return ids
+
+    def get_many(self, ids: list[str]) -> dict[str, dict]:
+        """캐시에 있는 논문만 {openalex_id: 논문 정보} 로 반환한다."""
+        found = {}
+        with self._lock:
+            for openalex_id in ids:
+                row = self._items.get(openalex_id)
+                if row is not None:
+                    self._items.move_to_end(openalex_id)
+                    found[openalex_id] = row
+            self.hits += len(found)
+            self.misses += len(set(ids) - set(found))
+        return found
+
+    def get_papers(self, ids: list[str], loader=None) -> list[dict]:
+        """
+        ids 순서대로 논문 정보를 반환한다. 캐시에 없는 논문은 loader(기본값: DB 조회)로 읽어 캐시에 넣는다.
+        DB에도 없는 id는 결과에서 빠진다.
+        """
+        found = self.get_many(ids)
+        missing = [i for i in dict.fromkeys(ids) if i not in found]
+        if missing:
+            if loader is None:
+                from services.rag_api.src.core.database import db_select_papers as loader
+            rows = loader(missing)
+            self.put(rows)
+            found.update({row["openalex_id"]: row for row in rows})
+        return [found[i] for i in ids if i in found]
+
+    def get_documents(self, ids: list[str]) -> list[Document]:
+        """답변 생성용 Document 리스트 (page_content=초록)."""
+        return convert_to_documents(self.get_papers(ids))
+
+_cache: PaperCache | None = None
+_cache_lock = threading.Lock()
+
+def get_paper_cache() -> PaperCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = PaperCache()
+    return _cache
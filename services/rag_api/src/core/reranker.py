@@ -0,0 +1,157 @@
+"""
+후속 논문 후보 재순위(rerank) 단계 (core/multi_source.py 의 DB 소스에서 사용).
+
+DB에서 코사인 거리 순으로 RERANK_CANDIDATES 개의 후보를 가져오고, 작은 cross-encoder(CPU)로
+(질문, 제목 + 초록) 쌍을 한 번의 배치 예측으로 점수화해 상위 k개를 남긴다.
+
+- 점수는 (질문, 논문) 쌍 단위로 LRU 캐시에 저장한다. (같은 질문의 재시도, 증강 질문과 겹치는 후보)
+- RERANK_BUDGET_MS 안에 끝나도록 쌍 1개당 예측 시간(지수 이동 평균)으로 이번에 점수화할 후보 수를 정한다.
+  점수화하지 못한 후보는 점수화된 후보 뒤에 원래(코사인) 순서대로 붙는다.
+- 모델은 그래프 빌드 시(graph/builder.py) 미리 로드하고 예측을 한 번 실행해 둔다. (warm_up)
+"""
+import hashlib
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.abspath(__file__), "..", "..", "..", "..", ".."))
+sys.path.append(ROOT_DIR)
+
+from services.rag_api.src.config import (
+    RERANK_MODEL,
+    RERANK_MAX_LENGTH,
+    RERANK_BATCH_SIZE,
+    RERANK_BUDGET_MS,
+    RERANK_MIN_SCORED,
+    RERANK_INITIAL_PAIR_MS,
+    RERANK_CACHE_SIZE,
+)
+
+# 문서 텍스트 최대 글자 수 (토크나이저가 RERANK_MAX_LENGTH 토큰으로 자르기 전에 미리 줄여 토큰화 비용을 줄인다)
+MAX_DOC_CHARS = 2000
+
+def query_key(query: str) -> str:
+    return hashlib.sha1(" ".join(query.split()).casefold().encode("utf-8")).hexdigest()
+
+def doc_text(doc: dict) -> str:
+    return f"{doc.get('title') or ''}. {doc.get('abstract') or ''}"[:MAX_DOC_CHARS]
+
+class ScoreCache:
+    """(질문 해시, openalex_id) -> cross-encoder 점수 LRU 캐시"""
+
+    def __init__(self, max_items: int = RERANK_CACHE_SIZE):
+        self.max_items = max_items
+        self._items: OrderedDict[tuple[str, str], float] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, qkey: str, ids: list[str]) -> dict[str, float]:
+        found = {}
+        with self._lock:
+            for openalex_id in ids:
+                score = self._items.get((qkey, openalex_id))
+                if score is not None:
+                    self._items.move_to_end((qkey, openalex_id))
+                    found[openalex_id] = score
+        return found
+
+    def put_many(self, qkey: str, scores: dict[str, float]):
+        with self._lock:
+            for openalex_id, score in scores.items():
+                self._items[(qkey, openalex_id)] = score
+                self._items.move_to_end((qkey, openalex_id))
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+
+class CrossEncoderReranker:
+    """
+    :param str model_name: sentence-transformers CrossEncoder 모델 이름
+    :param float budget_ms: rerank 1회의 CPU 예측 시간 예산(ms). 0이면 모든 후보를 점수화한다.
+    :param model: 테스트/벤치마크용으로 미리 만든 모델 (predict(pairs, batch_size=...) 지원). 없으면 처음 사용할 때 로드한다.
+    """
+
+    def __init__(self, model_name: str = RERANK_MODEL, budget_ms: float = RERANK_BUDGET_MS, model=None):
+        self.model_name = model_name
+        self.budget_ms = budget_ms
+        self.cache = ScoreCache()
+        self._model = model
+        self._model_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.pair_ms = RERANK_INITIAL_PAIR_MS # 쌍 1개당 예측 시간(ms) 추정치
+
+    def get_model(self):
+        with self._model_lock:
+            if self._model is None:
+                from sentence_transformers import CrossEncoder
+
+                print(f"🧠 rerank 모델 로드: {self.model_name}")
+                self._model = CrossEncoder(self.model_name, max_length=RERANK_MAX_LENGTH, device="cpu")
+        return self._model
+
+    def warm_up(self):
+        """모델을 로드하고 작은 예측을 한 번 실행한다. (첫 요청의 rerank 시간과 DB 소스 마감 시간에 모델 로드가 들어가지 않도록 시작 시 호출)"""
+        self.get_model().predict([("warm up", "warm up")], show_progress_bar=False)
+
+    def max_scored(self) -> int:
+        """이번 호출에서 점수화할 수 있는 최대 후보 수 (예산 / 쌍당 시간)"""
+        if self.budget_ms <= 0:
+            return sys.maxsize
+        return max(RERANK_MIN_SCORED, int(self.budget_ms / max(self.pair_ms, 1e-3)))
+
+    def score(self, query: str, docs: list[dict]) -> list[float]:
+        """캐시 없이 (query, doc) 쌍을 한 번의 배치 예측으로 점수화한다."""
+        if not docs:
+            return []
+        # 모델 로드 시간이 쌍당 시간 추정치(pair_ms)에 섞이지 않도록 측정 전에 로드한다.
+        model = self.get_model()
+        start = time.perf_counter()
+        scores = model.predict([(query, doc_text(d)) for d in docs], batch_size=RERANK_BATCH_SIZE, show_progress_bar=False)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        with self._stats_lock:
+            # 큰 배치일수록 쌍당 시간 추정이 정확하므로 배치 크기만큼 가중한다.
+            weight = min(1.0, len(docs) / 64)
+            self.pair_ms = (1 - 0.5 * weight) * self.pair_ms + 0.5 * weight * (elapsed_ms / len(docs))
+        return [float(s) for s in scores]
+
+    def rerank(self, query: str, candidates: list[dict], top_k: int, timings: dict | None = None) -> list[dict]:
+        """
+        후보(1단계 순서)를 cross-encoder 점수로 다시 정렬해 top_k개를 반환한다. 각 논문에 rerank_score를 넣는다.
+
+        :param str query: 사용자 질문
+        :param list candidates: openalex_id, title, abstract를 가진 논문 dict 리스트 (1단계 관련도 순)
+        :param int top_k: 반환할 논문 수
+        :param dict timings: rerank 시간(ms)과 후보/캐시/점수화/건너뜀 수를 기록할 딕셔너리
+        """
+        timings = timings if timings is not None else {}
+        start = time.perf_counter()
+        qkey = query_key(query)
+        ids = [d["openalex_id"] for d in candidates]
+        scores = self.cache.get_many(qkey, ids)
+        uncached = [d for d in candidates if d["openalex_id"] not in scores]
+        # 예산을 넘는 후보는 1단계 순위가 낮은 쪽부터 점수화하지 않는다.
+        to_score = uncached[:self.max_scored()]
+        new_scores = dict(zip((d["openalex_id"] for d in to_score), self.score(query, to_score)))
+        self.cache.put_many(qkey, new_scores)
+        scores.update(new_scores)
+
+        scored = sorted((d for d in candidates if d["openalex_id"] in scores), key=lambda d: scores[d["openalex_id"]], reverse=True)
+        unscored = [d for d in candidates if d["openalex_id"] not in scores]
+        ranked = [{**d, "rerank_score": round(scores[d["openalex_id"]], 4)} for d in scored] + unscored
+
+        timings["rerank"] = round((time.perf_counter() - start) * 1000, 1)
+        timings["rerank_candidates"] = len(candidates)
+        timings["rerank_cached"] = len(candidates) - len(uncached)
+        timings["rerank_scored"] = len(to_score)
+        timings["rerank_skipped"] = len(unscored)
+        return ranked[:top_k]
+
+_reranker: CrossEncoderReranker | None = None
+_reranker_lock = threading.Lock()
+
+def get_reranker() -> CrossEncoderReranker:
+    global _reranker
+    with _reranker_lock:
+        if _reranker is None:
+            _reranker = CrossEncoderReranker()
+    return _reranker
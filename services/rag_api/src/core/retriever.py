@@ -1,11 +1,15 @@
-import functools
+import re
+from concurrent.futures import ThreadPoolExecutor, wait
+import requests
 from typing import List
 from langchain_core.prompts import ChatPromptTemplate
 from pydantic import BaseModel, Field
 from langchain_core.output_parsers import StrOutputParser, JsonOutputParser
-from langchain_upstage import ChatUpstage
-from langchain_tavily import TavilySearch
-from langchain_community.tools.tavily_search import TavilyAnswer # TavilyAnswer는 질문에 대한 직접적인 답변을 생성
+from .llm_client import make_chat_model, invoke_chain
+from .source_api import tavily_search
+from .definition_cache import get_definition_cache
+from .glossary import get_glossary
+from ..config import TAVILY_MAX_WORKERS, TAVILY_TIMEOUT_S, AUGMENT_COMBINED
 
 import os 
 from dotenv import load_dotenv
@@ -24,8 +28,83 @@ class Keywords(BaseModel):
     """A list of keywords extracted from the user's question."""
     keywords: List[str] = Field(description="사용자 질문에서 추출된 핵심 키워드 리스트")
 
+class KeywordsTranslation(BaseModel):
+    """Keywords extracted from the user's question and its English translation."""
+    keywords: List[str] = Field(description="English keywords exactly as they appear in the translation")
+    translation: str = Field(description="The user's question translated into English")
 
-def augment_prompt(question: str, llm_api_key: str, tavily_search_key: str) -> str:
+
+# 키워드 정의 검색 전용 스레드 풀 (요청 간 공유, 동시 Tavily 호출 수 상한)
+_tavily_pool = ThreadPoolExecutor(max_workers=TAVILY_MAX_WORKERS, thread_name_prefix="tavily")
+
+def _search_definition(tavily_search_key: str, keyword: str) -> str:
+    # 각 키워드에 대한 한 줄 정의를 얻기 위해 구체적인 쿼리 생성
+    search_query = f'Machine Learning, Deep Learning, AI와 관련하여 "{keyword}"에 대한 한 줄 정의'
+    # 타임아웃은 HTTP 요청 자체에 걸린다. (풀 대기 시간은 포함하지 않고, 시간 초과된 호출이 워커를 계속 잡고 있지 않음)
+    results = tavily_search(tavily_search_key, search_query, max_results=1, timeout=TAVILY_TIMEOUT_S)
+    # 검색 결과가 있고, content 키가 존재하면 정의 추출
+    if results and 'content' in results[0]:
+        return results[0]['content']
+    return ""
+
+def lookup_keyword_definitions(keywords: List[str], tavily_search_key: str) -> dict:
+    """
+    키워드별 한 줄 정의를 구한다.
+    1. 오프라인으로 만든 ML 용어집(core/glossary.py)에서 먼저 찾는다. (정확 일치 -> 임베딩 유사도)
+    2. 용어집에 없는 키워드는 정규화된 키워드로 영속 캐시를 조회한다.
+    3. 캐시에도 없는 키워드만 bounded 스레드 풀에서 동시에 Tavily로 검색한다. (호출마다 TAVILY_TIMEOUT_S 초과 시 빈 정의)
+    4. 웹에서 찾은 비어 있지 않은 정의만 캐시에 저장한다.
+
+    :param List[str] keywords: 키워드 리스트
+    :param str tavily_search_key: Tavily API Key
+    :return dict: {keyword: definition}, 정의를 구하지 못한 키워드는 ""
+    """
+    keyword_definitions = {keyword: "" for keyword in keywords}
+    try:
+        from_glossary = get_glossary().lookup(keywords)
+    except Exception as e:
+        print(f"⚠️ 용어집 조회 실패: {e}")
+        from_glossary = {}
+    keyword_definitions.update(from_glossary)
+    remaining = [k for k in keywords if k not in from_glossary]
+
+    cache = get_definition_cache()
+    cached = cache.get_many(remaining)
+    keyword_definitions.update(cached)
+    misses = [k for k in remaining if k not in cached]
+    print(f"✅ 용어집 hit: {len(from_glossary)}, 정의 캐시 hit: {len(cached)}, 웹 검색: {len(misses)}")
+    if not misses:
+        return keyword_definitions
+
+    futures = {_tavily_pool.submit(_search_definition, tavily_search_key, keyword): keyword for keyword in misses}
+    # 각 호출은 HTTP 타임아웃으로 끝나므로 전체 배치에는 별도 마감을 두지 않는다.
+    wait(futures)
+    for future, keyword in futures.items():
+        try:
+            definition = future.result()
+        except requests.Timeout:
+            print(f"⚠️ Tavily 검색 시간 초과: {keyword}")
+            continue
+        except Exception as e:
+            print(f"⚠️ Tavily 검색 실패 ({keyword}): {e}")
+            continue
+        keyword_definitions[keyword] = definition
+        cache.put(keyword, definition)
+    return keyword_definitions
+
+def augment_prompt(question: str, llm_api_key: str, tavily_search_key: str, combined: bool | None = None) -> str:
+    """
+    사용자 prompt를 키워드 정의로 증강하고 영어로 번역하여 반환한다.
+
+    :param bool combined: True면 augment_prompt_combined(키워드+번역 1회 호출, 영어 질문은 번역 생략),
+        False면 augment_prompt_three_step(키워드 추출 -> 정의 검색 -> 번역). None이면 config.AUGMENT_COMBINED.
+    """
+    combined = AUGMENT_COMBINED if combined is None else combined
+    if combined:
+        return augment_prompt_combined(question, llm_api_key, tavily_search_key)
+    return augment_prompt_three_step(question, llm_api_key, tavily_search_key)
+
+def augment_prompt_three_step(question: str, llm_api_key: str, tavily_search_key: str) -> str:
     """사용자 prompt에서 키워드를 추출하여 tavily search로 증강한 후, 영어로 번역하여 반환하는 함수
     1. Upstage의 solar-mini LLM 모델을 사용해 question으로부터 키워드를 추출하여라. 이때, LLM의 답변이 List[str] 이 되도록 형식을 제한하는 프롬프트를 잘 작성하여라. 또는 Langchain에서 OutputFixingParser와 같은 클래스를 활용하여 출력 형식을 제한하여라.
 
@@ -42,7 +121,7 @@ def augment_prompt(question: str, llm_api_key: str, tavily_search_key: str) -> s
     :return str: augmented prompt & translated to English
     """
     # 1. solar-mini 로 키워드 추출
-    llm_mini = ChatUpstage(api_key=llm_api_key, model='solar-pro2')
+    llm_mini = make_chat_model('solar-pro2', llm_api_key)
     # JSON 형식으로 출력을 파싱하는 파서 설정
     parser = JsonOutputParser(pydantic_object=Keywords)
     # 키워드 추출을 위한 프롬프트 템플릿 정의
@@ -59,30 +138,15 @@ Question: {question}
     # LCEL을 사용해 키워드 추출 체인 구성
     keyword_chain = keyword_prompt | llm_mini | parser
     # 체인 실행
-    response = keyword_chain.invoke({
+    response = invoke_chain(keyword_chain, {
         "question": question,
         "format_instructions": parser.get_format_instructions()
-    })
+    }, model="solar-pro2", label="extract_keywords")
     keywords = response['keywords']
     print(f"✅ 추출된 키워드: {keywords}")
 
-    # --- 2단계: Tavily Search로 각 키워드에 대한 부가설명 검색 ---
-    # Tavily Search 도구 초기화
-    search = TavilySearch(tavily_api_key=tavily_search_key, max_results=1)
-    keyword_definitions = {}
-
-    # print("\n--- 2. 키워드 정의 검색 중... ---")
-    for keyword in keywords:
-        # 각 키워드에 대한 한 줄 정의를 얻기 위해 구체적인 쿼리 생성
-        search_query = f'Machine Learning, Deep Learning, AI와 관련하여 "{keyword}"에 대한 한 줄 정의'
-        search_result = search.invoke(search_query)
-        
-        # 검색 결과가 있고, content 키가 존재하면 정의 추출
-        if search_result and 'content' in search_result['results'][0]:
-            definition = search_result['results'][0]['content']
-            keyword_definitions[keyword] = definition
-        else:
-            keyword_definitions[keyword] = ""
+    # --- 2단계: Tavily Search로 각 키워드에 대한 부가설명 검색 (캐시 + 동시 검색) ---
+    keyword_definitions = lookup_keyword_definitions(keywords, tavily_search_key)
 
     # --- 3단계: keyword:definition pair formatting ---
     keydef_pair = ""
@@ -93,7 +157,7 @@ Question: {question}
     # --- 4단계: Upstage solar-pro2 LLM을 사용하여 영어로 번역 ---
     
     # solar-pro2 모델 초기화
-    llm_pro = ChatUpstage(api_key=llm_api_key, model="solar-pro2")
+    llm_pro = make_chat_model("solar-pro2", llm_api_key)
     
     # 번역을 위한 프롬프트 템플릿 정의
     translate_prompt = ChatPromptTemplate.from_messages([
@@ -116,12 +180,99 @@ Text: {text_to_translate}""")]
     
     print("\n--- 4. 영어로 번역 중... ---")
     # 체인 실행
-    final_result = translate_chain.invoke({"keydef_pair":keydef_pair, "text_to_translate": question})
+    final_result = invoke_chain(translate_chain, {"keydef_pair":keydef_pair, "text_to_translate": question}, model="solar-pro2", label="translate")
     print("✅ 번역 완료!")
     return final_result
 
 
+def is_english(text: str, max_non_ascii_ratio: float = 0.05) -> bool:
+    """
+    로컬 언어 판별: 문자(letter) 중 ASCII가 아닌 문자(한글 등)의 비율이 작으면 영어로 본다.
+    LLM 호출 없이 번역 필요 여부를 결정하기 위해 사용한다.
+    """
+    letters = [c for c in text if c.isalpha()]
+    if not letters:
+        return True
+    non_ascii = sum(1 for c in letters if not c.isascii())
+    return non_ascii / len(letters) <= max_non_ascii_ratio
+
+def insert_definitions(text: str, keyword_definitions: dict) -> str:
+    """
+    영어 문장에서 각 키워드가 처음 등장하는 위치 뒤에 괄호로 정의를 붙인다.
+    위치는 모두 원문에서 찾은 뒤 뒤쪽부터 삽입한다. (앞서 넣은 정의 안의 단어에 다른 키워드가 매칭되지 않도록)
+    문장에서 찾지 못했거나 다른 키워드와 위치가 겹치는 키워드의 정의는 끝에 덧붙인다.
+    """
+    spans = [] # (start, end, definition)
+    leftovers = []
+    for keyword, definition in keyword_definitions.items():
+        if not definition:
+            continue
+        pattern = re.compile(rf"(?<!\w){re.escape(keyword)}(?!\w)", re.IGNORECASE)
+        match = pattern.search(text)
+        if match and not any(match.start() < end and start < match.end() for start, end, _ in spans):
+            spans.append((match.start(), match.end(), definition))
+        else:
+            leftovers.append(f"- {keyword}: {definition}")
+    for _, end, definition in sorted(spans, reverse=True):
+        text = f"{text[:end]} ({definition}){text[end:]}"
+    if leftovers:
+        text += "\n\nKeyword definitions:\n" + "\n".join(leftovers)
+    return text
+
+def augment_prompt_combined(question: str, llm_api_key: str, tavily_search_key: str) -> str:
+    """
+    augment_prompt_three_step의 두 번의 LLM 호출(키워드 추출, 번역)을 한 번으로 줄인 경로.
+    1. 로컬 언어 판별로 영어 질문이면 번역을 생략하고 키워드만 추출한다.
+    2. 영어가 아니면 한 번의 structured output 호출로 영어 키워드와 번역문을 함께 받는다.
+    3. 키워드 정의를 검색(lookup_keyword_definitions)하여 번역문의 키워드 뒤 괄호에 넣는다.
+
+    :param str question: user prompt
+    :param str llm_api_key: Upstage API Key
+    :return str: augmented prompt in English
+    """
+    llm = make_chat_model("solar-pro2", llm_api_key)
+    english = is_english(question)
+    if english:
+        parser = JsonOutputParser(pydantic_object=Keywords)
+        prompt = ChatPromptTemplate.from_template(
+            """You are an expert in extracting keywords from a text.
+Extract the main technical keywords from the following user question, exactly as they appear in it.
+Your output must be a JSON object with a single key 'keywords' containing a list of the extracted keywords.
+Exclude keywords related to 'follow-up papers'.
+
+Question: {question}
+
+{format_instructions}"""
+        )
+        label = "extract_keywords"
+    else:
+        parser = JsonOutputParser(pydantic_object=KeywordsTranslation)
+        prompt = ChatPromptTemplate.from_template(
+            """You are a professional translator and an expert in extracting keywords from a text.
+1. Translate the following user question into English. The translation must contain only the translated text.
+2. Extract the main technical keywords from your English translation, exactly as they appear in it.
+Exclude keywords related to 'follow-up papers', '후속 논문'.
+Your output must be a JSON object with the keys 'keywords' (a list of strings) and 'translation' (a string).
+
+Question: {question}
+
+{format_instructions}"""
+        )
+        label = "extract_keywords_translate"
+
+    response = invoke_chain(prompt | llm | parser, {
+        "question": question,
+        "format_instructions": parser.get_format_instructions()
+    }, model="solar-pro2", label=label)
+    keywords = response.get("keywords") or []
+    translation = question if english else (response.get("translation") or question)
+    print(f"✅ 추출된 키워드: {keywords} (영어 질문: {english})")
+
+    keyword_definitions = lookup_keyword_definitions(keywords, tavily_search_key)
+    return insert_definitions(translation, keyword_definitions)
+
 if __name__ == "__main__":
+    # 실행: python -m services.rag_api.src.core.retriever (패키지 상대 import 사용)
     import os 
     from dotenv import load_dotenv
     ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..', '..')) # 5단계 위로 이동
@@ -5,8 +5,40 @@ ROOT_DIR = os.path.abspath(os.path.join(os.path.abspath(__file__), "..", "..", "
 print(ROOT_DIR)
 sys.path.append(ROOT_DIR)
 
+from db.http_client import http_post_json
 from db.meta_openalex import search_works_by_keywords
-from db.util import reconstruct_abstract
+from db.rate_limit import TokenBucket
+from db.util import reconstruct_abstract, loads, OPENALEX_RPS, OPENALEX_BURST
+
+TAVILY_API_URL = os.getenv("TAVILY_API_URL", "https://api.tavily.com")
+
+# rag_api 프로세스 전체가 공유하는 OpenAlex 요청 속도 제한 (후속 논문 검색 core/multi_source.py, 인용 논문 수집 core/citing_harvest.py)
+# 모듈마다 버킷을 따로 두면 동시에 실행될 때 합쳐서 OPENALEX_RPS를 넘는다.
+openalex_bucket = TokenBucket(OPENALEX_RPS, OPENALEX_BURST)
+
+class TavilyError(RuntimeError):
+    """Tavily API가 200이 아닌 응답을 보냈을 때 발생한다."""
+
+def tavily_search(api_key: str, query: str, max_results: int, timeout: float) -> list[dict]:
+    """
+    Tavily 검색 API를 재시도 없이 한 번 호출한다. (langchain TavilySearch는 HTTP 타임아웃을 설정할 수 없다)
+    timeout은 요청이 실제로 시작된 시점부터 적용되며, 넘으면 requests.Timeout이 발생한다.
+
+    :param str api_key: Tavily API Key
+    :param str query: 검색어
+    :param int max_results: 결과 수
+    :param float timeout: 연결/응답 대기 타임아웃(초)
+    :return list: title, url, content 등을 가진 결과 dict 리스트
+    """
+    response = http_post_json(
+        f"{TAVILY_API_URL}/search",
+        {"query": query, "max_results": max_results},
+        timeout=timeout,
+        headers={"Authorization": f"Bearer {api_key}"},
+    )
+    if response.status_code != 200:
+        raise TavilyError(f"Tavily search failed: HTTP {response.status_code}")
+    return loads(response.content).get("results") or []
 
 def mock_web_search(paper_title: str) -> dict | None:
     """웹 검색 API를 호출하는 모의 함수."""
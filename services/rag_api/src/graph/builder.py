@@ -5,8 +5,8 @@ ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "
 sys.path.append(ROOT_DIR)
 
 from langgraph.graph import StateGraph, END
-from langgraph.checkpoint.memory import MemorySaver
 from services.rag_api.src.graph.state import GraphState
+from services.rag_api.src.graph.checkpointer import get_checkpointer
 from services.rag_api.src.graph.nodes import (
     select_paper_node,
     web_search_node,
@@ -16,47 +16,78 @@ from services.rag_api.src.graph.nodes import (
     should_search_web,
     rag_judge_node,
     rag_condition,
+    speculative_rag_node,
+    augment_question_node,
+    merge_context_node,
 )
+from services.rag_api.src.config import GRAPH_SPECULATIVE, AUGMENT_TARGET, RERANK_ENABLED
 
 from services.rag_api.src.core.get_emb import get_emb_model
+from services.rag_api.src.core.reranker import get_reranker
 
-def build_graph():
-    checkpointer = MemorySaver()
+def build_graph(speculative: bool | None = None):
+    """
+    LangGraph 워크플로우를 구성한다.
+
+    :param bool speculative: True면 rag_judge와 후속 논문 검색을 동시에 실행하는 speculative_rag 노드를 사용한다.
+        None이면 config.GRAPH_SPECULATIVE(환경변수) 값을 따른다.
+    """
+    if speculative is None:
+        speculative = GRAPH_SPECULATIVE
+
+    checkpointer = get_checkpointer() # config.CHECKPOINT_BACKEND (기본값 sqlite, thread당 체크포인트 수/TTL 제한)
     workflow = StateGraph(GraphState)
 
     workflow.add_node("select_paper", select_paper_node)
     workflow.add_node("web_search", web_search_node)
     workflow.add_node("insert_paper", insert_paper_node)
-    workflow.add_node("retrieve_and_select", retrieve_and_select_node)
     workflow.add_node("generate_answer", generate_answer_node)
-    workflow.add_node("rag_judge", rag_judge_node)
     
     workflow.set_entry_point("select_paper")
     workflow.add_edge("web_search", "insert_paper")
     workflow.add_edge("insert_paper", "select_paper")
-    workflow.add_edge("retrieve_and_select", "generate_answer")
     workflow.add_edge("generate_answer", END)
 
+    if speculative:
+        # judge와 검색을 하나의 노드에서 동시에 실행한다.
+        workflow.add_node("speculative_rag", speculative_rag_node)
+        workflow.add_edge("speculative_rag", "generate_answer")
+        phase2_entry = "speculative_rag"
+    else:
+        workflow.add_node("retrieve_and_select", retrieve_and_select_node)
+        workflow.add_node("rag_judge", rag_judge_node)
+        rag_paths = {
+          "retrieve_and_select": "retrieve_and_select",
+          "generate_answer": "generate_answer",
+        }
+        if AUGMENT_TARGET != "off":
+            # raw query 검색과 질문 증강을 동시에 실행하고 merge_context에서 합친다.
+            workflow.add_node("augment_question", augment_question_node)
+            workflow.add_node("merge_context", merge_context_node)
+            workflow.add_edge(["retrieve_and_select", "augment_question"], "merge_context")
+            workflow.add_edge("merge_context", "generate_answer")
+            rag_paths["augment_question"] = "augment_question"
+        else:
+            workflow.add_edge("retrieve_and_select", "generate_answer")
+        workflow.add_conditional_edges(
+            "rag_judge",
+            rag_condition,
+            rag_paths,
+        )
+        phase2_entry = "rag_judge"
+
     workflow.add_conditional_edges(
         "select_paper",
         should_search_web,
         {
             "web_search": "web_search",
-            "rag_judge": "rag_judge",
+            "rag_judge": phase2_entry,
         },
     )
 
-    workflow.add_conditional_edges(
-        "rag_judge",
-        rag_condition,
-        {
-          "retrieve_and_select": "retrieve_and_select",
-          "generate_answer": "generate_answer",
-        },
-    )
-
-
     model = get_emb_model() # 임베딩 모델 로드(캐시 적용되어 이후 노드들에서는 로드 X)
+    if RERANK_ENABLED:
+        get_reranker().warm_up() # cross-encoder 로드 + 예측 1회 (첫 요청의 DB 소스 마감 시간 안에서 로드하지 않도록)
 
     # Checkpointer와 함께 그래프를 컴파일하고, select_paper 이후에 중단점을 설정합니다.
     return workflow.compile(
@@ -0,0 +1,479 @@
+"""
+LangGraph 체크포인터 (graph/builder.py 에서 사용).
+
+MemorySaver는 모든 thread의 체크포인트 이력을 프로세스 메모리에 무기한 보관하고, 재시작하면 사라지며,
+다른 워커 프로세스에서 보이지 않는다. 여기서는 체크포인트를 SQLite(단일 노드) 또는 Postgres(클러스터)에 저장하고
+다음 세 가지로 저장량을 제한한다.
+
+- put 할 때마다 (thread, namespace)별로 최근 CHECKPOINT_MAX_PER_THREAD 개만 남긴다.
+- CheckpointCompactor(백그라운드 스레드)가 CHECKPOINT_COMPACT_IDLE_S 동안 새 체크포인트가 없는 thread를
+  최신 체크포인트(와 그 pending writes) 하나만 남기고 압축한다. Phase 2 재개에는 최신 체크포인트만 필요하다.
+- 같은 스레드가 CHECKPOINT_TTL_S 동안 쓰이지 않은 thread는 통째로 삭제한다.
+
+두 백엔드는 같은 SQL을 사용하고(placeholder ?), Postgres 백엔드가 %s 로 바꿔 실행한다.
+"""
+import asyncio
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Iterator, Sequence
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.abspath(__file__), "..", "..", "..", "..", ".."))
+sys.path.append(ROOT_DIR)
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+    writes_sort_key,
+)
+from langgraph.checkpoint.memory import MemorySaver
+
+from services.rag_api.src.config import (
+    CHECKPOINT_BACKEND,
+    CHECKPOINT_SQLITE_PATH,
+    CHECKPOINT_PG_POOL_SIZE,
+    CHECKPOINT_MAX_PER_THREAD,
+    CHECKPOINT_TTL_S,
+    CHECKPOINT_COMPACT_IDLE_S,
+    CHECKPOINT_COMPACT_INTERVAL_S,
+)
+
+DDL = """
+CREATE TABLE IF NOT EXISTS graph_checkpoints (
+    thread_id             TEXT NOT NULL,
+    checkpoint_ns         TEXT NOT NULL DEFAULT '',
+    checkpoint_id         TEXT NOT NULL,
+    parent_checkpoint_id  TEXT,
+    type                  TEXT,
+    checkpoint            {blob},
+    metadata              TEXT,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+);
+CREATE TABLE IF NOT EXISTS graph_writes (
+    thread_id      TEXT NOT NULL,
+    checkpoint_ns  TEXT NOT NULL DEFAULT '',
+    checkpoint_id  TEXT NOT NULL,
+    task_id        TEXT NOT NULL,
+    task_path      TEXT NOT NULL DEFAULT '',
+    idx            INTEGER NOT NULL,
+    channel        TEXT NOT NULL,
+    type           TEXT,
+    value          {blob},
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+);
+-- thread별 마지막 체크포인트 시각. TTL 만료와 idle thread 압축 대상 선정에 사용한다.
+CREATE TABLE IF NOT EXISTS graph_threads (
+    thread_id   TEXT PRIMARY KEY,
+    updated_at  {float} NOT NULL,
+    compacted   INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_graph_threads_updated ON graph_threads (updated_at);
+"""
+
+class _SqliteBackend:
+    """하나의 sqlite3 커넥션을 lock으로 보호해 공유한다. (WAL 모드라 같은 파일을 여러 프로세스가 열어도 된다)"""
+
+    def __init__(self, path: str):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._lock = threading.Lock()
+        with self._lock:
+            if path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(DDL.format(blob="BLOB", float="REAL"))
+            self._conn.commit()
+
+    @contextmanager
+    def cursor(self) -> Iterator[Any]:
+        """하나의 트랜잭션. 예외가 나면 rollback 한다."""
+        with self._lock:
+            cur = self._conn.cursor()
+            try:
+                yield cur
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                raise
+            finally:
+                cur.close()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+class _PostgresBackend:
+    """
+    psycopg2 ThreadedConnectionPool에서 트랜잭션마다 커넥션을 빌려 쓴다. (여러 graph 실행의 체크포인트 I/O가 동시에 진행)
+    풀이 모두 사용 중이면 커넥션이 반납될 때까지 기다린다. 끊긴 커넥션은 풀에서 버리고 다음에 새로 연결한다.
+
+    :param int pool_size: 최대 커넥션 수
+    :param pool: 테스트용으로 미리 만든 풀 (getconn/putconn/closeall 지원). 없으면 db_init.get_conn_params()로 만든다.
+    """
+
+    def __init__(self, pool_size: int = CHECKPOINT_PG_POOL_SIZE, pool=None):
+        if pool is None:
+            from psycopg2.pool import ThreadedConnectionPool
+            from db.db_init import get_conn_params
+
+            pool = ThreadedConnectionPool(1, pool_size, **get_conn_params())
+        self._pool = pool
+        # ThreadedConnectionPool.getconn()은 풀이 비어 있으면 기다리지 않고 PoolError를 내므로 빌리는 수를 제한한다.
+        self._slots = threading.BoundedSemaphore(pool_size)
+        with self.cursor() as cur:
+            cur.execute(DDL.format(blob="BYTEA", float="DOUBLE PRECISION"))
+
+    @contextmanager
+    def cursor(self) -> Iterator[Any]:
+        with self._slots:
+            conn = self._pool.getconn()
+            try:
+                cur = _QmarkCursor(conn.cursor())
+                try:
+                    yield cur
+                    conn.commit()
+                except Exception:
+                    if not conn.closed:
+                        conn.rollback()
+                    raise
+                finally:
+                    cur.close()
+            finally:
+                self._pool.putconn(conn, close=bool(conn.closed))
+
+    def close(self):
+        self._pool.closeall()
+
+class _QmarkCursor:
+    """? placeholder SQL을 psycopg2(%s)로 실행하는 얇은 래퍼. BYTEA 값(memoryview)은 bytes로 바꿔 돌려준다."""
+
+    def __init__(self, cur):
+        self._cur = cur
+
+    def execute(self, sql: str, params: Sequence = ()):
+        self._cur.execute(sql.replace("?", "%s"), tuple(params))
+        return self
+
+    def executemany(self, sql: str, rows: Sequence[Sequence]):
+        self._cur.executemany(sql.replace("?", "%s"), [tuple(r) for r in rows])
+        return self
+
+    @property
+    def rowcount(self) -> int:
+        return self._cur.rowcount
+
+    def fetchone(self):
+        row = self._cur.fetchone()
+        return None if row is None else tuple(bytes(v) if isinstance(v, memoryview) else v for v in row)
+
+    def fetchall(self):
+        return [tuple(bytes(v) if isinstance(v, memoryview) else v for v in row) for row in self._cur.fetchall()]
+
+    def close(self):
+        self._cur.close()
+
+# 같은 (thread, namespace)에서 keep 번째로 최신인 체크포인트보다 오래된 행을 지운다. (keep개보다 적으면 서브쿼리가 NULL -> 삭제 없음)
+_PRUNE_CHECKPOINTS_SQL = """
+DELETE FROM graph_checkpoints
+WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id < (
+    SELECT checkpoint_id FROM graph_checkpoints
+    WHERE thread_id = ? AND checkpoint_ns = ?
+    ORDER BY checkpoint_id DESC LIMIT 1 OFFSET ?
+)
+"""
+_PRUNE_WRITES_SQL = """
+DELETE FROM graph_writes
+WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id < (
+    SELECT MIN(checkpoint_id) FROM graph_checkpoints WHERE thread_id = ? AND checkpoint_ns = ?
+)
+"""
+
+class PrunedCheckpointSaver(BaseCheckpointSaver):
+    """
+    thread별 체크포인트 수를 제한하고 TTL/idle 압축을 지원하는 SQL 체크포인터.
+    체크포인트는 serde.dumps_typed 로 한 행에 통째로 저장한다. (channel_values 포함)
+
+    :param backend: _SqliteBackend 또는 _PostgresBackend
+    :param int max_per_thread: (thread, namespace)별로 남길 최근 체크포인트 수. 0이면 제한하지 않는다.
+    :param float ttl_s: 이 시간(초) 동안 새 체크포인트가 없는 thread는 expire()에서 삭제한다. 0이면 삭제하지 않는다.
+    :param float compact_idle_s: 이 시간(초) 동안 새 체크포인트가 없는 thread는 compact()에서 최신 체크포인트만 남긴다.
+    """
+
+    def __init__(self, backend, max_per_thread: int = CHECKPOINT_MAX_PER_THREAD, ttl_s: float = CHECKPOINT_TTL_S,
+                 compact_idle_s: float = CHECKPOINT_COMPACT_IDLE_S):
+        super().__init__()
+        self.backend = backend
+        self.max_per_thread = max_per_thread
+        self.ttl_s = ttl_s
+        self.compact_idle_s = compact_idle_s
+
+    # -----------------------------
+    # 조회
+    # -----------------------------
+    def _load_writes(self, cur, thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> list:
+        cur.execute(
+            "SELECT task_id, channel, type, value, task_path, idx FROM graph_writes "
+            "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+            (thread_id, checkpoint_ns, checkpoint_id),
+        )
+        rows = sorted(cur.fetchall(), key=lambda r: writes_sort_key(r[4], r[0], r[5]))
+        return [(task_id, channel, self.serde.loads_typed((type_, value))) for task_id, channel, type_, value, _, _ in rows]
+
+    def _to_tuple(self, cur, row) -> CheckpointTuple:
+        thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type_, checkpoint, metadata = row
+        return CheckpointTuple(
+            {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint_id}},
+            self.serde.loads_typed((type_, checkpoint)),
+            json.loads(metadata) if metadata else {},
+            (
+                {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": parent_checkpoint_id}}
+                if parent_checkpoint_id else None
+            ),
+            self._load_writes(cur, thread_id, checkpoint_ns, checkpoint_id),
+        )
+
+    def get_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        thread_id = str(config["configurable"]["thread_id"])
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        select = "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata FROM graph_checkpoints "
+        with self.backend.cursor() as cur:
+            if checkpoint_id := get_checkpoint_id(config):
+                cur.execute(select + "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                            (thread_id, checkpoint_ns, checkpoint_id))
+            else:
+                cur.execute(select + "WHERE thread_id = ? AND checkpoint_ns = ? ORDER BY checkpoint_id DESC LIMIT 1",
+                            (thread_id, checkpoint_ns))
+            row = cur.fetchone()
+            return self._to_tuple(cur, row) if row else None
+
+    def list(self, config: RunnableConfig | None, *, filter: dict[str, Any] | None = None,
+             before: RunnableConfig | None = None, limit: int | None = None) -> Iterator[CheckpointTuple]:
+        """
+        최신 체크포인트부터 반환한다. metadata filter는 thread당 체크포인트 수가 작으므로 Python에서 적용한다.
+        """
+        wheres, params = [], []
+        if config is not None:
+            wheres.append("thread_id = ?")
+            params.append(str(config["configurable"]["thread_id"]))
+            if (checkpoint_ns := config["configurable"].get("checkpoint_ns")) is not None:
+                wheres.append("checkpoint_ns = ?")
+                params.append(checkpoint_ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                wheres.append("checkpoint_id = ?")
+                params.append(checkpoint_id)
+        if before is not None and (before_id := get_checkpoint_id(before)):
+            wheres.append("checkpoint_id < ?")
+            params.append(before_id)
+        sql = "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata FROM graph_checkpoints"
+        if wheres:
+            sql += " WHERE " + " AND ".join(wheres)
+        sql += " ORDER BY checkpoint_id DESC"
+
+        results = []
+        with self.backend.cursor() as cur:
+            cur.execute(sql, params)
+            for row in cur.fetchall():
+                if filter:
+                    metadata = json.loads(row[6]) if row[6] else {}
+                    if any(metadata.get(k) != v for k, v in filter.items()):
+                        continue
+                results.append(self._to_tuple(cur, row))
+                if limit is not None and len(results) >= limit:
+                    break
+        yield from results
+
+    # -----------------------------
+    # 저장
+    # -----------------------------
+    def put(self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata,
+            new_versions: ChannelVersions) -> RunnableConfig:
+        thread_id = str(config["configurable"]["thread_id"])
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        type_, blob = self.serde.dumps_typed(checkpoint)
+        meta = json.dumps(get_checkpoint_metadata(config, metadata), ensure_ascii=False, default=str)
+        with self.backend.cursor() as cur:
+            cur.execute(
+                "INSERT INTO graph_checkpoints (thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (thread_id, checkpoint_ns, checkpoint_id) DO UPDATE SET "
+                "parent_checkpoint_id = excluded.parent_checkpoint_id, type = excluded.type, "
+                "checkpoint = excluded.checkpoint, metadata = excluded.metadata",
+                (thread_id, checkpoint_ns, checkpoint["id"], config["configurable"].get("checkpoint_id"), type_, blob, meta),
+            )
+            cur.execute(
+                "INSERT INTO graph_threads (thread_id, updated_at, compacted) VALUES (?, ?, 0) "
+                "ON CONFLICT (thread_id) DO UPDATE SET updated_at = excluded.updated_at, compacted = 0",
+                (thread_id, time.time()),
+            )
+            if self.max_per_thread > 0:
+                cur.execute(_PRUNE_CHECKPOINTS_SQL, (thread_id, checkpoint_ns, thread_id, checkpoint_ns, self.max_per_thread - 1))
+                if cur.rowcount:
+                    cur.execute(_PRUNE_WRITES_SQL, (thread_id, checkpoint_ns, thread_id, checkpoint_ns))
+        return {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint["id"]}}
+
+    def put_writes(self, config: RunnableConfig, writes: Sequence[tuple[str, Any]], task_id: str,
+                   task_path: str = "") -> None:
+        # 특수 채널(에러, 인터럽트 등)은 덮어쓰고, 일반 채널은 먼저 저장된 값을 유지한다. (SqliteSaver와 같은 규칙)
+        on_conflict = (
+            "DO UPDATE SET channel = excluded.channel, type = excluded.type, value = excluded.value"
+            if all(w[0] in WRITES_IDX_MAP for w in writes) else "DO NOTHING"
+        )
+        thread_id = str(config["configurable"]["thread_id"])
+        checkpoint_ns = str(config["configurable"].get("checkpoint_ns", ""))
+        checkpoint_id = str(config["configurable"]["checkpoint_id"])
+        with self.backend.cursor() as cur:
+            cur.executemany(
+                "INSERT INTO graph_writes (thread_id, checkpoint_ns, checkpoint_id, task_id, task_path, idx, channel, type, value) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (thread_id, checkpoint_ns, checkpoint_id, task_id, idx) " + on_conflict,
+                [
+                    (thread_id, checkpoint_ns, checkpoint_id, task_id, task_path, WRITES_IDX_MAP.get(channel, idx),
+                     channel, *self.serde.dumps_typed(value))
+                    for idx, (channel, value) in enumerate(writes)
+                ],
+            )
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self.backend.cursor() as cur:
+            for table in ("graph_checkpoints", "graph_writes", "graph_threads"):
+                cur.execute(f"DELETE FROM {table} WHERE thread_id = ?", (str(thread_id),))
+
+    # -----------------------------
+    # 정리 (CheckpointCompactor에서 주기적으로 호출)
+    # -----------------------------
+    def expire(self, now: float | None = None) -> int:
+        """ttl_s 동안 새 체크포인트가 없는 thread를 모두 삭제하고, 삭제한 thread 수를 반환한다."""
+        if self.ttl_s <= 0:
+            return 0
+        cutoff = (now or time.time()) - self.ttl_s
+        stale = "SELECT thread_id FROM graph_threads WHERE updated_at < ?"
+        with self.backend.cursor() as cur:
+            cur.execute(f"DELETE FROM graph_writes WHERE thread_id IN ({stale})", (cutoff,))
+            cur.execute(f"DELETE FROM graph_checkpoints WHERE thread_id IN ({stale})", (cutoff,))
+            cur.execute("DELETE FROM graph_threads WHERE updated_at < ?", (cutoff,))
+            return cur.rowcount
+
+    def compact(self, now: float | None = None) -> int:
+        """
+        compact_idle_s 동안 새 체크포인트가 없는 thread를 (namespace별) 최신 체크포인트와 그 writes만 남기고 압축한다.
+        압축한 thread는 다시 체크포인트가 저장될 때까지 대상에서 빠진다. 압축한 thread 수를 반환한다.
+        """
+        cutoff = (now or time.time()) - self.compact_idle_s
+        idle = "SELECT thread_id FROM graph_threads WHERE compacted = 0 AND updated_at < ?"
+        with self.backend.cursor() as cur:
+            cur.execute(f"""
+                DELETE FROM graph_checkpoints
+                WHERE thread_id IN ({idle}) AND checkpoint_id < (
+                    SELECT MAX(c.checkpoint_id) FROM graph_checkpoints c
+                    WHERE c.thread_id = graph_checkpoints.thread_id AND c.checkpoint_ns = graph_checkpoints.checkpoint_ns
+                )
+            """, (cutoff,))
+            cur.execute(f"""
+                DELETE FROM graph_writes
+                WHERE thread_id IN ({idle}) AND checkpoint_id < (
+                    SELECT MAX(c.checkpoint_id) FROM graph_checkpoints c
+                    WHERE c.thread_id = graph_writes.thread_id AND c.checkpoint_ns = graph_writes.checkpoint_ns
+                )
+            """, (cutoff,))
+            cur.execute("UPDATE graph_threads SET compacted = 1 WHERE compacted = 0 AND updated_at < ?", (cutoff,))
+            return cur.rowcount
+
+    def stats(self) -> dict:
+        with self.backend.cursor() as cur:
+            counts = {}
+            for table in ("graph_threads", "graph_checkpoints", "graph_writes"):
+                cur.execute(f"SELECT COUNT(*) FROM {table}")
+                counts[table.removeprefix("graph_")] = cur.fetchone()[0]
+        return counts
+
+    # -----------------------------
+    # async (API는 sync .stream()을 쓰지만 astream/ainvoke도 지원한다)
+    # -----------------------------
+    async def aget_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(self, config: RunnableConfig | None, *, filter: dict[str, Any] | None = None,
+                    before: RunnableConfig | None = None, limit: int | None = None) -> AsyncIterator[CheckpointTuple]:
+        items = await asyncio.to_thread(lambda: list(self.list(config, filter=filter, before=before, limit=limit)))
+        for item in items:
+            yield item
+
+    async def aput(self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata,
+                   new_versions: ChannelVersions) -> RunnableConfig:
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config: RunnableConfig, writes: Sequence[tuple[str, Any]], task_id: str,
+                          task_path: str = "") -> None:
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+class CheckpointCompactor:
+    """
+    interval_s 마다 saver.expire()와 saver.compact()를 실행하는 백그라운드(daemon) 스레드.
+
+    :param PrunedCheckpointSaver saver: 정리할 체크포인터
+    :param float interval_s: 정리 주기(초)
+    """
+
+    def __init__(self, saver: PrunedCheckpointSaver, interval_s: float = CHECKPOINT_COMPACT_INTERVAL_S):
+        self.saver = saver
+        self.interval_s = interval_s
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="checkpoint_compactor", daemon=True)
+
+    def start(self) -> "CheckpointCompactor":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def run_once(self) -> dict:
+        return {"expired": self.saver.expire(), "compacted": self.saver.compact()}
+
+    def _run(self):
+        while not self._stop.wait(self.interval_s):
+            try:
+                result = self.run_once()
+                if result["expired"] or result["compacted"]:
+                    print(f"🧹 체크포인트 정리: {result} -> {self.saver.stats()}")
+            except Exception as e:
+                print(f"체크포인트 정리 실패: {e}")
+
+_compactor: CheckpointCompactor | None = None
+
+def get_checkpointer(backend: str = CHECKPOINT_BACKEND) -> BaseCheckpointSaver:
+    """
+    config.CHECKPOINT_BACKEND 에 맞는 체크포인터를 만든다. sqlite/postgres면 CheckpointCompactor를 함께 시작한다.
+
+    :param str backend: memory | sqlite | postgres (memory는 제한 없는 MemorySaver, 로컬 디버깅용)
+    """
+    global _compactor
+    if backend == "memory":
+        return MemorySaver()
+    if backend == "sqlite":
+        saver = PrunedCheckpointSaver(_SqliteBackend(CHECKPOINT_SQLITE_PATH))
+    elif backend == "postgres":
+        saver = PrunedCheckpointSaver(_PostgresBackend())
+    else:
+        raise ValueError(f"알 수 없는 CHECKPOINT_BACKEND: {backend}")
+    if CHECKPOINT_COMPACT_INTERVAL_S > 0:
+        if _compactor is not None:
+            _compactor.stop()
+        _compactor = CheckpointCompactor(saver).start()
+    print(f"💾 체크포인터: {backend} (thread당 최대 {saver.max_per_thread}개, TTL {saver.ttl_s:.0f}s)")
+    return saver
@@ -1,16 +1,24 @@
 from dotenv import load_dotenv
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from langchain_core.messages import HumanMessage
 
 
 from .state import GraphState
-from ..core.database import mock_db_select, mock_db_insert, mock_db_follow_up_select
+from ..core.database import mock_db_select, mock_db_insert, db_save_external_papers
 from ..core.source_api import openalex_search
 from ..core.retriever import UPSTAGE_API_KEY, TAVILY_SEARCH, augment_prompt
 from ..core.llm import mock_llm_generate, rag_judge, mock_llm_generate_no_rag
 from ..core.get_emb import get_emb_model, get_emb
+from ..core.accounting import usage_scope
+from ..core.citing_harvest import start_citing_harvest
+from ..core.paper_cache import get_paper_cache, paper_ref
+from ..core.multi_source import multi_source_retrieve
+from ..config import AUGMENT_TARGET, AUGMENT_RETRIEVAL_SOURCES, AUGMENT_TIMEOUT_S, CITING_HARVEST_ENABLED, RETRIEVAL_BUDGET_S
 from langgraph.types import interrupt
-from ..util import convert_to_documents, get_last_user_query
+from ..util import get_last_user_query, timed
 
 load_dotenv()
 
@@ -27,6 +35,10 @@ def select_paper_node(state: GraphState):
     query = state["initial_query"]
 
     paper_info = mock_db_select(query)
+    if paper_info:
+        # 초록 등은 캐시에 두고, state와 interrupt 값에는 paper_ref만 남긴다.
+        get_paper_cache().put([paper_info["paper_meta"]])
+        paper_info = {**paper_info, "paper_meta": paper_ref(paper_info["paper_meta"])}
     print(f"paper_info: {paper_info}")
 
     if not state.get("is_chat_mode"):
@@ -55,25 +67,33 @@ def web_search_node(state: GraphState):
     print("\n--- 노드 실행: web_search_node ---")
     query = state["initial_query"]
     paper_search_result = openalex_search(query)
+    get_paper_cache().put([paper_search_result]) # insert_paper_node 에서 사용 (초록, 인용 목록 포함)
 
-    return {"paper_search_result": paper_search_result,
+    return {"paper_search_result": paper_ref(paper_search_result),
             "initial_query": paper_search_result["title"]} # 무한 루프 방지 위해 우선 논문 제목으로 초기 쿼리 업데이트 추후 수정 필요
 
 def insert_paper_node(state: GraphState):
     """
     :param state: The current graph state. 
-    :return: 논문 정보를 DB에 저장
+    :return: 논문 정보를 DB에 저장하고, 기준 논문을 인용한 논문 수집을 백그라운드로 시작
     """
     print("\n--- 노드 실행: insert_paper_node ---")
-    paper_info = state["paper_search_result"]
+    ref = state["paper_search_result"]
+    paper_info = get_paper_cache().get_many([ref["openalex_id"]]).get(ref["openalex_id"])
+    if paper_info is None:
+        # 캐시에서 밀려났거나 다른 워커에서 web_search_node가 실행된 경우 다시 검색한다.
+        paper_info = openalex_search(ref["title"])
 
     # 논문 초록 임베딩
     emb_model = get_emb_model()
     embedding = get_emb(emb_model, [paper_info["abstract"]])
-    paper_info["embedding"] = embedding[0]
+    paper_info = {**paper_info, "embedding": embedding[0]}
 
     if paper_info:
         mock_db_insert(paper_info)
+        if CITING_HARVEST_ENABLED:
+            # Phase 2 후속 논문 검색에 필요한 인용 논문을 미리 수집한다. (기다리지 않음)
+            start_citing_harvest(paper_info["openalex_id"])
 
     return {}
 
@@ -84,26 +104,201 @@ def rag_judge_node(state: GraphState):
     """
     print("\n--- 노드 실행: rag_judge_node ---")
     question = state["question"]
-    judgement = rag_judge(question, os.getenv("UPSTAGE_API_KEY"))
-    return {"rag_judgement": judgement}
+    timings = {}
+    with usage_scope(state.get("thread_id"), "rag_judge"), timed(timings, "rag_judge"):
+        judgement = rag_judge(question, os.getenv("UPSTAGE_API_KEY"))
+    return {"rag_judgement": judgement, "node_timings": timings}
+
+def _retrieve_follow_up_ids(
+    paper_info: dict,
+    query: str,
+    cancel_event: threading.Event | None = None,
+    timings: dict | None = None,
+    deadline: float | None = None,
+    sources: list[str] | None = None,
+) -> list:
+    """
+    로컬 DB, OpenAlex, Tavily에서 후속 논문을 동시에 검색하고 합쳐서 RRF 순으로 반환한다. (core/multi_source.py)
+    소스마다 마감 시간이 있어 느린 외부 소스는 결과 없이 건너뛴다.
+    검색된 논문은 paper_cache에 넣고 openalex_id 리스트만 반환한다. (state에는 id만 저장)
+    DB 밖(OpenAlex, Tavily)에서 찾은 논문은 id를 반환하기 전에 DB에 저장해, 캐시에서 빠져도 다시 읽을 수 있게 한다.
+    cancel_event가 set 되면 빈 리스트를 반환한다.
+
+    :param dict paper_info: 기준 논문 paper_ref (openalex_id, title 포함)
+    :param str query: 검색 질문
+    :param threading.Event cancel_event: 검색 취소 신호
+    :param dict timings: 소스/단계별 실행 시간(ms)을 기록할 딕셔너리
+    :param float deadline: time.monotonic() 기준 호출자의 마감 시각. 검색 예산(인용 논문 수집 대기 포함)을 그 안으로 줄인다.
+    :param list sources: 조회할 소스 (기본값: config.RETRIEVAL_SOURCES)
+    :return list: 검색된 후속 논문 openalex_id 리스트 (RRF 순)
+    """
+    k = 5
+    budget_s = RETRIEVAL_BUDGET_S if deadline is None else min(RETRIEVAL_BUDGET_S, deadline - time.monotonic())
+    if budget_s <= 0:
+        return []
+    docs = multi_source_retrieve(paper_info, query, k, cancel_event, timings, sources=sources, budget_s=budget_s)
+    try:
+        with timed(timings if timings is not None else {}, "save_external"):
+            db_save_external_papers(paper_info["openalex_id"], docs)
+    except Exception as e:
+        # 저장에 실패해도 이번 요청은 캐시로 답할 수 있다. (캐시에서 빠지면 해당 문서는 context에서 빠진다)
+        print(f"⚠️ 외부 검색 결과 저장 실패: {e}")
+    return get_paper_cache().put(docs)
     
 def retrieve_and_select_node(state: GraphState):
-    """:param state: The current graph state. :return: New state with retrieved documents."""
+    """
+    사용자 질문 원문(raw query)으로 후속 논문을 검색한다.
+    질문 증강은 별도 노드(augment_question)에서 동시에 실행된다.
+
+    :param state: The current graph state. 
+    :return: New state with retrieved paper ids.
+    """
     print("\n--- 노드 실행: retrieve_and_select_node ---")
-    use_prompt_augment = True
-    if use_prompt_augment:
-        ### prompt에서 키워드를 찾아 tavily search로 증강하고, 영어로 번역하는 함수.
-        augmented_question = augment_prompt(state['question'], UPSTAGE_API_KEY, TAVILY_SEARCH)
-        state['question'] = augmented_question # update state 
+    timings = {}
+    paper_info = state["paper_search_result"]
+    last_user_query = get_last_user_query(state["messages"])
+    with timed(timings, "retrieve_and_select"):
+        all_ids = _retrieve_follow_up_ids(paper_info, last_user_query, timings=timings)
+    return {"retrieved_ids": all_ids, "node_timings": timings}
 
+# 질문 증강 브랜치 전용 스레드 풀 (시간 초과된 작업은 백그라운드에서 끝나고 결과는 버려진다)
+_augment_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="augment")
+# 증강 질문 검색이 AUGMENT_TIMEOUT_S 전에 결과를 합쳐 돌려줄 수 있도록 남겨 두는 시간(초)
+_AUGMENT_MERGE_RESERVE_S = 0.2
+
+def _run_augment_branch(state: GraphState, cancel_event: threading.Event | None = None) -> tuple[str, list, dict]:
+    """
+    질문 증강(augment_prompt)을 실행하고, AUGMENT_TARGET이 retrieval이면 증강된 질문으로 후속 논문을 검색한다.
+    증강 질문 검색은 AUGMENT_RETRIEVAL_SOURCES(기본값 로컬 DB)만 조회한다. (외부 API는 raw query 검색에서 이미 조회함)
+    AUGMENT_TIMEOUT_S 안에 끝나지 않으면 ("", [])를 반환해 raw query 결과를 사용하게 한다.
+    증강 질문 검색은 남은 시간 안으로 예산을 줄인다. (인용 논문 수집 대기가 브랜치 마감을 넘기지 않도록)
+
+    :return tuple: (augmented_question, augmented_ids, timings)
+    """
+    timings = {}
+    deadline = time.monotonic() + AUGMENT_TIMEOUT_S - _AUGMENT_MERGE_RESERVE_S
+    thread_id = state.get("thread_id")
+    paper_info = state["paper_search_result"]
+
+    def work():
+        with usage_scope(thread_id, "augment_question"), timed(timings, "augment_prompt"):
+            augmented_question = augment_prompt(state["question"], UPSTAGE_API_KEY, TAVILY_SEARCH)
+        augmented_ids = []
+        if AUGMENT_TARGET == "retrieval" and augmented_question:
+            with timed(timings, "augmented_retrieve"):
+                augmented_ids = _retrieve_follow_up_ids(
+                    paper_info, augmented_question, cancel_event, deadline=deadline, sources=AUGMENT_RETRIEVAL_SOURCES
+                )
+        return augmented_question, augmented_ids
+
+    future = _augment_pool.submit(work)
+    try:
+        augmented_question, augmented_ids = future.result(timeout=AUGMENT_TIMEOUT_S)
+    except FutureTimeoutError:
+        print(f"⚠️ 질문 증강 시간 초과({AUGMENT_TIMEOUT_S}s): raw query 결과를 사용합니다.")
+        future.cancel()
+        return "", [], {"augment_timeout": AUGMENT_TIMEOUT_S * 1000}
+    except Exception as e:
+        print(f"⚠️ 질문 증강 실패: {e}. raw query 결과를 사용합니다.")
+        return "", [], dict(timings)
+    return augmented_question, augmented_ids, dict(timings)
+
+def augment_question_node(state: GraphState):
+    """
+    (선택) 질문 증강 단계. retrieve_and_select 와 같은 단계에서 동시에 실행된다.
+    - AUGMENT_TARGET=retrieval: 증강된 질문의 임베딩으로 후속 논문을 다시 검색한다. (AUGMENT_RETRIEVAL_SOURCES만)
+    - AUGMENT_TARGET=generation: 증강된 질문을 답변 생성 프롬프트에만 전달한다.
+    시간 초과/실패 시 빈 값을 반환하고, merge_context 가 raw query 결과를 사용한다.
+
+    :param state: The current graph state.
+    :return: augmented_question, augmented_ids
+    """
+    print("\n--- 노드 실행: augment_question_node ---")
+    augmented_question, augmented_ids, timings = _run_augment_branch(state)
+    return {"augmented_question": augmented_question, "augmented_ids": augmented_ids, "node_timings": timings}
+
+def _select_context(raw_ids: list, augmented_ids: list) -> list:
+    # 증강된 질문으로 검색한 결과가 있으면 우선 사용하고, 없으면 raw query 결과로 대체한다.
+    return augmented_ids if augmented_ids else raw_ids
+
+def merge_context_node(state: GraphState):
+    """
+    retrieve_and_select(raw query)와 augment_question 브랜치의 결과를 합친다.
+
+    :param state: The current graph state.
+    :return: New state with the paper ids used for generation.
+    """
+    print("\n--- 노드 실행: merge_context_node ---")
+    return {"retrieved_ids": _select_context(state.get("retrieved_ids") or [], state.get("augmented_ids") or [])}
+
+def speculative_rag_node(state: GraphState):
+    """
+    rag_judge와 (질문 임베딩 + 후속 논문 검색)을 동시에 시작하는 투기적(speculative) 실행 노드.
+    대부분의 질문이 RAG로 판정되므로 judge LLM 호출 지연 동안 검색을 미리 진행하고,
+    judge 결과가 NO_RAG이면 검색을 취소하거나 결과를 버린다.
+
+    임계 경로(critical path)는 순차 실행의 judge + retrieve 에서 max(judge, retrieve) 로 줄어든다.
+
+    :param GraphState state: The current graph state.
+    :return dict: rag_judgement, retrieved_ids, node_timings
+    """
+    print("\n--- 노드 실행: speculative_rag_node ---")
+    question = state["question"]
     paper_info = state["paper_search_result"]
     last_user_query = get_last_user_query(state["messages"])
-    query_vec = get_emb(get_emb_model(), [last_user_query])[0]
-    k = 5
-    db_follow_up_docs = mock_db_follow_up_select(paper_info, query_vec, k)
 
-    all_docs = convert_to_documents(db_follow_up_docs)
-    return {"retrieved_docs": all_docs}
+    cancel_event = threading.Event()
+    judge_timings, retrieve_timings = {}, {}
+
+    def run_judge():
+        # 워커 스레드는 contextvars를 상속하지 않으므로 scope를 다시 지정한다.
+        with usage_scope(state.get("thread_id"), "rag_judge"), timed(judge_timings, "rag_judge"):
+            return rag_judge(question, os.getenv("UPSTAGE_API_KEY"))
+
+    def run_retrieve():
+        with timed(retrieve_timings, "retrieve"):
+            return _retrieve_follow_up_ids(paper_info, last_user_query, cancel_event, retrieve_timings)
+
+    def discard_result(future):
+        # 버려진 검색 브랜치의 예외는 로그만 남긴다.
+        if not future.cancelled() and future.exception() is not None:
+            print(f"ℹ️ 버려진 검색 브랜치 예외: {future.exception()}")
+
+    start = time.perf_counter()
+    executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix="speculative_rag")
+    judge_future = executor.submit(run_judge)
+    retrieve_future = executor.submit(run_retrieve)
+    augment_future = executor.submit(_run_augment_branch, state, cancel_event) if AUGMENT_TARGET != "off" else None
+    speculative_futures = [f for f in (retrieve_future, augment_future) if f is not None]
+    augmented_question, augmented_ids, augment_timings = "", [], {}
+    try:
+        judgement = judge_future.result()
+        if judgement == "RAG":
+            all_ids = retrieve_future.result()
+            if augment_future is not None:
+                augmented_question, augmented_ids, augment_timings = augment_future.result()
+                all_ids = _select_context(all_ids, augmented_ids)
+        else:
+            print("🛑 NO_RAG 판정: 후속 논문 검색 결과를 버립니다.")
+            cancel_event.set()
+            for future in speculative_futures:
+                future.cancel()
+                future.add_done_callback(discard_result)
+            all_ids = []
+    except BaseException:
+        cancel_event.set()
+        for future in speculative_futures:
+            future.cancel()
+            future.add_done_callback(discard_result)
+        raise
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    timings = {**judge_timings, **retrieve_timings, **augment_timings}
+    timings["critical_path"] = round((time.perf_counter() - start) * 1000, 1)
+    timings["sequential_estimate"] = round(judge_timings.get("rag_judge", 0) + retrieve_timings.get("retrieve", 0), 1)
+    print(f"⏱️ speculative timings(ms): {timings}")
+    return {"rag_judgement": judgement, "retrieved_ids": all_ids, "augmented_question": augmented_question, "node_timings": timings}
 
 def generate_answer_node(state: GraphState):
     """:param state: The current graph state. :return: New state with the final answer."""
@@ -113,11 +308,13 @@ def generate_answer_node(state: GraphState):
     
     print(f"\n\nstate['rag_judgement']: {state['rag_judgement']}\n\n")
 
-    if state["rag_judgement"] == "RAG":
-        context = state["retrieved_docs"]
-        answer = mock_llm_generate(messages, context, llm_api_key = os.getenv("UPSTAGE_API_KEY"))
-    else:
-        answer = mock_llm_generate_no_rag(messages, llm_api_key = os.getenv("UPSTAGE_API_KEY"))
+    with usage_scope(state.get("thread_id"), "generate_answer"):
+        if state["rag_judgement"] == "RAG":
+            context = get_paper_cache().get_documents(state.get("retrieved_ids") or [])
+            augmented_question = state.get("augmented_question") if AUGMENT_TARGET == "generation" else None
+            answer = mock_llm_generate(messages, context, llm_api_key = os.getenv("UPSTAGE_API_KEY"), augmented_question = augmented_question)
+        else:
+            answer = mock_llm_generate_no_rag(messages, llm_api_key = os.getenv("UPSTAGE_API_KEY"))
     return {"messages": [answer]}
 
 def should_search_web(state: GraphState) -> str:
@@ -130,10 +327,15 @@ def should_search_web(state: GraphState) -> str:
         print("❌ SBP 미발견. 웹 검색을 시작합니다.")
         return "web_search"
 
-def rag_condition(state: GraphState) -> str:
-    """:param state: The current graph state. :return: The name of the next node to call."""
+def rag_condition(state: GraphState) -> str | list[str]:
+    """
+    :param state: The current graph state. 
+    :return: The name of the next node to call. 질문 증강이 켜져 있으면 검색과 증강을 동시에 실행한다.
+    """
     print("\n--- 조건 분기: rag_condition ---")
     if state["rag_judgement"] == "RAG":
+        if AUGMENT_TARGET != "off":
+            return ["retrieve_and_select", "augment_question"]
         return "retrieve_and_select"
     else:
         return "generate_answer"
\ No newline at end of file
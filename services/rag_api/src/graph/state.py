@@ -1,17 +1,22 @@
 from typing import TypedDict, List, Annotated
 from langgraph.graph.message import add_messages
-from langchain_core.documents import Document
+
+def merge_timings(left: dict | None, right: dict | None) -> dict:
+    """노드별 실행 시간(ms)을 누적한다. right가 None이면 초기화한다(새 대화 턴 시작)."""
+    if right is None:
+        return {}
+    return {**(left or {}), **right}
 
 class GraphState(TypedDict):
     """Represents the state of our graph."""
     initial_query: str # 사용자가 입력한 논문 제목
     sbp_found: bool # sbp (selected base paper)
     sbp_title: str # full title of sbp
-    retrieved_docs: List[Document]
+    retrieved_ids: List[str] # 답변 생성에 사용할 후속 논문 openalex_id (초록은 core/paper_cache.py 에서 조회)
     answer: str
 
     ### 김정빈 ###
-    paper_search_result: dict | None
+    paper_search_result: dict | None # 기준 논문 paper_ref (openalex_id, title 등 작은 메타데이터만. core/paper_cache.py)
     is_chat_mode: bool
     rag_judgement: str
     messages: Annotated[list, add_messages]
@@ -19,6 +24,9 @@ class GraphState(TypedDict):
     thread_id: str # 각 대화 세션을 식별하는 ID
     question: str # Phase 2 에서 사용자가 입력한 프롬프트
     history: str
+    node_timings: Annotated[dict, merge_timings] # 노드/브랜치별 실행 시간(ms)
+    augmented_question: str # 키워드 정의로 증강 + 영어로 번역된 질문 (augment_question 노드)
+    augmented_ids: List[str] # 증강된 질문으로 검색한 후속 논문 openalex_id
 
     ### 이나경 ###
 
@@ -1,3 +1,5 @@
+import time
+from contextlib import contextmanager
 from langchain_core.documents import Document
 from langchain_core.messages import BaseMessage, HumanMessage
 from typing import List
@@ -25,6 +27,7 @@ def convert_to_documents(results: List[dict]) -> List[Document]:
             "authors": row.get('authors'),
             "cited_by_count": row.get('cited_by_count'),
             "pdf_url": row.get('pdf_url'),
+            "sources": row.get('sources'), # 다중 소스 검색(core/multi_source.py)에서 찾은 소스 (db, openalex, tavily)
         }
         
         # Document 객체 생성 및 리스트에 추가
@@ -40,4 +43,15 @@ def get_last_user_query(messages: List[BaseMessage]) -> str:
     for message in reversed(messages):
         if isinstance(message, HumanMessage):
             return message.content
-    return ""
\ No newline at end of file
+    return ""
+
+@contextmanager
+def timed(timings: dict, key: str):
+    """
+    with 블록의 실행 시간을 ms 단위로 timings[key]에 기록합니다.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[key] = round((time.perf_counter() - start) * 1000, 1)
@@ -0,0 +1,26 @@
+import os
+import sys
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+sys.path.append(ROOT_DIR)
+
+from services.rag_api.src.core.retriever import insert_definitions
+
+def test_insert_definitions_does_not_match_inside_inserted_definition():
+    text = "How does LoRA compare to fine-tuning?"
+    definitions = {
+        "LoRA": "low-rank adaptation, an alternative to fine-tuning",
+        "fine-tuning": "updating all weights",
+    }
+    assert insert_definitions(text, definitions) == (
+        "How does LoRA (low-rank adaptation, an alternative to fine-tuning) "
+        "compare to fine-tuning (updating all weights)?"
+    )
+
+def test_insert_definitions_appends_unmatched_and_overlapping_keywords():
+    text = "Parameter-efficient fine-tuning of LLMs"
+    definitions = {"fine-tuning": "updating weights", "tuning": "adjusting", "RLHF": "", "adapter": "small module"}
+    assert insert_definitions(text, definitions) == (
+        "Parameter-efficient fine-tuning (updating weights) of LLMs"
+        "\n\nKeyword definitions:\n- tuning: adjusting\n- adapter: small module"
+    )